@@ -10,9 +10,12 @@ class Command(BaseCommand):
         )
         
         try:
-            Appointment.update_all_statuses()
+            changed = Appointment.update_all_statuses()
             self.stdout.write(
-                self.style.SUCCESS('Statusy zostały zaktualizowane pomyślnie!')
+                self.style.SUCCESS(
+                    f"Statusy zostały zaktualizowane pomyślnie! Zakończone: {len(changed['completed'])}, "
+                    f"w trakcie: {len(changed['in_progress'])}"
+                )
             )
         except Exception as e:
             self.stdout.write(
@@ -0,0 +1,77 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:20
+
+from datetime import timedelta
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+def fill_end_date_and_resolve_overlaps(apps, schema_editor):
+    """
+    Uzupełnij end_date i odepnij mechanika od wizyt, które nachodzą na jego
+    wcześniejszą wizytę - inaczej nie da się utworzyć ograniczenia
+    """
+    Appointment = apps.get_model('appointments', 'Appointment')
+
+    to_update = []
+    last_end_by_mechanic = {}
+    for appointment in Appointment.objects.order_by('assigned_mechanic_id', 'date', 'id').iterator(chunk_size=2000):
+        appointment.end_date = appointment.date + timedelta(minutes=appointment.duration_estimate or 120)
+        mechanic_id = appointment.assigned_mechanic_id
+        if mechanic_id is not None and appointment.status in ('scheduled', 'in_progress'):
+            last_end = last_end_by_mechanic.get(mechanic_id)
+            if last_end is not None and appointment.date < last_end:
+                appointment.assigned_mechanic_id = None
+            else:
+                last_end_by_mechanic[mechanic_id] = appointment.end_date
+        to_update.append(appointment)
+
+    Appointment.objects.bulk_update(to_update, ['end_date', 'assigned_mechanic'], batch_size=2000)
+
+
+def create_no_overlap_constraint(apps, schema_editor):
+    # EXCLUDE USING gist jest dostępne tylko na PostgreSQL; DEFERRABLE pozwala
+    # zamienić terminy wizyt w jednym UPDATE (bulk_update)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        """
+        ALTER TABLE appointments_appointment
+        ADD CONSTRAINT appointment_mechanic_no_overlap
+        EXCLUDE USING gist (
+            tstzrange("date", end_date, '[)') WITH &&,
+            assigned_mechanic_id WITH =
+        )
+        WHERE (
+            status IN ('scheduled', 'in_progress')
+            AND assigned_mechanic_id IS NOT NULL
+            AND end_date IS NOT NULL
+        )
+        DEFERRABLE INITIALLY IMMEDIATE
+        """
+    )
+
+
+def drop_no_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "ALTER TABLE appointments_appointment DROP CONSTRAINT IF EXISTS appointment_mechanic_no_overlap"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0006_alter_appointment_appointment_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='end_date',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Koniec wizyty (date + duration_estimate), utrzymywany w save()', null=True),
+        ),
+        migrations.RunPython(fill_end_date_and_resolve_overlaps, migrations.RunPython.noop),
+        BtreeGistExtension(),
+        migrations.RunPython(create_no_overlap_constraint, drop_no_overlap_constraint),
+    ]
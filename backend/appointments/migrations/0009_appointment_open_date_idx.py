@@ -0,0 +1,21 @@
+# Generated by Django 5.0.3 on 2026-10-18 04:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0008_row_versioning'),
+        ('vehicles', '0006_row_versioning'),
+        ('workshops', '0008_row_versioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status__in', ['scheduled', 'in_progress'])), fields=['date', 'end_date'], name='appointment_open_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-18 04:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0009_appointment_open_date_idx'),
+        ('vehicles', '0006_row_versioning'),
+        ('workshops', '0008_row_versioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['workshop', 'date'], name='appointment_workshop_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('assigned_mechanic__isnull', False)), fields=['assigned_mechanic', 'date'], name='appointment_mechanic_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'date'], name='appointment_status_date_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from django.db import migrations
+
+
+def recompute_end_date(apps, schema_editor):
+    """
+    Przelicz end_date wierszy zapisanych przez bulk_create() / QuerySet.update(),
+    które zostawiały NULL albo nieaktualny koniec, i odepnij mechanika od wizyt,
+    które po przeliczeniu nachodzą na jego wcześniejszą wizytę
+    """
+    Appointment = apps.get_model('appointments', 'Appointment')
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS appointment_mechanic_no_overlap DEFERRED')
+
+    to_update = []
+    last_end_by_mechanic = {}
+    for appointment in Appointment.objects.order_by('assigned_mechanic_id', 'date', 'id').iterator(chunk_size=2000):
+        end_date = appointment.date + timedelta(minutes=appointment.duration_estimate or 120)
+        changed = appointment.end_date != end_date
+        appointment.end_date = end_date
+        mechanic_id = appointment.assigned_mechanic_id
+        if mechanic_id is not None and appointment.status in ('scheduled', 'in_progress'):
+            last_end = last_end_by_mechanic.get(mechanic_id)
+            if last_end is not None and appointment.date < last_end:
+                appointment.assigned_mechanic_id = None
+                changed = True
+            else:
+                last_end_by_mechanic[mechanic_id] = end_date
+        if changed:
+            to_update.append(appointment)
+
+    Appointment.objects.bulk_update(to_update, ['end_date', 'assigned_mechanic'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0010_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_end_date, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,86 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F, Func, Q, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.contrib.postgres.fields import DateTimeRangeField, RangeBoundary
 from users.models import User
 from vehicles.models import Vehicle
 from workshops.models import Workshop
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
+from backend.versioning import VersionedModel, VersionedQuerySet
 
-class Appointment(models.Model):
+class TsTzRange(Func):
+    function = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
+def estimated_end_expression(date=None, duration=None):
+    """
+    Koniec wizyty liczony w SQL: date + COALESCE(duration_estimate, 120) minut -
+    ta sama reguła co Appointment.estimated_end_time
+    """
+    date = F('date') if date is None else date
+    duration = F('duration_estimate') if duration is None else duration
+    minutes = ExpressionWrapper(
+        Coalesce(NullIf(duration, Value(0)), Value(Appointment.DEFAULT_DURATION)) * Value(timedelta(minutes=1)),
+        output_field=DurationField()
+    )
+    return ExpressionWrapper(date + minutes, output_field=DateTimeField())
+
+
+class AppointmentQuerySet(VersionedQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """bulk_create() pomija save() - end_date ustawiamy tu, inaczej zostałby NULL"""
+        objs = list(objs)
+        for appointment in objs:
+            appointment.end_date = appointment.estimated_end_time
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Zmiana date lub duration_estimate przelicza też end_date"""
+        objs = list(objs)
+        if {'date', 'duration_estimate'} & set(fields) and 'end_date' not in fields:
+            for appointment in objs:
+                appointment.end_date = appointment.estimated_end_time
+            fields = [*fields, 'end_date']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        return super().update(**self._with_end_date(kwargs))
+
+    def update_returning_ids(self, **kwargs):
+        return super().update_returning_ids(**self._with_end_date(kwargs))
+
+    @staticmethod
+    def _with_end_date(values):
+        """
+        UPDATE zmieniający date lub duration_estimate liczy end_date w tym samym
+        poleceniu z nowych wartości (SET widzi stare wartości kolumn)
+        """
+        if ('date' in values or 'duration_estimate' in values) and 'end_date' not in values:
+            date = values.get('date', F('date'))
+            duration = values.get('duration_estimate', F('duration_estimate'))
+            values['end_date'] = estimated_end_expression(
+                date if hasattr(date, 'resolve_expression') else Value(date, output_field=DateTimeField()),
+                duration if hasattr(duration, 'resolve_expression') else Value(duration, output_field=models.IntegerField())
+            )
+        return values
+
+    def overlapping(self, start, end):
+        """
+        Wizyty, których przedział [date, end_date) nachodzi na [start, end).
+        Na PostgreSQL filtr używa tstzrange, więc trafia w indeks GiST ograniczenia
+        appointment_mechanic_no_overlap.
+        """
+        if connection.vendor == 'postgresql':
+            return self.annotate(
+                period=TsTzRange('date', 'end_date', RangeBoundary())
+            ).filter(period__overlap=(start, end))
+        return self.filter(date__lt=end, end_date__gt=start)
+
+
+class Appointment(VersionedModel):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
         ('in_progress', 'In Progress'), 
@@ -43,6 +117,10 @@ class Appointment(models.Model):
         'maintenance': 90,
         'other': 120,
     }
+    DEFAULT_DURATION = 120
+
+    # Statusy, w których wizyta zajmuje warsztat i mechanika
+    ACTIVE_STATUSES = ['scheduled', 'in_progress']
 
     client = models.ForeignKey(User, on_delete=models.CASCADE, related_name='appointments')
     workshop = models.ForeignKey(Workshop, on_delete=models.CASCADE, related_name='appointments')
@@ -78,6 +156,31 @@ class Appointment(models.Model):
         blank=True,
         help_text="Szacowany czas trwania w minutach"
     )
+    end_date = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Koniec wizyty (date + duration_estimate), utrzymywany w save()"
+    )
+
+    objects = AppointmentQuerySet.as_manager()
+
+    # Wykluczenie nakładających się aktywnych wizyt tego samego mechanika
+    # (EXCLUDE USING gist na tstzrange(date, end_date)) tworzy migracja 0007
+    # i istnieje tylko na PostgreSQL.
+    NO_OVERLAP_CONSTRAINT = 'appointment_mechanic_no_overlap'
+
+    class Meta:
+        indexes = [
+            # Wizyty, których status jeszcze się zmieni (update_all_statuses co minutę)
+            models.Index(fields=['date', 'end_date'], condition=Q(status__in=['scheduled', 'in_progress']),
+                         name='appointment_open_date_idx'),
+            # Kalendarze warsztatu i mechanika oraz listy po statusie - zakres dat (AppointmentRepository)
+            models.Index(fields=['workshop', 'date'], name='appointment_workshop_date_idx'),
+            models.Index(fields=['assigned_mechanic', 'date'], condition=Q(assigned_mechanic__isnull=False),
+                         name='appointment_mechanic_date_idx'),
+            models.Index(fields=['status', 'date'], name='appointment_status_date_idx'),
+        ]
 
     def __str__(self):
         return f"Wizyta {self.client.username} w {self.workshop.name}"
@@ -97,6 +200,7 @@ class Appointment(models.Model):
         # Auto-set duration based on appointment type if not set
         if not self.duration_estimate and self.appointment_type:
             self.duration_estimate = self.APPOINTMENT_DURATIONS.get(self.appointment_type, 120)
+        self.end_date = self.estimated_end_time
         # Automatycznie ustaw status na podstawie daty
         self.update_status_based_on_date()
         super().save(*args, **kwargs)
@@ -121,22 +225,38 @@ class Appointment(models.Model):
             self.status = 'in_progress'
     
     @classmethod
-    def update_all_statuses(cls):
+    def update_all_statuses(cls, now=None):
         """
-        Aktualizuje statusy wszystkich appointments na podstawie daty
+        Przejścia statusów dwoma UPDATE ... WHERE z końcem wizyty liczonym w SQL z date
+        i duration_estimate (jak update_status_based_on_date, także dla wierszy z pustym
+        lub nieaktualnym end_date). Zwraca id zmienionych wizyt: {'completed': [...], 'in_progress': [...]}.
         """
-        for appointment in cls.objects.exclude(status='completed'):
-            old_status = appointment.status
-            appointment.update_status_based_on_date()
-            if old_status != appointment.status:
-                appointment.save()
+        from .signals import appointment_statuses_changed
+
+        now = now or timezone.now()
+        # Oba przejścia dotyczą wizyt już rozpoczętych - zakres na pierwszej kolumnie appointment_open_date_idx
+        started = cls.objects.filter(status__in=cls.ACTIVE_STATUSES, date__lte=now).alias(
+            estimated_end=estimated_end_expression()
+        )
+        with transaction.atomic():
+            completed = started.filter(estimated_end__lt=now).update_returning_ids(status='completed')
+            in_progress = started.filter(status='scheduled', estimated_end__gte=now).update_returning_ids(
+                status='in_progress'
+            )
+
+        # Bez save() nie ma post_save - dostępność się nie zmienia (oba statusy otwarte zajmują
+        # sloty, a wizyta kończy się dopiero po swoim końcu), więc cache dni zostaje bez zmian
+        changed = {'completed': completed, 'in_progress': in_progress}
+        if completed or in_progress:
+            appointment_statuses_changed.send(sender=cls, changed=changed)
+        return changed
     
     @property
     def estimated_end_time(self):
         """
         Zwraca szacowany czas zakończenia wizyty
         """
-        duration = self.duration_estimate if self.duration_estimate else 120
+        duration = self.duration_estimate if self.duration_estimate else self.DEFAULT_DURATION
         return self.date + timedelta(minutes=duration)
 
 class RepairJob(models.Model):
@@ -1,8 +1,41 @@
+from datetime import datetime, time, timedelta
+from django.db import models
+from django.utils import timezone
 from ..models import Appointment
 from backend.repositories.baseRepository import BaseRepository
 
 class AppointmentRepository(BaseRepository):
     model = Appointment
+    # AppointmentSerializer czyta klienta, warsztat, pojazd i mechanika każdej wizyty
+    eager_loading = {
+        'default': {'select_related': ('client', 'workshop', 'vehicle', 'assigned_mechanic')},
+        # Kanał kalendarza czyta kolumny przez values_list - JOIN bez tworzenia modeli
+        'calendar': {},
+    }
+    CALENDAR_FIELDS = (
+        'id', 'date', 'duration_estimate', 'status', 'appointment_type', 'priority',
+        'assigned_mechanic_id', 'workshop_id', 'client_id',
+        'vehicle__brand', 'vehicle__model', 'vehicle__registration_number',
+    )
+
+    @staticmethod
+    def filter_days(appointments, start_date=None, end_date=None):
+        """
+        Filters appointments to the local days [start_date, end_date] with a range on
+        the date column. Unlike date__date it does not cast the column, so the query
+        can use the (workshop, date) / (assigned_mechanic, date) indexes.
+        """
+        if start_date:
+            appointments = appointments.filter(date__gte=AppointmentRepository._day_start(start_date))
+        if end_date:
+            appointments = appointments.filter(date__lt=AppointmentRepository._day_start(end_date, days_after=1))
+        return appointments
+
+    @staticmethod
+    def _day_start(day, days_after=0):
+        """Start of the day (a date or 'YYYY-MM-DD') in the current time zone."""
+        day = models.DateField().to_python(day) + timedelta(days=days_after)
+        return timezone.make_aware(datetime.combine(day, time.min))
 
     @staticmethod
     def get_appointments_by_client(client_id, start_date=None, end_date=None):
@@ -11,13 +44,10 @@ class AppointmentRepository(BaseRepository):
         Optionally filters by date range.
         """
         try:
-            appointments = Appointment.objects.filter(client_id=client_id)
+            appointments = AppointmentRepository.queryset().filter(client_id=client_id)
             
             # Apply date filters if provided
-            if start_date:
-                appointments = appointments.filter(date__date__gte=start_date)
-            if end_date:
-                appointments = appointments.filter(date__date__lte=end_date)
+            appointments = AppointmentRepository.filter_days(appointments, start_date, end_date)
             
             # Return empty queryset instead of raising error when no appointments found
             return appointments
@@ -31,13 +61,10 @@ class AppointmentRepository(BaseRepository):
         Optionally filters by date range.
         """
         try:
-            appointments = Appointment.objects.filter(assigned_mechanic_id=mechanic_id)
+            appointments = AppointmentRepository.queryset().filter(assigned_mechanic_id=mechanic_id)
             
             # Apply date filters if provided
-            if start_date:
-                appointments = appointments.filter(date__date__gte=start_date)
-            if end_date:
-                appointments = appointments.filter(date__date__lte=end_date)
+            appointments = AppointmentRepository.filter_days(appointments, start_date, end_date)
             
             # Return empty queryset instead of raising error when no appointments found
             return appointments
@@ -51,26 +78,39 @@ class AppointmentRepository(BaseRepository):
         Optionally filters by date range.
         """
         try:
-            appointments = Appointment.objects.filter(workshop_id=workshop_id)
+            appointments = AppointmentRepository.queryset().filter(workshop_id=workshop_id)
             
             # Apply date filters if provided
-            if start_date:
-                appointments = appointments.filter(date__date__gte=start_date)
-            if end_date:
-                appointments = appointments.filter(date__date__lte=end_date)
+            appointments = AppointmentRepository.filter_days(appointments, start_date, end_date)
             
             # Return empty queryset instead of raising error when no appointments found
             return appointments
         except Exception as e:
             raise RuntimeError(f"Error retrieving appointments for workshop {workshop_id}: {str(e)}")
 
+    @staticmethod
+    def get_calendar(start_date, end_date, workshop_id=None, mechanic_id=None):
+        """
+        Retrieves the appointments of a workshop or a mechanic starting on the local
+        days [start_date, end_date], ordered by date. Read the rows with CALENDAR_FIELDS.
+        """
+        try:
+            appointments = AppointmentRepository.queryset('calendar')
+            if workshop_id is not None:
+                appointments = appointments.filter(workshop_id=workshop_id)
+            if mechanic_id is not None:
+                appointments = appointments.filter(assigned_mechanic_id=mechanic_id)
+            return AppointmentRepository.filter_days(appointments, start_date, end_date).order_by('date', 'id')
+        except Exception as e:
+            raise RuntimeError(f"Error retrieving calendar appointments: {str(e)}")
+
     @staticmethod
     def get_appointments_by_vehicle(vehicle_id):
         """
         Retrieves all appointments for a specific vehicle.
         """
         try:
-            appointments = Appointment.objects.filter(vehicle_id=vehicle_id)
+            appointments = AppointmentRepository.queryset().filter(vehicle_id=vehicle_id)
             # Return empty queryset instead of raising error when no appointments found
             return appointments
         except Exception as e:
@@ -82,7 +122,7 @@ class AppointmentRepository(BaseRepository):
         Retrieves all appointments with a specific status.
         """
         try:
-            appointments = Appointment.objects.filter(status=status)
+            appointments = AppointmentRepository.queryset().filter(status=status)
             # Return empty queryset instead of raising error when no appointments found
             return appointments
         except Exception as e:
@@ -94,7 +134,7 @@ class AppointmentRepository(BaseRepository):
         Retrieves all appointments with a specific priority.
         """
         try:
-            appointments = Appointment.objects.filter(priority=priority)
+            appointments = AppointmentRepository.queryset().filter(priority=priority)
             # Return empty queryset instead of raising error when no appointments found
             return appointments
         except Exception as e:
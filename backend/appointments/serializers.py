@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from backend.sparseFields import SparseFieldsMixin
 from .models import Appointment, RepairJob, CustomerFeedback
 
-class AppointmentSerializer(serializers.ModelSerializer):
+USER_DETAIL_FIELDS = ('id', 'first_name', 'last_name', 'email')
+VEHICLE_DETAIL_FIELDS = ('id', 'brand', 'model', 'year', 'registration_number')
+
+class AppointmentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Dodaj pola tylko do odczytu dla relacji
     client_name = serializers.CharField(source='client.get_full_name', read_only=True)
     workshop_name = serializers.CharField(source='workshop.name', read_only=True)
@@ -25,15 +29,33 @@ class AppointmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Appointment
         fields = '__all__'
+        expandable_fields = ('client_detail', 'mechanic_detail', 'vehicle_detail', 'vehicle_info')
+        # client/vehicle/assigned_mechanic są zastępowane obiektami w to_representation
+        field_sources = {
+            'client': tuple(f'client__{name}' for name in USER_DETAIL_FIELDS),
+            'client_detail': tuple(f'client__{name}' for name in USER_DETAIL_FIELDS),
+            'client_name': ('client__first_name', 'client__last_name'),
+            'assigned_mechanic': tuple(f'assigned_mechanic__{name}' for name in USER_DETAIL_FIELDS),
+            'mechanic_detail': tuple(f'assigned_mechanic__{name}' for name in USER_DETAIL_FIELDS),
+            'vehicle': tuple(f'vehicle__{name}' for name in VEHICLE_DETAIL_FIELDS),
+            'vehicle_detail': tuple(f'vehicle__{name}' for name in VEHICLE_DETAIL_FIELDS),
+            'vehicle_info': ('vehicle__brand', 'vehicle__model', 'vehicle__registration_number'),
+            'appointment_type_display': ('appointment_type',),
+            'service': (),
+            'service_type': (),
+        }
         
     def to_representation(self, instance):
         """Add client/mechanic/vehicle objects to response for frontend compatibility"""
         data = super().to_representation(instance)
         
-        # Add expanded objects for frontend compatibility
-        data['client'] = self.get_client_detail(instance)
-        data['mechanic'] = self.get_mechanic_detail(instance)
-        data['vehicle'] = self.get_vehicle_detail(instance)
+        # Add expanded objects for frontend compatibility (only for selected fields)
+        if 'client' in self.fields:
+            data['client'] = self.get_client_detail(instance)
+        if 'assigned_mechanic' in self.fields:
+            data['mechanic'] = self.get_mechanic_detail(instance)
+        if 'vehicle' in self.fields:
+            data['vehicle'] = self.get_vehicle_detail(instance)
         
         return data
     
@@ -73,12 +95,12 @@ class AppointmentSerializer(serializers.ModelSerializer):
             }
         return None
 
-class RepairJobSerializer(serializers.ModelSerializer):
+class RepairJobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = RepairJob
         fields = '__all__'
 
-class CustomerFeedbackSerializer(serializers.ModelSerializer):
+class CustomerFeedbackSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomerFeedback
         fields = '__all__'
\ No newline at end of file
@@ -1,10 +1,19 @@
 from django.http import Http404
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.db.models.functions import Greatest
+from ..models import Appointment
 from ..repositories.appointmentsRepository import AppointmentRepository
 from backend.services.baseService import BaseService
 
 class AppointmentService(BaseService):
     repository = AppointmentRepository
+    # Kolumny wierszy kanału kalendarza; start - znacznik czasu Unix (s), duration - minuty.
+    # Klient jako id: User nie ma updated_at, więc zmiana jego nazwiska nie zmieniłaby ETag
+    CALENDAR_COLUMNS = [
+        'id', 'start', 'duration', 'status', 'appointment_type', 'priority',
+        'mechanic_id', 'workshop_id', 'client_id', 'vehicle', 'registration_number',
+    ]
 
     @staticmethod
     def get_appointments_by_client(client_id, start_date=None, end_date=None):
@@ -39,6 +48,42 @@ class AppointmentService(BaseService):
         except Exception as e:
             raise RuntimeError(f"Error retrieving appointments for workshop: {str(e)}")
 
+    @staticmethod
+    def get_calendar(start_date, end_date, workshop_id=None, mechanic_id=None):
+        """
+        Retrieves the appointments of a workshop or a mechanic in a calendar window.
+        """
+        try:
+            return AppointmentRepository.get_calendar(start_date, end_date, workshop_id, mechanic_id)
+        except Exception as e:
+            raise RuntimeError(f"Error retrieving calendar: {str(e)}")
+
+    @staticmethod
+    def calendar_state(appointments):
+        """
+        list_state of the calendar feed: the rows embed vehicle columns, so the
+        last update also covers the vehicles of the listed appointments.
+        """
+        return appointments.order_by().aggregate(
+            last_update=Greatest(Max('updated_at'), Max('vehicle__updated_at')), count=Count('pk')
+        )
+
+    @staticmethod
+    def calendar_rows(appointments):
+        """
+        Rows of the calendar feed in CALENDAR_COLUMNS order, from one values_list query.
+        """
+        return [
+            [
+                appointment_id, int(date.timestamp()), duration or Appointment.DEFAULT_DURATION,
+                status, appointment_type, priority, mechanic_id, workshop_id, client_id,
+                f"{brand} {model}".strip(), registration_number,
+            ]
+            for (appointment_id, date, duration, status, appointment_type, priority, mechanic_id, workshop_id,
+                 client_id, brand, model, registration_number)
+            in appointments.values_list(*AppointmentRepository.CALENDAR_FIELDS)
+        ]
+
     @staticmethod
     def get_appointments_by_vehicle(vehicle_id):
         """
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Wysyłany przez Appointment.update_all_statuses po zbiorczej zmianie statusów
+# (UPDATE bez save() i post_save); changed = {'completed': [id, ...], 'in_progress': [id, ...]}
+appointment_statuses_changed = Signal()
@@ -12,9 +12,13 @@ def update_appointment_statuses():
     """
     try:
         logger.info("Rozpoczęcie automatycznej aktualizacji statusów appointments")
-        Appointment.update_all_statuses()
-        logger.info("Automatyczna aktualizacja statusów zakończona pomyślnie")
-        return "Statusy zostały zaktualizowane"
+        changed = Appointment.update_all_statuses()
+        logger.info(
+            f"Automatyczna aktualizacja statusów zakończona pomyślnie: "
+            f"{len(changed['completed'])} zakończonych, {len(changed['in_progress'])} w trakcie"
+        )
+        # Lista id dla zadań i konsumentów uruchamianych po tym zadaniu
+        return changed
     except Exception as e:
         logger.error(f"Błąd podczas aktualizacji statusów: {str(e)}")
         raise
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason="Ograniczenie EXCLUDE USING gist istnieje tylko na PostgreSQL"
+)
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="conflict_client", email="conflict_client@example.com", password="password123")
+
+@pytest.fixture
+def mechanic(db):
+    return User.objects.create_user(
+        username="conflict_mechanic", email="conflict_mechanic@example.com", password="password123", role="mechanic"
+    )
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Conflict Workshop")
+
+@pytest.fixture
+def vehicle(db, client_user):
+    return Vehicle.objects.create(
+        owner=client_user,
+        brand="toyota",
+        model="Corolla",
+        registration_number="CNF123",
+        vin="1HGCM82633A654321",
+        year=2020,
+    )
+
+@pytest.fixture
+def start():
+    return timezone.make_aware(datetime(2030, 1, 7, 10, 0))
+
+@pytest.fixture
+def book(client_user, workshop, vehicle, mechanic):
+    def _book(date, duration=60, assigned_mechanic=mechanic):
+        return Appointment.objects.create(
+            client=client_user,
+            workshop=workshop,
+            vehicle=vehicle,
+            assigned_mechanic=assigned_mechanic,
+            date=date,
+            duration_estimate=duration
+        )
+    return _book
+
+
+@pytest.mark.django_db
+def test_end_date_follows_date_and_duration(book, start):
+    appointment = book(start, duration=90)
+    assert appointment.end_date == start + timedelta(minutes=90)
+
+    appointment.date = start + timedelta(hours=2)
+    appointment.save()
+    appointment.refresh_from_db()
+    assert appointment.end_date == start + timedelta(hours=3, minutes=30)
+
+@pytest.mark.django_db
+def test_end_date_follows_bulk_writes(client_user, workshop, vehicle, start):
+    # bulk_create() i QuerySet.update() omijają save() - end_date liczy AppointmentQuerySet
+    timed, untimed = Appointment.objects.bulk_create([
+        Appointment(client=client_user, workshop=workshop, vehicle=vehicle, date=start, duration_estimate=30),
+        Appointment(client=client_user, workshop=workshop, vehicle=vehicle, date=start),
+    ])
+    ends = dict(Appointment.objects.values_list('id', 'end_date'))
+    assert ends == {timed.id: start + timedelta(minutes=30), untimed.id: start + timedelta(minutes=Appointment.DEFAULT_DURATION)}
+
+    Appointment.objects.filter(id=timed.id).update(duration_estimate=180)
+    Appointment.objects.filter(id=untimed.id).update(date=start + timedelta(hours=1), duration_estimate=45)
+    ends = dict(Appointment.objects.values_list('id', 'end_date'))
+    assert ends == {timed.id: start + timedelta(hours=3), untimed.id: start + timedelta(hours=1, minutes=45)}
+
+    timed.refresh_from_db()
+    timed.date = start + timedelta(days=1)
+    Appointment.objects.bulk_update([timed], ['date'])
+    timed.refresh_from_db()
+    assert timed.end_date == start + timedelta(days=1, hours=3)
+
+@pytest.mark.django_db
+def test_overlapping_uses_half_open_ranges(book, start):
+    overnight = book(start - timedelta(hours=12), duration=13 * 60, assigned_mechanic=None)
+    inside = book(start + timedelta(hours=1), assigned_mechanic=None)
+    book(start + timedelta(hours=2), assigned_mechanic=None)
+
+    overlapping = Appointment.objects.overlapping(start, start + timedelta(hours=2))
+
+    assert set(overlapping.values_list('id', flat=True)) == {overnight.id, inside.id}
+
+@postgres_only
+@pytest.mark.django_db(transaction=True)
+def test_database_rejects_overlapping_bookings(book, start):
+    book(start, duration=120)
+    # Wizyta zaczynająca się dokładnie po poprzedniej nie koliduje
+    book(start + timedelta(hours=2))
+
+    with pytest.raises(IntegrityError, match=Appointment.NO_OVERLAP_CONSTRAINT):
+        with transaction.atomic():
+            book(start + timedelta(hours=1))
+
+    # Inny mechanik lub brak mechanika nie podlega ograniczeniu
+    book(start + timedelta(hours=1), assigned_mechanic=None)
+
+@pytest.mark.django_db
+def test_conflict_returns_409(client_user, workshop, vehicle, mechanic, start):
+    api_client = APIClient()
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(client_user).access_token}')
+    payload = {
+        "client": client_user.id,
+        "workshop": workshop.id,
+        "vehicle": vehicle.id,
+        "assigned_mechanic": mechanic.id,
+        "date": start.isoformat(),
+        "status": "scheduled",
+        "priority": "medium",
+        "booking_type": "standard",
+    }
+    error = IntegrityError(f'conflicting key value violates exclusion constraint "{Appointment.NO_OVERLAP_CONSTRAINT}"')
+
+    with patch('appointments.services.appointmentsService.AppointmentService.create', side_effect=error):
+        response = api_client.post(reverse("appointments-list"), payload, format='json')
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.data["error"] == "The assigned mechanic already has an appointment at this time"
@@ -0,0 +1,163 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+import pytest
+from datetime import datetime, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from appointments.services.appointmentsService import AppointmentService
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username="calendar_client", email="calendar_client@example.com", password="password123")
+
+@pytest.fixture
+def mechanic(db):
+    return User.objects.create_user(
+        username="calendar_mechanic", email="calendar_mechanic@example.com", password="password123", role="mechanic"
+    )
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Calendar Workshop")
+
+@pytest.fixture
+def vehicle(client_user):
+    return Vehicle.objects.create(
+        owner=client_user, brand="toyota", model="Corolla", registration_number="CAL123", vin="1HGCM82633A121212", year=2020
+    )
+
+@pytest.fixture
+def api_client(client_user):
+    api_client = APIClient()
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(client_user).access_token}')
+    return api_client
+
+@pytest.fixture
+def book(client_user, workshop, vehicle):
+    def _book(date, duration=60, assigned_mechanic=None, target_workshop=None):
+        return Appointment.objects.create(
+            client=client_user, workshop=target_workshop or workshop, vehicle=vehicle,
+            date=date, duration_estimate=duration, assigned_mechanic=assigned_mechanic
+        )
+    return _book
+
+def calendar(api_client, **params):
+    return api_client.get(reverse('appointments-calendar'), params)
+
+def local(year, month, day, hour=0, minute=0):
+    return timezone.make_aware(datetime(year, month, day, hour, minute))
+
+
+def test_rows_follow_columns(api_client, book, client_user, workshop, mechanic):
+    appointment = book(local(2030, 7, 2, 9, 30), duration=45, assigned_mechanic=mechanic)
+
+    response = calendar(api_client, workshop_id=workshop.id, **{'from': '2030-07-01', 'to': '2030-07-07'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['columns'] == AppointmentService.CALENDAR_COLUMNS
+    assert (response.data['from'], response.data['to']) == ('2030-07-01', '2030-07-07')
+    row = dict(zip(response.data['columns'], response.data['rows'][0]))
+    assert row == {
+        'id': appointment.id, 'start': int(appointment.date.timestamp()), 'duration': 45,
+        'status': appointment.status, 'appointment_type': appointment.appointment_type,
+        'priority': appointment.priority, 'mechanic_id': mechanic.id, 'workshop_id': workshop.id,
+        'client_id': client_user.id, 'vehicle': "toyota Corolla", 'registration_number': "CAL123",
+    }
+
+def test_window_is_inclusive_local_days_ordered_by_start(api_client, book, workshop):
+    later = book(local(2030, 7, 7, 23, 0))
+    first = book(local(2030, 7, 1, 0, 0))
+    book(local(2030, 6, 30, 23, 59))
+    book(local(2030, 7, 8, 0, 0))
+
+    response = calendar(api_client, workshop_id=workshop.id, **{'from': '2030-07-01', 'to': '2030-07-07'})
+
+    assert [row[0] for row in response.data['rows']] == [first.id, later.id]
+
+def test_filters_by_workshop_or_mechanic(api_client, book, workshop, mechanic):
+    other_workshop = Workshop.objects.create(name="Other Calendar Workshop")
+    assigned = book(local(2030, 7, 2, 9), assigned_mechanic=mechanic)
+    unassigned = book(local(2030, 7, 2, 11))
+    elsewhere = book(local(2030, 7, 3, 9), assigned_mechanic=mechanic, target_workshop=other_workshop)
+    window = {'from': '2030-07-01', 'to': '2030-07-07'}
+
+    by_workshop = calendar(api_client, workshop_id=workshop.id, **window)
+    by_mechanic = calendar(api_client, mechanic_id=mechanic.id, **window)
+
+    assert [row[0] for row in by_workshop.data['rows']] == [assigned.id, unassigned.id]
+    assert [row[0] for row in by_mechanic.data['rows']] == [assigned.id, elsewhere.id]
+
+@pytest.mark.parametrize('params', [
+    {'from': '2030-07-01', 'to': '2030-07-07'},
+    {'workshop_id': 1, 'mechanic_id': 1, 'from': '2030-07-01', 'to': '2030-07-07'},
+    {'workshop_id': 'x', 'from': '2030-07-01', 'to': '2030-07-07'},
+    {'workshop_id': 1, 'to': '2030-07-07'},
+    {'workshop_id': 1, 'from': '2030-07-01', 'to': '07/07/2030'},
+    {'workshop_id': 1, 'from': '2030-07-08', 'to': '2030-07-07'},
+    {'workshop_id': 1, 'from': '2030-01-01', 'to': '2030-12-31'},
+])
+def test_invalid_parameters_return_400(api_client, params):
+    response = calendar(api_client, **params)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'error' in response.data
+
+def test_conditional_request_returns_304_until_window_changes(api_client, book, workshop):
+    appointment = book(local(2030, 7, 2, 9))
+    params = {'workshop_id': workshop.id, 'from': '2030-07-01', 'to': '2030-07-07'}
+    etag = calendar(api_client, **params)['ETag']
+
+    response = api_client.get(reverse('appointments-calendar'), params, HTTP_IF_NONE_MATCH=etag)
+    assert (response.status_code, response['ETag']) == (status.HTTP_304_NOT_MODIFIED, etag)
+
+    Appointment.objects.filter(id=appointment.id).update(duration_estimate=90)
+    response = api_client.get(reverse('appointments-calendar'), params, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['rows'][0][2] == 90
+
+def test_vehicle_change_invalidates_etag(api_client, book, workshop, vehicle):
+    book(local(2030, 7, 2, 9))
+    params = {'workshop_id': workshop.id, 'from': '2030-07-01', 'to': '2030-07-07'}
+    etag = calendar(api_client, **params)['ETag']
+
+    # Wiersze zawierają kolumny pojazdu - jego zmiana musi zmienić ETag
+    vehicle.registration_number = "CAL999"
+    vehicle.save()
+    response = api_client.get(reverse('appointments-calendar'), params, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert response.data['rows'][0][-1] == "CAL999"
+
+def test_month_of_2000_appointments_is_small_and_uses_two_queries(api_client, client_user, workshop, vehicle):
+    start = local(2030, 7, 1, 0, 0)
+    Appointment.objects.bulk_create(
+        Appointment(
+            client=client_user, workshop=workshop, vehicle=vehicle, date=start + timedelta(minutes=20 * number),
+            end_date=start + timedelta(minutes=20 * number + 15), duration_estimate=15
+        )
+        for number in range(2000)
+    )
+    params = {'workshop_id': workshop.id, 'from': '2030-07-01', 'to': '2030-07-31'}
+    calendar(api_client, **params)
+
+    with CaptureQueriesContext(connection) as context:
+        response = calendar(api_client, **params)
+
+    assert len(response.data['rows']) == 2000
+    # Agregat ETag i jedno zapytanie values_list z JOIN pojazdu (bez zapytań uwierzytelniania)
+    appointment_queries = [query['sql'] for query in context.captured_queries if 'appointments_appointment' in query['sql']]
+    assert len(appointment_queries) == 2
+    assert len(response.content) < 200 * 1024
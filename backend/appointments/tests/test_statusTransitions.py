@@ -0,0 +1,141 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from appointments.models import Appointment, estimated_end_expression
+from appointments.signals import appointment_statuses_changed
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason="Plan zapytania z indeksem częściowym sprawdzany tylko na PostgreSQL"
+)
+
+
+@pytest.fixture
+def vehicle(db):
+    client = User.objects.create_user(username="status_client", email="status_client@example.com", password="password123")
+    return Vehicle.objects.create(
+        owner=client, brand="toyota", model="Corolla", registration_number="STS123", vin="1HGCM82633A777888", year=2020
+    )
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Status Workshop")
+
+@pytest.fixture
+def make_appointment(vehicle, workshop):
+    def make(start_offset, duration, status):
+        appointment = Appointment.objects.create(
+            client=vehicle.owner, workshop=workshop, vehicle=vehicle,
+            date=timezone.now() + start_offset, duration_estimate=duration
+        )
+        # save() sam poprawia status - stan sprzed uruchomienia zadania ustawiamy z pominięciem save()
+        Appointment.objects.filter(id=appointment.id).update(status=status)
+        appointment.refresh_from_db()
+        return appointment
+    return make
+
+def per_row_status(appointment, now):
+    """Status wyliczony jak dawniej przez update_status_based_on_date()"""
+    estimated_end = appointment.date + timedelta(minutes=appointment.duration_estimate or 120)
+    if now > estimated_end and appointment.status != 'completed':
+        return 'completed'
+    if appointment.date <= now <= estimated_end and appointment.status == 'scheduled':
+        return 'in_progress'
+    return appointment.status
+
+
+def test_transitions_match_per_row_logic(make_appointment):
+    appointments = [
+        make_appointment(timedelta(hours=-5), 60, 'scheduled'),
+        make_appointment(timedelta(hours=-5), 60, 'in_progress'),
+        make_appointment(timedelta(minutes=-30), 60, 'scheduled'),
+        make_appointment(timedelta(minutes=-30), 60, 'in_progress'),
+        make_appointment(timedelta(hours=2), 60, 'scheduled'),
+        make_appointment(timedelta(hours=-5), 60, 'completed'),
+        make_appointment(timedelta(hours=-1), 180, 'scheduled'),
+    ]
+    now = timezone.now()
+    expected = {appointment.id: per_row_status(appointment, now) for appointment in appointments}
+
+    changed = Appointment.update_all_statuses(now)
+
+    assert dict(Appointment.objects.values_list('id', 'status')) == expected
+    assert sorted(changed['completed']) == [appointments[0].id, appointments[1].id]
+    assert sorted(changed['in_progress']) == [appointments[2].id, appointments[6].id]
+
+def test_end_is_computed_from_date_and_duration(make_appointment):
+    missing_end = make_appointment(timedelta(hours=-5), 60, 'scheduled')
+    stale_long = make_appointment(timedelta(minutes=-30), 180, 'scheduled')
+    stale_short = make_appointment(timedelta(hours=-3), 60, 'in_progress')
+    # Wiersze zapisane z pominięciem end_date albo z końcem sprzed zmiany czasu trwania
+    Appointment.objects.filter(id=missing_end.id).update(end_date=None)
+    Appointment.objects.filter(id=stale_long.id).update(end_date=stale_long.date + timedelta(minutes=10))
+    Appointment.objects.filter(id=stale_short.id).update(end_date=stale_short.date + timedelta(hours=8))
+    now = timezone.now()
+    expected = {
+        appointment.id: per_row_status(appointment, now)
+        for appointment in (missing_end, stale_long, stale_short)
+    }
+
+    changed = Appointment.update_all_statuses(now)
+
+    assert dict(Appointment.objects.values_list('id', 'status')) == expected
+    assert sorted(changed['completed']) == sorted([missing_end.id, stale_short.id])
+    assert changed['in_progress'] == [stale_long.id]
+
+def test_runs_two_update_statements(make_appointment):
+    for hours in range(-6, 6):
+        make_appointment(timedelta(hours=hours), 90, 'scheduled')
+
+    with CaptureQueriesContext(connection) as context:
+        changed = Appointment.update_all_statuses()
+
+    statements = [query['sql'].split()[0].upper() for query in context.captured_queries]
+    assert statements.count('UPDATE') == 2
+    assert 'SELECT' not in statements
+    assert len(changed['completed']) + len(changed['in_progress']) == 7
+
+def test_updates_bump_version_and_signal_changed_ids(make_appointment):
+    finished = make_appointment(timedelta(hours=-3), 60, 'scheduled')
+    future = make_appointment(timedelta(days=1), 60, 'scheduled')
+    receiver = Mock()
+    appointment_statuses_changed.connect(receiver)
+    try:
+        Appointment.update_all_statuses()
+        Appointment.update_all_statuses()
+    finally:
+        appointment_statuses_changed.disconnect(receiver)
+
+    # Drugie uruchomienie niczego nie zmienia - bez sygnału
+    assert receiver.call_count == 1
+    assert receiver.call_args.kwargs['changed'] == {'completed': [finished.id], 'in_progress': []}
+    versions = (finished.version, future.version)
+    finished.refresh_from_db()
+    future.refresh_from_db()
+    assert (finished.status, finished.version) == ('completed', versions[0] + 1)
+    assert future.version == versions[1]
+
+@postgres_only
+def test_open_appointments_index_is_used(make_appointment):
+    for hours in range(-3, 3):
+        make_appointment(timedelta(hours=hours), 60, 'scheduled')
+    queryset = Appointment.objects.filter(
+        status__in=Appointment.ACTIVE_STATUSES, date__lte=timezone.now()
+    ).alias(estimated_end=estimated_end_expression()).filter(estimated_end__lt=timezone.now())
+
+    with connection.cursor() as cursor:
+        cursor.execute('SET enable_seqscan = off')
+        plan = queryset.explain()
+        cursor.execute('RESET enable_seqscan')
+
+    assert 'appointment_open_date_idx' in plan
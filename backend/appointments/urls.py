@@ -1,6 +1,18 @@
+from django.conf import settings
 from django.urls import path, include
 from .routers import router, urlpatterns
+from .views_collection.AppointmentView import AppointmentViewSet
+from .views_collection.AsyncAppointmentView import MyAppointmentsAsyncView
 
-urlpatterns = [
+# Widok asynchroniczny przed trasami routera, z tą samą nazwą trasy co akcja DRF
+async_read_urlpatterns = [
+    path(
+        'appointments/my-appointments/',
+        MyAppointmentsAsyncView.as_view(sync_view=AppointmentViewSet.as_view({'get': 'my_appointments'})),
+        name='appointments-my-appointments'
+    ),
+] if settings.ASYNC_READ_VIEWS else []
+
+urlpatterns = async_read_urlpatterns + [
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
@@ -1,5 +1,7 @@
-from backend.views_collection.BaseView import BaseViewSet
+from datetime import datetime
+from backend.views_collection.BaseView import BaseViewSet, PAGINATION_PARAMETERS, STREAM_PARAMETERS
 from ..services.appointmentsService import AppointmentService
+from ..models import Appointment
 from ..serializers import AppointmentSerializer
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from rest_framework.decorators import action
@@ -10,11 +12,21 @@ from django.http import Http404
 class AppointmentViewSet(BaseViewSet):
     service = AppointmentService
     serializer_class = AppointmentSerializer
+    conflict_messages = {
+        Appointment.NO_OVERLAP_CONSTRAINT: "The assigned mechanic already has an appointment at this time"
+    }
+    cursor_ordering = 'date'
+    # AppointmentSerializer dołącza dane klienta, warsztatu, pojazdu i mechanika
+    etag_related = ('client', 'workshop', 'vehicle', 'assigned_mechanic')
+    # Najdłuższe okno kanału kalendarza (dni) - ok. dwa miesiące widoku kalendarza
+    calendar_max_days = 62
+    # Np. zmiana statusu wizyt całego dnia; Appointment.save() i sygnały działają per wiersz
+    bulk_actions = True
 
     @extend_schema(
         summary="Get current user's appointments",
-        description="Returns appointments for the current authenticated user based on their role",
-        responses={200: AppointmentSerializer(many=True)}
+        description="Returns appointments for the current authenticated user based on their role. Supports If-None-Match.",
+        responses={200: AppointmentSerializer(many=True), 304: OpenApiResponse(description="Not modified")}
     )
     @action(detail=False, methods=['get'], url_path='my-appointments')
     def my_appointments(self, request):
@@ -36,9 +48,13 @@ class AppointmentViewSet(BaseViewSet):
                     appointments = []
             else:
                 appointments = []
-                
-            serializer = self.serializer_class(appointments, many=True)
-            return Response(serializer.data)
+
+            # Odpytywane co kilka sekund - 304, gdy wizyty się nie zmieniły
+            return self.conditional_response(
+                request,
+                self.list_etag(request, appointments),
+                lambda: Response(self.serializer_class(appointments, many=True).data)
+            )
         except Exception as e:
             return Response(
                 {"error": f"Error fetching appointments: {str(e)}"},
@@ -84,6 +100,8 @@ class AppointmentViewSet(BaseViewSet):
             OpenApiParameter(name="workshop_id", description="ID of the workshop", required=True, type=str),
             OpenApiParameter(name="start_date", description="Start date for filtering (YYYY-MM-DD)", required=False, type=str),
             OpenApiParameter(name="end_date", description="End date for filtering (YYYY-MM-DD)", required=False, type=str),
+            *PAGINATION_PARAMETERS,
+            *STREAM_PARAMETERS,
         ],
         responses={200: AppointmentSerializer(many=True), 404: OpenApiResponse(description="No appointments found")}
     )
@@ -97,8 +115,7 @@ class AppointmentViewSet(BaseViewSet):
         if workshop_id:
             try:
                 appointments = self.service.get_appointments_by_workshop(workshop_id, start_date, end_date)
-                serializer = self.serializer_class(appointments, many=True)
-                return Response(serializer.data)
+                return self.paginated_response(request, appointments)
             except Exception as e:
                 return Response(
                     {"error": f"Error retrieving appointments: {str(e)}"},
@@ -109,6 +126,70 @@ class AppointmentViewSet(BaseViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @extend_schema(
+        summary="Calendar feed of a workshop or mechanic",
+        description="Returns a compact columnar feed of the appointments starting on the days [from, to] "
+                    "(at most 62 days) of a workshop or a mechanic. Each row follows `columns`; `start` is "
+                    "a Unix timestamp in seconds and `duration` is in minutes. Supports If-None-Match; "
+                    "the ETag changes with the appointments and their vehicles.",
+        parameters=[
+            OpenApiParameter(name="workshop_id", description="ID of the workshop (or mechanic_id)", required=False, type=int),
+            OpenApiParameter(name="mechanic_id", description="ID of the mechanic (or workshop_id)", required=False, type=int),
+            OpenApiParameter(name="from", description="First day of the window (YYYY-MM-DD)", required=True, type=str),
+            OpenApiParameter(name="to", description="Last day of the window (YYYY-MM-DD)", required=True, type=str),
+        ],
+        responses={
+            200: OpenApiResponse(description="Columns and rows of the calendar window"),
+            304: OpenApiResponse(description="Not modified"),
+            400: OpenApiResponse(description="Invalid parameters"),
+        }
+    )
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Compact calendar feed of a workshop or a mechanic."""
+        workshop_id = request.query_params.get('workshop_id')
+        mechanic_id = request.query_params.get('mechanic_id')
+        if bool(workshop_id) == bool(mechanic_id):
+            return Response(
+                {"error": "Exactly one of the 'workshop_id' and 'mechanic_id' parameters is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            workshop_id = int(workshop_id) if workshop_id else None
+            mechanic_id = int(mechanic_id) if mechanic_id else None
+            start_date = datetime.strptime(request.query_params.get('from', ''), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.query_params.get('to', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {"error": "Invalid parameters. Use numeric IDs and 'from' / 'to' dates in YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start_date > end_date:
+            return Response({"error": "'from' cannot be after 'to'."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end_date - start_date).days >= self.calendar_max_days:
+            return Response(
+                {"error": f"The calendar window cannot be longer than {self.calendar_max_days} days."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            appointments = self.service.get_calendar(start_date, end_date, workshop_id, mechanic_id)
+            return self.conditional_response(
+                request,
+                self.list_etag(request, appointments, self.service.calendar_state(appointments)),
+                lambda: Response({
+                    "from": start_date.isoformat(),
+                    "to": end_date.isoformat(),
+                    "columns": self.service.CALENDAR_COLUMNS,
+                    "rows": self.service.calendar_rows(appointments),
+                })
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Error retrieving calendar: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @extend_schema(
         summary="Retrieve appointments for a specific vehicle",
         description="Returns a list of appointments for a specific vehicle.",
@@ -0,0 +1,48 @@
+from rest_framework import status
+from backend.views_collection.AsyncView import AsyncAPIView
+from ..services.appointmentsService import AppointmentService
+from ..serializers import AppointmentSerializer
+from .AppointmentView import AppointmentViewSet
+
+
+class MyAppointmentsAsyncView(AsyncAPIView):
+    """Async GET /appointments/my-appointments/ (AppointmentViewSet.my_appointments)."""
+    service = AppointmentService
+    serializer_class = AppointmentSerializer
+    etag_related = AppointmentViewSet.etag_related
+
+    async def user_appointments(self, user):
+        """Appointments of the user based on their role (a queryset, or an empty list)."""
+        if user.role == 'client':
+            return self.service.get_appointments_by_client(user.id)
+        if user.role == 'mechanic':
+            return self.service.get_appointments_by_mechanic(user.id)
+        if user.role == 'owner':
+            # Owner sees all appointments in their workshop
+            from workshops.services.workshopService import WorkshopService
+            workshop = await WorkshopService.aget_user_workshop(user)
+            if workshop:
+                return self.service.get_appointments_by_workshop(workshop.id)
+        return []
+
+    async def get(self, request):
+        try:
+            appointments = await self.user_appointments(request.user)
+
+            # Odpytywane co kilka sekund - 304 po jednym zapytaniu agregującym
+            etag = self.list_etag(request, appointments, await self.alist_state(appointments))
+            response = self.not_modified(request, etag)
+            if response is not None:
+                return response
+
+            if not isinstance(appointments, list):
+                appointments = [appointment async for appointment in appointments]
+            response = self.render(self.serializer_class(appointments, many=True).data)
+            if etag is not None:
+                response['ETag'] = etag
+            return response
+        except Exception as e:
+            return self.render(
+                {"error": f"Error fetching appointments: {str(e)}"},
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
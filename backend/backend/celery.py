@@ -1,6 +1,7 @@
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
@@ -13,10 +14,31 @@ app.conf.beat_schedule = {
         'task': 'appointments.tasks.update_appointment_statuses',
         'schedule': crontab(minute='*'),
     },
+    'refresh-availability-cache': {
+        'task': 'workshops.tasks.refresh_availability_cache',
+        'schedule': crontab(minute=5, hour=0),
+    },
 }
 
 app.autodiscover_tasks()
 
+_routing_tokens = {}
+
+
+@task_prerun.connect
+def begin_database_routing(task_id=None, **kwargs):
+    # Zapis w jednym zadaniu nie przypina kolejnych zadań workera do bazy głównej
+    from backend.dbRouter import DatabaseRouting
+    _routing_tokens[task_id] = DatabaseRouting.begin()
+
+
+@task_postrun.connect
+def end_database_routing(task_id=None, **kwargs):
+    from backend.dbRouter import DatabaseRouting
+    tokens = _routing_tokens.pop(task_id, None)
+    if tokens is not None:
+        DatabaseRouting.end(tokens)
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
@@ -0,0 +1,241 @@
+import logging
+import random
+import threading
+import time as time_module
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connections
+from .redisClient import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = 'default'
+
+# Stan bieżącego żądania (lub zadania Celery): odczyty z bazy głównej / był zapis
+_pinned: ContextVar[bool] = ContextVar('db_pinned', default=False)
+_wrote: ContextVar[bool] = ContextVar('db_wrote', default=False)
+
+# Opóźnienie replikacji PostgreSQL w sekundach; 0, gdy replika odtworzyła cały otrzymany WAL
+POSTGRESQL_LAG_SQL = """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class DatabaseRouting:
+    """
+    Stan kierowania zapytań: przypięcie do bazy głównej (read-your-writes)
+    i opóźnienie replik sprawdzane co LAG_CHECK_INTERVAL_SECONDS w każdym procesie.
+    """
+    PIN_KEY_PREFIX = 'dbpin:user'
+    LAG_CHECK_INTERVAL_SECONDS = 5
+
+    _lag_lock = threading.Lock()
+    # alias: (czas sprawdzenia, opóźnienie w sekundach albo None = niedostępna)
+    _lag: Dict[str, Tuple[float, Optional[float]]] = {}
+    # Modele czytane zawsze z bazy głównej (BaseRepository.read_from_replica = False)
+    primary_models = set()
+
+    @staticmethod
+    def replicas() -> List[str]:
+        return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+    @classmethod
+    def begin(cls):
+        """Nowy stan dla żądania lub zadania; zwraca tokeny dla end()"""
+        return _pinned.set(False), _wrote.set(False)
+
+    @classmethod
+    def end(cls, tokens):
+        pinned, wrote = tokens
+        _pinned.reset(pinned)
+        _wrote.reset(wrote)
+
+    @classmethod
+    def pin(cls):
+        """Kolejne odczyty w tym żądaniu idą do bazy głównej"""
+        _pinned.set(True)
+
+    @classmethod
+    @contextmanager
+    def primary(cls):
+        """Odczyty w bloku idą do bazy głównej (sprawdzenia, po których następuje zapis)"""
+        token = _pinned.set(True)
+        try:
+            yield
+        finally:
+            # Zapis w bloku przypina resztę żądania
+            if not _wrote.get():
+                _pinned.reset(token)
+
+    @classmethod
+    def is_pinned(cls) -> bool:
+        return _pinned.get()
+
+    @classmethod
+    def record_write(cls):
+        _wrote.set(True)
+        _pinned.set(True)
+
+    @classmethod
+    def wrote(cls) -> bool:
+        return _wrote.get()
+
+    @classmethod
+    def _pin_key(cls, user_id) -> str:
+        return f'{cls.PIN_KEY_PREFIX}:{user_id}'
+
+    @classmethod
+    def pin_user(cls, user_id):
+        """Odczyty użytkownika idą do bazy głównej przez DATABASE_PIN_SECONDS (wszystkie procesy)"""
+        if not cls.replicas():
+            return
+        try:
+            get_redis().set(cls._pin_key(user_id), 1, ex=settings.DATABASE_PIN_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Nie można przypiąć użytkownika {user_id} do bazy głównej: {str(e)}")
+
+    @classmethod
+    def pin_if_user_wrote(cls, user_id):
+        """Przypnij bieżące żądanie, jeśli użytkownik niedawno coś zapisał"""
+        if not cls.replicas() or cls.is_pinned():
+            return
+        try:
+            pinned = get_redis().exists(cls._pin_key(user_id))
+        except redis.RedisError:
+            # Bez Redis nie wiadomo, czy zapis już dotarł do replik
+            pinned = True
+        if pinned:
+            cls.pin()
+
+    @classmethod
+    async def apin_if_user_wrote(cls, user_id):
+        """pin_if_user_wrote dla widoków asynchronicznych"""
+        if not cls.replicas() or cls.is_pinned():
+            return
+        try:
+            pinned = await get_async_redis().exists(cls._pin_key(user_id))
+        except redis.RedisError:
+            pinned = True
+        if pinned:
+            cls.pin()
+
+    @classmethod
+    def replica_lag(cls, alias: str) -> Optional[float]:
+        """Opóźnienie repliki w sekundach (z pamięci procesu), None gdy replika nie odpowiada"""
+        now = time_module.monotonic()
+        with cls._lag_lock:
+            checked = cls._lag.get(alias)
+        if checked is not None and now - checked[0] < cls.LAG_CHECK_INTERVAL_SECONDS:
+            return checked[1]
+        lag = cls._measure_lag(alias)
+        with cls._lag_lock:
+            cls._lag[alias] = (now, lag)
+        return lag
+
+    @staticmethod
+    def _measure_lag(alias: str) -> Optional[float]:
+        connection = connections[alias]
+        try:
+            if connection.vendor != 'postgresql':
+                connection.ensure_connection()
+                return 0.0
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRESQL_LAG_SQL)
+                return float(cursor.fetchone()[0])
+        except DatabaseError as e:
+            logger.warning(f"Replika '{alias}' niedostępna: {str(e)}")
+            return None
+
+    @classmethod
+    def reset_lag(cls):
+        with cls._lag_lock:
+            cls._lag.clear()
+
+    @classmethod
+    def read_alias(cls, model=None) -> str:
+        """Losowa replika z akceptowalnym opóźnieniem, w przeciwnym razie baza główna"""
+        if cls.is_pinned() or model in cls.primary_models or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = cls.replicas()
+        if not replicas:
+            return PRIMARY
+        max_lag = settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+        healthy = [alias for alias in replicas if (lag := cls.replica_lag(alias)) is not None and lag <= max_lag]
+        return random.choice(healthy) if healthy else PRIMARY
+
+
+class PrimaryReplicaRouter:
+    """
+    Zapisy do bazy głównej, odczyty do replik z DATABASE_REPLICAS.
+    Po zapisie (i w transakcji) odczyty tego żądania idą do bazy głównej.
+    """
+
+    def db_for_read(self, model, **hints):
+        return DatabaseRouting.read_alias(model)
+
+    def db_for_write(self, model, **hints):
+        DatabaseRouting.record_write()
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Repliki zawierają te same dane co baza główna
+        aliases = {PRIMARY, *DatabaseRouting.replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in DatabaseRouting.replicas():
+            return False
+        return None
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Osobny stan kierowania dla każdego żądania. Po żądaniu z zapisem
+    użytkownik jest przypinany do bazy głównej (BaseViewSet sprawdza to
+    po uwierzytelnieniu, bo JWT nie jest znany przed widokiem).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = DatabaseRouting.begin()
+        try:
+            response = self.get_response(request)
+            if DatabaseRouting.wrote():
+                self._pin_writer(request)
+            return response
+        finally:
+            DatabaseRouting.end(tokens)
+
+    async def __acall__(self, request):
+        tokens = DatabaseRouting.begin()
+        try:
+            response = await self.get_response(request)
+            if DatabaseRouting.wrote():
+                # request.user z sesji może jeszcze wymagać zapytania do bazy
+                await sync_to_async(self._pin_writer)(request)
+            return response
+        finally:
+            DatabaseRouting.end(tokens)
+
+    @staticmethod
+    def _pin_writer(request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            DatabaseRouting.pin_user(user.pk)
@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import threading
+import time as time_module
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterable, Optional, Tuple
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+from django.db.backends.signals import connection_created
+from .redisClient import get_redis
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# nazwa: (typ, opis, kubełki histogramu)
+METRICS = {
+    'http_requests_total': ('counter', "HTTP requests by route, method and status", None),
+    'http_request_duration_seconds': ('histogram', "HTTP request latency", LATENCY_BUCKETS),
+    'http_request_db_queries': ('histogram', "Database queries executed per HTTP request", QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds_total': ('counter', "Time spent in database queries", None),
+    'http_response_size_bytes': ('histogram', "HTTP response body size", SIZE_BUCKETS),
+    'websocket_connections_total': ('counter', "Accepted WebSocket connections", None),
+    'websocket_connections_active': ('gauge', "Open WebSocket connections", None),
+    'websocket_messages_total': ('counter', "WebSocket messages by direction", None),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Metryki w formacie Prometheus wspólne dla wszystkich workerów.
+    Zapis metryki to tylko zmiana licznika w pamięci procesu; wątek w tle co
+    FLUSH_INTERVAL_SECONDS dodaje przyrosty do hasha w Redis (HINCRBYFLOAT),
+    a /metrics czyta sumę ze wszystkich procesów. Bez Redis /metrics pokazuje
+    dane bieżącego procesu.
+    """
+    KEY = 'metrics:samples'
+    FLUSH_INTERVAL_SECONDS = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._totals = Counter()
+        self._flusher_pid: Optional[int] = None
+
+    @staticmethod
+    def _field(sample: str, labels: Labels) -> str:
+        return json.dumps([sample, labels], separators=(',', ':'))
+
+    def _add(self, increments: Iterable[Tuple[str, Labels, float]]):
+        self._ensure_flusher()
+        with self._lock:
+            for sample, labels, value in increments:
+                field = self._field(sample, labels)
+                self._pending[field] += value
+                self._totals[field] += value
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Zwiększ licznik (lub zmień gauge o value)"""
+        self._add([(name, tuple(sorted(labels.items())), value)])
+
+    def observe(self, name: str, value: float, **labels):
+        """Dodaj obserwację do histogramu (kubełki skumulowane, _sum i _count)"""
+        base = tuple(sorted(labels.items()))
+        increments = [
+            (f'{name}_bucket', base + (('le', _format_value(bucket)),), 1)
+            for bucket in METRICS[name][2] if value <= bucket
+        ]
+        increments += [
+            (f'{name}_bucket', base + (('le', '+Inf'),), 1),
+            (f'{name}_sum', base, value),
+            (f'{name}_count', base, 1),
+        ]
+        self._add(increments)
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            if self._flusher_pid is not None:
+                # Proces potomny: przyrosty rodzica zapisze rodzic
+                self._pending.clear()
+                self._totals.clear()
+            self._flusher_pid = pid
+        threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time_module.sleep(self.FLUSH_INTERVAL_SECONDS)
+            self.flush()
+
+    def flush(self) -> bool:
+        """Dodaj przyrosty tego procesu do Redis; przy błędzie zostają na następną próbę"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return True
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            for field, value in pending.items():
+                pipeline.hincrbyfloat(self.KEY, field, value)
+            pipeline.execute()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Metryki nie zostały zapisane w Redis: {str(e)}")
+            with self._lock:
+                self._pending.update(pending)
+            return False
+
+    def snapshot(self) -> Tuple[Dict[str, float], bool]:
+        """(wartości próbek, czy to suma wszystkich workerów)"""
+        if self.flush():
+            try:
+                return {field: float(value) for field, value in get_redis().hgetall(self.KEY).items()}, True
+            except redis.RedisError:
+                pass
+        with self._lock:
+            return dict(self._totals), False
+
+    def render(self) -> str:
+        """Wszystkie metryki w formacie tekstowym Prometheus (text/plain; version=0.0.4)"""
+        values, shared = self.snapshot()
+        samples = {}
+        for field, value in values.items():
+            sample, labels = json.loads(field)
+            name = _metric_name(sample)
+            if name is not None:
+                samples.setdefault(name, []).append((sample, [tuple(pair) for pair in labels], value))
+
+        lines = [] if shared else ['# Redis unavailable: values of this worker process only']
+        for name, (metric_type, help_text, _) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for sample, labels, value in sorted(samples.get(name, ()), key=_sample_order):
+                lines.append(f'{sample}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._totals.clear()
+        try:
+            get_redis().delete(self.KEY)
+        except redis.RedisError:
+            pass
+
+
+def _metric_name(sample: str) -> Optional[str]:
+    if sample in METRICS:
+        return sample
+    for suffix in ('_bucket', '_sum', '_count'):
+        name = sample[:-len(suffix)]
+        if sample.endswith(suffix) and METRICS.get(name, ('',))[0] == 'histogram':
+            return name
+    return None
+
+
+def _sample_order(item):
+    sample, labels, _ = item
+    series = [pair for pair in labels if pair[0] != 'le']
+    le = dict(labels).get('le')
+    return series, sample != f'{_metric_name(sample)}_bucket', float(le) if le is not None else 0.0, sample
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+metrics = MetricsRegistry()
+
+
+class QueryMetrics:
+    """Liczba zapytań SQL żądania i ich łączny czas"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+
+
+# Liczniki bieżącego żądania; sync_to_async kopiuje kontekst, więc widoki
+# asynchroniczne liczą też zapytania wykonane przez async ORM w wątku roboczym
+_request_queries: ContextVar[Optional[QueryMetrics]] = ContextVar('request_queries', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    return queries(execute, sql, params, many, context)
+
+
+def install_query_metrics(connection, **kwargs):
+    """execute_wrapper liczący zapytania żądania - na stałe w każdym połączeniu"""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(install_query_metrics, dispatch_uid='metrics_install_query_metrics')
+
+
+class RequestMetricsMiddleware:
+    """
+    Opóźnienie, liczba i czas zapytań SQL oraz rozmiar odpowiedzi dla każdej
+    rozwiązanej trasy (nazwa URL) i metody HTTP. Nierozwiązane ścieżki trafiają
+    do jednej etykiety, żeby skanery nie mnożyły serii.
+    Działa w obu trybach, więc nie wymusza synchronicznego łańcucha middleware
+    dla widoków asynchronicznych.
+    """
+    UNRESOLVED_ROUTE = 'unresolved'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Połączenia otwarte przed rejestracją odbiornika connection_created
+        for alias in connections:
+            install_query_metrics(connections[alias])
+        queries = QueryMetrics()
+        token = _request_queries.set(queries)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self._record(request, response, queries, perf_counter() - started)
+
+    async def __acall__(self, request):
+        queries = QueryMetrics()
+        token = _request_queries.set(queries)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        return self._record(request, response, queries, perf_counter() - started)
+
+    def _record(self, request, response, queries, duration):
+        match = getattr(request, 'resolver_match', None)
+        route = (match.view_name or match.route) if match else self.UNRESOLVED_ROUTE
+        labels = {'route': route, 'method': request.method}
+        metrics.inc('http_requests_total', status=str(response.status_code), **labels)
+        metrics.observe('http_request_duration_seconds', duration, **labels)
+        metrics.observe('http_request_db_queries', queries.count, **labels)
+        metrics.inc('http_request_db_duration_seconds_total', queries.duration, **labels)
+
+        if response.streaming:
+            measure = self._measure_async_stream if response.is_async else self._measure_stream
+            response.streaming_content = measure(response.streaming_content, labels)
+        else:
+            metrics.observe('http_response_size_bytes', len(response.content), **labels)
+        return response
+
+    @staticmethod
+    def _measure_stream(content, labels):
+        size = 0
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+        metrics.observe('http_response_size_bytes', size, **labels)
+
+    @staticmethod
+    async def _measure_async_stream(content, labels):
+        size = 0
+        async for chunk in content:
+            size += len(chunk)
+            yield chunk
+        metrics.observe('http_response_size_bytes', size, **labels)
+
+
+class ConsumerMetricsMixin:
+    """Liczba połączeń i wiadomości konsumenta WebSocket (przed AsyncWebsocketConsumer w MRO)"""
+
+    def _metrics_labels(self):
+        return {'consumer': type(self).__name__}
+
+    async def accept(self, *args, **kwargs):
+        await super().accept(*args, **kwargs)
+        self._metrics_connected = True
+        metrics.inc('websocket_connections_total', **self._metrics_labels())
+        metrics.inc('websocket_connections_active', **self._metrics_labels())
+
+    async def websocket_receive(self, message):
+        metrics.inc('websocket_messages_total', direction='received', **self._metrics_labels())
+        await super().websocket_receive(message)
+
+    async def send(self, *args, **kwargs):
+        metrics.inc('websocket_messages_total', direction='sent', **self._metrics_labels())
+        await super().send(*args, **kwargs)
+
+    async def websocket_disconnect(self, message):
+        # super() kończy konsumenta wyjątkiem StopConsumer - licznik przed wywołaniem
+        if getattr(self, '_metrics_connected', False):
+            self._metrics_connected = False
+            metrics.inc('websocket_connections_active', -1, **self._metrics_labels())
+        await super().websocket_disconnect(message)
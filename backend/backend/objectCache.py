@@ -0,0 +1,265 @@
+import base64
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time as time_module
+import uuid
+from collections import Counter
+from typing import Callable, Dict, Optional
+import redis
+from cachetools import TTLCache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from .redisClient import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class _LocalCache(TTLCache):
+    """TTLCache zgłaszający wyparcie najdawniej używanego wpisu (LRU)"""
+
+    def __init__(self, maxsize, ttl, on_evict: Callable):
+        super().__init__(maxsize, ttl)
+        self._on_evict = on_evict
+
+    def popitem(self):
+        item = super().popitem()
+        self._on_evict()
+        return item
+
+    def clear(self):
+        # MutableMapping.clear() usuwa przez popitem() - to nie są wyparcia
+        while True:
+            try:
+                TTLCache.popitem(self)
+            except KeyError:
+                break
+
+
+class ObjectCache:
+    """
+    Dwupoziomowy cache rekordów czytanych po kluczu głównym: LRU w pamięci procesu
+    przed Redis, klucz = model + wersja schematu + pk.
+    Zapis i usunięcie rekordu (post_save/post_delete) usuwają wpis z Redis i
+    rozgłaszają unieważnienie kanałem pub/sub, więc każdy proces (daphne, celery)
+    wyrzuca swoją kopię. Zmiany omijające sygnały (QuerySet.update, bulk_update)
+    ogranicza TTL. Wpis to sam wiersz - bez obiektów z select_related/prefetch,
+    które mogłyby się zdezaktualizować bez unieważnienia.
+    """
+    KEY_PREFIX = 'objcache'
+    CHANNEL = 'objcache:invalidate'
+    LOCAL_MAXSIZE = 1024
+    # Kopia lokalna żyje krócej - ogranicza nieaktualność po zgubionym komunikacie pub/sub
+    LOCAL_MAX_TTL = 30
+    RECONNECT_DELAY_SECONDS = 1
+
+    OUTCOME_LOCAL_HIT = 'local_hit'
+    OUTCOME_SHARED_HIT = 'shared_hit'
+    OUTCOME_MISS = 'miss'
+    OUTCOME_EVICTION = 'eviction'
+    OUTCOME_INVALIDATION = 'invalidation'
+    OUTCOMES = (OUTCOME_LOCAL_HIT, OUTCOME_SHARED_HIT, OUTCOME_MISS, OUTCOME_EVICTION, OUTCOME_INVALIDATION)
+
+    _registry: Dict[str, 'ObjectCache'] = {}
+    _listener_lock = threading.Lock()
+    _listener_pid: Optional[int] = None
+    # Identyfikator procesu w komunikatach - własne unieważnienia są już wykonane lokalnie
+    _origin = uuid.uuid4().hex
+
+    def __init__(self, model, ttl: int, version: int = 1, local_maxsize: Optional[int] = None):
+        self.model = model
+        self.ttl = ttl
+        self.label = model._meta.label_lower
+        self.schema_version = self._schema_version(model, version)
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._local = _LocalCache(
+            local_maxsize or self.LOCAL_MAXSIZE, min(ttl, self.LOCAL_MAX_TTL), self._count_eviction
+        )
+        ObjectCache._registry[self.label] = self
+        post_save.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'objcache_save_{self.label}')
+        post_delete.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'objcache_delete_{self.label}')
+
+    @staticmethod
+    def _schema_version(model, version: int) -> str:
+        """Skrót kolumn modelu - po migracji zmieniającej pola stare wpisy przestają pasować"""
+        columns = ','.join(f'{field.attname}:{field.get_internal_type()}' for field in model._meta.concrete_fields)
+        return f'{version}-{hashlib.sha1(columns.encode()).hexdigest()[:8]}'
+
+    def _normalize_pk(self, pk) -> Optional[str]:
+        try:
+            return str(self.model._meta.pk.to_python(pk))
+        except (ValidationError, TypeError, ValueError):
+            return None
+
+    def _key(self, pk: str) -> str:
+        return f'{self.KEY_PREFIX}:{self.label}:{self.schema_version}:{pk}'
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def _count_eviction(self):
+        # Wywoływane przez _LocalCache pod self._lock
+        self._counts[self.OUTCOME_EVICTION] += 1
+
+    @staticmethod
+    def _dump(record) -> str:
+        snapshot = copy.copy(record)
+        snapshot._state = copy.copy(record._state)
+        snapshot._state.fields_cache = {}
+        snapshot.__dict__.pop('_prefetched_objects_cache', None)
+        return base64.b64encode(pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)).decode('ascii')
+
+    @staticmethod
+    def _load(payload: str):
+        return pickle.loads(base64.b64decode(payload))
+
+    def get_or_load(self, pk, load: Callable):
+        """Rekord o kluczu pk: z pamięci procesu, z Redis albo z load() (wynik trafia do obu poziomów)"""
+        normalized = self._normalize_pk(pk)
+        if normalized is None:
+            return load()
+        self.ensure_listener()
+        key = self._key(normalized)
+
+        with self._lock:
+            payload = self._local.get(key)
+        if payload is not None:
+            self._count(self.OUTCOME_LOCAL_HIT)
+            return self._load(payload)
+
+        try:
+            payload = get_redis().get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache obiektów '{self.label}' bez Redis: {str(e)}")
+            payload = None
+        if payload is not None:
+            self._count(self.OUTCOME_SHARED_HIT)
+            with self._lock:
+                self._local[key] = payload
+            return self._load(payload)
+
+        self._count(self.OUTCOME_MISS)
+        record = load()
+        payload = self._dump(record)
+        with self._lock:
+            self._local[key] = payload
+        try:
+            get_redis().set(key, payload, ex=self.ttl)
+        except redis.RedisError:
+            pass
+        return record
+
+    def invalidate(self, pk):
+        """Usuń rekord z Redis i z pamięci wszystkich procesów"""
+        normalized = self._normalize_pk(pk)
+        if normalized is None:
+            return
+        self._count(self.OUTCOME_INVALIDATION)
+        self._purge(normalized)
+
+    def _purge(self, normalized: str):
+        self._drop_local(self._key(normalized))
+        try:
+            client = get_redis()
+            client.delete(self._key(normalized))
+            client.publish(self.CHANNEL, f'{self.label}|{normalized}|{ObjectCache._origin}')
+        except redis.RedisError as e:
+            logger.warning(f"Cache obiektów '{self.label}' nie rozgłosił unieważnienia: {str(e)}")
+
+    def _on_change(self, sender, instance, **kwargs):
+        normalized = self._normalize_pk(instance.pk)
+        if normalized is None:
+            return
+        self.invalidate(normalized)
+        # Równoległy odczyt sprzed commitu mógł ponownie zapisać starą wersję
+        transaction.on_commit(lambda: self._purge(normalized))
+
+    def _drop_local(self, key: str):
+        with self._lock:
+            self._local.pop(key, None)
+
+    def clear(self):
+        """Wyczyść oba poziomy dla tego modelu"""
+        with self._lock:
+            self._local.clear()
+        try:
+            client = get_redis()
+            keys = list(client.scan_iter(match=f'{self.KEY_PREFIX}:{self.label}:*'))
+            if keys:
+                client.delete(*keys)
+        except redis.RedisError:
+            pass
+
+    @classmethod
+    def _handle_message(cls, data: str):
+        label, _, rest = data.partition('|')
+        pk, _, origin = rest.partition('|')
+        if origin == cls._origin:
+            # Echo własnego komunikatu mogłoby usunąć świeżo wczytany wpis
+            return
+        cache = cls._registry.get(label)
+        if cache is not None:
+            cache._drop_local(cache._key(pk))
+
+    @classmethod
+    def _clear_local_all(cls):
+        for cache in cls._registry.values():
+            with cache._lock:
+                cache._local.clear()
+
+    @classmethod
+    def ensure_listener(cls):
+        """Uruchom wątek nasłuchujący unieważnień (raz na proces, także po fork())"""
+        pid = os.getpid()
+        if cls._listener_pid == pid:
+            return
+        with cls._listener_lock:
+            if cls._listener_pid == pid:
+                return
+            if cls._listener_pid is not None:
+                # Proces potomny: kopia pamięci rodzica nie dostawała unieważnień
+                cls._clear_local_all()
+                cls._origin = uuid.uuid4().hex
+            cls._listener_pid = pid
+            threading.Thread(target=cls._listen, name='object-cache-invalidation', daemon=True).start()
+
+    @classmethod
+    def _listen(cls):
+        while True:
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(cls.CHANNEL)
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        cls._handle_message(message['data'])
+            except redis.RedisError as e:
+                logger.warning(f"Cache obiektów: utracono subskrypcję unieważnień: {str(e)}")
+                # Komunikaty z czasu przerwy przepadły - kopie lokalne mogą być nieaktualne
+                cls._clear_local_all()
+                time_module.sleep(cls.RECONNECT_DELAY_SECONDS)
+
+    def stats(self) -> Dict:
+        """Liczniki trafień (pamięć procesu / Redis), chybień, wyparć LRU i unieważnień w tym procesie"""
+        with self._lock:
+            counts = {outcome: self._counts[outcome] for outcome in self.OUTCOMES}
+            size = len(self._local)
+        lookups = counts[self.OUTCOME_LOCAL_HIT] + counts[self.OUTCOME_SHARED_HIT] + counts[self.OUTCOME_MISS]
+        hits = counts[self.OUTCOME_LOCAL_HIT] + counts[self.OUTCOME_SHARED_HIT]
+        return {
+            **counts,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'local_size': size,
+            'local_maxsize': self._local.maxsize,
+            'ttl': self.ttl,
+        }
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict]:
+        return {label: cache.stats() for label, cache in cls._registry.items()}
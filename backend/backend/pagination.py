@@ -0,0 +1,131 @@
+import base64
+import binascii
+import json
+import logging
+from typing import Optional, Tuple
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist, ValidationError
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(ValueError):
+    """Niepoprawny kursor lub rozmiar strony"""
+
+
+class KeysetPaginator:
+    """
+    Stronicowanie kursorem (keyset) po (klucz sortowania, id).
+    Kolejna strona to warunek WHERE (klucz, id) > (ostatni klucz, ostatnie id),
+    więc koszt nie rośnie z numerem strony, a wstawienia nie przesuwają wyników.
+    Kursor to base64 z JSON {'v': wartość klucza, 'id': id} ostatniego rekordu.
+    """
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    # Od tej liczby wierszy (wg planera PostgreSQL) szacunek zastępuje COUNT(*)
+    ESTIMATE_COUNT_THRESHOLD = 10_000
+
+    def __init__(self, ordering: str = 'id', page_size: Optional[int] = None):
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+        self.page_size = page_size or self.DEFAULT_PAGE_SIZE
+
+    @classmethod
+    def parse_page_size(cls, value) -> Optional[int]:
+        """Rozmiar strony z parametru zapytania, przycięty do MAX_PAGE_SIZE"""
+        if value in (None, ''):
+            return None
+        try:
+            page_size = int(value)
+        except (TypeError, ValueError):
+            raise InvalidCursorError("page_size must be a positive integer")
+        if page_size <= 0:
+            raise InvalidCursorError("page_size must be a positive integer")
+        return min(page_size, cls.MAX_PAGE_SIZE)
+
+    def ordering(self) -> Tuple[str, ...]:
+        prefix = '-' if self.descending else ''
+        if self.field in ('id', 'pk'):
+            return (f'{prefix}id',)
+        return (f'{prefix}{self.field}', f'{prefix}id')
+
+    def _sort_value(self, record):
+        value = record.pk if self.field in ('id', 'pk') else getattr(record, self.field)
+        # Pełna precyzja (DjangoJSONEncoder obcina mikrosekundy, co gubiłoby rekordy)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def encode_cursor(self, record) -> str:
+        payload = json.dumps({'v': self._sort_value(record), 'id': str(record.pk)})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, queryset, cursor: str):
+        """Zwróć (wartość klucza, id) z kursora, sprowadzone do typów pól modelu"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            model_meta = queryset.model._meta
+            record_id = model_meta.pk.to_python(payload['id'])
+            if self.field in ('id', 'pk'):
+                return record_id, record_id
+            return model_meta.get_field(self.field).to_python(payload['v']), record_id
+        except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError,
+                FieldDoesNotExist, ValidationError):
+            raise InvalidCursorError("Invalid cursor")
+
+    def _after(self, value, record_id) -> Q:
+        """Warunek 'za kursorem' w kierunku sortowania"""
+        lookup = 'lt' if self.descending else 'gt'
+        if self.field in ('id', 'pk'):
+            return Q(**{f'id__{lookup}': record_id})
+        return Q(**{f'{self.field}__{lookup}': value}) | Q(**{self.field: value, f'id__{lookup}': record_id})
+
+    def _page_queryset(self, queryset, cursor: Optional[str]):
+        queryset = queryset.order_by(*self.ordering())
+        if cursor:
+            queryset = queryset.filter(self._after(*self.decode_cursor(queryset, cursor)))
+        # Jeden dodatkowy rekord mówi, czy istnieje następna strona
+        return queryset[:self.page_size + 1]
+
+    def _split_page(self, records):
+        if len(records) <= self.page_size:
+            return records, None
+        records = records[:self.page_size]
+        return records, self.encode_cursor(records[-1])
+
+    def paginate(self, queryset, cursor: Optional[str] = None):
+        """Zwróć (rekordy strony, kursor następnej strony lub None)"""
+        return self._split_page(list(self._page_queryset(queryset, cursor)))
+
+    async def apaginate(self, queryset, cursor: Optional[str] = None):
+        """paginate() przez asynchroniczny ORM"""
+        return self._split_page([record async for record in self._page_queryset(queryset, cursor)])
+
+    @classmethod
+    def estimated_count(cls, queryset) -> Tuple[int, bool]:
+        """
+        Liczba rekordów querysetu i informacja, czy jest szacunkiem.
+        Na PostgreSQL duże wyniki są szacowane z planu zapytania zamiast COUNT(*).
+        """
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            try:
+                sql, params = queryset.query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                    plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                estimate = int(plan[0]['Plan']['Plan Rows'])
+                if estimate >= cls.ESTIMATE_COUNT_THRESHOLD:
+                    return estimate, True
+            except EmptyResultSet:
+                return 0, False
+            except (DatabaseError, KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning(f"Nie można oszacować liczby rekordów: {str(e)}")
+        return queryset.count(), False
@@ -0,0 +1,28 @@
+import functools
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Test wykonał więcej zapytań niż zadeklarowany budżet"""
+
+
+def query_budget(max_queries: int, using: str = 'default'):
+    """
+    Dekorator testu: błąd, gdy ciało testu wykona więcej niż max_queries zapytań
+    (fixtures i setUp się nie liczą). Chroni endpointy przed regresjami N+1.
+    """
+    def decorator(test_function):
+        @functools.wraps(test_function)
+        def wrapper(*args, **kwargs):
+            with CaptureQueriesContext(connections[using]) as context:
+                result = test_function(*args, **kwargs)
+            queries = context.captured_queries
+            if len(queries) > max_queries:
+                listing = '\n'.join(f"{number}. {query['sql']}" for number, query in enumerate(queries, 1))
+                raise QueryBudgetExceeded(
+                    f"{test_function.__qualname__} executed {len(queries)} queries, budget is {max_queries}:\n{listing}"
+                )
+            return result
+        return wrapper
+    return decorator
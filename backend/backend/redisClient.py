@@ -0,0 +1,36 @@
+import asyncio
+import weakref
+import redis
+import redis.asyncio
+from django.conf import settings
+
+_client = None
+# Klient asynchroniczny jest związany z pętlą zdarzeń, w której powstał
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_redis():
+    """Współdzielony klient Redis (z pulą połączeń) dla settings.REDIS_URL"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+    return _client
+
+
+def get_async_redis():
+    """Klient Redis dla widoków asynchronicznych (jeden na pętlę zdarzeń)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = redis.asyncio.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=1,
+            socket_timeout=1
+        )
+    return client
@@ -1,5 +1,59 @@
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, IntegrityError, models, transaction
+from django.db.models.signals import post_save, pre_save
+from backend.dbRouter import PRIMARY, DatabaseRouting
+from backend.objectCache import ObjectCache
+from backend.versioning import VersionedModel
+
+
 class BaseRepository:
     model = None
+    # Liczba rekordów zapisywanych w jednej transakcji operacji masowych
+    BULK_BATCH_SIZE = 500
+    # Plany ładowania relacji dla przypadków użycia:
+    # {'nazwa': {'select_related': (...), 'prefetch_related': (...)}}
+    # Plan 'default' stosują get_all, get_by_id i finders bez własnego planu.
+    eager_loading = {}
+    # Cache get_by_id (pamięć procesu + Redis): TTL w sekundach, None = wyłączony.
+    # cache_version podnieść, gdy zmienia się sposób budowania rekordu z bazy.
+    cache_ttl = None
+    cache_version = 1
+    object_cache = None
+    # Odczyty z replik (PrimaryReplicaRouter); False = model czytany zawsze z bazy głównej
+    read_from_replica = True
+    # Klucze danych operacji masowych, które nie są polami modelu - przekazywane do write_related
+    related_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.read_from_replica and cls.model is not None:
+            DatabaseRouting.primary_models.add(cls.model)
+        # Rejestracja przy imporcie: odbiorniki unieważnień działają też w procesach, które tylko zapisują
+        if cls.cache_ttl and cls.model is not None:
+            cls.object_cache = ObjectCache(cls.model, cls.cache_ttl, cls.cache_version)
+
+    @classmethod
+    def with_eager_loading(cls, queryset, use_case='default'):
+        """
+        Applies the eager-loading plan of a use case (or the default plan) to a queryset.
+        """
+        plan = cls.eager_loading.get(use_case, cls.eager_loading.get('default', {}))
+        if plan.get('select_related'):
+            queryset = queryset.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            queryset = queryset.prefetch_related(*plan['prefetch_related'])
+        return queryset
+
+    @classmethod
+    def queryset(cls, use_case='default', primary=False):
+        """
+        Returns all records with the eager-loading plan of a use case applied.
+        Reads go to a replica unless primary=True or the request is pinned to the primary.
+        """
+        queryset = cls.model.objects.all()
+        if primary:
+            queryset = queryset.using(PRIMARY)
+        return cls.with_eager_loading(queryset, use_case)
 
     @classmethod
     def get_all(cls):
@@ -7,17 +61,21 @@ class BaseRepository:
         Retrieves all records from the database.
         """
         try:
-            return cls.model.objects.all()
+            return cls.queryset()
         except Exception as e:
             raise RuntimeError(f"Error retrieving {cls.model.__name__} records: {str(e)}")
 
     @classmethod
-    def get_by_id(cls, record_id):
+    def get_by_id(cls, record_id, use_cache=True):
         """
-        Retrieves a record by its ID.
+        Retrieves a record by its ID, through the object cache when the repository enables it.
+        Writes pass use_cache=False so they never modify a cached copy.
+        Cache misses load from the primary, so a lagging replica cannot refill the cache with an old row.
         """
         try:
-            return cls.model.objects.get(id=record_id)
+            if use_cache and cls.object_cache is not None:
+                return cls.object_cache.get_or_load(record_id, lambda: cls.queryset(primary=True).get(id=record_id))
+            return cls.queryset().get(id=record_id)
         except cls.model.DoesNotExist:
             raise ValueError(f"{cls.model.__name__} with ID {record_id} does not exist.")
         except Exception as e:
@@ -30,6 +88,8 @@ class BaseRepository:
         """
         try:
             return cls.model.objects.create(**data)
+        except IntegrityError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error creating {cls.model.__name__}: {str(e)}")
 
@@ -39,11 +99,13 @@ class BaseRepository:
         Updates an existing record.
         """
         try:
-            record = cls.get_by_id(record_id)
+            record = cls.get_by_id(record_id, use_cache=False)
             for key, value in data.items():
                 setattr(record, key, value)
             record.save()
             return record
+        except IntegrityError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error updating {cls.model.__name__}: {str(e)}")
 
@@ -60,7 +122,155 @@ class BaseRepository:
         Deletes a record by its ID.
         """
         try:
-            record = cls.get_by_id(record_id)
+            record = cls.get_by_id(record_id, use_cache=False)
             record.delete()
         except Exception as e:
-            raise RuntimeError(f"Error deleting {cls.model.__name__}: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Error deleting {cls.model.__name__}: {str(e)}")
+
+    @classmethod
+    def saves_in_bulk(cls):
+        """
+        Whether bulk_create/bulk_update may be used: the model has no custom save()
+        and no pre/post-save receivers that a bulk write would silently skip.
+        VersionedModel.save only bumps the row version, which bulk writes do themselves.
+        """
+        return (
+            cls.model.save in (models.Model.save, VersionedModel.save)
+            and not pre_save.has_listeners(cls.model)
+            and not post_save.has_listeners(cls.model)
+        )
+
+    @classmethod
+    def write_related(cls, written):
+        """
+        Writes rows that depend on bulk-written records, inside the chunk transaction.
+        `written` is [(record, {name: value})] with the related_fields of each item.
+        """
+
+    @classmethod
+    def _split_bulk_data(cls, data):
+        many_to_many = {field.name for field in cls.model._meta.many_to_many}
+        fields = {key: value for key, value in data.items() if key not in many_to_many and key not in cls.related_fields}
+        relations = {key: value for key, value in data.items() if key in many_to_many}
+        related = {key: value for key, value in data.items() if key in cls.related_fields}
+        return fields, relations, related
+
+    @classmethod
+    def _write_relations(cls, chunk):
+        for record, relations, _ in chunk:
+            for name, value in relations.items():
+                getattr(record, name).set(value)
+        if cls.related_fields:
+            cls.write_related([(record, related) for record, _, related in chunk])
+
+    @classmethod
+    def _write_chunk(cls, chunk, update_fields=None):
+        """
+        Zapisz paczkę [(rekord, relacje M2M, dane related_fields)] w jednej transakcji.
+        Zwraca [(rekord, None) | (None, błąd)] w kolejności paczki.
+        """
+        if cls.saves_in_bulk():
+            try:
+                with transaction.atomic():
+                    records = [record for record, _, _ in chunk]
+                    if update_fields is None:
+                        cls.model.objects.bulk_create(records)
+                    elif update_fields:
+                        cls.model.objects.bulk_update(records, update_fields)
+                    cls._write_relations(chunk)
+                return [(record, None) for record, _, _ in chunk]
+            except DatabaseError:
+                # Paczka wycofana (konflikt, DataError, ...) - zapis wiersz po wierszu wskaże błędne rekordy
+                cls._reset_created(chunk, update_fields)
+
+        results = []
+        try:
+            with transaction.atomic():
+                for entry in chunk:
+                    record = entry[0]
+                    try:
+                        with transaction.atomic():
+                            record.save()
+                            cls._write_relations([entry])
+                        results.append((record, None))
+                    except (DatabaseError, ValidationError) as e:
+                        results.append((None, e))
+        except DatabaseError as e:
+            # Np. odroczone ograniczenie przy zatwierdzeniu - cała paczka wycofana
+            cls._reset_created(chunk, update_fields)
+            return [(None, e) for _ in chunk]
+        return results
+
+    @staticmethod
+    def _reset_created(chunk, update_fields):
+        """Rekordy wycofanej paczki bulk_create znów są nowe (bez pk)"""
+        if update_fields is None:
+            for record, _, _ in chunk:
+                record.pk = None
+                record._state.adding = True
+
+    @classmethod
+    def bulk_create(cls, items):
+        """
+        Creates records in chunks of BULK_BATCH_SIZE, each chunk in its own transaction.
+        Returns (record, None) or (None, error) for every item, in input order.
+        """
+        results = []
+        for start in range(0, len(items), cls.BULK_BATCH_SIZE):
+            chunk = []
+            for data in items[start:start + cls.BULK_BATCH_SIZE]:
+                fields, relations, related = cls._split_bulk_data(data)
+                chunk.append((cls.model(**fields), relations, related))
+            results.extend(cls._write_chunk(chunk))
+        return results
+
+    @classmethod
+    def get_many(cls, record_ids):
+        """
+        Retrieves records by IDs in one query, as a {id: record} mapping.
+        """
+        return cls.queryset().in_bulk(record_ids)
+
+    @classmethod
+    def bulk_update(cls, changes):
+        """
+        Updates [(record, data)] in chunks, each chunk in its own transaction.
+        Returns (record, None) or (None, error) for every item, in input order.
+        """
+        results = []
+        for start in range(0, len(changes), cls.BULK_BATCH_SIZE):
+            chunk = []
+            update_fields = set()
+            for record, data in changes[start:start + cls.BULK_BATCH_SIZE]:
+                fields, relations, related = cls._split_bulk_data(data)
+                for key, value in fields.items():
+                    setattr(record, key, value)
+                update_fields.update(fields)
+                chunk.append((record, relations, related))
+            results.extend(cls._write_chunk(chunk, sorted(update_fields)))
+        return results
+
+    @classmethod
+    def bulk_delete(cls, record_ids):
+        """
+        Deletes records in chunks, each chunk in its own transaction.
+        Returns {id: None | error} for the IDs that existed.
+        """
+        results = {}
+        for start in range(0, len(record_ids), cls.BULK_BATCH_SIZE):
+            chunk = record_ids[start:start + cls.BULK_BATCH_SIZE]
+            found = list(cls.model.objects.filter(id__in=chunk).values_list('id', flat=True))
+            try:
+                with transaction.atomic():
+                    cls.model.objects.filter(id__in=found).delete()
+                results.update((record_id, None) for record_id in found)
+            except DatabaseError:
+                # Np. rekordy chronione przez PROTECT - usuwanie pojedynczo
+                for record_id in found:
+                    try:
+                        with transaction.atomic():
+                            cls.model.objects.filter(id=record_id).delete()
+                        results[record_id] = None
+                    except DatabaseError as e:
+                        results[record_id] = e
+        return results
@@ -1,5 +1,6 @@
 from django.http import Http404
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError
 
 class BaseService:
     repository = None
@@ -35,6 +36,8 @@ class BaseService:
             return cls.repository.create(data)
         except ValidationError as e:
             raise ValidationError({"error": str(e)})
+        except IntegrityError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error creating {cls.repository.model.__name__}: {str(e)}")
 
@@ -47,6 +50,8 @@ class BaseService:
             return cls.repository.update(record_id, data)
         except ValueError as e:
             raise Http404(str(e))
+        except IntegrityError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error updating {cls.repository.model.__name__}: {str(e)}")
 
@@ -59,6 +64,8 @@ class BaseService:
             return cls.repository.partially_update(record_id, data)
         except ValueError as e:
             raise Http404(str(e))
+        except IntegrityError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error partially updating {cls.repository.model.__name__}: {str(e)}")
 
@@ -72,4 +79,44 @@ class BaseService:
         except ValueError as e:
             raise Http404(str(e))
         except Exception as e:
-            raise RuntimeError(f"Error deleting {cls.repository.model.__name__}: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Error deleting {cls.repository.model.__name__}: {str(e)}")
+
+    @classmethod
+    def bulk_create(cls, items):
+        """
+        Creates many records; returns (record, None) or (None, error) per item.
+        """
+        try:
+            return cls.repository.bulk_create(items)
+        except Exception as e:
+            raise RuntimeError(f"Error bulk creating {cls.repository.model.__name__} records: {str(e)}")
+
+    @classmethod
+    def get_many(cls, record_ids):
+        """
+        Retrieves records by IDs as a {id: record} mapping.
+        """
+        try:
+            return cls.repository.get_many(record_ids)
+        except Exception as e:
+            raise RuntimeError(f"Error retrieving {cls.repository.model.__name__} records: {str(e)}")
+
+    @classmethod
+    def bulk_update(cls, changes):
+        """
+        Updates many [(record, data)]; returns (record, None) or (None, error) per item.
+        """
+        try:
+            return cls.repository.bulk_update(changes)
+        except Exception as e:
+            raise RuntimeError(f"Error bulk updating {cls.repository.model.__name__} records: {str(e)}")
+
+    @classmethod
+    def bulk_delete(cls, record_ids):
+        """
+        Deletes many records; returns {id: None | error} for the IDs that existed.
+        """
+        try:
+            return cls.repository.bulk_delete(record_ids)
+        except Exception as e:
+            raise RuntimeError(f"Error bulk deleting {cls.repository.model.__name__} records: {str(e)}")
@@ -73,6 +73,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
     'drf_spectacular',
@@ -93,6 +94,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Pierwszy, żeby czas odpowiedzi obejmował pozostałe middleware
+    'backend.metrics.RequestMetricsMiddleware',
+    'backend.dbRouter.DatabaseRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -144,6 +148,24 @@ DATABASES = {
     }
 }
 
+# Repliki tylko do odczytu: DB_REPLICA_HOSTS=host[:port],... (pozostałe parametry jak w 'default')
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(',')), start=1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['backend.dbRouter.PrimaryReplicaRouter']
+# Po zapisie odczyty użytkownika idą do bazy głównej przez tyle sekund
+DATABASE_PIN_SECONDS = int(os.environ.get("DB_PIN_SECONDS", "5"))
+# Replika z większym opóźnieniem jest pomijana (odczyt z bazy głównej)
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.environ.get("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -205,6 +227,19 @@ CORS_ALLOW_CREDENTIALS = True
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = "django-db"
 
+# Automatyczne przeplanowanie wizyt po dodaniu lub zmianie przerwy (workshops.signals)
+BREAK_DISRUPTION_AUTO_APPLY = os.environ.get("BREAK_DISRUPTION_AUTO_APPLY", "true").lower() == "true"
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0')
+
+# Najczęściej odpytywane odczyty (dostępność, moje wizyty, powiadomienia, wyszukiwanie warsztatów)
+# obsługiwane przez widoki asynchroniczne pod ASGI; false = tylko widoki DRF
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "true").lower() == "true"
+
+# Endpoint /metrics (Prometheus): dostęp z tych adresów albo z nagłówkiem Authorization: Bearer METRICS_TOKEN
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 # Channels / WebSocket configuration
 ASGI_APPLICATION = 'backend.asgi.application'
 
@@ -212,7 +247,7 @@ CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0')],
+            "hosts": [REDIS_URL],
         },
     },
 }
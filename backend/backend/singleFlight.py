@@ -0,0 +1,202 @@
+import json
+import logging
+import threading
+import time as time_module
+import uuid
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+import redis
+from .redisClient import get_redis
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] wynik, KEYS[2] blokada, KEYS[3] statystyki; ARGV: token, TTL blokady (ms)
+# Zwraca {'hit', wynik}, {'wait', token lidera} albo {'lead', token}
+JOIN_SCRIPT = """
+local result = redis.call('GET', KEYS[1])
+if result then
+    redis.call('HINCRBY', KEYS[3], 'hit', 1)
+    return {'hit', result}
+end
+local token = redis.call('GET', KEYS[2])
+if token then
+    return {'wait', token}
+end
+redis.call('SET', KEYS[2], ARGV[1], 'PX', ARGV[2])
+redis.call('HINCRBY', KEYS[3], 'miss', 1)
+return {'lead', ARGV[1]}
+"""
+
+# KEYS[1] wynik, KEYS[2] blokada, KEYS[3] zbiór kluczy tagu (opcjonalny)
+# ARGV: token, wynik, TTL wyniku (ms)
+PUBLISH_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+if KEYS[3] then
+    redis.call('SADD', KEYS[3], KEYS[1])
+    redis.call('PEXPIRE', KEYS[3], ARGV[3])
+end
+if redis.call('GET', KEYS[2]) == ARGV[1] then
+    redis.call('DEL', KEYS[2])
+end
+return 1
+"""
+
+
+class SingleFlight:
+    """
+    Łączenie identycznych, równoległych obliczeń (single-flight).
+    W obrębie procesu kolejne wywołania czekają na Future pierwszego; między
+    workerami lider trzyma blokadę w Redis, a pozostali czekają na klucz wyniku.
+    Wynik jest trzymany przez RESULT_TTL_MS, a forget(tag) usuwa go od razu
+    po zmianie danych. Bez Redis obliczenie wykonywane jest lokalnie.
+    """
+    KEY_PREFIX = 'singleflight'
+    RESULT_TTL_MS = 1000
+    LOCK_TTL_MS = 5000
+    POLL_INTERVAL_SECONDS = 0.02
+
+    OUTCOME_HIT = 'hit'
+    OUTCOME_MISS = 'miss'
+    OUTCOME_COALESCED = 'coalesced'
+
+    _registry: Dict[str, 'SingleFlight'] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._counts = Counter()
+        SingleFlight._registry[name] = self
+
+    def _key(self, key: str, suffix: str) -> str:
+        return f'{self.KEY_PREFIX}:{self.name}:{key}:{suffix}'
+
+    def _stats_key(self) -> str:
+        return f'{self.KEY_PREFIX}:{self.name}:stats'
+
+    @classmethod
+    def _tag_key(cls, tag: str) -> str:
+        return f'{cls.KEY_PREFIX}:tag:{tag}'
+
+    def _count(self, outcome: str, shared: bool = False):
+        with self._lock:
+            self._counts[outcome] += 1
+        if shared:
+            try:
+                get_redis().hincrby(self._stats_key(), outcome, 1)
+            except redis.RedisError:
+                pass
+
+    def run(self, key: str, compute: Callable, tag: Optional[str] = None):
+        """Zwróć wynik compute() dla klucza, współdzieląc obliczenie z równoległymi wywołaniami"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not leader:
+            self._count(self.OUTCOME_COALESCED, shared=True)
+            return future.result()
+
+        try:
+            result = self._run_shared(key, compute, tag)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _run_shared(self, key: str, compute: Callable, tag: Optional[str]):
+        result_key = self._key(key, 'result')
+        lock_key = self._key(key, 'lock')
+        token = uuid.uuid4().hex
+
+        try:
+            client = get_redis()
+            state, value = client.eval(JOIN_SCRIPT, 3, result_key, lock_key, self._stats_key(), token, self.LOCK_TTL_MS)
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight '{self.name}' bez Redis: {str(e)}")
+            self._count(self.OUTCOME_MISS)
+            return compute()
+
+        if state == 'hit':
+            self._count(self.OUTCOME_HIT)
+            return json.loads(value)
+
+        if state == 'wait':
+            try:
+                shared = self._wait_for_result(client, result_key, lock_key)
+            except redis.RedisError:
+                shared = None
+            if shared is not None:
+                self._count(self.OUTCOME_COALESCED, shared=True)
+                return json.loads(shared)
+            # Lider nie opublikował wyniku (błąd, forget lub przekroczony czas)
+            self._count(self.OUTCOME_MISS, shared=True)
+            return compute()
+
+        self._count(self.OUTCOME_MISS)
+        try:
+            result = compute()
+        except BaseException:
+            try:
+                if client.get(lock_key) == token:
+                    client.delete(lock_key)
+            except redis.RedisError:
+                pass
+            raise
+
+        keys = [result_key, lock_key] + ([self._tag_key(tag)] if tag else [])
+        try:
+            client.eval(PUBLISH_SCRIPT, len(keys), *keys, token, json.dumps(result), self.RESULT_TTL_MS)
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight '{self.name}' nie zapisał wyniku: {str(e)}")
+        return result
+
+    def _wait_for_result(self, client, result_key: str, lock_key: str) -> Optional[str]:
+        """Czekaj na wynik lidera, dopóki trzyma blokadę"""
+        deadline = time_module.monotonic() + self.LOCK_TTL_MS / 1000
+        while time_module.monotonic() < deadline:
+            pipeline = client.pipeline(transaction=False)
+            pipeline.get(result_key)
+            pipeline.exists(lock_key)
+            result, locked = pipeline.execute()
+            if result is not None:
+                return result
+            if not locked:
+                return None
+            time_module.sleep(self.POLL_INTERVAL_SECONDS)
+        return None
+
+    @classmethod
+    def forget(cls, tag: str):
+        """Usuń wyniki oznaczone tagiem (np. po zmianie danych warsztatu)"""
+        try:
+            client = get_redis()
+            tag_key = cls._tag_key(tag)
+            keys = client.smembers(tag_key)
+            client.delete(tag_key, *keys)
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight nie usunął wyników tagu '{tag}': {str(e)}")
+
+    def stats(self) -> Dict:
+        """Liczniki trafień, obliczeń i połączonych wywołań: w tym procesie i we wszystkich workerach"""
+        with self._lock:
+            process = {outcome: self._counts[outcome] for outcome in (self.OUTCOME_HIT, self.OUTCOME_MISS, self.OUTCOME_COALESCED)}
+        try:
+            shared = get_redis().hgetall(self._stats_key())
+            cluster = {outcome: int(shared.get(outcome, 0)) for outcome in process}
+        except redis.RedisError:
+            cluster = None
+        return {'process': process, 'cluster': cluster}
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict]:
+        return {name: flight.stats() for name, flight in cls._registry.items()}
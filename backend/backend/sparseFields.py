@@ -0,0 +1,102 @@
+from typing import Iterable, Optional, Set
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+# Sufiks ścieżki oznaczający cały rekord powiązany (np. 'owner__*')
+WHOLE_RELATION = '__*'
+
+
+class SparseFieldsMixin:
+    """
+    Rzadkie zestawy pól (?fields= / ?expand=) dla ModelSerializer.
+    Meta.expandable_fields to ciężkie pola (zagnieżdżone obiekty), pomijane,
+    gdy klient wybiera pola, i dołączane przez expand. Meta.field_sources mapuje
+    pola wyliczane (SerializerMethodField, właściwości) na ścieżki ORM, z których
+    korzystają - na tej podstawie project() ogranicza kolumny (only()) i złączenia
+    (select_related()) do tego, co faktycznie trafi do odpowiedzi.
+    """
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def _meta_option(cls, name, default):
+        return getattr(cls.Meta, name, default)
+
+    @classmethod
+    def select_fields(cls, fields: Optional[Iterable[str]] = None, expand: Optional[Iterable[str]] = None) -> Set[str]:
+        """
+        Nazwy pól odpowiedzi: wskazane fields (lub wszystkie poza rozwijanymi) plus expand.
+        Nieznane nazwy zgłaszają ValidationError.
+        """
+        available = set(cls().fields)
+        expandable = set(cls._meta_option('expandable_fields', ())) & available
+        expand = set(expand or ())
+
+        unknown = sorted((set(fields or ()) - available) | (expand - expandable))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown or non-expandable fields: {', '.join(unknown)}")
+
+        selected = set(fields) if fields is not None else available - expandable
+        return selected | expand
+
+    @classmethod
+    def _orm_paths(cls, field) -> Optional[Set[str]]:
+        """Ścieżki ORM potrzebne do wyliczenia pola; None, gdy nie da się ich ustalić"""
+        field_sources = cls._meta_option('field_sources', {})
+        if field.field_name in field_sources:
+            return set(field_sources[field.field_name])
+        if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            return None
+
+        model = cls.Meta.model
+        path = []
+        for attr in field.source_attrs:
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Właściwość lub metoda rekordu powiązanego - potrzebny cały rekord
+                return {'__'.join(path) + WHOLE_RELATION} if path else None
+            path.append(attr)
+            if not model_field.is_relation:
+                break
+            if model_field.many_to_many or model_field.one_to_many:
+                return None
+            model = model_field.related_model
+        return {'__'.join(path)}
+
+    @classmethod
+    def project(cls, queryset, fields: Iterable[str]):
+        """Ogranicz queryset do kolumn i złączeń potrzebnych wybranym polom"""
+        declared = cls().fields
+        paths = {'pk'}
+        for name in fields:
+            field_paths = cls._orm_paths(declared[name])
+            if field_paths is None:
+                return queryset
+            paths |= field_paths
+
+        only, relations, whole_relations = set(), set(), set()
+        for path in paths:
+            if path.endswith(WHOLE_RELATION):
+                path = path[:-len(WHOLE_RELATION)]
+                whole_relations.add(path)
+                parts = path.split('__') + ['']
+            else:
+                parts = path.split('__')
+            only.add(path)
+            relations.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+
+        # Cały rekord relacji wygrywa z pojedynczymi kolumnami tej relacji
+        only = {
+            path for path in only
+            if not any(path.startswith(f'{relation}__') for relation in whole_relations)
+        }
+        # Plan ładowania repozytorium zastępują złączenia wybranych pól
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if relations:
+            queryset = queryset.select_related(*sorted(relations))
+        return queryset.only(*sorted(only))
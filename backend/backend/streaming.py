@@ -0,0 +1,64 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Rekordy pobierane z bazy jedną porcją iterator(chunk_size=...)
+STREAM_CHUNK_SIZE = 500
+# Porcja bajtów wysyłana klientowi - mniej zapisów do gniazda niż wiersz po wierszu
+STREAM_BUFFER_BYTES = 64 * 1024
+
+_END = object()
+
+
+def _encode_rows(rows, serializer, buffer_bytes):
+    """
+    Tablica JSON budowana wiersz po wierszu. Kodowanie jak w JSONRenderer DRF
+    (zwarte separatory, UTF-8, bez NaN, escapowane U+2028/U+2029), więc bajty
+    są takie same jak w zwykłej odpowiedzi.
+    """
+    encoder = JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    buffer, size = ['['], 1
+    for index, row in enumerate(rows):
+        part = encoder.encode(serializer.to_representation(row))
+        part = part.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        if index:
+            part = ',' + part
+        buffer.append(part)
+        size += len(part)
+        if size >= buffer_bytes:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    buffer.append(']')
+    yield ''.join(buffer).encode('utf-8')
+
+
+async def _iterate_async(iterator):
+    """Kolejne porcje z iteratora synchronicznego, pobierane w wątku żądania (połączenie z bazą)"""
+    next_part = sync_to_async(next, thread_sensitive=True)
+    while (part := await next_part(iterator, _END)) is not _END:
+        yield part
+
+
+class StreamingJSONListResponse(StreamingHttpResponse):
+    """
+    Lista JSON wysyłana przyrostowo: queryset czytany porcjami iterator(chunk_size),
+    każdy rekord serializowany osobno. Pamięć nie rośnie z liczbą rekordów.
+    Pod ASGI treść jest iteratorem asynchronicznym - Django nie buforuje jej wtedy
+    w całości, jak robi to z iteratorem synchronicznym.
+    """
+
+    def __init__(self, queryset, serializer, asynchronous=False,
+                 chunk_size=STREAM_CHUNK_SIZE, buffer_bytes=STREAM_BUFFER_BYTES, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(**kwargs)
+        # Baza wybrana teraz - treść jest czytana już po zakończeniu widoku i middleware
+        queryset = queryset.using(queryset.db)
+        parts = _encode_rows(queryset.iterator(chunk_size=chunk_size), serializer, buffer_bytes)
+        self.streaming_content = _iterate_async(parts) if asynchronous else parts
+
+
+def stream_json_list(request, queryset, serializer, **kwargs):
+    """Strumieniowa lista JSON w trybie pasującym do serwera (ASGI lub WSGI)"""
+    http_request = getattr(request, '_request', request)
+    return StreamingJSONListResponse(queryset, serializer, asynchronous=isinstance(http_request, ASGIRequest), **kwargs)
@@ -0,0 +1,142 @@
+"""
+Async Read View Tests
+Tests covering parity of the async read endpoints with their DRF views
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncClient
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from backend.dbRouter import DatabaseRoutingMiddleware
+from backend.metrics import RequestMetricsMiddleware
+from backend.views_collection.AsyncView import AsyncAPIView
+from notifications.models import Notification
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+from workshops.services.geoIndexService import WorkshopGeoIndex
+
+READ_URLS = [
+    '/api/v1/availability/check_availability/?workshop_id={workshop}&date=2030-07-01',
+    '/api/v1/availability/check_availability/?workshop_id={workshop}&date=2030-07-01&duration=90',
+    '/api/v1/availability/check_availability/?workshop_id=x&date=2030-07-01',
+    '/api/v1/appointments/my-appointments/',
+    '/api/v1/notifications/',
+    '/api/v1/notifications/?page_size=2',
+    '/api/v1/notifications/?read_status=false&fields=id,message',
+    '/api/v1/notifications/?cursor=broken&page_size=2',
+    '/api/v1/workshops/nearby/?latitude=52.2297&longitude=21.0122&radius=10',
+    '/api/v1/workshops/nearby/?latitude=52.2297&longitude=21.0122&radius=500&limit=1&offset=1',
+    '/api/v1/workshops/nearby/?latitude=50&longitude=20&k=1',
+    '/api/v1/workshops/nearby/?latitude=x&longitude=1',
+    '/api/v1/workshops/search/?query=Warsztat',
+    '/api/v1/workshops/search/?sort_by=name&limit=1&offset=1',
+]
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="async_user", email="async_user@example.com", password="password123")
+
+@pytest.fixture
+def token(user):
+    return str(RefreshToken.for_user(user).access_token)
+
+@pytest.fixture
+def workshop(user):
+    WorkshopGeoIndex.invalidate()
+    workshop = Workshop.objects.create(
+        name="Warsztat Centrum", location="Warszawa", owner=user,
+        latitude=Decimal('52.229700'), longitude=Decimal('21.012200')
+    )
+    Workshop.objects.create(name="Warsztat Praga", location="Warszawa", latitude=Decimal('52.250000'), longitude=Decimal('21.040000'))
+    vehicle = Vehicle.objects.create(
+        owner=user, brand="toyota", model="Aygo", registration_number="ASY123", vin="1HGCM82633A333555", year=2018
+    )
+    start = timezone.make_aware(datetime(2030, 7, 1, 9, 0))
+    for hour in range(2):
+        Appointment.objects.create(client=user, workshop=workshop, vehicle=vehicle, date=start + timedelta(hours=hour), duration_estimate=30)
+    for number in range(3):
+        Notification.objects.create(user=user, message=f"Wiadomość {number}", notification_type='system')
+    return workshop
+
+def async_get(path, token=None, **headers):
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+
+    async def fetch():
+        return await AsyncClient().get(path, headers=headers)
+
+    return async_to_sync(fetch)()
+
+def drf_get(path, token=None):
+    """The same request served by the DRF view the async view replaces."""
+    view = resolve(path.split('?')[0]).func
+    request = APIRequestFactory().get(path, HTTP_AUTHORIZATION=f'Bearer {token}' if token else '')
+    return view.view_initkwargs['sync_view'](request).render()
+
+
+@pytest.mark.parametrize('url', READ_URLS)
+def test_async_views_return_drf_bodies(url, workshop, token):
+    path = url.format(workshop=workshop.id)
+    assert issubclass(resolve(path.split('?')[0]).func.view_class, AsyncAPIView)
+
+    expected = drf_get(path, token)
+    response = async_get(path, token)
+
+    assert (response.status_code, response.content) == (expected.status_code, expected.content)
+    assert response.get('ETag') == expected.get('ETag')
+
+def test_unauthenticated_request_gets_drf_401(db):
+    path = '/api/v1/appointments/my-appointments/'
+
+    for token in (None, 'not-a-token'):
+        response = async_get(path, token)
+        expected = drf_get(path, token)
+        assert (response.status_code, response.content) == (401, expected.content)
+        assert response['WWW-Authenticate'] == expected['WWW-Authenticate']
+
+def test_my_appointments_returns_304_for_current_etag(workshop, token):
+    etag = async_get('/api/v1/appointments/my-appointments/', token)['ETag']
+
+    response = async_get('/api/v1/appointments/my-appointments/', token, **{'If-None-Match': etag})
+    assert (response.status_code, response.content, response['ETag']) == (304, b'', etag)
+
+    Appointment.objects.filter(client__username="async_user").update(duration_estimate=45)
+    assert async_get('/api/v1/appointments/my-appointments/', token, **{'If-None-Match': etag}).status_code == 200
+
+def test_other_methods_are_served_by_drf_view(user, token):
+    async def post():
+        return await AsyncClient().post(
+            '/api/v1/notifications/',
+            {'user': user.id, 'message': "Przegląd za tydzień", 'notification_type': 'service_reminder', 'channel': 'email'},
+            content_type='application/json',
+            headers={'Authorization': f'Bearer {token}'}
+        )
+
+    response = async_to_sync(post)()
+    assert response.status_code == 201
+    assert Notification.objects.filter(user=user, message="Przegląd za tydzień").exists()
+
+    async def put():
+        return await AsyncClient().put('/api/v1/workshops/nearby/', headers={'Authorization': f'Bearer {token}'})
+
+    assert async_to_sync(put)().status_code == 405
+
+def test_middlewares_keep_async_chain():
+    async def get_response(request):
+        return None
+
+    for middleware in (RequestMetricsMiddleware, DatabaseRoutingMiddleware):
+        assert iscoroutinefunction(middleware(get_response))
+        assert not iscoroutinefunction(middleware(lambda request: None))
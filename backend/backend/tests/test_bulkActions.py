@@ -0,0 +1,202 @@
+"""
+Bulk Action Tests
+Tests covering bulk create/update/delete on BaseViewSet resources
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from django.db import DataError, connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from inventory.models import Part, PartInventory, Supplier
+from inventory.repositories.partRepository import PartRepository
+from inventory.repositories.supplierRepository import SupplierRepository
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="bulk_user", email="bulk_user@example.com", password="password123")
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+@pytest.fixture
+def supplier(db):
+    return Supplier.objects.create(
+        name="Bulk Parts", email="bulk@example.com", phone="123", address="ul. Testowa 1", city="Warszawa", postal_code="00-001"
+    )
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Bulk Parts Workshop")
+
+def part_payload(number, workshop=None, supplier=None, **overrides):
+    payload = {
+        'name': f"Part {number}", 'manufacturer': "Bosch", 'price': '19.99',
+        'stock_quantity': 10, 'minimum_stock_level': 2, 'category': 'brake',
+    }
+    if workshop:
+        payload['workshop_id'] = workshop.id
+    if supplier:
+        payload['supplier'] = supplier.id
+    payload.update(overrides)
+    return payload
+
+def inserts_per_chunk(model, rows):
+    """INSERT-y jednej paczki bulk_create - SQLite dzieli je według limitu parametrów zapytania"""
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    return math.ceil(rows / connection.ops.bulk_batch_size(fields, [None] * rows))
+
+def supplier_payload(name):
+    return {'name': name, 'email': "s@example.com", 'phone': "1", 'address': "a", 'city': "c", 'postal_code': "p"}
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_per_item_results(api_client, workshop, supplier):
+    items = [part_payload(1, workshop, supplier), part_payload(2, workshop, price='not-a-price'), part_payload(3, workshop)]
+
+    response = api_client.post('/api/v1/parts/bulk/', items, format='json')
+
+    assert response.status_code == 207
+    assert (response.data['succeeded'], response.data['failed']) == (2, 1)
+    created, invalid, plain = response.data['results']
+    assert created['status'] == 201 and Part.objects.get(id=created['id']).supplier_id == supplier.id
+    assert invalid['index'] == 1 and invalid['status'] == 400 and 'price' in invalid['error']
+    assert Part.objects.filter(id=plain['id'], name="Part 3").exists()
+
+@pytest.mark.django_db
+def test_bulk_created_parts_are_stocked_in_their_workshop(api_client, workshop):
+    items = [
+        part_payload(1, workshop, stock_quantity=4), part_payload(2), part_payload(3, workshop_id=999999),
+        part_payload(4, workshop, name=""),
+    ]
+
+    response = api_client.post('/api/v1/parts/bulk/', items, format='json')
+
+    assert [result['status'] for result in response.data['results']] == [201, 400, 400, 400]
+    assert 'workshop_id' in response.data['results'][1]['error']
+    assert 'workshop_id' in response.data['results'][2]['error']
+    created_id = response.data['results'][0]['id']
+    assert list(PartInventory.objects.values_list('part_id', 'workshop_id', 'quantity')) == [(created_id, workshop.id, 4)]
+    # Lista części warsztatu widzi import przez PartInventory, jak po pojedynczym create
+    listed = api_client.get('/api/v1/parts/', {'workshop_id': workshop.id})
+    assert [part['id'] for part in listed.data] == [created_id]
+
+@pytest.mark.django_db
+def test_bulk_import_of_10k_parts(api_client, workshop):
+    items = [part_payload(number, workshop) for number in range(10_000)]
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.post('/api/v1/parts/bulk/', items, format='json')
+
+    assert response.status_code == 201
+    assert response.data['succeeded'] == 10_000
+    assert Part.objects.count() == 10_000
+    assert PartInventory.objects.filter(workshop=workshop).count() == 10_000
+    # Uwierzytelnienie i sprawdzenie warsztatów, potem paczki po BULK_BATCH_SIZE (części i ich
+    # PartInventory) w osobnych transakcjach - bez zapytania na każdy wiersz
+    chunks = 10_000 // PartRepository.BULK_BATCH_SIZE
+    statements = Counter(query['sql'].split()[0].upper() for query in context.captured_queries)
+    assert statements['SELECT'] == 2
+    assert statements['SAVEPOINT'] == statements['RELEASE'] == chunks
+    assert statements['INSERT'] == chunks * (
+        inserts_per_chunk(Part, PartRepository.BULK_BATCH_SIZE)
+        + inserts_per_chunk(PartInventory, PartRepository.BULK_BATCH_SIZE)
+    )
+    assert set(statements) == {'SELECT', 'SAVEPOINT', 'INSERT', 'RELEASE'}
+
+@pytest.mark.django_db
+def test_conflicts_inside_a_chunk_are_isolated(api_client):
+    Supplier.objects.create(**supplier_payload("Existing"))
+    items = [supplier_payload("Alpha"), supplier_payload("Alpha"), supplier_payload("Existing"), supplier_payload("Beta")]
+
+    response = api_client.post('/api/v1/suppliers/bulk/', items, format='json')
+
+    statuses = [result['status'] for result in response.data['results']]
+    # Duplikat w paczce wykrywa baza (409), istniejącą nazwę - walidacja serializera (400)
+    assert statuses == [201, 409, 400, 201]
+    assert set(Supplier.objects.values_list('name', flat=True)) == {"Existing", "Alpha", "Beta"}
+
+@pytest.mark.django_db
+def test_database_errors_are_reported_per_item(api_client):
+    items = [supplier_payload("Alpha"), supplier_payload("Too long"), supplier_payload("Beta")]
+    save = Supplier.save
+
+    def failing_save(supplier, *args, **kwargs):
+        if supplier.name == "Too long":
+            raise DataError("value too long for type character varying(100)")
+        return save(supplier, *args, **kwargs)
+
+    # Błąd paczki (np. DataError z PostgreSQL) przechodzi na zapis wiersz po wierszu
+    with patch.object(SupplierRepository, 'saves_in_bulk', return_value=True), \
+            patch.object(QuerySet, 'bulk_create', side_effect=DataError("value too long")) as bulk_create, \
+            patch.object(Supplier, 'save', failing_save):
+        response = api_client.post('/api/v1/suppliers/bulk/', items, format='json')
+
+    assert bulk_create.called
+    assert response.status_code == 207
+    assert [result['status'] for result in response.data['results']] == [201, 400, 201]
+    assert "value too long" in response.data['results'][1]['error']
+    assert set(Supplier.objects.values_list('name', flat=True)) == {"Alpha", "Beta"}
+
+@pytest.mark.django_db
+def test_bulk_update_runs_model_save_and_availability_refresh(api_client, user):
+    workshop = Workshop.objects.create(name="Bulk Workshop")
+    vehicle = Vehicle.objects.create(
+        owner=user, brand="toyota", model="Yaris", registration_number="BLK123", vin="1HGCM82633A111222", year=2021
+    )
+    start = timezone.make_aware(datetime(2030, 6, 3, 9, 0))
+    appointments = [
+        Appointment.objects.create(client=user, workshop=workshop, vehicle=vehicle, date=start + timedelta(hours=hour), duration_estimate=60)
+        for hour in range(3)
+    ]
+    items = [
+        {'id': appointments[0].id, 'priority': 'high'},
+        {'id': appointments[1].id, 'date': (start + timedelta(days=1)).isoformat()},
+        {'id': 999999, 'priority': 'high'},
+        {'priority': 'high'},
+    ]
+
+    with patch('workshops.services.availabilityCacheService.AvailabilityCacheService.schedule_refresh') as schedule_refresh:
+        response = api_client.patch('/api/v1/appointments/bulk/', items, format='json')
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.data['results']] == [200, 200, 404, 400]
+    appointments[0].refresh_from_db()
+    appointments[1].refresh_from_db()
+    assert appointments[0].priority == 'high'
+    assert appointments[1].end_date == start + timedelta(days=1, hours=1)
+    assert schedule_refresh.call_count >= 2
+
+@pytest.mark.django_db
+def test_bulk_delete(api_client, supplier):
+    parts = [Part.objects.create(**{**part_payload(number), 'supplier': supplier}) for number in range(3)]
+
+    response = api_client.delete('/api/v1/parts/bulk/', {'ids': [parts[0].id, parts[2].id, 999999, 'x']}, format='json')
+
+    assert response.status_code == 207
+    assert [result['status'] for result in response.data['results']] == [204, 204, 404, 400]
+    assert list(Part.objects.values_list('id', flat=True)) == [parts[1].id]
+
+@pytest.mark.django_db
+def test_bulk_requires_opt_in_and_a_list(api_client):
+    assert api_client.post('/api/v1/vehicles/bulk/', [{}], format='json').status_code == 405
+    assert api_client.post('/api/v1/parts/bulk/', {'name': 'x'}, format='json').status_code == 400
+    assert api_client.post('/api/v1/parts/bulk/', [], format='json').status_code == 400
@@ -0,0 +1,182 @@
+"""
+Conditional Request Tests
+Tests covering row versioning and ETag / If-None-Match handling on polled endpoints
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from appointments.serializers import AppointmentSerializer
+from inventory.models import Part
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="etag_user", email="etag_user@example.com", password="password123")
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+@pytest.fixture
+def notifications(user):
+    return [
+        Notification.objects.create(user=user, message=f"Wiadomość {number}", notification_type='system')
+        for number in range(3)
+    ]
+
+@pytest.fixture
+def appointments(user):
+    workshop = Workshop.objects.create(name="ETag Workshop", owner=user)
+    vehicle = Vehicle.objects.create(
+        owner=user, brand="toyota", model="Aygo", registration_number="ETG123", vin="1HGCM82633A333444", year=2018
+    )
+    start = timezone.make_aware(datetime(2030, 7, 1, 9, 0))
+    return [
+        Appointment.objects.create(client=user, workshop=workshop, vehicle=vehicle, date=start + timedelta(hours=hour), duration_estimate=30)
+        for hour in range(2)
+    ]
+
+
+def test_saves_bump_version_and_updated_at(notifications):
+    notification = notifications[0]
+    first_update = notification.updated_at
+    assert notification.version == 1
+
+    notification.mark_as_read()
+    notification.refresh_from_db()
+    assert notification.version == 2
+    assert notification.updated_at > first_update
+
+    Notification.objects.filter(id=notification.id).update(message="Zmieniona")
+    notification.refresh_from_db()
+    assert notification.version == 3
+
+    second_update = notification.updated_at
+    notification.message = "Zmieniona ponownie"
+    Notification.objects.bulk_update([notification], ['message'])
+    notification.refresh_from_db()
+    assert notification.version == 4
+    assert notification.updated_at > second_update
+
+def test_appointment_bulk_update_bumps_version(appointments):
+    # AppointmentQuerySet.bulk_update dokłada end_date i przekazuje dalej do VersionedQuerySet
+    for appointment in appointments:
+        appointment.date += timedelta(days=1)
+    Appointment.objects.bulk_update(appointments, ['date'])
+
+    rows = Appointment.objects.order_by('id').values_list('version', 'end_date')
+    assert list(rows) == [(2, appointment.date + timedelta(minutes=30)) for appointment in appointments]
+
+@pytest.mark.django_db
+def test_retrieve_returns_304_for_current_etag(api_client):
+    part = Part.objects.create(name="Klocki", manufacturer="Bosch", price='99.00', stock_quantity=4, category='brake')
+    url = f'/api/v1/parts/{part.id}/'
+
+    response = api_client.get(url)
+    etag = response['ETag']
+    assert response.status_code == 200
+
+    not_modified = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified['ETag'] == etag
+    assert not not_modified.content
+    # Słabe porównanie: klient (lub proxy) może odesłać W/"..."
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}').status_code == 304
+
+    api_client.patch(url, {'stock_quantity': 5}, format='json')
+    changed = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert changed.status_code == 200
+    assert changed['ETag'] != etag
+    assert api_client.get(url, {'fields': 'id,name'}, HTTP_IF_NONE_MATCH=changed['ETag']).status_code == 200
+
+@pytest.mark.django_db
+def test_list_304_skips_serialization(api_client, notifications):
+    etag = api_client.get('/api/v1/notifications/')['ETag']
+
+    with patch.object(NotificationSerializer, 'to_representation') as to_representation:
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get('/api/v1/notifications/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    to_representation.assert_not_called()
+    notification_queries = [query['sql'] for query in context.captured_queries if 'notifications_notification' in query['sql']]
+    assert len(notification_queries) == 1
+    assert 'MAX(' in notification_queries[0] and 'COUNT(' in notification_queries[0]
+
+@pytest.mark.django_db
+def test_list_etag_follows_updates_inserts_and_deletes(api_client, user, notifications):
+    def current_etag():
+        return api_client.get('/api/v1/notifications/')['ETag']
+
+    etags = [current_etag()]
+    api_client.post(f'/api/v1/notifications/{notifications[0].id}/mark_as_read/')
+    etags.append(current_etag())
+    Notification.objects.create(user=user, message="Nowa", notification_type='system')
+    etags.append(current_etag())
+    notifications[1].delete()
+    etags.append(current_etag())
+
+    assert len(set(etags)) == 4
+    assert current_etag() == etags[-1]
+    assert api_client.get('/api/v1/notifications/', {'page_size': 2})['ETag'] != etags[-1]
+
+@pytest.mark.django_db
+def test_polled_dashboard_endpoints(api_client, user, appointments):
+    user.role = 'owner'
+    user.save()
+
+    first = api_client.get('/api/v1/appointments/my-appointments/')
+    assert len(first.data) == 2
+    with patch.object(AppointmentSerializer, 'to_representation') as to_representation:
+        response = api_client.get('/api/v1/appointments/my-appointments/', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == 304
+    to_representation.assert_not_called()
+
+    workshop = api_client.get('/api/v1/workshops/my-workshop/')
+    assert api_client.get('/api/v1/workshops/my-workshop/', HTTP_IF_NONE_MATCH=workshop['ETag']).status_code == 304
+
+    api_client.patch('/api/v1/appointments/bulk/', [{'id': appointments[0].id, 'priority': 'high'}], format='json')
+    assert api_client.get('/api/v1/appointments/my-appointments/', HTTP_IF_NONE_MATCH=first['ETag']).status_code == 200
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('related', ['vehicle', 'workshop', 'client'])
+def test_appointment_etags_follow_embedded_relations(api_client, user, appointments, related):
+    # AppointmentSerializer dołącza kolumny pojazdu, warsztatu i klienta - ich zmiana musi zmienić ETag
+    user.role = 'owner'
+    user.save()
+    appointment = appointments[0]
+    urls = [
+        '/api/v1/appointments/my-appointments/',
+        f'/api/v1/appointments/by_workshop/?workshop_id={appointment.workshop_id}',
+        f'/api/v1/appointments/{appointment.id}/',
+    ]
+    etags = [api_client.get(url)['ETag'] for url in urls]
+
+    instance = getattr(Appointment.objects.get(id=appointment.id), related)
+    if related == 'vehicle':
+        instance.registration_number = "ETG999"
+    elif related == 'workshop':
+        instance.name = "Renamed ETag Workshop"
+    else:
+        instance.last_name = "Nowak"
+    instance.save()
+
+    for url, etag in zip(urls, etags):
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
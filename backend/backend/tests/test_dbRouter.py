@@ -0,0 +1,134 @@
+"""
+Database Router Tests
+Tests covering read-replica routing, read-your-writes pinning and lag-aware fallback
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from unittest.mock import patch
+import pytest
+import redis
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend.dbRouter import PRIMARY, DatabaseRouting
+from backend.redisClient import get_redis
+from inventory.models import Part
+from inventory.repositories.partRepository import PartRepository
+from users.models import User
+
+REPLICA = 'replica_test'
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except redis.RedisError:
+        return False
+
+
+@pytest.fixture
+def replica(transactional_db, settings):
+    # Druga nazwa połączenia do tej samej bazy testowej - jak replika z TEST MIRROR
+    connections.settings[REPLICA] = {**connections.settings[PRIMARY], 'TEST': {'MIRROR': PRIMARY}}
+    settings.DATABASE_REPLICAS = [REPLICA]
+    DatabaseRouting.reset_lag()
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+    DatabaseRouting.reset_lag()
+
+@pytest.fixture
+def routing():
+    tokens = DatabaseRouting.begin()
+    yield
+    DatabaseRouting.end(tokens)
+
+@pytest.fixture
+def part(transactional_db):
+    return Part.objects.create(name="Klocki", manufacturer="Bosch", price='99.00', stock_quantity=4, category='brake')
+
+def queries_on(alias, read, table=None):
+    with CaptureQueriesContext(connections[alias]) as context:
+        result = read()
+    return result, len([query for query in context.captured_queries if table is None or table in query['sql']])
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica, part, routing):
+    names, replica_queries = queries_on(REPLICA, lambda: list(PartRepository.get_all().values_list('name', flat=True)))
+    assert (names, replica_queries) == (["Klocki"], 1)
+    assert not DatabaseRouting.is_pinned()
+
+    _, primary_queries = queries_on(PRIMARY, lambda: PartRepository.update(part.id, {'stock_quantity': 5}))
+    assert primary_queries >= 1
+    assert DatabaseRouting.is_pinned()
+
+def test_reads_after_write_in_same_request_use_primary(replica, part, routing):
+    Part.objects.filter(id=part.id).update(stock_quantity=7)
+
+    quantity, replica_queries = queries_on(REPLICA, lambda: PartRepository.get_by_id(part.id).stock_quantity)
+    assert (quantity, replica_queries) == (7, 0)
+
+def test_transactions_and_primary_blocks_read_from_primary(replica, part, routing):
+    with transaction.atomic():
+        _, replica_queries = queries_on(REPLICA, lambda: PartRepository.get_all().count())
+    assert replica_queries == 0
+
+    with DatabaseRouting.primary():
+        _, replica_queries = queries_on(REPLICA, lambda: PartRepository.get_all().count())
+    assert replica_queries == 0
+    # Po bloku bez zapisu odczyty wracają do repliki
+    assert DatabaseRouting.read_alias() == REPLICA
+
+def test_lagging_or_unavailable_replica_falls_back_to_primary(replica, routing, settings):
+    settings.DATABASE_REPLICA_MAX_LAG_SECONDS = 5
+    with patch.object(DatabaseRouting, '_measure_lag', return_value=30.0) as measure:
+        assert DatabaseRouting.read_alias() == PRIMARY
+        assert DatabaseRouting.read_alias() == PRIMARY
+    # Opóźnienie jest sprawdzane raz na LAG_CHECK_INTERVAL_SECONDS
+    assert measure.call_count == 1
+
+    DatabaseRouting.reset_lag()
+    with patch.object(DatabaseRouting, '_measure_lag', return_value=None):
+        assert DatabaseRouting.read_alias() == PRIMARY
+
+    DatabaseRouting.reset_lag()
+    with patch.object(DatabaseRouting, '_measure_lag', return_value=1.5):
+        assert DatabaseRouting.read_alias() == REPLICA
+
+def test_repository_hint_keeps_model_on_primary(replica, routing):
+    with patch.object(DatabaseRouting, 'primary_models', {Part}):
+        assert DatabaseRouting.read_alias(Part) == PRIMARY
+        assert DatabaseRouting.read_alias(User) == REPLICA
+    assert PartRepository.queryset(primary=True).db == PRIMARY
+
+def test_without_replicas_everything_uses_primary(db, routing):
+    assert DatabaseRouting.read_alias() == PRIMARY
+    assert PartRepository.get_all().db == PRIMARY
+
+@pytest.mark.skipif(not redis_available(), reason="Read-your-writes across requests requires Redis")
+def test_user_is_pinned_to_primary_after_write(replica, part, settings):
+    settings.DATABASE_PIN_SECONDS = 30
+    admin = User.objects.create_superuser(username="router_admin", email="router_admin@example.com", password="password123", role='admin')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+    get_redis().delete(DatabaseRouting._pin_key(admin.pk))
+
+    def retrieve():
+        # Użytkownik z tokenu JWT jest czytany przed sprawdzeniem przypięcia - liczą się zapytania o części
+        return queries_on(REPLICA, lambda: client.get(f'/api/v1/parts/{part.id}/'), Part._meta.db_table)
+
+    response, replica_queries = retrieve()
+    assert response.status_code == 200 and replica_queries == 1
+
+    assert client.patch(f'/api/v1/parts/{part.id}/', {'stock_quantity': 9}, format='json').status_code == 200
+    response, replica_queries = retrieve()
+    assert (response.data['stock_quantity'], replica_queries) == (9, 0)
+
+    # Okno przypięcia minęło
+    get_redis().delete(DatabaseRouting._pin_key(admin.pk))
+    assert retrieve()[1] == 1
@@ -0,0 +1,153 @@
+"""
+Metrics Tests
+Tests covering per-route request metrics, WebSocket metrics and the /metrics endpoint
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import json
+import re
+from unittest.mock import AsyncMock, patch
+import pytest
+import redis
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend.metrics import MetricsRegistry, metrics
+from inventory.models import Part
+from notifications.routing import websocket_urlpatterns
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="metrics_user", email="metrics_user@example.com", password="password123")
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def scrape(client=None, **extra):
+    response = (client or APIClient()).get('/metrics', **extra)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    return response.content.decode()
+
+def sample(text, name, **labels):
+    # Etykieta le jest ostatnia, pozostałe alfabetycznie
+    le = labels.pop('le', None)
+    pairs = sorted(labels.items()) + ([('le', le)] if le is not None else [])
+    selector = ','.join(f'{key}="{value}"' for key, value in pairs)
+    match = re.search(rf'^{re.escape(name)}\{{{re.escape(selector)}\}} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+@pytest.mark.django_db
+def test_request_metrics_per_route(api_client):
+    Part.objects.create(name="Filtr", manufacturer="Bosch", price='25.00', stock_quantity=3, category='engine')
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get('/api/v1/parts/')
+    query_count = len(context.captured_queries)
+    api_client.get('/api/v1/parts/')
+    api_client.get('/api/v1/parts/999999/')
+    text = scrape()
+
+    route = {'route': 'parts-list', 'method': 'GET'}
+    assert sample(text, 'http_requests_total', status='200', **route) == 2
+    assert sample(text, 'http_requests_total', route='parts-detail', method='GET', status='404') == 1
+    assert sample(text, 'http_request_duration_seconds_count', **route) == 2
+    assert sample(text, 'http_request_duration_seconds_bucket', le='+Inf', **route) == 2
+    assert sample(text, 'http_request_db_queries_sum', **route) == 2 * query_count
+    assert sample(text, 'http_request_db_duration_seconds_total', **route) > 0
+    assert sample(text, 'http_response_size_bytes_sum', **route) == 2 * len(response.content)
+    assert '# TYPE http_request_duration_seconds histogram' in text
+
+@pytest.mark.django_db
+def test_histogram_buckets_are_cumulative(api_client):
+    for _ in range(3):
+        api_client.get('/api/v1/parts/')
+    text = scrape()
+
+    buckets = re.findall(r'^http_request_db_queries_bucket\{method="GET",route="parts-list",le="([^"]+)"\} (\S+)$', text, re.MULTILINE)
+    counts = [float(count) for _, count in buckets]
+    assert buckets[-1][0] == '+Inf'
+    assert counts == sorted(counts)
+    assert counts[-1] == 3
+
+def test_unresolved_paths_share_one_series(db):
+    client = APIClient()
+    client.get('/no/such/path/1')
+    client.get('/no/such/path/2')
+
+    assert sample(scrape(client), 'http_requests_total', route='unresolved', method='GET', status='404') == 2
+
+def test_metrics_endpoint_is_internal(db, settings):
+    client = APIClient()
+    assert client.get('/metrics', REMOTE_ADDR='203.0.113.7').status_code == 403
+
+    settings.METRICS_TOKEN = 'scrape-secret'
+    assert client.get('/metrics', REMOTE_ADDR='203.0.113.7', HTTP_AUTHORIZATION='Bearer wrong').status_code == 403
+    assert client.get('/metrics', REMOTE_ADDR='203.0.113.7', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code == 200
+
+def test_workers_are_aggregated_through_redis():
+    try:
+        metrics.flush()
+    except redis.RedisError:
+        pytest.skip("Aggregation across workers requires Redis")
+    other_worker = MetricsRegistry()
+    other_worker.inc('websocket_connections_total', consumer='ChatConsumer')
+    metrics.inc('websocket_connections_total', consumer='ChatConsumer')
+    if not other_worker.flush():
+        pytest.skip("Aggregation across workers requires Redis")
+
+    assert sample(metrics.render(), 'websocket_connections_total', consumer='ChatConsumer') == 2
+
+def test_without_redis_the_process_values_are_served():
+    metrics.inc('websocket_connections_total', consumer='ChatConsumer')
+    with patch('backend.metrics.get_redis', side_effect=redis.ConnectionError("down")):
+        text = metrics.render()
+    assert text.startswith('# Redis unavailable')
+    assert sample(text, 'websocket_connections_total', consumer='ChatConsumer') == 1
+
+@pytest.mark.django_db
+def test_websocket_consumer_reports_connections_and_messages(user, settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+    async def session():
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f'/ws/notifications/{user.id}/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        assert connected
+        await communicator.receive_json_from()
+        active = sample(metrics.render(), 'websocket_connections_active', consumer='NotificationConsumer')
+        await communicator.send_to(text_data=json.dumps({'type': 'get_unread_notifications'}))
+        await communicator.receive_json_from()
+        await communicator.disconnect()
+        return active
+
+    unread = AsyncMock(return_value=[{'id': 1, 'message': "Przypomnienie"}])
+    with patch('notifications.consumers.NotificationConsumer.get_unread_notifications', unread):
+        assert async_to_sync(session)() == 1
+    text = metrics.render()
+
+    labels = {'consumer': 'NotificationConsumer'}
+    assert sample(text, 'websocket_connections_total', **labels) == 1
+    assert sample(text, 'websocket_connections_active', **labels) == 0
+    assert sample(text, 'websocket_messages_total', direction='received', **labels) == 1
+    assert sample(text, 'websocket_messages_total', direction='sent', **labels) == 2
@@ -0,0 +1,133 @@
+"""
+Object Cache Tests
+Tests covering the two-tier get_by_id cache, its invalidation and statistics
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import time
+from unittest.mock import patch
+import pytest
+import redis
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend.objectCache import ObjectCache, _LocalCache
+from backend.redisClient import get_redis
+from users.models import User
+from workshops.models import Workshop
+from workshops.repositories.workshopRepository import WorkshopRepository
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except redis.RedisError:
+        return False
+
+
+requires_redis = pytest.mark.skipif(not redis_available(), reason="Shared cache tier requires Redis")
+
+
+@pytest.fixture
+def cache():
+    cache = WorkshopRepository.object_cache
+    cache.clear()
+    cache._counts.clear()
+    yield cache
+    cache.clear()
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Cache Workshop", location="Kraków")
+
+def get_without_queries(record_id):
+    with CaptureQueriesContext(connection) as context:
+        record = WorkshopRepository.get_by_id(record_id)
+    return record, len(context.captured_queries)
+
+
+@requires_redis
+def test_repeated_reads_hit_local_then_shared_tier(cache, workshop):
+    first, first_queries = get_without_queries(workshop.id)
+    local, local_queries = get_without_queries(str(workshop.id))
+    with cache._lock:
+        cache._local.clear()
+    shared, shared_queries = get_without_queries(workshop.id)
+
+    assert (first_queries, local_queries, shared_queries) == (1, 0, 0)
+    assert local.name == shared.name == "Cache Workshop"
+    # Każdy odczyt dostaje własną kopię rekordu
+    assert local is not shared
+    stats = cache.stats()
+    assert (stats['miss'], stats['local_hit'], stats['shared_hit']) == (1, 1, 1)
+    assert stats['hit_ratio'] == round(2 / 3, 4)
+
+@requires_redis
+def test_save_and_delete_invalidate(cache, workshop):
+    WorkshopRepository.get_by_id(workshop.id)
+
+    workshop.name = "Renamed Workshop"
+    workshop.save()
+    assert WorkshopRepository.get_by_id(workshop.id).name == "Renamed Workshop"
+
+    workshop.delete()
+    with pytest.raises(ValueError):
+        WorkshopRepository.get_by_id(workshop.id)
+    # Utworzenie, zmiana i usunięcie rekordu
+    assert cache.stats()['invalidation'] == 3
+
+@requires_redis
+def test_broadcast_drops_copies_in_other_processes(cache, workshop):
+    WorkshopRepository.get_by_id(workshop.id)
+    # Zmiana w innym procesie: wiersz i Redis są już aktualne, ten proces dostaje tylko komunikat
+    Workshop.objects.filter(id=workshop.id).update(name="Changed Elsewhere")
+    get_redis().delete(cache._key(str(workshop.id)))
+    get_redis().publish(ObjectCache.CHANNEL, f'{cache.label}|{workshop.id}')
+
+    deadline = time.monotonic() + 3
+    while WorkshopRepository.get_by_id(workshop.id).name != "Changed Elsewhere":
+        assert time.monotonic() < deadline, "invalidation message was not received"
+        time.sleep(0.05)
+
+@requires_redis
+def test_local_tier_counts_lru_evictions(cache, db):
+    workshops = [Workshop.objects.create(name=f"LRU {number}", location="Gdańsk") for number in range(3)]
+    with patch.object(cache, '_local', _LocalCache(2, 30, cache._count_eviction)):
+        for workshop in workshops:
+            WorkshopRepository.get_by_id(workshop.id)
+        assert cache.stats()['eviction'] == 1
+        assert cache.stats()['local_size'] == 2
+
+def test_reads_fall_back_to_database_without_redis(workshop):
+    with patch('backend.objectCache.get_redis', side_effect=redis.ConnectionError("down")):
+        record = WorkshopRepository.get_by_id(workshop.id)
+        workshop.name = "Still Works"
+        workshop.save()
+    assert record.name == "Cache Workshop"
+    WorkshopRepository.object_cache.clear()
+
+@requires_redis
+@pytest.mark.django_db
+def test_api_retrieve_sees_updates_and_stats_are_admin_only(cache, workshop):
+    admin = User.objects.create_superuser(
+        username="cache_admin", email="cache_admin@example.com", password="password123", role='admin'
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+
+    assert client.get(f'/api/v1/workshops/{workshop.id}/').data['name'] == "Cache Workshop"
+    client.patch(f'/api/v1/workshops/{workshop.id}/', {'name': "Patched Workshop"}, format='json')
+    assert client.get(f'/api/v1/workshops/{workshop.id}/').data['name'] == "Patched Workshop"
+
+    response = client.get('/api/v1/cache-stats/')
+    assert response.status_code == 200
+    assert response.data['workshops.workshop']['miss'] >= 1
+    assert 'users.user' in response.data
+
+    customer = User.objects.create_user(username="cache_client", email="cache_client@example.com", password="password123")
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(customer).access_token}')
+    assert client.get('/api/v1/cache-stats/').status_code == 403
@@ -0,0 +1,131 @@
+"""
+Cursor Pagination Tests
+Tests covering keyset pagination shared by every BaseViewSet list endpoint
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import datetime, timedelta
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from backend.pagination import InvalidCursorError, KeysetPaginator
+from notifications.models import Notification
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="pagination_user", email="pagination_user@example.com", password="password123")
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+@pytest.fixture
+def notifications(user):
+    created = [
+        Notification.objects.create(user=user, message=f"Notification {number}", notification_type='system')
+        for number in range(7)
+    ]
+    # Kilka rekordów z identycznym created_at - remisy rozstrzyga id
+    same_time = timezone.now() - timedelta(days=1)
+    Notification.objects.filter(id__in=[n.id for n in created[2:5]]).update(created_at=same_time)
+    return created
+
+
+def collect_pages(api_client, url, page_size, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        query = {'page_size': page_size, **params}
+        if cursor:
+            query['cursor'] = cursor
+        response = api_client.get(url, query)
+        assert response.status_code == 200
+        ids.extend(item['id'] for item in response.data['results'])
+        pages += 1
+        cursor = response.data['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.django_db
+def test_pages_cover_ordering_without_gaps(api_client, notifications):
+    expected = list(
+        Notification.objects.filter(user__username="pagination_user")
+        .order_by('-created_at', '-id').values_list('id', flat=True)
+    )
+
+    ids, pages = collect_pages(api_client, '/api/v1/notifications/', 2)
+
+    assert ids == expected
+    assert pages == 4
+
+@pytest.mark.django_db
+def test_page_metadata_and_filters(api_client, notifications):
+    notifications[0].read_status = True
+    notifications[0].save()
+
+    response = api_client.get('/api/v1/notifications/', {'page_size': 10, 'read_status': 'false'})
+
+    assert response.data['count'] == 6
+    assert response.data['count_is_estimate'] is False
+    assert response.data['page_size'] == 10
+    assert response.data['next_cursor'] is None
+    assert len(response.data['results']) == 6
+
+@pytest.mark.django_db
+def test_page_size_is_capped_and_validated(api_client, notifications):
+    response = api_client.get('/api/v1/notifications/', {'page_size': 10_000})
+    assert response.data['page_size'] == KeysetPaginator.MAX_PAGE_SIZE
+
+    assert api_client.get('/api/v1/notifications/', {'page_size': 0}).status_code == 400
+    assert api_client.get('/api/v1/notifications/', {'page_size': 'all'}).status_code == 400
+    assert api_client.get('/api/v1/notifications/', {'cursor': 'not-a-cursor'}).status_code == 400
+
+@pytest.mark.django_db
+def test_legacy_clients_get_full_list_with_deprecation_header(api_client, notifications):
+    response = api_client.get('/api/v1/notifications/')
+
+    assert response.status_code == 200
+    assert len(response.data) == 7
+    assert response['Deprecation'] == 'true'
+    assert 'page_size=' in response['Link']
+
+@pytest.mark.django_db
+def test_appointments_by_workshop_paginated_by_date(api_client, user):
+    workshop = Workshop.objects.create(name="Pagination Workshop")
+    vehicle = Vehicle.objects.create(
+        owner=user, brand="toyota", model="Yaris", registration_number="PAG123", vin="1HGCM82633A765432", year=2021
+    )
+    start = timezone.make_aware(datetime(2030, 3, 4, 8, 0))
+    appointments = [
+        Appointment.objects.create(
+            client=user, workshop=workshop, vehicle=vehicle, date=start + timedelta(hours=offset), duration_estimate=30
+        )
+        for offset in (5, 1, 3, 1, 4)
+    ]
+
+    ids, _ = collect_pages(api_client, '/api/v1/appointments/by_workshop/', 2, workshop_id=workshop.id)
+
+    expected = [a.id for a in sorted(appointments, key=lambda a: (a.date, a.id))]
+    assert ids == expected
+
+def test_cursor_keeps_microseconds():
+    paginator = KeysetPaginator('-created_at')
+    notification = Notification(id=5, created_at=timezone.make_aware(datetime(2030, 1, 1, 12, 0, 0, 123456)))
+
+    value, record_id = paginator.decode_cursor(Notification.objects.all(), paginator.encode_cursor(notification))
+
+    assert value == notification.created_at
+    assert record_id == 5
+    with pytest.raises(InvalidCursorError):
+        paginator.decode_cursor(Notification.objects.all(), 'eyJ2IjogMX0')
@@ -0,0 +1,167 @@
+"""
+Query Budget Tests
+Tests covering repository eager-loading plans and the N+1 query budget guard
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from appointments.repositories.appointmentsRepository import AppointmentRepository
+from appointments.serializers import AppointmentSerializer
+from backend.queryBudget import QueryBudgetExceeded, query_budget
+from users.models import Profile, User
+from users.repositories.userRepository import UserRepository
+from users.serializers import UserSerializer
+from vehicles.models import Vehicle, VehicleService
+from vehicles.repositories.VehicleServiceRepository import VehicleServiceRepository
+from vehicles.serializers import VehicleServiceSerializer
+from workshops.models import Service, Workshop
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create_superuser(username="budget_admin", email="budget_admin@example.com", password="password123")
+
+@pytest.fixture
+def api_client(admin):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+    return client
+
+@pytest.fixture
+def workshop(db):
+    return Workshop.objects.create(name="Budget Workshop")
+
+@pytest.fixture
+def create_appointments(workshop):
+    clients = [
+        User.objects.create_user(username=f"budget_client_{number}", email=f"budget_client_{number}@example.com", password="password123")
+        for number in range(5)
+    ]
+    mechanic = User.objects.create_user(
+        username="budget_mechanic", email="budget_mechanic@example.com", password="password123", role="mechanic"
+    )
+    vehicles = [
+        Vehicle.objects.create(
+            owner=client, brand="toyota", model="Corolla", registration_number=f"BDG{number}",
+            vin=f"1HGCM82633A{number:06d}", year=2020
+        )
+        for number, client in enumerate(clients)
+    ]
+    start = timezone.make_aware(datetime(2030, 2, 4, 8, 0))
+
+    def _create(count):
+        offset = Appointment.objects.count()
+        Appointment.objects.bulk_create([
+            Appointment(
+                client=clients[number % 5], vehicle=vehicles[number % 5], workshop=workshop,
+                assigned_mechanic=mechanic if number % 2 else None,
+                date=start + timedelta(hours=number), end_date=start + timedelta(hours=number, minutes=30),
+                duration_estimate=30
+            )
+            for number in range(offset, offset + count)
+        ])
+    return _create
+
+@pytest.fixture
+def many_appointments(create_appointments):
+    create_appointments(500)
+
+@pytest.fixture
+def many_users_and_services(workshop):
+    owner = User.objects.create_user(username="budget_owner", email="budget_owner@example.com", password="password123")
+    for number in range(10):
+        mechanic = User.objects.create_user(
+            username=f"budget_mech_{number}", email=f"budget_mech_{number}@example.com", password="password123", role="mechanic"
+        )
+        Profile.objects.create(user=mechanic, specializations=['toyota'])
+    vehicle = Vehicle.objects.create(
+        owner=owner, brand="toyota", model="Corolla", registration_number="BDGSRV", vin="1HGCM82633A999999", year=2020
+    )
+    service = Service.objects.create(workshop=workshop, name="Wymiana oleju", description="", price=Decimal('150.00'))
+    VehicleService.objects.bulk_create([
+        VehicleService(vehicle=vehicle, service=service, workshop=workshop, service_date=date(2030, 1, 1), cost=Decimal('150.00'))
+        for _ in range(10)
+    ])
+
+
+def list_query_count(api_client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries), response
+
+
+@pytest.mark.django_db
+def test_appointment_list_query_count_is_constant(api_client, create_appointments):
+    create_appointments(5)
+    small_count, _ = list_query_count(api_client, '/api/v1/appointments/')
+    create_appointments(495)
+    large_count, response = list_query_count(api_client, '/api/v1/appointments/')
+
+    assert len(response.data) == 500
+    assert large_count == small_count
+
+@pytest.mark.django_db
+@query_budget(3)
+def test_listing_500_appointments_within_budget(api_client, many_appointments):
+    # Uwierzytelnienie, agregat dla ETag + jedno zapytanie o wizyty ze wszystkimi relacjami
+    response = api_client.get('/api/v1/appointments/')
+
+    assert len(response.data) == 500
+    assert response.data[1]['mechanic']['id']
+    assert response.data[0]['vehicle']['registration_number'].startswith("BDG")
+
+@pytest.mark.django_db
+@query_budget(3)
+def test_appointment_by_workshop_within_budget(api_client, workshop, many_appointments):
+    # Uwierzytelnienie, agregat dla ETag (daje też liczbę rekordów) i strona wizyt
+    response = api_client.get('/api/v1/appointments/by_workshop/', {'workshop_id': workshop.id, 'page_size': 100})
+
+    assert len(response.data['results']) == 100
+
+@pytest.mark.django_db
+def test_repository_finders_apply_default_plan(create_appointments, workshop):
+    create_appointments(20)
+
+    with CaptureQueriesContext(connection) as context:
+        data = AppointmentSerializer(AppointmentRepository.get_appointments_by_workshop(workshop.id), many=True).data
+        AppointmentSerializer(AppointmentRepository.get_by_id(Appointment.objects.first().id)).data
+    assert len(data) == 20
+    # first() w teście + po jednym zapytaniu na listę i pojedynczy rekord
+    assert len(context.captured_queries) == 3
+
+@pytest.mark.django_db
+@query_budget(1)
+def test_user_list_within_budget(many_users_and_services):
+    users = UserSerializer(UserRepository.get_all(), many=True).data
+    assert any(user['specializations'] == ['toyota'] for user in users)
+
+@pytest.mark.django_db
+def test_vehicle_service_list_within_budget(many_users_and_services):
+    with CaptureQueriesContext(connection) as context:
+        services = VehicleServiceSerializer(VehicleServiceRepository.get_all(), many=True).data
+    assert len(services) == 10
+    assert services[0]['service_name'] == "Wymiana oleju"
+    assert len(context.captured_queries) == 1
+
+def test_budget_guard_reports_queries(db):
+    @query_budget(1)
+    def too_many_queries():
+        list(User.objects.all())
+        list(Workshop.objects.all())
+
+    with pytest.raises(QueryBudgetExceeded) as error:
+        too_many_queries()
+    assert "executed 2 queries, budget is 1" in str(error.value)
+    assert 'workshops_workshop' in str(error.value)
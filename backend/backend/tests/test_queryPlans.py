@@ -0,0 +1,190 @@
+"""
+Query Plan Tests
+Runs EXPLAIN on the hot queries against a seeded dataset and fails when one of
+them falls back to a sequential scan instead of its composite index
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+import pytest
+from django.db import connection
+from django.utils import timezone
+from appointments.models import Appointment, estimated_end_expression
+from appointments.repositories.appointmentsRepository import AppointmentRepository
+from chat.models import Conversation, Message
+from inventory.models import Part, PartInventory, StockEntry
+from notifications.models import Notification
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+WEEK = (date(2030, 7, 1), date(2030, 7, 7))
+
+
+@pytest.fixture
+def dataset(db):
+    """Kilka warsztatów z wizytami, powiadomieniami, czatem i magazynem"""
+    rng = random.Random(24)
+    client = User.objects.create_user(username="plan_client", email="plan_client@example.com", password="password123")
+    mechanics = [
+        User.objects.create_user(username=f"plan_mechanic{number}", email=f"plan_mechanic{number}@example.com",
+                                 password="password123", role='mechanic')
+        for number in range(4)
+    ]
+    workshops = Workshop.objects.bulk_create(Workshop(name=f"Warsztat {number}") for number in range(8))
+    vehicle = Vehicle.objects.create(
+        owner=client, brand="toyota", model="Corolla", registration_number="PLN123", vin="1HGCM82633A999000", year=2020
+    )
+    start = timezone.make_aware(datetime(2030, 1, 1, 8, 0))
+    appointments = []
+    for number in range(2000):
+        appointment_date = start + timedelta(hours=rng.randrange(24 * 365))
+        appointments.append(Appointment(
+            client=client, workshop=rng.choice(workshops), vehicle=vehicle, date=appointment_date,
+            end_date=appointment_date + timedelta(minutes=60), duration_estimate=60,
+            assigned_mechanic=rng.choice(mechanics + [None] * 4),
+            status=rng.choice(['scheduled', 'in_progress', 'completed', 'completed'])
+        ))
+    Appointment.objects.bulk_create(appointments)
+
+    Notification.objects.bulk_create(
+        Notification(user=rng.choice(mechanics + [client]), message=f"Wiadomość {number}",
+                     notification_type='system', read_status=rng.random() < 0.8)
+        for number in range(1500)
+    )
+    conversations = [
+        Conversation.objects.create(client=client, mechanic=mechanic, workshop=workshops[0], subject="Naprawa")
+        for mechanic in mechanics
+    ]
+    Message.objects.bulk_create(
+        Message(conversation=rng.choice(conversations), sender=rng.choice([client, *mechanics]),
+                content=f"Treść {number}", is_read=rng.random() < 0.9)
+        for number in range(1500)
+    )
+    parts = Part.objects.bulk_create(
+        Part(name=f"Część {number}", manufacturer="Bosch", price='10.00', stock_quantity=5, category='engine')
+        for number in range(200)
+    )
+    PartInventory.objects.bulk_create(
+        PartInventory(part=part, workshop=workshop, quantity=rng.randrange(20))
+        for part in parts for workshop in workshops
+    )
+    StockEntry.objects.bulk_create(
+        StockEntry(part=rng.choice(parts), change_type='sale', quantity_change=-1) for _ in range(1500)
+    )
+    _analyze()
+    return {'client': client, 'mechanic': mechanics[0], 'workshop': workshops[0],
+            'conversation': conversations[0], 'part': parts[0]}
+
+def _analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+@contextmanager
+def indexes_preferred():
+    """Na PostgreSQL mała tabela i tak byłaby czytana sekwencyjnie - wyłącz Seq Scan, gdy jest indeks"""
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SET enable_seqscan = off')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+def sequential_scans(plan):
+    """Węzły planu czytające całą tabelę (PostgreSQL: Seq Scan, SQLite: SCAN tabela bez indeksu)"""
+    if connection.vendor == 'postgresql':
+        return [line.strip() for line in plan.splitlines() if 'Seq Scan' in line]
+    return [
+        line.strip() for line in plan.splitlines()
+        if line.split('--')[-1].strip().startswith('SCAN') and 'INDEX' not in line
+    ]
+
+HOT_QUERIES = {
+    'appointments_by_workshop': (
+        lambda data: AppointmentRepository.get_appointments_by_workshop(data['workshop'].id, *WEEK),
+        'appointment_workshop_date_idx'
+    ),
+    'appointments_by_mechanic': (
+        lambda data: AppointmentRepository.get_appointments_by_mechanic(data['mechanic'].id, *WEEK),
+        'appointment_mechanic_date_idx'
+    ),
+    'appointments_by_status': (
+        lambda data: AppointmentRepository.filter_days(Appointment.objects.filter(status='scheduled'), *WEEK),
+        'appointment_status_date_idx'
+    ),
+    'appointment_status_transitions': (
+        lambda data: Appointment.objects.filter(
+            status__in=Appointment.ACTIVE_STATUSES, date__lte=timezone.make_aware(datetime(2030, 3, 1))
+        ).alias(estimated_end=estimated_end_expression()).filter(
+            estimated_end__lt=timezone.make_aware(datetime(2030, 3, 1))
+        ),
+        # Częściowy indeks otwartych wizyt albo (status, date) - oba bez odczytu całej tabeli
+        ('appointment_open_date_idx', 'appointment_status_date_idx')
+    ),
+    'notifications_list': (
+        lambda data: Notification.objects.filter(user=data['client']).order_by('-created_at', '-id'),
+        'notification_user_created_idx'
+    ),
+    'unread_notifications': (
+        lambda data: Notification.objects.filter(user=data['client'], read_status=False).order_by('-created_at'),
+        'notification_user_unread_idx'
+    ),
+    'unread_messages': (
+        lambda data: Message.objects.filter(conversation=data['conversation'], sender=data['client'], is_read=False),
+        'message_unread_idx'
+    ),
+    'workshop_part_ids': (
+        lambda data: PartInventory.objects.filter(workshop=data['workshop']).values_list('part_id', flat=True),
+        'partinventory_workshop_qty_idx'
+    ),
+    'workshop_low_stock': (
+        lambda data: PartInventory.objects.filter(workshop=data['workshop'], quantity__lte=3),
+        'partinventory_workshop_qty_idx'
+    ),
+    'part_stock_history': (
+        lambda data: StockEntry.objects.filter(part=data['part']).order_by('-timestamp'),
+        'stockentry_part_time_idx'
+    ),
+}
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_index(name, dataset):
+    build_query, index_names = HOT_QUERIES[name]
+    if isinstance(index_names, str):
+        index_names = (index_names,)
+
+    with indexes_preferred():
+        plan = build_query(dataset).explain()
+
+    assert not sequential_scans(plan), f"{name}: sequential scan\n{plan}"
+    assert any(index_name in plan for index_name in index_names), f"{name}: {index_names} not used\n{plan}"
+
+def test_day_filters_are_sargable_and_keep_local_days(dataset):
+    workshop = dataset['workshop']
+    # Granice dnia w czasie lokalnym: tuż przed północą 7 lipca jest w zakresie, północ 8 lipca już nie
+    inside = timezone.make_aware(datetime(2030, 7, 7, 23, 59))
+    outside = timezone.make_aware(datetime(2030, 7, 8, 0, 0))
+    for appointment_date in (inside, outside):
+        Appointment.objects.create(
+            client=dataset['client'], workshop=workshop, vehicle=Vehicle.objects.first(), date=appointment_date
+        )
+
+    appointments = AppointmentRepository.get_appointments_by_workshop(workshop.id, '2030-07-01', '2030-07-07')
+    expected = [
+        appointment.id for appointment in Appointment.objects.filter(workshop=workshop)
+        if date(2030, 7, 1) <= timezone.localtime(appointment.date).date() <= date(2030, 7, 7)
+    ]
+
+    assert sorted(appointments.values_list('id', flat=True)) == sorted(expected)
+    assert 'django_datetime_cast_date' not in str(appointments.query)
+    assert '::date' not in str(appointments.query)
@@ -0,0 +1,130 @@
+"""
+Single-flight Tests
+Tests covering request coalescing in one process and across workers sharing Redis
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pytest
+import redis
+from backend.redisClient import get_redis
+from backend.singleFlight import SingleFlight
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except redis.RedisError:
+        return False
+
+
+requires_redis = pytest.mark.skipif(not redis_available(), reason="Single-flight across workers requires Redis")
+
+
+@pytest.fixture
+def flight():
+    flight = SingleFlight(f'test_{uuid.uuid4().hex}')
+    yield flight
+    if redis_available():
+        client = get_redis()
+        for key in client.scan_iter(f'{SingleFlight.KEY_PREFIX}:{flight.name}:*'):
+            client.delete(key)
+    SingleFlight._registry.pop(flight.name, None)
+
+
+@requires_redis
+def test_concurrent_calls_share_one_computation(flight):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return {'slots': ['10:00']}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flight.run, 'key', compute)
+        started.wait(2)
+        followers = [executor.submit(flight.run, 'key', compute) for _ in range(4)]
+        time.sleep(0.05)
+        release.set()
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert all(result == {'slots': ['10:00']} for result in results)
+    assert flight.stats()['process'] == {'hit': 0, 'miss': 1, 'coalesced': 4}
+
+
+@requires_redis
+def test_waits_for_leader_in_another_worker(flight):
+    client = get_redis()
+    client.set(flight._key('key', 'lock'), 'other-worker', px=SingleFlight.LOCK_TTL_MS)
+
+    def publish():
+        time.sleep(0.1)
+        client.set(flight._key('key', 'result'), json.dumps({'slots': []}), px=SingleFlight.RESULT_TTL_MS)
+        client.delete(flight._key('key', 'lock'))
+
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    result = flight.run('key', lambda: pytest.fail("The leader in another worker computes the result"))
+    publisher.join()
+
+    assert result == {'slots': []}
+    stats = flight.stats()
+    assert stats['process']['coalesced'] == 1
+    assert stats['cluster']['coalesced'] == 1
+
+
+@requires_redis
+def test_recent_result_is_a_hit_until_forgotten(flight):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.run('key', compute, tag='workshop:1') == 1
+    assert flight.run('key', compute, tag='workshop:1') == 1
+    assert flight.stats()['process'] == {'hit': 1, 'miss': 1, 'coalesced': 0}
+
+    SingleFlight.forget('workshop:1')
+
+    assert flight.run('key', compute, tag='workshop:1') == 2
+
+
+@requires_redis
+def test_leader_error_is_shared_and_releases_lock(flight):
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.run, 'key', compute)
+        started.wait(2)
+        follower = executor.submit(flight.run, 'key', compute)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+    assert not get_redis().exists(flight._key('key', 'lock'))
+    assert flight.run('key', lambda: 'recovered') == 'recovered'
+
+
+def test_computes_locally_without_redis(flight):
+    with patch('backend.singleFlight.get_redis', side_effect=redis.ConnectionError):
+        assert flight.run('key', lambda: 42) == 42
+        assert flight.stats() == {'process': {'hit': 0, 'miss': 1, 'coalesced': 0}, 'cluster': None}
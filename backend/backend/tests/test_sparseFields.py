@@ -0,0 +1,132 @@
+"""
+Sparse Fieldset Tests
+Tests covering ?fields= / ?expand= trimming of responses and of the underlying queries
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import datetime, timedelta
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from appointments.models import Appointment
+from appointments.serializers import AppointmentSerializer
+from users.models import User
+from vehicles.models import Vehicle
+from workshops.models import Workshop
+
+
+@pytest.fixture
+def admin(db):
+    return User.objects.create_superuser(username="sparse_admin", email="sparse_admin@example.com", password="password123")
+
+@pytest.fixture
+def api_client(admin):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+    return client
+
+@pytest.fixture
+def appointments(admin):
+    client = User.objects.create_user(
+        username="sparse_client", email="sparse_client@example.com", password="password123",
+        first_name="Jan", last_name="Nowak"
+    )
+    workshop = Workshop.objects.create(name="Sparse Workshop")
+    vehicle = Vehicle.objects.create(
+        owner=client, brand="toyota", model="Auris", registration_number="SPR123", vin="1HGCM82633A876543", year=2019
+    )
+    start = timezone.make_aware(datetime(2030, 5, 6, 9, 0))
+    return [
+        Appointment.objects.create(
+            client=client, workshop=workshop, vehicle=vehicle, date=start + timedelta(hours=hour), duration_estimate=30
+        )
+        for hour in range(3)
+    ]
+
+
+def appointment_queries(queries):
+    # Bez zapytania agregującego dla ETag listy
+    return [
+        query['sql'] for query in queries
+        if 'appointments_appointment' in query['sql'] and 'MAX(' not in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+def test_calendar_fields_trim_output_and_columns(api_client, appointments):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get('/api/v1/appointments/', {'fields': 'id,date,status,customerFirstName,customerLastName'})
+
+    assert response.status_code == 200
+    assert len(response.data) == 3
+    assert set(response.data[0]) == {'id', 'date', 'status', 'customerFirstName', 'customerLastName'}
+    assert response.data[0]['customerLastName'] == "Nowak"
+
+    sql = appointment_queries(queries.captured_queries)
+    # Jedno zapytanie z jednym złączeniem - bez pojazdu, warsztatu i mechanika
+    assert len(sql) == 1
+    assert 'vehicles_vehicle' not in sql[0]
+    assert 'workshops_workshop' not in sql[0]
+    assert '"service_description"' not in sql[0]
+
+@pytest.mark.django_db
+def test_full_representation_is_unchanged_and_joined(api_client, appointments):
+    with CaptureQueriesContext(connection) as queries:
+        sparse = api_client.get('/api/v1/appointments/', {'expand': 'client_detail,mechanic_detail,vehicle_detail,vehicle_info'})
+    # Wszystkie relacje w jednym zapytaniu zamiast leniwych odczytów dla każdej wizyty
+    assert len(appointment_queries(queries.captured_queries)) == 1
+
+    full = api_client.get('/api/v1/appointments/')
+    assert sparse.data == full.data
+    assert full.data[0]['client']['first_name'] == "Jan"
+
+@pytest.mark.django_db
+def test_expand_adds_nested_objects_to_default_fields(api_client, appointments):
+    response = api_client.get('/api/v1/appointments/', {'expand': 'vehicle_detail'})
+
+    item = response.data[0]
+    assert item['vehicle_detail']['registration_number'] == "SPR123"
+    assert 'client_detail' not in item
+    assert 'mechanic_detail' not in item
+    assert item['client']['last_name'] == "Nowak"
+
+@pytest.mark.django_db
+def test_fields_work_with_cursor_pages_and_retrieve(api_client, appointments):
+    response = api_client.get('/api/v1/appointments/', {'fields': 'id,date', 'page_size': 2})
+    assert [set(item) for item in response.data['results']] == [{'id', 'date'}, {'id', 'date'}]
+    assert response.data['next_cursor']
+
+    response = api_client.get(f'/api/v1/appointments/{appointments[0].id}/', {'fields': 'id,vehicle', 'expand': 'vehicle_info'})
+    assert set(response.data) == {'id', 'vehicle', 'vehicle_info'}
+    assert response.data['vehicle']['brand'] == "toyota"
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected(api_client, appointments):
+    response = api_client.get('/api/v1/appointments/', {'fields': 'id,password'})
+    assert response.status_code == 400
+    assert 'password' in str(response.data['error'])
+
+    assert api_client.get('/api/v1/appointments/', {'expand': 'status'}).status_code == 400
+
+@pytest.mark.django_db
+def test_vehicle_fields_skip_current_workshop_lookup(api_client, appointments):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get('/api/v1/vehicles/', {'fields': 'id,registration_number,owner_name'})
+
+    assert response.data == [{'id': appointments[0].vehicle_id, 'registration_number': "SPR123", 'owner_name': "Jan Nowak"}]
+    # workshop_id/workshop_name (ostatnia wizyta) nie są liczone, gdy nie zostały wybrane
+    assert appointment_queries(queries.captured_queries) == []
+
+def test_projection_follows_field_sources():
+    fields = AppointmentSerializer.select_fields(['id', 'vehicle_info'])
+    sql = str(AppointmentSerializer.project(Appointment.objects.all(), fields).query)
+
+    assert '"vehicles_vehicle"."brand"' in sql
+    assert '"vehicles_vehicle"."vin"' not in sql
+    assert 'users_user' not in sql
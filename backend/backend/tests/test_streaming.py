@@ -0,0 +1,119 @@
+"""
+Streaming Response Tests
+Tests covering row-by-row JSON streaming of large unpaginated list responses
+"""
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import json
+import tracemalloc
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import StreamingHttpResponse
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend.metrics import metrics
+from backend.views_collection.BaseView import BaseViewSet
+from inventory.models import Part
+from users.models import User
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username="stream_user", email="stream_user@example.com", password="password123")
+
+@pytest.fixture
+def token(user):
+    return str(RefreshToken.for_user(user).access_token)
+
+@pytest.fixture
+def api_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+def create_parts(count):
+    Part.objects.bulk_create(
+        Part(name=f"Część  {number}", manufacturer="Bosch", price='19.99', stock_quantity=number, category='engine')
+        for number in range(count)
+    )
+
+def streamed_body(response):
+    assert isinstance(response, StreamingHttpResponse)
+    return b''.join(response.streaming_content)
+
+
+def test_streamed_body_matches_regular_response(api_client):
+    create_parts(25)
+
+    regular = api_client.get('/api/v1/parts/?stream=false')
+    streamed = api_client.get('/api/v1/parts/?stream=true')
+
+    assert not regular.streaming
+    assert streamed['Content-Type'] == 'application/json'
+    assert streamed_body(streamed) == regular.content
+    assert streamed['Deprecation'] == 'true'
+    assert streamed['ETag']
+
+def test_sparse_fields_are_streamed(api_client):
+    create_parts(3)
+
+    body = streamed_body(api_client.get('/api/v1/parts/?stream=1&fields=id,name'))
+
+    assert [set(row) for row in json.loads(body)] == [{'id', 'name'}] * 3
+
+def test_empty_list_streams_empty_array(api_client):
+    assert streamed_body(api_client.get('/api/v1/parts/?stream=true')) == b'[]'
+
+def test_lists_above_threshold_stream_automatically(api_client, monkeypatch):
+    monkeypatch.setattr(BaseViewSet, 'stream_threshold', 5)
+    create_parts(5)
+    assert not api_client.get('/api/v1/parts/').streaming
+
+    create_parts(1)
+    response = api_client.get('/api/v1/parts/')
+    assert len(json.loads(streamed_body(response))) == 6
+    # Stronicowanie ma pierwszeństwo przed strumieniem
+    assert not api_client.get('/api/v1/parts/?page_size=2').streaming
+
+def test_streaming_keeps_memory_flat(api_client):
+    create_parts(3000)
+
+    def peak(query):
+        tracemalloc.start()
+        try:
+            response = api_client.get(f'/api/v1/parts/?{query}')
+            body = streamed_body(response) if response.streaming else response.content
+            return len(body), tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    regular_size, regular_peak = peak('stream=false')
+    streamed_size, streamed_peak = peak('stream=true')
+    assert streamed_size == regular_size
+    assert streamed_peak < regular_peak / 2
+
+def test_response_size_metric_counts_streamed_bytes(api_client):
+    metrics.clear()
+    create_parts(4)
+
+    body = streamed_body(api_client.get('/api/v1/parts/?stream=true'))
+
+    values, _ = metrics.snapshot()
+    sizes = [value for field, value in values.items() if field.startswith('["http_response_size_bytes_sum"')]
+    metrics.clear()
+    assert sizes == [len(body)]
+
+@pytest.mark.django_db(transaction=True)
+def test_asgi_requests_get_async_stream(token):
+    create_parts(3)
+
+    async def fetch():
+        response = await AsyncClient().get('/api/v1/parts/?stream=true', headers={'Authorization': f'Bearer {token}'})
+        assert response.is_async
+        return b''.join([chunk async for chunk in response.streaming_content])
+
+    assert len(json.loads(async_to_sync(fetch)())) == 3
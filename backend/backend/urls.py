@@ -42,7 +42,11 @@ from notifications import routers as notifications_routers
 
 from chat import urls as chat_urls
 
+from backend.views_collection.CacheStatsView import CacheStatsView
+from backend.views_collection.MetricsView import MetricsView
+
 urlpatterns = [
+    path('metrics', MetricsView.as_view(), name='metrics'),
     path('api/v1/admin/', admin.site.urls),
     path('api/v1/api-auth/', include("rest_framework.urls")),
     path('api/v1/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -63,4 +67,5 @@ urlpatterns = [
     path("api/v1/", include(notifications_urls)),
     path("api/v1/", include(notifications_routers)),
     path("api/v1/chat/", include(chat_urls)),
+    path("api/v1/cache-stats/", CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -0,0 +1,71 @@
+from django.db import connections, models, transaction
+from django.db.models import F, sql
+from django.utils import timezone
+
+
+class VersionedQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """UPDATE zbiorczy też podbija wersję i updated_at zmienionych wierszy"""
+        return super().update(**self._with_version(kwargs))
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """bulk_update() omija save() - wersję i updated_at podbijamy tutaj"""
+        objs = list(objs)
+        for obj in objs:
+            obj.bump_version()
+        fields = [*fields, *(field for field in self.model.VERSION_FIELDS if field not in fields)]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update_returning_ids(self, **kwargs):
+        """
+        update() jednym UPDATE ... RETURNING, zwraca id zmienionych wierszy
+        (PostgreSQL i SQLite >= 3.35). Bez save() i sygnałów, jak update().
+        """
+        self._for_write = True
+        query = self.query.chain(sql.UpdateQuery)
+        query.add_update_values(self._with_version(kwargs))
+        update_sql, params = query.get_compiler(self.db).as_sql()
+        if not update_sql:
+            return []
+        connection = connections[self.db]
+        pk_column = connection.ops.quote_name(self.model._meta.pk.column)
+        with transaction.mark_for_rollback_on_error(using=self.db):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{update_sql} RETURNING {pk_column}', params)
+                return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def _with_version(values):
+        values.setdefault('updated_at', timezone.now())
+        values.setdefault('version', F('version') + 1)
+        return values
+
+
+class VersionedModel(models.Model):
+    """
+    Wersjonowanie wierszy: updated_at i licznik version zmieniają się przy każdym
+    zapisie (save(), QuerySet.bulk_update() i QuerySet.update()). Z nich widoki
+    wyliczają ETag bez serializacji rekordów.
+    """
+    VERSION_FIELDS = ('updated_at', 'version')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def bump_version(self):
+        """Podbij wersję rekordu przed zapisem (nowy rekord zostaje przy wersji 1)"""
+        if not self._state.adding:
+            self.version += 1
+        self.updated_at = timezone.now()
+
+    def save(self, *args, **kwargs):
+        self.bump_version()
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, *self.VERSION_FIELDS}
+        super().save(*args, **kwargs)
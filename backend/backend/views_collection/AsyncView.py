@@ -0,0 +1,152 @@
+from asgiref.sync import sync_to_async
+from django.utils.decorators import classonlymethod
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.exceptions import ValidationError as SerializerValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from backend.dbRouter import DatabaseRouting
+from backend.pagination import InvalidCursorError
+from backend.streaming import stream_json_list
+from backend.views_collection.BaseView import ResponseHelpersMixin
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication with the user looked up through the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class AsyncAPIView(ResponseHelpersMixin, View):
+    """
+    Async read endpoint mounted on the URL of a DRF action. GET and HEAD are served
+    here with the same JSON, ETags and error bodies as the DRF view, without holding
+    a worker thread while waiting on Redis or the database; other methods are passed
+    to the synchronous DRF view (sync_view).
+    """
+    serializer_class = None
+    sync_view = None
+    authentication = AsyncJWTAuthentication()
+    renderer = JSONRenderer()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Jak w DRF: uwierzytelnianie JWT, bez sesji i CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+        # Ten sam dostęp do parametrów co Request z DRF - wspólne metody z ResponseHelpersMixin
+        request.query_params = request.GET
+        try:
+            await self.authenticate(request)
+            return await self.get(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.exception_response(exc)
+
+    async def authenticate(self, request):
+        result = await self.authentication.aauthenticate(request)
+        if result is None:
+            raise exceptions.NotAuthenticated()
+        request.user, request.auth = result
+        await DatabaseRouting.apin_if_user_wrote(request.user.pk)
+
+    def exception_response(self, exc):
+        """The response DRF's exception handler would return for exc."""
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            headers['WWW-Authenticate'] = self.authentication.authenticate_header(None)
+            exc.status_code = status.HTTP_401_UNAUTHORIZED
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return self.render(data, exc.status_code, headers)
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        """A rendered DRF Response - the same body, headers and .data as from the DRF view."""
+        return self.finalize(Response(data, status=status_code, headers=headers))
+
+    def finalize(self, response):
+        response.accepted_renderer = self.renderer
+        response.accepted_media_type = self.renderer.media_type
+        response.renderer_context = {'view': self, 'request': self.request}
+        return response.render()
+
+    def not_modified_response(self, etag):
+        return self.finalize(super().not_modified_response(etag))
+
+    async def paginated_response(self, request, records, serializer_class=None):
+        """BaseViewSet.paginated_response through the async ORM."""
+        serializer_class = serializer_class or self.serializer_class
+        try:
+            fields = self.sparse_fields(request, serializer_class)
+        except SerializerValidationError as e:
+            return self.render({"error": e.detail}, status.HTTP_400_BAD_REQUEST)
+
+        state = await self.alist_state(records)
+        etag = self.list_etag(request, records, state)
+        response = self.not_modified(request, etag)
+        if response is not None:
+            return response
+        if state is None:
+            state = {'count': await records.order_by().acount()}
+        response = await self._list_response(request, records, serializer_class, fields, state)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    async def _list_response(self, request, records, serializer_class, fields, state):
+        projected, serializer_kwargs = self.list_projection(records, serializer_class, fields)
+
+        if not self.wants_page(request):
+            if self.wants_stream(request, records, state):
+                response = stream_json_list(request, projected, serializer_class(**serializer_kwargs))
+            else:
+                rows = [record async for record in projected]
+                response = self.render(serializer_class(rows, many=True, **serializer_kwargs).data)
+            self.mark_full_list(request, response)
+            return response
+
+        try:
+            paginator = self.paginator(request)
+            page, next_cursor = await paginator.apaginate(projected, request.query_params.get('cursor'))
+        except InvalidCursorError as e:
+            return self.render({"error": str(e)}, status.HTTP_400_BAD_REQUEST)
+        return self.render(self.page_body(
+            paginator, page, next_cursor, state['count'], False, serializer_class, serializer_kwargs
+        ))
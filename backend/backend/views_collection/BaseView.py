@@ -1,40 +1,317 @@
+import hashlib
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from django.http import Http404
+from django.db import IntegrityError
+from django.db.models import Count, Max, QuerySet
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.http import parse_etags
 from django.forms import ValidationError
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError as SerializerValidationError
+from backend.dbRouter import DatabaseRouting
+from backend.pagination import InvalidCursorError, KeysetPaginator
+from backend.sparseFields import SparseFieldsMixin
+from backend.streaming import stream_json_list
+from backend.versioning import VersionedModel
 
-class BaseViewSet(viewsets.ViewSet):
+PAGINATION_PARAMETERS = [
+    OpenApiParameter(name="cursor", description="Cursor returned as next_cursor by the previous page", required=False, type=str),
+    OpenApiParameter(
+        name="page_size",
+        description=f"Records per page (default {KeysetPaginator.DEFAULT_PAGE_SIZE}, max {KeysetPaginator.MAX_PAGE_SIZE}); enables cursor pagination",
+        required=False,
+        type=int
+    ),
+]
+
+STREAM_PARAMETERS = [
+    OpenApiParameter(
+        name="stream",
+        description="Stream the unpaginated list as it is serialized (default: only lists above the streaming threshold)",
+        required=False,
+        type=bool
+    ),
+]
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(name="fields", description="Comma-separated fields to return (default: all non-expandable fields)", required=False, type=str),
+    OpenApiParameter(name="expand", description="Comma-separated expandable fields (nested objects) to include", required=False, type=str),
+]
+
+class ResponseHelpersMixin:
+    """
+    ETag, sparse fieldset and streaming helpers shared by BaseViewSet and the async read views.
+    """
+    # Klucz sortowania stronicowania kursorem ('-pole' = malejąco); id rozstrzyga remisy
+    cursor_ordering = 'id'
+    # Pełne listy (bez stronicowania) dłuższe niż próg są wysyłane strumieniowo
+    stream_threshold = 1000
+    # Relacje (z polem updated_at), których kolumny serializer dołącza do rekordu - ich zmiana też zmienia ETag
+    etag_related = ()
+
+    def _etag(self, request, *state):
+        """Strong ETag of a representation: the request URL (fields, page) plus the data state."""
+        digest = hashlib.sha1('|'.join(str(part) for part in (request.get_full_path(), *state)).encode())
+        return f'"{digest.hexdigest()}"'
+
+    def record_etag(self, request, record):
+        """
+        ETag of a single versioned record and its etag_related rows,
+        or None for models without versioning.
+        """
+        if not isinstance(record, VersionedModel):
+            return None
+        related = (getattr(record, name) for name in self.etag_related)
+        return self._etag(
+            request, record._meta.label, record.pk, record.version, record.updated_at.isoformat(),
+            *(instance.updated_at.isoformat() if instance is not None else '' for instance in related)
+        )
+
+    def last_update_expression(self):
+        """
+        max(updated_at) of the listed rows and of their etag_related rows.
+        Coalesce keeps an empty optional relation from nulling the result (GREATEST on SQLite).
+        """
+        if not self.etag_related:
+            return Max('updated_at')
+        return Greatest(
+            Max('updated_at'),
+            *(Coalesce(Max(f'{name}__updated_at'), Max('updated_at')) for name in self.etag_related)
+        )
+
+    def list_state(self, records):
+        """
+        max(updated_at) and the row count of a versioned queryset in one aggregate query,
+        or None for plain lists and unversioned models.
+        """
+        if not isinstance(records, QuerySet) or not issubclass(records.model, VersionedModel):
+            return None
+        return records.order_by().aggregate(last_update=self.last_update_expression(), count=Count('pk'))
+
+    async def alist_state(self, records):
+        """list_state through the async ORM."""
+        if not isinstance(records, QuerySet) or not issubclass(records.model, VersionedModel):
+            return None
+        return await records.order_by().aaggregate(last_update=self.last_update_expression(), count=Count('pk'))
+
+    def list_etag(self, request, records, state=None):
+        """
+        ETag of a list computed from its list_state, without loading or serializing
+        the rows. Covers inserts, updates and deletes of the listed rows.
+        """
+        state = state or self.list_state(records)
+        if state is None:
+            return None
+        last_update = state['last_update'].isoformat() if state['last_update'] else ''
+        return self._etag(request, records.model._meta.label, last_update, state['count'])
+
+    def not_modified(self, request, etag):
+        """A 304 response when If-None-Match matches the current ETag, otherwise None."""
+        if etag is None:
+            return None
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return None
+        # If-None-Match używa słabego porównania - prefiks W/ klienta nie ma znaczenia
+        candidates = {candidate.removeprefix('W/') for candidate in parse_etags(if_none_match)}
+        if etag in candidates or '*' in candidates:
+            return self.not_modified_response(etag)
+        return None
+
+    def not_modified_response(self, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    def conditional_response(self, request, etag, build_response):
+        """Return 304 for a fresh client copy; otherwise build the response and tag it."""
+        response = self.not_modified(request, etag)
+        if response is not None:
+            return response
+        response = build_response()
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def sparse_fields(self, request, serializer_class=None):
+        """
+        Field names selected with `?fields=` / `?expand=`, or None when the client
+        asked for the full representation (or the serializer does not support it).
+        """
+        serializer_class = serializer_class or self.serializer_class
+        if not issubclass(serializer_class, SparseFieldsMixin):
+            return None
+        fields = request.query_params.get('fields')
+        expand = request.query_params.get('expand')
+        if fields is None and expand is None:
+            return None
+        return serializer_class.select_fields(
+            [name for name in fields.split(',') if name] if fields is not None else None,
+            [name for name in (expand or '').split(',') if name]
+        )
+
+    def list_projection(self, records, serializer_class, fields):
+        """(queryset limited to the columns of the selected fields, serializer kwargs)"""
+        serializer_kwargs = {}
+        projected = records
+        if fields is not None:
+            serializer_kwargs['fields'] = fields
+        if isinstance(records, QuerySet) and issubclass(serializer_class, SparseFieldsMixin):
+            projected = serializer_class.project(
+                records, fields if fields is not None else serializer_class().fields
+            )
+        return projected, serializer_kwargs
+
+    def wants_page(self, request):
+        return 'cursor' in request.query_params or 'page_size' in request.query_params
+
+    def paginator(self, request):
+        return KeysetPaginator(
+            self.cursor_ordering,
+            KeysetPaginator.parse_page_size(request.query_params.get('page_size'))
+        )
+
+    def page_body(self, paginator, page, next_cursor, count, count_is_estimate, serializer_class, serializer_kwargs):
+        return {
+            "count": count,
+            "count_is_estimate": count_is_estimate,
+            "page_size": paginator.page_size,
+            "next_cursor": next_cursor,
+            "results": serializer_class(page, many=True, **serializer_kwargs).data,
+        }
+
+    def mark_full_list(self, request, response):
+        """Deprecation headers of an unpaginated list pointing to the cursor-paginated version."""
+        response['Deprecation'] = 'true'
+        response['Link'] = f'<{request.path}?page_size={KeysetPaginator.DEFAULT_PAGE_SIZE}>; rel="successor-version"'
+
+    def wants_stream(self, request, records, state=None):
+        """Whether to stream a full list: `?stream=` decides, otherwise the row count vs stream_threshold."""
+        stream = request.query_params.get('stream')
+        if stream is not None:
+            return stream.lower() in ('true', '1', 'yes')
+        if state is not None:
+            count = state['count']
+        else:
+            count, _ = KeysetPaginator.estimated_count(records)
+        return count > self.stream_threshold
+
+
+class BaseViewSet(ResponseHelpersMixin, viewsets.ViewSet):
     """
     Base ViewSet for common CRUD operations.
     """
     service = None
     serializer_class = None
     permission_classes = [IsAuthenticated]
+    # Komunikaty 409 dla naruszeń ograniczeń bazy: {nazwa ograniczenia: komunikat}
+    conflict_messages = {}
+    # Operacje masowe (bulk/) omijają nadpisane create/update widoku - włączane per zasób
+    bulk_actions = False
+    MAX_BULK_ITEMS = 10000
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Read-your-writes: after a recent write the user's reads go to the primary database
+        if request.user.is_authenticated:
+            DatabaseRouting.pin_if_user_wrote(request.user.pk)
+
+    def _conflict_message(self, error):
+        message = "Record conflicts with an existing record"
+        for constraint_name, constraint_message in self.conflict_messages.items():
+            if constraint_name in str(error):
+                message = constraint_message
+                break
+        return message
+
+    def _conflict_response(self, error):
+        """Return a 409 response for a database constraint violation."""
+        return Response({"error": self._conflict_message(error)}, status=status.HTTP_409_CONFLICT)
+
+    def paginated_response(self, request, records, serializer_class=None):
+        """
+        Serialize a list response, paginated with a cursor when the client sends
+        `cursor` or `page_size`. Without them the full list is returned with a
+        Deprecation header so existing clients keep working; long full lists are
+        streamed row by row instead of being built in memory.
+        Sparse fieldsets also limit the queried columns and joins. Lists of versioned
+        records carry an ETag; a matching If-None-Match returns 304 before serialization.
+        """
+        serializer_class = serializer_class or self.serializer_class
+        try:
+            fields = self.sparse_fields(request, serializer_class)
+        except SerializerValidationError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        state = self.list_state(records)
+        return self.conditional_response(
+            request,
+            self.list_etag(request, records, state),
+            lambda: self._list_response(request, records, serializer_class, fields, state)
+        )
+
+    def _list_response(self, request, records, serializer_class, fields, state=None):
+        projected, serializer_kwargs = self.list_projection(records, serializer_class, fields)
+
+        if not self.wants_page(request) or not isinstance(records, QuerySet):
+            if isinstance(records, QuerySet) and self.wants_stream(request, records, state):
+                response = stream_json_list(request, projected, serializer_class(**serializer_kwargs))
+            else:
+                response = Response(serializer_class(projected, many=True, **serializer_kwargs).data)
+            if isinstance(records, QuerySet):
+                self.mark_full_list(request, response)
+            return response
+
+        try:
+            paginator = self.paginator(request)
+            page, next_cursor = paginator.paginate(projected, request.query_params.get('cursor'))
+        except InvalidCursorError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if state is not None:
+            # Dokładna liczba jest już znana z zapytania o ETag
+            count, count_is_estimate = state['count'], False
+        else:
+            count, count_is_estimate = KeysetPaginator.estimated_count(records)
+        return Response(self.page_body(
+            paginator, page, next_cursor, count, count_is_estimate, serializer_class, serializer_kwargs
+        ))
 
     @extend_schema(
         summary="List all records",
-        description="Returns a list of all records.",
-        responses={200: "Serializer(many=True)"}
+        description="Returns a list of all records. Send `page_size` or `cursor` for cursor pagination.",
+        parameters=PAGINATION_PARAMETERS + SPARSE_FIELDS_PARAMETERS + STREAM_PARAMETERS,
+        responses={200: "Serializer(many=True)", 304: OpenApiResponse(description="Not modified (If-None-Match)")}
     )
     def list(self, request):
         """List all records."""
         records = self.service.get_all()
-        serializer = self.serializer_class(records, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(request, records)
 
     @extend_schema(
         summary="Retrieve record details",
         description="Returns details of a specific record.",
-        responses={200: "Serializer", 404: OpenApiResponse(description="Record not found")}
+        parameters=SPARSE_FIELDS_PARAMETERS,
+        responses={
+            200: "Serializer",
+            304: OpenApiResponse(description="Not modified (If-None-Match)"),
+            404: OpenApiResponse(description="Record not found")
+        }
     )
     def retrieve(self, request, pk=None):
         """Retrieve details of a specific record."""
         try:
+            fields = self.sparse_fields(request)
             record = self.service.get_by_id(pk)
-            serializer = self.serializer_class(record)
-            return Response(serializer.data)
+            serializer_kwargs = {'fields': fields} if fields is not None else {}
+            return self.conditional_response(
+                request,
+                self.record_etag(request, record),
+                lambda: Response(self.serializer_class(record, **serializer_kwargs).data)
+            )
+        except SerializerValidationError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
         except Http404:
             return Response(
                 {"error": "Record not found"},
@@ -45,7 +322,11 @@ class BaseViewSet(viewsets.ViewSet):
         summary="Create a new record",
         description="Creates a new record.",
         request="Serializer",
-        responses={201: "Serializer", 400: OpenApiResponse(description="Validation error")}
+        responses={
+            201: "Serializer",
+            400: OpenApiResponse(description="Validation error"),
+            409: OpenApiResponse(description="Conflicts with an existing record")
+        }
     )
     def create(self, request):
         """Create a new record."""
@@ -59,6 +340,8 @@ class BaseViewSet(viewsets.ViewSet):
                 record = self.service.create(serializer.validated_data)
                 output_serializer = self.serializer_class(record)
                 return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+            except IntegrityError as e:
+                return self._conflict_response(e)
             except ValidationError as e:
                 print(f"[DEBUG] ValidationError: {str(e)}")
                 return Response(
@@ -98,6 +381,8 @@ class BaseViewSet(viewsets.ViewSet):
                     {"error": "Record not found"},
                     status=status.HTTP_404_NOT_FOUND
                 )
+            except IntegrityError as e:
+                return self._conflict_response(e)
             except ValidationError as e:
                 return Response(
                     {"error": e.message_dict if hasattr(e, 'message_dict') else str(e)},
@@ -134,6 +419,8 @@ class BaseViewSet(viewsets.ViewSet):
                     {"error": "Record not found"},
                     status=status.HTTP_404_NOT_FOUND
                 )
+            except IntegrityError as e:
+                return self._conflict_response(e)
             except ValidationError as e:
                 return Response(
                     {"error": e.message_dict if hasattr(e, 'message_dict') else str(e)},
@@ -164,4 +451,200 @@ class BaseViewSet(viewsets.ViewSet):
             return Response(
                 {"error": "Record not found"},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+    def _bulk_payload(self, request):
+        """Return (items, None) for a bulk request body, or (None, error response)."""
+        if not self.bulk_actions:
+            return None, Response(
+                {"error": "Bulk operations are not supported for this resource"},
+                status=status.HTTP_405_METHOD_NOT_ALLOWED
+            )
+        items = request.data
+        if isinstance(items, dict) and request.method == 'DELETE':
+            items = items.get('ids')
+        if not isinstance(items, list) or not items:
+            return None, Response({"error": "Expected a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.MAX_BULK_ITEMS:
+            return None, Response(
+                {"error": f"At most {self.MAX_BULK_ITEMS} items per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+
+    def _bulk_error(self, index, error, item_id=None):
+        """Per-item error entry using the same envelopes as the single-record endpoints."""
+        if isinstance(error, IntegrityError):
+            code, message = status.HTTP_409_CONFLICT, self._conflict_message(error)
+        elif isinstance(error, Http404):
+            code, message = status.HTTP_404_NOT_FOUND, "Record not found"
+        elif hasattr(error, 'message_dict'):
+            code, message = status.HTTP_400_BAD_REQUEST, error.message_dict
+        else:
+            code, message = status.HTTP_400_BAD_REQUEST, error if isinstance(error, (dict, list)) else str(error)
+        entry = {"index": index, "status": code, "error": message}
+        if item_id is not None:
+            entry["id"] = item_id
+        return entry
+
+    def _bulk_response(self, results, success_status):
+        """200/201 when every item succeeded, 207 when some did, 400 when none did."""
+        failed = sum(1 for result in results if result["status"] >= 400)
+        if not failed:
+            response_status = success_status
+        elif failed < len(results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {"succeeded": len(results) - failed, "failed": failed, "results": results},
+            status=response_status
+        )
+
+    def _validate_bulk_item(self, index, item, instance=None):
+        """Run the single-record serializer validation; return (validated data, error entry)."""
+        if instance is None:
+            serializer = self.serializer_class(data=item, context={'request': self.request})
+        else:
+            serializer = self.serializer_class(instance, data=item, partial=True, context={'request': self.request})
+        if serializer.is_valid():
+            return serializer.validated_data, None
+        return None, self._bulk_error(index, serializer.errors, getattr(instance, 'pk', None))
+
+    def _parse_bulk_id(self, value):
+        model = self.service.repository.model
+        try:
+            return model._meta.pk.to_python(value)
+        except ValidationError:
+            return None
+
+    @extend_schema(
+        summary="Create records in bulk",
+        description=(
+            "Validates each item like the single-record create and writes valid items in chunked "
+            "transactions. Returns a per-item result (status, id or error); 207 when only some items succeeded."
+        ),
+        request="Serializer(many=True)",
+        responses={
+            201: OpenApiResponse(description="All items created"),
+            207: OpenApiResponse(description="Some items failed"),
+            400: OpenApiResponse(description="No item could be created"),
+            405: OpenApiResponse(description="Bulk operations not enabled for this resource")
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create many records in one request."""
+        items, error_response = self._bulk_payload(request)
+        if error_response:
+            return error_response
+
+        results = [None] * len(items)
+        valid_indexes, valid_data = [], []
+        for index, item in enumerate(items):
+            data, error = self._validate_bulk_item(index, item)
+            if error:
+                results[index] = error
+            else:
+                valid_indexes.append(index)
+                valid_data.append(data)
+
+        try:
+            written = self.service.bulk_create(valid_data)
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        for index, (record, error) in zip(valid_indexes, written):
+            if error is None:
+                results[index] = {"index": index, "status": status.HTTP_201_CREATED, "id": record.pk}
+            else:
+                results[index] = self._bulk_error(index, error)
+        return self._bulk_response(results, status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary="Update records in bulk",
+        description="Partially updates each item (which must contain `id`) like PATCH on a single record, in chunked transactions.",
+        request="Serializer(many=True)",
+        responses={
+            200: OpenApiResponse(description="All items updated"),
+            207: OpenApiResponse(description="Some items failed"),
+            400: OpenApiResponse(description="No item could be updated")
+        }
+    )
+    @bulk_create.mapping.patch
+    def bulk_update(self, request):
+        """Partially update many records in one request."""
+        items, error_response = self._bulk_payload(request)
+        if error_response:
+            return error_response
+
+        results = [None] * len(items)
+        item_ids = []
+        for index, item in enumerate(items):
+            item_id = self._parse_bulk_id(item.get('id')) if isinstance(item, dict) else None
+            if item_id is None:
+                results[index] = self._bulk_error(index, {"id": ["This field is required."]})
+            item_ids.append(item_id)
+
+        try:
+            records = self.service.get_many([item_id for item_id in item_ids if item_id is not None])
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        valid_indexes, changes = [], []
+        for index, (item, item_id) in enumerate(zip(items, item_ids)):
+            if results[index] is not None:
+                continue
+            record = records.get(item_id)
+            if record is None:
+                results[index] = self._bulk_error(index, Http404(), item_id)
+                continue
+            data, error = self._validate_bulk_item(index, {k: v for k, v in item.items() if k != 'id'}, record)
+            if error:
+                results[index] = error
+            else:
+                valid_indexes.append(index)
+                changes.append((record, data))
+
+        try:
+            written = self.service.bulk_update(changes)
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        for index, (record, error) in zip(valid_indexes, written):
+            if error is None:
+                results[index] = {"index": index, "status": status.HTTP_200_OK, "id": record.pk}
+            else:
+                results[index] = self._bulk_error(index, error, item_ids[index])
+        return self._bulk_response(results, status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Delete records in bulk",
+        description="Deletes the records with the given IDs (a list, or {\"ids\": [...]}) in chunked transactions.",
+        responses={
+            200: OpenApiResponse(description="All records deleted"),
+            207: OpenApiResponse(description="Some records were not found or could not be deleted")
+        }
+    )
+    @bulk_create.mapping.delete
+    def bulk_delete(self, request):
+        """Delete many records in one request."""
+        items, error_response = self._bulk_payload(request)
+        if error_response:
+            return error_response
+
+        item_ids = [self._parse_bulk_id(item) for item in items]
+        try:
+            deleted = self.service.bulk_delete([item_id for item_id in item_ids if item_id is not None])
+        except RuntimeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = []
+        for index, item_id in enumerate(item_ids):
+            if item_id is None:
+                results.append(self._bulk_error(index, "Invalid id"))
+            elif item_id not in deleted:
+                results.append(self._bulk_error(index, Http404(), item_id))
+            elif deleted[item_id] is not None:
+                results.append(self._bulk_error(index, deleted[item_id], item_id))
+            else:
+                results.append({"index": index, "status": status.HTTP_204_NO_CONTENT, "id": item_id})
+        return self._bulk_response(results, status.HTTP_200_OK)
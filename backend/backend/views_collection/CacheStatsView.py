@@ -0,0 +1,25 @@
+from drf_spectacular.utils import extend_schema, OpenApiResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from backend.objectCache import ObjectCache
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Object cache statistics",
+        description="Local hits, Redis hits, misses, LRU evictions and invalidations of the "
+                    "get_by_id object cache in this worker process, per model.",
+        responses={
+            200: OpenApiResponse(description="Counts per cached model"),
+            403: OpenApiResponse(description="Admin only")
+        }
+    )
+    def get(self, request):
+        """Return object cache metrics of this process"""
+        if request.user.role not in ('admin', 'root'):
+            return Response({"error": "Only administrators can view metrics"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(ObjectCache.all_stats())
@@ -0,0 +1,25 @@
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views import View
+from backend.metrics import metrics
+
+
+class MetricsView(View):
+    """
+    Internal Prometheus scrape endpoint. Not part of the public API: allowed from
+    METRICS_ALLOWED_IPS or with `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def _allowed(self, request):
+        if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+            return True
+        token = settings.METRICS_TOKEN
+        authorization = request.headers.get('Authorization', '')
+        return bool(token) and hmac.compare_digest(authorization, f'Bearer {token}')
+
+    def get(self, request):
+        if not self._allowed(request):
+            return HttpResponseForbidden("Metrics are internal")
+        return HttpResponse(metrics.render(), content_type=self.content_type)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Read Endpoint Load Benchmark
+Measures throughput and latency percentiles of the hot read endpoints under
+concurrent load. Run it against the ASGI server (daphne backend.asgi:application)
+once with ASYNC_READ_VIEWS=false and once with ASYNC_READ_VIEWS=true.
+"""
+import argparse
+import http.client
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import urlencode, urlsplit
+
+def endpoints(args):
+    """(name, path) of the benchmarked endpoints"""
+    return [
+        ('check_availability', '/api/v1/availability/check_availability/?' + urlencode({
+            'workshop_id': args.workshop_id, 'date': args.date
+        })),
+        ('my_appointments', '/api/v1/appointments/my-appointments/'),
+        ('notifications', '/api/v1/notifications/?page_size=20'),
+        ('nearby', '/api/v1/workshops/nearby/?' + urlencode({
+            'latitude': args.latitude, 'longitude': args.longitude, 'radius': 25, 'limit': 20
+        })),
+        ('search', '/api/v1/workshops/search/?' + urlencode({'query': args.query, 'limit': 20})),
+    ]
+
+def run_endpoint(args, path):
+    """Send args.requests GET requests with args.concurrency keep-alive connections"""
+    url = urlsplit(args.base_url)
+    headers = {'Authorization': f'Bearer {args.token}'}
+    local = threading.local()
+    errors = []
+
+    def request(_):
+        if not hasattr(local, 'connection'):
+            local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+        started = time.perf_counter()
+        try:
+            local.connection.request('GET', path, headers=headers)
+            response = local.connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            local.connection.close()
+            del local.connection
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(request, range(args.concurrency)))  # rozgrzewka połączeń i cache
+        errors.clear()
+        started = time.perf_counter()
+        latencies = list(executor.map(request, range(args.requests)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed, errors
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_benchmark():
+    """Run the benchmark and print a report"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', required=True, help='JWT access token of the benchmark user')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per endpoint')
+    parser.add_argument('--workshop-id', type=int, default=1)
+    parser.add_argument('--date', default=date.today().isoformat())
+    parser.add_argument('--latitude', type=float, default=52.2297)
+    parser.add_argument('--longitude', type=float, default=21.0122)
+    parser.add_argument('--query', default='auto')
+    parser.add_argument('--only', nargs='*', help='names of the endpoints to run')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("GarageManager Read Endpoint Benchmark")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Target: {args.base_url}, concurrency {args.concurrency}, {args.requests} requests per endpoint")
+    print("=" * 80)
+    print(f"{'endpoint':<20}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'errors':>8}")
+    print("-" * 80)
+
+    failed = False
+    for name, path in endpoints(args):
+        if args.only and name not in args.only:
+            continue
+        latencies, elapsed, errors = run_endpoint(args, path)
+        failed = failed or bool(errors)
+        print(
+            f"{name:<20}{len(latencies) / elapsed:>10.1f}"
+            f"{percentile(latencies, 0.50) * 1000:>10.1f}{percentile(latencies, 0.95) * 1000:>10.1f}"
+            f"{percentile(latencies, 0.99) * 1000:>10.1f}{statistics.mean(latencies) * 1000:>10.1f}{len(errors):>8}"
+        )
+
+    print("-" * 80)
+    if failed:
+        print("✗ Some requests failed - the numbers above include error responses")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run_benchmark())
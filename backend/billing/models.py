@@ -1,7 +1,8 @@
 from django.db import models
 from users.models import User
+from backend.versioning import VersionedModel
 
-class Invoice(models.Model):
+class Invoice(VersionedModel):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('paid', 'Paid'),
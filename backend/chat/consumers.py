@@ -1,6 +1,7 @@
 import json
 import logging
 from channels.generic.websocket import AsyncWebsocketConsumer
+from backend.metrics import ConsumerMetricsMixin
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from .models import Conversation, Message, ConversationParticipant
@@ -9,7 +10,7 @@ from .serializers import MessageSerializer, ConversationSerializer
 
 logger = logging.getLogger(__name__)
 
-class ChatConsumer(AsyncWebsocketConsumer):
+class ChatConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     """WebSocket consumer dla czatu real-time"""
 
     async def connect(self):
@@ -278,7 +279,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             logger.error(f"Failed to send notification: {e}")
 
 
-class ChatNotificationConsumer(AsyncWebsocketConsumer):
+class ChatNotificationConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     """Consumer dla powiadomień czatu (globalne dla użytkownika)"""
 
     async def connect(self):
@@ -3,8 +3,9 @@ import uuid
 from users.models import User
 from appointments.models import Appointment
 from workshops.models import Workshop
+from backend.versioning import VersionedModel
 
-class Conversation(models.Model):
+class Conversation(VersionedModel):
     """Konwersacja między klientem a mechanikiem"""
 
     # Uczestnicy
@@ -89,6 +90,10 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Liczniki nieprzeczytanych i oznaczanie jako przeczytane (tylko nieprzeczytane wiadomości)
+            models.Index(fields=['conversation', 'sender'], condition=models.Q(is_read=False), name='message_unread_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sender.username}: {self.content[:50]}..."
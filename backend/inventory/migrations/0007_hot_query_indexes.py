@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-18 04:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_row_versioning'),
+        ('workshops', '0008_row_versioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='partinventory',
+            index=models.Index(fields=['workshop', 'quantity'], include=('part',), name='partinventory_workshop_qty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stockentry',
+            index=models.Index(fields=['part', 'timestamp'], name='stockentry_part_time_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from users.models import User
 from appointments.models import RepairJob
+from backend.versioning import VersionedModel
 
 class Supplier(models.Model):
     """Dostawcy części samochodowych"""
@@ -37,7 +38,7 @@ class Supplier(models.Model):
     def __str__(self):
         return self.name
 
-class Part(models.Model):
+class Part(VersionedModel):
     CATEGORY_CHOICES = [
         ('engine', 'Engine'),
         ('electrical', 'Electrical'),
@@ -78,6 +79,12 @@ class StockEntry(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     notes = models.TextField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Historia ruchów magazynowych części w czasie
+            models.Index(fields=['part', 'timestamp'], name='stockentry_part_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.part.name} - {self.change_type}"
 
@@ -97,7 +104,7 @@ class RepairJobPart(models.Model):
     def __str__(self):
         return f"{self.part.name} in repair {self.repair_job}"
 
-class PartInventory(models.Model):
+class PartInventory(VersionedModel):
     part = models.ForeignKey('Part', on_delete=models.CASCADE, related_name='inventories')
     workshop = models.ForeignKey('workshops.Workshop', on_delete=models.CASCADE, related_name='part_inventories')
     quantity = models.PositiveIntegerField(default=0)
@@ -106,6 +113,10 @@ class PartInventory(models.Model):
     class Meta:
         unique_together = ('part', 'workshop')
         verbose_name_plural = "Part inventories"
+        indexes = [
+            # Części i stany warsztatu; part_id w indeksie (PostgreSQL INCLUDE) - bez odczytu tabeli
+            models.Index(fields=['workshop', 'quantity'], include=['part'], name='partinventory_workshop_qty_idx'),
+        ]
 
     def __str__(self):
         return f"{self.part.name} at {self.workshop.name}: {self.quantity} units"
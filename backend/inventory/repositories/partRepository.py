@@ -1,5 +1,21 @@
-from ..models import Part
+from ..models import Part, PartInventory
 from backend.repositories.baseRepository import BaseRepository
 
 class PartRepository(BaseRepository):
-    model = Part
\ No newline at end of file
+    model = Part
+    # PartSerializer.supplier_name
+    eager_loading = {
+        'default': {'select_related': ('supplier',)},
+    }
+    # Import masowy tworzy też stan magazynowy warsztatu, jak PartViewSet.create
+    related_fields = ('workshop_id',)
+
+    @classmethod
+    def write_related(cls, written):
+        """
+        Creates the PartInventory row of each bulk-created part in its workshop.
+        """
+        PartInventory.objects.bulk_create([
+            PartInventory(part=part, workshop_id=related['workshop_id'], quantity=part.stock_quantity)
+            for part, related in written if related.get('workshop_id')
+        ])
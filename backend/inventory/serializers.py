@@ -1,24 +1,25 @@
 from rest_framework import serializers
+from backend.sparseFields import SparseFieldsMixin
 from .models import Part, RepairJobPart, StockEntry, Supplier
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Supplier
         fields = '__all__'
 
-class PartSerializer(serializers.ModelSerializer):
+class PartSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     supplier_name = serializers.CharField(source='supplier.name', read_only=True)
     
     class Meta:
         model = Part
         fields = '__all__'
 
-class RepairJobPartSerializer(serializers.ModelSerializer):
+class RepairJobPartSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = RepairJobPart
         fields = '__all__'
 
-class StockEntrySerializer(serializers.ModelSerializer):
+class StockEntrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = StockEntry
         fields = '__all__'
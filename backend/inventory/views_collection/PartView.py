@@ -6,11 +6,15 @@ from ..services.partService import PartService
 from ..serializers import PartSerializer
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from ..models import PartInventory
+from workshops.models import Workshop
+from django.core.exceptions import ValidationError
 from django.db import transaction
 
 class PartViewSet(BaseViewSet):
     service = PartService
     serializer_class = PartSerializer
+    # Import katalogów części; każda pozycja wymaga workshop_id jak create (PartInventory)
+    bulk_actions = True
 
     @extend_schema(
         description="Create a new part in inventory",
@@ -78,6 +82,39 @@ class PartViewSet(BaseViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _validate_bulk_item(self, index, item, instance=None):
+        """Bulk create requires workshop_id like create and passes it on to the PartInventory row."""
+        if instance is not None or not isinstance(item, dict):
+            return super()._validate_bulk_item(index, item, instance)
+        workshop_id = self._parse_workshop_id(item.get('workshop_id'))
+        if workshop_id is None:
+            return None, self._bulk_error(index, {"workshop_id": ["This field is required."]})
+        if workshop_id not in self._bulk_workshop_ids():
+            return None, self._bulk_error(index, {"workshop_id": [f"Workshop {workshop_id} does not exist."]})
+        data, error = super()._validate_bulk_item(index, {k: v for k, v in item.items() if k != 'workshop_id'})
+        if error:
+            return None, error
+        return {**data, 'workshop_id': workshop_id}, None
+
+    @staticmethod
+    def _parse_workshop_id(value):
+        try:
+            return Workshop._meta.pk.to_python(value) if value not in (None, '') else None
+        except ValidationError:
+            return None
+
+    def _bulk_workshop_ids(self):
+        """IDs of the existing workshops referenced by the bulk request, in one query."""
+        if not hasattr(self, '_workshop_ids'):
+            requested = {
+                self._parse_workshop_id(item.get('workshop_id'))
+                for item in self.request.data if isinstance(item, dict)
+            }
+            self._workshop_ids = set(
+                Workshop.objects.filter(id__in=requested - {None}).values_list('id', flat=True)
+            )
+        return self._workshop_ids
+
     @extend_schema(
         description="List all parts in inventory",
         responses={200: PartSerializer(many=True)},
@@ -100,7 +137,7 @@ class PartViewSet(BaseViewSet):
         if hasattr(request.user, 'workshop'):
             user_workshop_id = request.user.workshop.id
 
-        queryset = self.service.repository.model.objects.all()
+        queryset = self.service.repository.queryset()
 
         if workshop_id:
 
@@ -115,8 +152,7 @@ class PartViewSet(BaseViewSet):
             ).values_list('part_id', flat=True)
             queryset = queryset.filter(id__in=part_ids)
 
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(request, queryset)
 
     @extend_schema(
         description="Retrieve a specific part by ID",
@@ -48,6 +48,7 @@ class SupplierViewSet(BaseViewSet):
     service = SupplierService
     serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated]
+    bulk_actions = True
 
     @extend_schema(
         summary="Get supplier parts",
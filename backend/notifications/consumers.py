@@ -1,12 +1,13 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
+from backend.metrics import ConsumerMetricsMixin
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from .models import Notification
 
 User = get_user_model()
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+class NotificationConsumer(ConsumerMetricsMixin, AsyncWebsocketConsumer):
     async def connect(self):
         # Pobierz user_id z URL
         self.user_id = self.scope['url_route']['kwargs']['user_id']
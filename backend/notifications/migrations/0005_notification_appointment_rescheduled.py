@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_extend_notification_system'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('appointment_reminder', 'Przypomnienie o wizycie'), ('repair_status', 'Status naprawy'), ('invoice', 'Faktura'), ('promotional', 'Promocyjna'), ('system', 'Systemowa'), ('service_reminder', 'Przypomnienie o serwisie'), ('chat_message', 'Nowa wiadomość'), ('ai_diagnosis_ready', 'Diagnoza AI gotowa'), ('parts_low_stock', 'Niski stan magazynowy'), ('supplier_delivery', 'Dostawa od dostawcy'), ('payment_reminder', 'Przypomnienie o płatności'), ('service_feedback_request', 'Prośba o opinię'), ('appointment_rescheduled', 'Zmiana terminu wizyty')], max_length=50),
+        ),
+    ]
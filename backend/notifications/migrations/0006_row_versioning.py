@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-18 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_notification_appointment_rescheduled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
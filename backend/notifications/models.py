@@ -1,9 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from backend.versioning import VersionedModel
 
 User = get_user_model()
 
-class Notification(models.Model):
+class Notification(VersionedModel):
     CHANNEL_CHOICES = [
         ('email', 'E-mail'),
         ('sms', 'SMS'),
@@ -24,6 +25,7 @@ class Notification(models.Model):
         ('supplier_delivery', 'Dostawa od dostawcy'),
         ('payment_reminder', 'Przypomnienie o płatności'),
         ('service_feedback_request', 'Prośba o opinię'),
+        ('appointment_rescheduled', 'Zmiana terminu wizyty'),
     ]
 
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -49,6 +51,16 @@ class Notification(models.Model):
     processed = models.BooleanField(default=False)
     queue_message_id = models.CharField(max_length=100, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Nieprzeczytane powiadomienia użytkownika od najnowszych (lista, licznik, WebSocket)
+            models.Index(fields=['user', 'created_at'], condition=models.Q(read_status=False),
+                         name='notification_user_unread_idx'),
+            # Lista powiadomień użytkownika bez filtra read_status (najczęściej odpytywana) -
+            # kolejność stronicowania kursorem (-created_at, -id) prosto z indeksu
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Powiadomienie dla {self.user.username} - {self.notification_type}"
     
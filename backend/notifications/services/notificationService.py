@@ -1,4 +1,5 @@
 from ..repositories.notificationRepository import NotificationRepository
+from ..models import Notification
 from backend.services.baseService import BaseService
 from .queue_service import notification_queue
 import logging
@@ -62,6 +63,26 @@ class NotificationService(BaseService):
             logger.error(f"Error creating notification: {str(e)}")
             raise
 
+    @classmethod
+    def send_bulk_notifications(cls, notifications_data, channel='email'):
+        """
+        Tworzy wiele powiadomień jednym zapytaniem (bez kolejki)
+
+        Args:
+            notifications_data: Lista słowników z polami powiadomienia
+            channel: Domyślny kanał dostarczenia
+
+        Returns:
+            Lista utworzonych powiadomień
+        """
+        notifications = [
+            Notification(**{'channel': channel, **data})
+            for data in notifications_data
+        ]
+        if not notifications:
+            return []
+        return Notification.objects.bulk_create(notifications)
+
     @classmethod
     def send_service_reminder(cls, vehicle, service_date, description):
         """
@@ -1,6 +1,18 @@
+from django.conf import settings
 from django.urls import path, include
 from .routers import router
+from .views_collection.AsyncNotificationView import NotificationListAsyncView
+from .views_collection.NotificationView import NotificationViewSet
 
-urlpatterns = [
+# Widok asynchroniczny przed trasami routera, z tą samą nazwą trasy co akcja DRF
+async_read_urlpatterns = [
+    path(
+        'notifications/',
+        NotificationListAsyncView.as_view(sync_view=NotificationViewSet.as_view({'get': 'list', 'post': 'create'})),
+        name='notification-list'
+    ),
+] if settings.ASYNC_READ_VIEWS else []
+
+urlpatterns = async_read_urlpatterns + [
     path("", include(router.urls)),
-]
\ No newline at end of file
+]
@@ -0,0 +1,12 @@
+from backend.views_collection.AsyncView import AsyncAPIView
+from ..serializers import NotificationSerializer
+from .NotificationView import NotificationViewSet
+
+
+class NotificationListAsyncView(AsyncAPIView):
+    """Async GET /notifications/ (NotificationViewSet.list); POST creates through the DRF view."""
+    serializer_class = NotificationSerializer
+    cursor_ordering = NotificationViewSet.cursor_ordering
+
+    async def get(self, request):
+        return await self.paginated_response(request, NotificationViewSet.user_notifications(request))
@@ -9,16 +9,23 @@ from django.db.models import Q
 class NotificationViewSet(BaseViewSet):
     service = NotificationService
     serializer_class = NotificationSerializer
+    cursor_ordering = '-created_at'
 
     def list(self, request):
         """List notifications for the authenticated user with optional filtering."""
+        # Serialize and return the data (cursor-paginated on request)
+        return self.paginated_response(request, self.user_notifications(request))
+
+    @classmethod
+    def user_notifications(cls, request):
+        """Notifications of the authenticated user filtered by the list query parameters."""
         # Get query parameters for filtering
         channel = request.query_params.get('channel', None)
         read_status = request.query_params.get('read_status', None)
         notification_type = request.query_params.get('notification_type', None)
 
         # Start with notifications for the current user
-        queryset = self.service.repository.model.objects.filter(user=request.user)
+        queryset = cls.service.repository.model.objects.filter(user=request.user)
 
         # Apply filters based on query parameters
         if channel:
@@ -33,11 +40,7 @@ class NotificationViewSet(BaseViewSet):
             queryset = queryset.filter(notification_type=notification_type)
 
         # Order by creation date (newest first)
-        queryset = queryset.order_by('-created_at')
-
-        # Serialize and return the data
-        serializer = self.serializer_class(queryset, many=True)
-        return Response(serializer.data)
+        return queryset.order_by('-created_at')
 
     @action(detail=True, methods=['post'])
     def mark_as_read(self, request, pk=None):
@@ -46,6 +46,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     date_joined = models.DateTimeField(auto_now_add=True)
     last_login = models.DateTimeField(null=True, blank=True)
     login_attempts = models.IntegerField(default=0)
+    # Widoki wizyt dołączają dane klienta i mechanika - ich zmiana unieważnia ETag wizyt
+    updated_at = models.DateTimeField(auto_now=True)
 
     USERNAME_FIELD = 'email'
     objects = CustomUserManager()
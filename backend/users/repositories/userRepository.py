@@ -3,34 +3,40 @@ from ..models import User
 
 class UserRepository(BaseRepository):
     model = User
+    # UserSerializer.get_specializations czyta profil
+    eager_loading = {
+        'default': {'select_related': ('profile',)},
+    }
+    # Krótszy TTL - konta zmieniają się częściej niż warsztaty i usługi
+    cache_ttl = 60
 
     @classmethod
     def get_users_by_status(cls, status):
         """
         Pobiera użytkowników według statusu (np. 'active', 'blocked').
         """
-        return cls.model.objects.filter(status=status)
+        return cls.queryset().filter(status=status)
 
     @classmethod
     def get_users_by_role(cls, role):
         """
         Pobiera użytkowników według roli (np. 'admin', 'mechanic', 'client').
         """
-        return cls.model.objects.filter(role=role)
+        return cls.queryset().filter(role=role)
 
     @classmethod
     def search_users(cls, query):
         """
         Wyszukuje użytkowników na podstawie nazwy użytkownika lub emaila.
         """
-        return cls.model.objects.filter(username__icontains=query) | cls.model.objects.filter(email__icontains=query)
+        return cls.queryset().filter(username__icontains=query) | cls.queryset().filter(email__icontains=query)
 
     @classmethod
     def get_by_email(cls, email):
         """
         Pobiera użytkownika na podstawie adresu email.
         """
-        return cls.model.objects.filter(email=email).first()
+        return cls.queryset().filter(email=email).first()
 
     @classmethod
     def create_user(cls, username, password, email):
@@ -44,11 +50,11 @@ class UserRepository(BaseRepository):
         """
         Pobiera wszystkich użytkowników z rolą 'client'.
         """
-        return cls.model.objects.filter(role='client')
+        return cls.queryset().filter(role='client')
 
     @classmethod
     def get_mechanics(cls):
         """
         Pobiera wszystkich użytkowników z rolą 'mechanic'.
         """
-        return cls.model.objects.filter(role='mechanic')
\ No newline at end of file
+        return cls.queryset().filter(role='mechanic')
\ No newline at end of file
@@ -1,19 +1,25 @@
 from rest_framework import serializers
+from backend.sparseFields import SparseFieldsMixin
 from .models import User, Profile, LoginHistory, LoyaltyPoints
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = ['id','user','address', 'phone', 'preferred_contact_method', 'specializations']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
     specializations = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'role', 'roles', 'first_name', 'last_name', 'status', 'is_active', 'specializations']
+        expandable_fields = ('specializations',)
+        field_sources = {
+            'roles': ('role',),
+            'specializations': ('profile__specializations',),
+        }
 
     def get_roles(self, obj):
         """Return role as array for frontend compatibility"""
@@ -40,12 +46,12 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("User with this email already exists.")
         return value
 
-class LoginHistorySerializer(serializers.ModelSerializer):
+class LoginHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LoginHistory
         fields = ['id', 'user', 'login_time', 'device_info', 'status']
 
-class LoyaltyPointsSerializer(serializers.ModelSerializer):
+class LoyaltyPointsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LoyaltyPoints
         fields = ['id', 'user', 'total_points', 'points_earned_this_year', 'membership_level']
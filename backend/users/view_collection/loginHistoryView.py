@@ -3,7 +3,6 @@ from rest_framework.permissions import IsAdminUser
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from ..services.loginHistoryService import LoginHistoryService
 from ..serializers import LoginHistorySerializer
-from rest_framework.response import Response
 
 @extend_schema_view(
     list=extend_schema(
@@ -16,11 +15,11 @@ class LoginHistoryViewSet(BaseViewSet):
     service = LoginHistoryService
     serializer_class = LoginHistorySerializer
     permission_classes = [IsAdminUser]
+    cursor_ordering = '-login_time'
 
     def list(self, request, *args, **kwargs):
         """
         Zwraca historię logowań użytkowników, posortowaną od najnowszych.
         """
         records = self.service.get_all_ordered()
-        serializer = self.serializer_class(records, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return self.paginated_response(request, records)
\ No newline at end of file
@@ -1,8 +1,9 @@
 from django.db import models
 from users.models import User
 from workshops.models import Service, Workshop
+from backend.versioning import VersionedModel
 
-class Vehicle(models.Model):
+class Vehicle(VersionedModel):
     BRAND_CHOICES = [
         ('toyota', 'Toyota'),
         ('ford', 'Ford'),
@@ -7,6 +7,10 @@ class VehicleServiceRepository(BaseRepository):
     Handles data access layer operations for vehicle services.
     """
     model = VehicleService
+    # VehicleServiceSerializer czyta pojazd, usługę i warsztat
+    eager_loading = {
+        'default': {'select_related': ('vehicle', 'service', 'workshop')},
+    }
 
     @classmethod
     def get_by_filter(cls, **kwargs):
@@ -14,7 +18,7 @@ class VehicleServiceRepository(BaseRepository):
         Get vehicle services by filter criteria.
         """
         try:
-            return cls.model.objects.filter(**kwargs)
+            return cls.queryset().filter(**kwargs)
         except Exception as e:
             raise RuntimeError(f"Error retrieving {cls.model.__name__} by filter: {str(e)}")
 
@@ -24,7 +28,7 @@ class VehicleServiceRepository(BaseRepository):
         Get all services for a specific vehicle.
         """
         try:
-            return cls.model.objects.filter(vehicle_id=vehicle_id)
+            return cls.queryset().filter(vehicle_id=vehicle_id)
         except Exception as e:
             raise RuntimeError(f"Error retrieving services for vehicle {vehicle_id}: {str(e)}")
 
@@ -34,7 +38,7 @@ class VehicleServiceRepository(BaseRepository):
         Get all services for a client's vehicles.
         """
         try:
-            return cls.model.objects.filter(vehicle__owner_id=client_id)
+            return cls.queryset().filter(vehicle__owner_id=client_id)
         except Exception as e:
             raise RuntimeError(f"Error retrieving services for client {client_id}: {str(e)}")
 
@@ -44,6 +48,6 @@ class VehicleServiceRepository(BaseRepository):
         Get all services for vehicles associated with a specific workshop.
         """
         try:
-            return cls.model.objects.filter(workshop_id=workshop_id)
+            return cls.queryset().filter(workshop_id=workshop_id)
         except Exception as e:
             raise RuntimeError(f"Error retrieving services for workshop {workshop_id}: {str(e)}")
\ No newline at end of file
@@ -4,13 +4,20 @@ from datetime import date
 
 class VehicleRepository(BaseRepository):
     model = Vehicle
+    eager_loading = {
+        'default': {'select_related': ('owner',)},
+        'in_service': {
+            'select_related': ('owner',),
+            'prefetch_related': ('appointments__workshop', 'appointments__assigned_mechanic'),
+        },
+    }
 
     @classmethod
     def get_vehicles_by_client(cls, client_id):
         """
         Pobiera wszystkie pojazdy powiązane z klientem.
         """
-        return cls.model.objects.filter(owner_id=client_id)
+        return cls.queryset().filter(owner_id=client_id)
 
     @classmethod
     def get_vehicles_by_owner(cls, owner_id):
@@ -25,14 +32,14 @@ class VehicleRepository(BaseRepository):
         """
         Pobiera pojazdy wymagające przeglądu technicznego.
         """
-        return cls.model.objects.filter(last_maintenance_date__lt=date.today())
+        return cls.queryset().filter(last_maintenance_date__lt=date.today())
 
     @classmethod
     def get_vehicles_by_brand(cls, brand):
         """
         Pobiera wszystkie pojazdy określonej marki.
         """
-        return cls.model.objects.filter(brand=brand)
+        return cls.queryset().filter(brand=brand)
 
     @staticmethod
     def get_vehicles_by_workshop(workshop_id):
@@ -42,7 +49,7 @@ class VehicleRepository(BaseRepository):
         from ..models import Vehicle
         
         # Pobierz pojazdy przez appointments w warsztacie
-        return Vehicle.objects.filter(
+        return VehicleRepository.queryset().filter(
             appointments__workshop_id=workshop_id
         ).distinct()
 
@@ -54,12 +61,7 @@ class VehicleRepository(BaseRepository):
         """
         from appointments.models import Appointment
         
-        return cls.model.objects.filter(
+        return cls.queryset('in_service').filter(
             owner_id=owner_id,
             appointments__status__in=['confirmed', 'in_progress']
-        ).select_related(
-            'owner'
-        ).prefetch_related(
-            'appointments__workshop',
-            'appointments__assigned_mechanic'
         ).distinct()
\ No newline at end of file
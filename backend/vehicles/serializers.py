@@ -1,9 +1,10 @@
 from rest_framework import serializers
+from backend.sparseFields import SparseFieldsMixin
 from .models import Vehicle, Diagnostics, MaintenanceSchedule, VehicleService
 from users.models import User
 from workshops.models import Workshop, Service
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner_name = serializers.SerializerMethodField()
     workshop_name = serializers.SerializerMethodField()
 
@@ -15,6 +16,14 @@ class VehicleSerializer(serializers.ModelSerializer):
             'owner_id', 'workshop_id', 'status', 'last_service_date',
             'next_service_due', 'image_url', 'owner_name', 'workshop_name'
         ]
+        # workshop_id/workshop_name czytają ostatnią wizytę pojazdu (osobne zapytanie)
+        expandable_fields = ('workshop_id', 'workshop_name')
+        field_sources = {
+            'owner_id': ('owner__id',),
+            'owner_name': ('owner__first_name', 'owner__last_name'),
+            'workshop_id': (),
+            'workshop_name': (),
+        }
 
     def get_owner_name(self, obj):
         return obj.owner_name
@@ -45,17 +54,17 @@ class VehicleSerializer(serializers.ModelSerializer):
 
         return super().create(validated_data)
 
-class DiagnosticsSerializer(serializers.ModelSerializer):
+class DiagnosticsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Diagnostics
         fields = '__all__'
 
-class MaintenanceScheduleSerializer(serializers.ModelSerializer):
+class MaintenanceScheduleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MaintenanceSchedule
         fields = '__all__'
 
-class VehicleServiceSerializer(serializers.ModelSerializer):
+class VehicleServiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for VehicleService model.
     Includes detailed information about the vehicle and service.
@@ -72,6 +81,15 @@ class VehicleServiceSerializer(serializers.ModelSerializer):
             'mechanic_notes', 'vehicle_details', 'service_name',
             'workshop_name'
         ]
+        expandable_fields = ('vehicle_details',)
+        field_sources = {
+            'vehicle_details': (
+                'vehicle__id', 'vehicle__brand', 'vehicle__model', 'vehicle__year',
+                'vehicle__registration_number', 'vehicle__color'
+            ),
+            'service_name': ('service__name',),
+            'workshop_name': ('workshop__name',),
+        }
 
     def get_vehicle_details(self, obj):
         """
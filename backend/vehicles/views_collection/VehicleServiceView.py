@@ -32,8 +32,7 @@ class VehicleServiceViewSet(BaseViewSet):
 
             records = self.service.get_by_filter(vehicle__owner=user)
 
-        serializer = self.serializer_class(records, many=True)
-        return Response(serializer.data)
+        return self.paginated_response(request, records)
 
     @extend_schema(
         summary="Get services for a specific vehicle",
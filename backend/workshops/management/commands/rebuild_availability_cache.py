@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from workshops.models import Workshop
+from workshops.services.availabilityCacheService import AvailabilityCacheService
+
+class Command(BaseCommand):
+    help = 'Przelicza lub weryfikuje zmaterializowaną dostępność warsztatów'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workshop-id',
+            type=int,
+            action='append',
+            dest='workshop_ids',
+            help='ID warsztatu (można podać wielokrotnie); domyślnie wszystkie'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Tylko porównaj cache z obliczeniem na żywo, bez zapisu'
+        )
+
+    def handle(self, *args, **options):
+        workshop_ids = options['workshop_ids'] or list(Workshop.objects.values_list('id', flat=True))
+
+        if options['verify']:
+            stale_count = 0
+            for workshop_id in workshop_ids:
+                stale_days = AvailabilityCacheService.verify(workshop_id)
+                if stale_days:
+                    stale_count += len(stale_days)
+                    self.stdout.write(
+                        self.style.WARNING(
+                            f'Warsztat {workshop_id}: nieaktualne dni '
+                            f'{", ".join(day.isoformat() for day in stale_days)}'
+                        )
+                    )
+
+            if stale_count:
+                self.stdout.write(self.style.ERROR(f'Znaleziono {stale_count} nieaktualnych dni'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Cache dostępności jest zgodny z obliczeniem na żywo'))
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Przeliczanie dostępności dla {len(workshop_ids)} warsztatów...')
+        )
+        refreshed_days = AvailabilityCacheService.rebuild(workshop_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f'Zapisano {refreshed_days} dni dostępności')
+        )
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-18 03:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0005_add_mechanic_availability_models'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkshopDaySlots',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('payload', models.JSONField(help_text='Wynik AvailabilityService.get_availability_range dla tego dnia')),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('workshop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_slots', to='workshops.workshop')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('workshop', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.3 on 2026-10-18 09:40
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # tsvector, trigger i indeksy GIN są dostępne tylko na PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        """
+        CREATE OR REPLACE FUNCTION workshops_workshop_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(NEW.location, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(NEW.address_full, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    schema_editor.execute(
+        """
+        CREATE TRIGGER workshops_workshop_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, location, address_full, search_vector ON workshops_workshop
+        FOR EACH ROW EXECUTE FUNCTION workshops_workshop_search_vector_update()
+        """
+    )
+    # Przeliczenie istniejących wierszy przez trigger
+    schema_editor.execute("UPDATE workshops_workshop SET name = name")
+    schema_editor.execute(
+        "CREATE INDEX workshop_search_vector_gin ON workshops_workshop USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX workshop_name_trgm_gin ON workshops_workshop USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS workshop_name_trgm_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS workshop_search_vector_gin")
+    schema_editor.execute("DROP TRIGGER IF EXISTS workshops_workshop_search_vector_trigger ON workshops_workshop")
+    schema_editor.execute("DROP FUNCTION IF EXISTS workshops_workshop_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0006_workshopdayslots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workshop',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
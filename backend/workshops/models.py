@@ -1,9 +1,11 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth import get_user_model
+from backend.versioning import VersionedModel
 
 User = get_user_model()
 
-class Workshop(models.Model):
+class Workshop(VersionedModel):
     SPECIALIZATION_CHOICES = [
         ('general', 'Serwis ogólny'),
         ('electric', 'Samochody elektryczne'),
@@ -53,6 +55,12 @@ class Workshop(models.Model):
     contact_phone = models.CharField(max_length=20, null=True, blank=True)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
 
+    # Wektor wyszukiwania (name A, location B, address_full C) utrzymywany przez
+    # trigger na PostgreSQL; indeksy GIN (tsvector i trigramy nazwy) w migracji 0007
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    SEARCH_CONFIG = 'simple'
+
     def __str__(self):
         return self.name
     
@@ -247,6 +255,21 @@ class WorkshopBreak(models.Model):
         return True  # Całodniowa przerwa
 
 
+class WorkshopDaySlots(models.Model):
+    """Zmaterializowana dostępność warsztatu na dany dzień"""
+    workshop = models.ForeignKey(Workshop, on_delete=models.CASCADE, related_name='day_slots')
+    date = models.DateField()
+    payload = models.JSONField(help_text="Wynik AvailabilityService.get_availability_range dla tego dnia")
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['workshop', 'date']
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.workshop.name} - {self.date}"
+
+
 class Report(models.Model):
     REPORT_TYPES = [
         ('daily', 'Daily'),
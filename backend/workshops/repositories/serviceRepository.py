@@ -2,4 +2,6 @@ from backend.repositories.baseRepository import BaseRepository
 from ..models import Service
 
 class ServiceRepository(BaseRepository):
-    model = Service
\ No newline at end of file
+    model = Service
+    # Cennik usług zmienia się rzadko
+    cache_ttl = 300
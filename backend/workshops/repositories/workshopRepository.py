@@ -2,4 +2,6 @@ from backend.repositories.baseRepository import BaseRepository
 from ..models import Workshop
 
 class WorkshopRepository(BaseRepository):
-    model = Workshop
\ No newline at end of file
+    model = Workshop
+    # Czytany przy prawie każdym żądaniu, zmieniany rzadko
+    cache_ttl = 300
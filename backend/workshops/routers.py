@@ -4,6 +4,7 @@ from .views_collection.WorkshopView import WorkshopViewSet
 from .views_collection.WorkshopMechanicView import WorkshopMechanicViewSet
 from .views_collection.ReportView import ReportViewSet
 from .views_collection.AvailabilityView import WorkshopAvailabilityViewSet, WorkshopBreakViewSet
+from .views_collection.SlotHoldView import SlotHoldViewSet
 
 router = DefaultRouter()
 
@@ -13,5 +14,6 @@ router.register(r'mechanics', WorkshopMechanicViewSet, basename='workshop-mechan
 router.register(r'reports', ReportViewSet, basename='report')
 router.register(r'availability', WorkshopAvailabilityViewSet, basename='workshop-availability')
 router.register(r'breaks', WorkshopBreakViewSet, basename='workshop-break')
+router.register(r'slot-holds', SlotHoldViewSet, basename='slot-hold')
 
 urlpatterns = router.urls
\ No newline at end of file
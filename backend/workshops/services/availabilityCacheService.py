@@ -0,0 +1,169 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from django.db import transaction
+from django.utils import timezone
+from backend.singleFlight import SingleFlight
+from ..models import Workshop, WorkshopDaySlots
+
+
+class AvailabilityCacheService:
+    """
+    Zmaterializowana dostępność warsztatów (tabela WorkshopDaySlots).
+    Odczyt to jedno zapytanie po (workshop, date); zapisy w harmonogramach,
+    przerwach i wizytach przeliczają tylko dotknięte dni (workshops.signals).
+    """
+    HORIZON_DAYS = 60
+
+    @classmethod
+    def horizon(cls):
+        """Zakres dat utrzymywanych w cache (od dziś)"""
+        start_date = timezone.localdate()
+        return start_date, start_date + timedelta(days=cls.HORIZON_DAYS - 1)
+
+    @classmethod
+    def _clip_to_horizon(cls, start_date: Optional[date], end_date: Optional[date]):
+        horizon_start, horizon_end = cls.horizon()
+        start_date = max(start_date or horizon_start, horizon_start)
+        end_date = min(end_date or horizon_end, horizon_end)
+        return start_date, end_date
+
+    @classmethod
+    def get_range(cls, workshop_id: int, start_date: date, end_date: date) -> Dict[date, Dict]:
+        """Pobierz dostępność z cache, dopełniając brakujące dni obliczeniem na żywo"""
+        from .availabilityService import AvailabilityService
+
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        cached = dict(
+            WorkshopDaySlots.objects.filter(
+                workshop_id=workshop_id,
+                date__gte=start_date,
+                date__lte=end_date
+            ).values_list('date', 'payload')
+        )
+
+        missing = [day for day in days if day not in cached]
+        if missing:
+            computed = AvailabilityService.get_availability_range(workshop_id, missing[0], missing[-1])
+            cached.update({day: computed[day] for day in missing})
+            horizon_start, horizon_end = cls.horizon()
+            cls._store(workshop_id, {
+                day: computed[day] for day in missing
+                if horizon_start <= day <= horizon_end
+            })
+
+        return {day: cached[day] for day in days}
+
+    @classmethod
+    def get_cached_many(cls, workshop_ids: List[int], start_date: date, end_date: date) -> Dict[int, Dict[date, Dict]]:
+        """
+        Pobierz jednym zapytaniem dostępność wielu warsztatów; zwraca tylko
+        warsztaty, dla których w cache jest komplet dni z zakresu
+        """
+        days_count = (end_date - start_date).days + 1
+        cached = defaultdict(dict)
+        for workshop_id, day, payload in WorkshopDaySlots.objects.filter(
+            workshop_id__in=workshop_ids,
+            date__gte=start_date,
+            date__lte=end_date
+        ).values_list('workshop_id', 'date', 'payload'):
+            cached[workshop_id][day] = payload
+
+        return {
+            workshop_id: dict(sorted(days.items()))
+            for workshop_id, days in cached.items()
+            if len(days) == days_count
+        }
+
+    @classmethod
+    def get_day(cls, workshop_id: int, target_date: date) -> Dict:
+        """Pobierz dostępność z cache na jeden dzień"""
+        return cls.get_range(workshop_id, target_date, target_date)[target_date]
+
+    @classmethod
+    def _store(cls, workshop_id: int, payloads: Dict[date, Dict]) -> int:
+        """Zapisz (upsert) przeliczone dni"""
+        if not payloads or not Workshop.objects.filter(id=workshop_id).exists():
+            return 0
+
+        WorkshopDaySlots.objects.bulk_create(
+            [
+                WorkshopDaySlots(workshop_id=workshop_id, date=day, payload=payload)
+                for day, payload in payloads.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['workshop', 'date'],
+            update_fields=['payload', 'computed_at']
+        )
+        return len(payloads)
+
+    @classmethod
+    def refresh(cls, workshop_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Przelicz na żywo i zapisz dni z zakresu (domyślnie cały horyzont)"""
+        from .availabilityService import AvailabilityService
+
+        start_date, end_date = cls._clip_to_horizon(start_date, end_date)
+        if start_date > end_date:
+            return 0
+
+        computed = AvailabilityService.get_availability_range(workshop_id, start_date, end_date)
+        stored = cls._store(workshop_id, computed)
+        SingleFlight.forget(f'workshop:{workshop_id}')
+        return stored
+
+    @classmethod
+    def invalidate(cls, workshop_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        """Usuń dni z cache; kolejny odczyt przeliczy je na żywo"""
+        records = WorkshopDaySlots.objects.filter(workshop_id=workshop_id)
+        if start_date:
+            records = records.filter(date__gte=start_date)
+        if end_date:
+            records = records.filter(date__lte=end_date)
+        records.delete()
+        SingleFlight.forget(f'workshop:{workshop_id}')
+
+    @classmethod
+    def schedule_refresh(cls, workshop_id: int, start_date: Optional[date] = None, end_date: Optional[date] = None):
+        """
+        Unieważnij dni w bieżącej transakcji i przelicz je po jej zatwierdzeniu,
+        tak aby przeliczenie widziało zapisy z równoległych transakcji.
+        """
+        if workshop_id is None:
+            return
+        cls.invalidate(workshop_id, start_date, end_date)
+        transaction.on_commit(lambda: cls.refresh(workshop_id, start_date, end_date))
+
+    @classmethod
+    def rebuild(cls, workshop_ids: Optional[List[int]] = None,
+                start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """
+        Przelicz dni z zakresu (domyślnie cały horyzont) dla wskazanych
+        (domyślnie wszystkich) warsztatów i usuń dni sprzed horyzontu
+        """
+        if workshop_ids is None:
+            workshop_ids = list(Workshop.objects.values_list('id', flat=True))
+
+        horizon_start, _ = cls.horizon()
+        WorkshopDaySlots.objects.filter(date__lt=horizon_start).delete()
+
+        return sum(cls.refresh(workshop_id, start_date, end_date) for workshop_id in workshop_ids)
+
+    @classmethod
+    def verify(cls, workshop_id: int) -> List[date]:
+        """Zwróć dni, dla których cache różni się od obliczenia na żywo"""
+        from .availabilityService import AvailabilityService
+
+        start_date, end_date = cls.horizon()
+        cached = dict(
+            WorkshopDaySlots.objects.filter(
+                workshop_id=workshop_id,
+                date__gte=start_date,
+                date__lte=end_date
+            ).values_list('date', 'payload')
+        )
+        computed = AvailabilityService.get_availability_range(workshop_id, start_date, end_date)
+
+        return [
+            day for day, payload in computed.items()
+            if day in cached and cached[day] != payload
+        ]
@@ -1,114 +1,372 @@
+import heapq
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, time, timedelta
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import List, Dict, Optional, Tuple
+from django.db import connections
+from django.utils import timezone
 from ..models import Workshop, WorkshopAvailability, WorkshopBreak
 from backend.services.baseService import BaseService
+from backend.singleFlight import SingleFlight
 
 
 class AvailabilityService(BaseService):
     model = WorkshopAvailability
 
+    MINUTES_PER_DAY = 24 * 60
+    SEARCH_WINDOW_DAYS = 7
+    SEARCH_WORKERS = 8
+
+    flight = SingleFlight('availability')
+
     @classmethod
-    def get_workshop_availability(cls, workshop_id: int, target_date: date) -> Dict:
-        """Pobierz dostępność warsztatu na dany dzień"""
-        try:
-            workshop = Workshop.objects.get(id=workshop_id)
-            weekday = target_date.weekday()
-            
-            # Pobierz harmonogram dla tego dnia tygodnia
-            try:
-                availability = WorkshopAvailability.objects.get(
-                    workshop=workshop,
-                    weekday=weekday
-                )
-            except WorkshopAvailability.DoesNotExist:
-                return {
-                    'available': False,
-                    'message': 'Warsztat nie jest dostępny w tym dniu tygodnia',
-                    'slots': []
-                }
+    def get_workshop_availability(cls, workshop_id: int, target_date: date,
+                                  duration_minutes: Optional[int] = None) -> Dict:
+        """
+        Pobierz dostępność warsztatu na dany dzień.
+        Bez duration_minutes zwracane są sloty o długości slot_duration (z cache).
+        Terminy zablokowane w kreatorze rezerwacji (SlotHoldService) są pomijane.
+        Identyczne równoległe zapytania współdzielą jedno obliczenie (SingleFlight).
+        """
+        availability = cls.flight.run(
+            f"{workshop_id}:{target_date.isoformat()}:{duration_minutes or ''}",
+            lambda: cls._compute_workshop_availability(workshop_id, target_date, duration_minutes),
+            tag=f'workshop:{workshop_id}'
+        )
+        return cls._apply_slot_holds(workshop_id, target_date, availability, duration_minutes)
+
+    @classmethod
+    def _compute_workshop_availability(cls, workshop_id: int, target_date: date,
+                                       duration_minutes: Optional[int] = None) -> Dict:
+        if duration_minutes is None:
+            from .availabilityCacheService import AvailabilityCacheService
+
+            return AvailabilityCacheService.get_day(workshop_id, target_date)
 
-            if not availability.is_available:
-                return {
+        return cls.get_availability_range(workshop_id, target_date, target_date, duration_minutes)[target_date]
+
+    @classmethod
+    async def aget_workshop_availability(cls, workshop_id: int, target_date: date,
+                                         duration_minutes: Optional[int] = None) -> Dict:
+        """
+        get_workshop_availability dla widoków asynchronicznych. Dzień z cache
+        (WorkshopDaySlots) i blokady z Redis są czytane bez zajmowania wątku;
+        obliczenie (inna długość, brak dnia w cache) idzie ścieżką synchroniczną.
+        """
+        from asgiref.sync import sync_to_async
+        from ..models import WorkshopDaySlots
+
+        availability = None
+        if duration_minutes is None:
+            availability = await WorkshopDaySlots.objects.filter(
+                workshop_id=workshop_id, date=target_date
+            ).values_list('payload', flat=True).afirst()
+        if availability is None:
+            return await sync_to_async(cls.get_workshop_availability)(workshop_id, target_date, duration_minutes)
+        if not availability.get('slots'):
+            return availability
+
+        from .slotHoldService import SlotHoldService
+
+        holds = await SlotHoldService.aget_active_holds(workshop_id, target_date)
+        return cls._remove_held_slots(availability, holds, duration_minutes)
+
+    @classmethod
+    def _apply_slot_holds(cls, workshop_id: int, target_date: date, availability: Dict,
+                          duration_minutes: Optional[int] = None) -> Dict:
+        """Usuń sloty nachodzące na aktywne blokady; słownik z cache nie jest modyfikowany"""
+        if not availability.get('slots'):
+            return availability
+
+        from .slotHoldService import SlotHoldService
+
+        return cls._remove_held_slots(
+            availability, SlotHoldService.get_active_holds(workshop_id, target_date), duration_minutes
+        )
+
+    @classmethod
+    def _remove_held_slots(cls, availability: Dict, holds: List[Dict], duration_minutes: Optional[int] = None) -> Dict:
+        if not holds:
+            return availability
+
+        duration = duration_minutes or availability['working_hours']['slot_duration']
+        starts = [int(slot[:2]) * 60 + int(slot[3:]) for slot in availability['slots']]
+        held_intervals = cls._merge_intervals([(hold['start_minute'], hold['end_minute']) for hold in holds])
+        final_slots = cls._fit_starts(starts, held_intervals, duration)
+
+        return {
+            **availability,
+            'available': len(final_slots) > 0,
+            'message': 'Dostępne terminy' if final_slots else 'Brak dostępnych terminów',
+            'slots': [f"{minute // 60:02d}:{minute % 60:02d}" for minute in final_slots]
+        }
+
+    @classmethod
+    def get_availability_range(cls, workshop_id: int, start_date: date, end_date: date,
+                               duration_minutes: Optional[int] = None) -> Dict[date, Dict]:
+        """
+        Pobierz dostępność warsztatu dla każdego dnia z zakresu.
+        Harmonogram, przerwy i rezerwacje są pobierane raz dla całego zakresu,
+        a wolne sloty liczone w pamięci.
+        """
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+
+        if not Workshop.objects.filter(id=workshop_id).exists():
+            return {
+                day: {
                     'available': False,
-                    'message': 'Warsztat jest zamknięty w tym dniu',
+                    'message': 'Warsztat nie istnieje',
                     'slots': []
                 }
+                for day in days
+            }
 
-            # Sprawdź przerwy/urlopy
-            breaks = WorkshopBreak.objects.filter(
-                workshop=workshop,
-                start_date__lte=target_date,
-                end_date__gte=target_date
-            )
+        schedule = {
+            availability.weekday: availability
+            for availability in WorkshopAvailability.objects.filter(workshop_id=workshop_id)
+        }
+        breaks = list(WorkshopBreak.objects.filter(
+            workshop_id=workshop_id,
+            start_date__lte=end_date,
+            end_date__gte=start_date
+        ))
+        booked_intervals = cls._get_booked_intervals_range(workshop_id, start_date, end_date)
 
-            # Pobierz dostępne sloty
-            available_slots = availability.get_available_slots(target_date)
-            
-            # Usuń sloty w czasie przerw
-            filtered_slots = []
-            for slot_time in available_slots:
-                blocked = False
-                for break_obj in breaks:
-                    if break_obj.overlaps_with_slot(target_date, slot_time):
-                        blocked = True
-                        break
-                if not blocked:
-                    filtered_slots.append(slot_time)
-
-            # Usuń już zajęte sloty
-            booked_slots = cls._get_booked_slots(workshop_id, target_date)
-            final_slots = [
-                slot for slot in filtered_slots 
-                if slot not in booked_slots
-            ]
+        return {
+            day: cls._build_day_availability(
+                day,
+                schedule.get(day.weekday()),
+                [break_obj for break_obj in breaks if break_obj.start_date <= day <= break_obj.end_date],
+                booked_intervals.get(day, []),
+                duration_minutes
+            )
+            for day in days
+        }
 
+    @classmethod
+    def _build_day_availability(cls, target_date: date, availability: Optional[WorkshopAvailability],
+                                breaks: List[WorkshopBreak], booked_intervals: List[Tuple[int, int]],
+                                duration_minutes: Optional[int] = None) -> Dict:
+        """Wylicz wolne sloty dnia z wcześniej pobranych danych"""
+        if availability is None:
             return {
-                'available': len(final_slots) > 0,
-                'message': 'Dostępne terminy' if final_slots else 'Brak dostępnych terminów',
-                'slots': [slot.strftime('%H:%M') for slot in final_slots],
-                'working_hours': {
-                    'start': availability.start_time.strftime('%H:%M'),
-                    'end': availability.end_time.strftime('%H:%M'),
-                    'slot_duration': availability.slot_duration
-                }
+                'available': False,
+                'message': 'Warsztat nie jest dostępny w tym dniu tygodnia',
+                'slots': []
             }
 
-        except Workshop.DoesNotExist:
+        if not availability.is_available:
             return {
                 'available': False,
-                'message': 'Warsztat nie istnieje',
+                'message': 'Warsztat jest zamknięty w tym dniu',
                 'slots': []
             }
 
+        duration = duration_minutes or availability.slot_duration
+        opening = cls._minutes(availability.start_time)
+        closing = cls._minutes(availability.end_time)
+        candidate_starts = range(opening, closing - duration + 1, availability.slot_duration)
+
+        busy_intervals = list(booked_intervals)
+        for break_obj in breaks:
+            if break_obj.start_time and break_obj.end_time:
+                busy_intervals.append((cls._minutes(break_obj.start_time), cls._minutes(break_obj.end_time)))
+            else:
+                busy_intervals.append((0, cls.MINUTES_PER_DAY))
+
+        final_slots = cls._fit_starts(candidate_starts, cls._merge_intervals(busy_intervals), duration)
+
+        return {
+            'available': len(final_slots) > 0,
+            'message': 'Dostępne terminy' if final_slots else 'Brak dostępnych terminów',
+            'slots': [f"{minute // 60:02d}:{minute % 60:02d}" for minute in final_slots],
+            'working_hours': {
+                'start': availability.start_time.strftime('%H:%M'),
+                'end': availability.end_time.strftime('%H:%M'),
+                'slot_duration': availability.slot_duration
+            }
+        }
+
+    @staticmethod
+    def _minutes(value: time) -> int:
+        return value.hour * 60 + value.minute
+
+    @staticmethod
+    def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Posortuj i scal nachodzące na siebie przedziały [start, end)"""
+        merged = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                if end > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], end)
+            else:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _fit_starts(starts, busy_intervals: List[Tuple[int, int]], duration: int) -> List[int]:
+        """
+        Zwróć godziny rozpoczęcia (posortowane, w minutach), dla których cały
+        przedział [start, start + duration) nie nachodzi na żaden zajęty przedział.
+        busy_intervals muszą być posortowane i scalone (_merge_intervals).
+        """
+        fitting = []
+        index = 0
+        for start in starts:
+            while index < len(busy_intervals) and busy_intervals[index][1] <= start:
+                index += 1
+            if index == len(busy_intervals) or busy_intervals[index][0] >= start + duration:
+                fitting.append(start)
+        return fitting
+
     @classmethod
-    def _get_booked_slots(cls, workshop_id: int, target_date: date) -> List[time]:
-        """Pobierz już zajęte sloty czasowe"""
+    def _get_booked_intervals_range(cls, workshop_id: int, start_date: date,
+                                    end_date: date) -> Dict[date, List[Tuple[int, int]]]:
+        """
+        Pobierz zajęte przedziały (w minutach od północy, czas lokalny) w zakresie dat,
+        pogrupowane po dniu. Wizyty przechodzące przez północ są dzielone między dni.
+        """
         from appointments.models import Appointment
-        
-        start_datetime = datetime.combine(target_date, time.min)
-        end_datetime = datetime.combine(target_date, time.max)
-        
-        appointments = Appointment.objects.filter(
+
+        range_start = timezone.make_aware(datetime.combine(start_date, time.min))
+        range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min))
+
+        # Przedział [date, end_date) obejmuje też wizyty rozpoczęte przed zakresem
+        appointments = Appointment.objects.overlapping(range_start, range_end).filter(
             workshop_id=workshop_id,
-            date__range=[start_datetime, end_datetime],
-            status__in=['confirmed', 'in_progress', 'pending']
-        )
-        
-        return [appointment.date.time() for appointment in appointments]
+            status__in=Appointment.ACTIVE_STATUSES
+        ).values_list('date', 'end_date')
+
+        booked_intervals = defaultdict(list)
+        for appointment_date, appointment_end in appointments:
+            local_start = timezone.localtime(appointment_date)
+            day = local_start.date()
+            start_minute = cls._minutes(local_start.time())
+            end_minute = start_minute + int(-(-(appointment_end - appointment_date).total_seconds() // 60))
+            while end_minute > 0 and day <= end_date:
+                if day >= start_date:
+                    booked_intervals[day].append((max(start_minute, 0), min(end_minute, cls.MINUTES_PER_DAY)))
+                day += timedelta(days=1)
+                start_minute -= cls.MINUTES_PER_DAY
+                end_minute -= cls.MINUTES_PER_DAY
+
+        return booked_intervals
 
     @classmethod
-    def get_available_dates(cls, workshop_id: int, start_date: date, end_date: date) -> List[str]:
+    def get_available_dates(cls, workshop_id: int, start_date: date, end_date: date,
+                            duration_minutes: Optional[int] = None) -> List[str]:
         """Pobierz dostępne daty w okresie"""
-        available_dates = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            availability = cls.get_workshop_availability(workshop_id, current_date)
-            if availability['available']:
-                available_dates.append(current_date.isoformat())
-            current_date += timedelta(days=1)
-        
-        return available_dates
+        if start_date > end_date:
+            return []
+
+        if duration_minutes is None:
+            from .availabilityCacheService import AvailabilityCacheService
+
+            availability_range = AvailabilityCacheService.get_range(workshop_id, start_date, end_date)
+        else:
+            availability_range = cls.get_availability_range(workshop_id, start_date, end_date, duration_minutes)
+
+        return [
+            day.isoformat()
+            for day, availability in availability_range.items()
+            if availability['available']
+        ]
+
+    @classmethod
+    def find_earliest_slots(cls, latitude: float, longitude: float, radius_km: float = 20, limit: int = 5,
+                            duration_minutes: Optional[int] = None, start_date: Optional[date] = None,
+                            max_days: int = 14) -> Dict:
+        """
+        Znajdź najwcześniejsze wolne terminy we wszystkich warsztatach w promieniu radius_km.
+        Dni są przeszukiwane oknami po SEARCH_WINDOW_DAYS; obliczenia dla warsztatów
+        w oknie rozkładane są na pulę wątków, a wyniki scalane kolejką priorytetową
+        po czasie slotu. Wyszukiwanie kończy się po oknie, w którym zebrano limit slotów.
+        """
+        from .workshopService import WorkshopService
+
+        workshops = WorkshopService.get_nearby_workshops(latitude, longitude, radius_km)
+        distances = {workshop.id: workshop.distance_km for workshop in workshops}
+        names = {workshop.id: workshop.name for workshop in workshops}
+
+        now = timezone.localtime()
+        start_date = max(start_date or now.date(), now.date())
+        last_date = start_date + timedelta(days=max_days - 1)
+
+        found = []
+        window_start = start_date
+        while workshops and window_start <= last_date and len(found) < limit:
+            window_end = min(window_start + timedelta(days=cls.SEARCH_WINDOW_DAYS - 1), last_date)
+            ranges = cls._get_ranges_for_workshops(list(names), window_start, window_end, duration_minutes)
+
+            per_workshop = []
+            for workshop_id, availability_range in ranges.items():
+                slots = []
+                for day, availability in availability_range.items():
+                    for slot in availability['slots']:
+                        slot_datetime = timezone.make_aware(
+                            datetime.combine(day, datetime.strptime(slot, '%H:%M').time())
+                        )
+                        if slot_datetime >= now:
+                            slots.append((slot_datetime, distances[workshop_id], workshop_id))
+                per_workshop.append(slots)
+
+            found.extend(islice(heapq.merge(*per_workshop), limit - len(found)))
+            window_start = window_end + timedelta(days=1)
+
+        return {
+            'slots': [
+                {
+                    'workshop_id': workshop_id,
+                    'workshop_name': names[workshop_id],
+                    'distance_km': round(distance, 2),
+                    'datetime': slot_datetime.isoformat(),
+                    'date': slot_datetime.date().isoformat(),
+                    'time': slot_datetime.strftime('%H:%M'),
+                }
+                for slot_datetime, distance, workshop_id in found
+            ],
+            'searched_workshops': len(workshops)
+        }
+
+    @classmethod
+    def _get_ranges_for_workshops(cls, workshop_ids: List[int], start_date: date, end_date: date,
+                                  duration_minutes: Optional[int] = None) -> Dict[int, Dict[date, Dict]]:
+        """
+        Dostępność wielu warsztatów w zakresie dat. Dni obecne w cache są pobierane
+        jednym zapytaniem, pozostałe obliczane równolegle w puli wątków.
+        """
+        from .availabilityCacheService import AvailabilityCacheService
+
+        def compute(workshop_id):
+            if duration_minutes is None:
+                return AvailabilityCacheService.get_range(workshop_id, start_date, end_date)
+            return cls.get_availability_range(workshop_id, start_date, end_date, duration_minutes)
+
+        ranges = {}
+        if duration_minutes is None:
+            ranges = AvailabilityCacheService.get_cached_many(workshop_ids, start_date, end_date)
+        pending = [workshop_id for workshop_id in workshop_ids if workshop_id not in ranges]
+
+        ranges.update(zip(pending, cls._run_in_pool(compute, pending)))
+        return ranges
+
+    @classmethod
+    def _run_in_pool(cls, func, items: List) -> List:
+        """Wykonaj func dla każdego elementu w puli wątków (każdy wątek zamyka własne połączenia z bazą)"""
+        if cls.SEARCH_WORKERS <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+
+        def run(item):
+            try:
+                return func(item)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=min(cls.SEARCH_WORKERS, len(items))) as executor:
+            return list(executor.map(run, items))
 
     @classmethod
     def create_default_availability(cls, workshop_id: int):
@@ -138,16 +396,19 @@ class AvailabilityService(BaseService):
             )
 
     @classmethod
-    def check_slot_availability(cls, workshop_id: int, datetime_slot: datetime) -> bool:
+    def check_slot_availability(cls, workshop_id: int, datetime_slot: datetime,
+                                duration_minutes: Optional[int] = None) -> bool:
         """Sprawdź czy konkretny slot czasowy jest dostępny"""
+        if timezone.is_aware(datetime_slot):
+            datetime_slot = timezone.localtime(datetime_slot)
         target_date = datetime_slot.date()
         target_time = datetime_slot.time()
         
-        availability = cls.get_workshop_availability(workshop_id, target_date)
+        availability = cls.get_workshop_availability(workshop_id, target_date, duration_minutes)
         
         if not availability['available']:
             return False
         
         # Sprawdź czy czas mieści się w slotach
         time_str = target_time.strftime('%H:%M')
-        return time_str in availability['slots']
\ No newline at end of file
+        return time_str in availability['slots']
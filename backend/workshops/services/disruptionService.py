@@ -0,0 +1,284 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.utils import timezone
+from appointments.models import Appointment
+from notifications.services.notificationService import NotificationService
+from ..models import WorkshopAvailability, WorkshopBreak, MechanicBreak
+from .availabilityCacheService import AvailabilityCacheService
+from .mechanicAvailabilityService import MechanicAvailabilityService, MechanicDayIndex
+
+
+class DisruptionService:
+    """
+    Przeplanowanie wizyt dotkniętych przerwą warsztatu lub mechanika.
+    Dla każdej wizyty (w kolejności rozpoczęcia) plan to: inny mechanik w tym
+    samym terminie, przesunięcie w obrębie dnia albo oznaczenie do zmiany terminu.
+    Liczba zapytań zależy od liczby dni przerwy, nie od liczby wizyt.
+    """
+    ACTION_REASSIGN = 'reassign'
+    ACTION_SHIFT = 'shift'
+    ACTION_FLAG = 'flag'
+    SHIFT_STEP_MINUTES = 15
+
+    @staticmethod
+    def _scope(break_obj):
+        """(workshop_id, mechanic_id) przerwy; mechanic_id=None dla przerwy warsztatu"""
+        if isinstance(break_obj, MechanicBreak):
+            return break_obj.workshop_mechanic.workshop_id, break_obj.workshop_mechanic.mechanic_id
+        return break_obj.workshop_id, None
+
+    @staticmethod
+    def _window(start_time, end_time):
+        """Przedział minut od północy zajęty przez przerwę każdego dnia"""
+        if start_time and end_time:
+            return MechanicDayIndex._minutes(start_time), MechanicDayIndex._minutes(end_time)
+        return 0, 24 * 60
+
+    @staticmethod
+    def _overlaps(appointment, start_date, end_date, window):
+        """Czy wizyta nachodzi na przerwę w podanym zakresie dni i przedziale minut"""
+        local_start = timezone.localtime(appointment.date)
+        start_minute = MechanicDayIndex._minutes(local_start.time())
+        duration = appointment.duration_estimate or Appointment.DEFAULT_DURATION
+        window_start, window_end = window
+        return (
+            start_date <= local_start.date() <= end_date
+            and start_minute < window_end and start_minute + duration > window_start
+        )
+
+    @classmethod
+    def affected_appointments(cls, break_obj, lock=False):
+        """Przyszłe aktywne wizyty nachodzące na przerwę (jedno zapytanie)"""
+        workshop_id, mechanic_id = cls._scope(break_obj)
+        range_start = timezone.make_aware(datetime.combine(break_obj.start_date, time.min))
+        range_end = timezone.make_aware(datetime.combine(break_obj.end_date + timedelta(days=1), time.min))
+
+        queryset = Appointment.objects.filter(
+            workshop_id=workshop_id,
+            date__gte=max(range_start, timezone.now()),
+            date__lt=range_end,
+            status__in=Appointment.ACTIVE_STATUSES
+        )
+        if mechanic_id is not None:
+            queryset = queryset.filter(assigned_mechanic_id=mechanic_id)
+        queryset = queryset.select_related('vehicle', 'client').order_by('date', 'id')
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+
+        window = cls._window(break_obj.start_time, break_obj.end_time)
+        return [
+            appointment for appointment in queryset
+            if cls._overlaps(appointment, break_obj.start_date, break_obj.end_date, window)
+        ]
+
+    @staticmethod
+    def _open_mask(schedule, day_breaks):
+        """Maska godzin otwarcia warsztatu danego dnia bez przerw warsztatu"""
+        if schedule is None or not schedule.is_available:
+            return 0
+        mask = MechanicDayIndex.interval_mask(
+            MechanicDayIndex._minutes(schedule.start_time),
+            MechanicDayIndex._minutes(schedule.end_time),
+            inner=True
+        )
+        for break_obj in day_breaks:
+            if break_obj.start_time and break_obj.end_time:
+                mask &= ~MechanicDayIndex.interval_mask(
+                    MechanicDayIndex._minutes(break_obj.start_time),
+                    MechanicDayIndex._minutes(break_obj.end_time)
+                )
+            else:
+                return 0
+        return mask
+
+    @classmethod
+    def _plan(cls, break_obj, appointments):
+        """Zwraca listę (wizyta, akcja, nowa data, nowy mechanik); wizyty nie są modyfikowane"""
+        if not appointments:
+            return []
+
+        workshop_id, _ = cls._scope(break_obj)
+        workshop_mechanics = list(MechanicAvailabilityService.get_workshop_mechanics(workshop_id))
+        schedules = {
+            schedule.weekday: schedule
+            for schedule in WorkshopAvailability.objects.filter(workshop_id=workshop_id)
+        }
+        workshop_breaks = list(WorkshopBreak.objects.filter(
+            workshop_id=workshop_id,
+            start_date__lte=break_obj.end_date,
+            end_date__gte=break_obj.start_date
+        ))
+
+        by_day = defaultdict(list)
+        for appointment in appointments:
+            by_day[timezone.localtime(appointment.date).date()].append(appointment)
+
+        now = timezone.localtime()
+        plan = []
+        for day, day_appointments in sorted(by_day.items()):
+            index = MechanicDayIndex.build(workshop_id, day, workshop_mechanics=workshop_mechanics)
+            open_mask = cls._open_mask(
+                schedules.get(day.weekday()),
+                [b for b in workshop_breaks if b.start_date <= day <= b.end_date]
+            )
+            earliest_minute = now.hour * 60 + now.minute + 1 if day == now.date() else 0
+
+            # Przenoszone wizyty nie blokują już swoich dotychczasowych terminów
+            for appointment in day_appointments:
+                if appointment.assigned_mechanic_id:
+                    index.release(
+                        appointment.assigned_mechanic_id,
+                        timezone.localtime(appointment.date).time(),
+                        appointment.duration_estimate or Appointment.DEFAULT_DURATION
+                    )
+
+            for appointment in day_appointments:
+                plan.append(cls._plan_appointment(appointment, index, open_mask, earliest_minute))
+        return plan
+
+    @classmethod
+    def _plan_appointment(cls, appointment, index, open_mask, earliest_minute):
+        local_start = timezone.localtime(appointment.date)
+        start_minute = local_start.hour * 60 + local_start.minute
+        duration = appointment.duration_estimate or Appointment.DEFAULT_DURATION
+        brand = appointment.vehicle.brand
+
+        def fits_open(minute):
+            job_mask = MechanicDayIndex.interval_mask(minute, minute + duration)
+            return minute + duration <= 24 * 60 and open_mask & job_mask == job_mask
+
+        if fits_open(start_minute):
+            mechanic = index.pick_mechanic(local_start.time(), duration, brand)
+            if mechanic is not None:
+                index.reserve(mechanic.id, local_start.time(), duration)
+                return appointment, cls.ACTION_REASSIGN, appointment.date, mechanic
+
+        first_minute = -(-earliest_minute // cls.SHIFT_STEP_MINUTES) * cls.SHIFT_STEP_MINUTES
+        candidates = sorted(
+            range(first_minute, 24 * 60 - duration + 1, cls.SHIFT_STEP_MINUTES),
+            key=lambda minute: (abs(minute - start_minute), minute)
+        )
+        for minute in candidates:
+            if minute == start_minute or not fits_open(minute):
+                continue
+            slot = time(minute // 60, minute % 60)
+            mechanic = index.pick_mechanic(slot, duration, brand)
+            if mechanic is not None:
+                index.reserve(mechanic.id, slot, duration)
+                new_date = timezone.make_aware(datetime.combine(local_start.date(), slot))
+                return appointment, cls.ACTION_SHIFT, new_date, mechanic
+
+        return appointment, cls.ACTION_FLAG, appointment.date, None
+
+    @classmethod
+    def _serialize(cls, break_obj, plan, applied):
+        summary = dict.fromkeys([cls.ACTION_REASSIGN, cls.ACTION_SHIFT, cls.ACTION_FLAG], 0)
+        entries = []
+        for appointment, action, new_date, mechanic in plan:
+            summary[action] += 1
+            entries.append({
+                'appointment_id': appointment.id,
+                'client_id': appointment.client_id,
+                'action': action,
+                'original_date': timezone.localtime(appointment.date).isoformat(),
+                'new_date': timezone.localtime(new_date).isoformat(),
+                'original_mechanic_id': appointment.assigned_mechanic_id,
+                'new_mechanic_id': mechanic.id if mechanic else None
+            })
+        workshop_id, mechanic_id = cls._scope(break_obj)
+        return {
+            'break_id': break_obj.id,
+            'workshop_id': workshop_id,
+            'mechanic_id': mechanic_id,
+            'applied': applied,
+            'summary': summary,
+            'appointments': entries
+        }
+
+    @classmethod
+    def preview(cls, break_obj):
+        """Oblicz plan bez zapisu"""
+        appointments = cls.affected_appointments(break_obj)
+        return cls._serialize(break_obj, cls._plan(break_obj, appointments), applied=False)
+
+    @classmethod
+    def apply(cls, break_obj, notify=True, previous=None):
+        """
+        Oblicz i zapisz plan jednym bulk_update; klienci dostają jedno powiadomienie zbiorcze.
+        previous to poprzedni zakres przerwy (start_date, end_date, start_time, end_time) -
+        wizyty oznaczone już przy jego zastosowaniu nie są zgłaszane ponownie
+        """
+        with transaction.atomic():
+            appointments = cls.affected_appointments(break_obj, lock=True)
+            plan = cls._plan(break_obj, appointments)
+            result = cls._serialize(break_obj, plan, applied=True)
+            if notify:
+                cls._notify_clients(plan, cls._already_flagged(plan, previous))
+
+            changed = []
+            for appointment, action, new_date, mechanic in plan:
+                if action == cls.ACTION_FLAG:
+                    # Wizyta u nieobecnego mechanika wraca do puli nieprzypisanych
+                    if isinstance(break_obj, MechanicBreak):
+                        appointment.assigned_mechanic = None
+                        changed.append(appointment)
+                    continue
+                appointment.date = new_date
+                appointment.end_date = appointment.estimated_end_time
+                appointment.assigned_mechanic = mechanic
+                changed.append(appointment)
+
+            if changed:
+                Appointment.objects.bulk_update(changed, ['date', 'end_date', 'assigned_mechanic'], batch_size=500)
+
+            shifted_days = [
+                timezone.localtime(new_date).date()
+                for _, action, new_date, _ in plan if action == cls.ACTION_SHIFT
+            ]
+            if shifted_days:
+                # bulk_update pomija sygnały, więc cache przeliczamy ręcznie
+                workshop_id, _ = cls._scope(break_obj)
+                AvailabilityCacheService.schedule_refresh(workshop_id, min(shifted_days), max(shifted_days))
+
+        return result
+
+    @classmethod
+    def _already_flagged(cls, plan, previous):
+        """Id wizyt, które pozostają oznaczone i nachodziły już na poprzedni zakres przerwy"""
+        if not previous:
+            return set()
+        start_date, end_date, start_time, end_time = previous
+        window = cls._window(start_time, end_time)
+        return {
+            appointment.id for appointment, action, _, _ in plan
+            if action == cls.ACTION_FLAG and cls._overlaps(appointment, start_date, end_date, window)
+        }
+
+    @classmethod
+    def _notify_clients(cls, plan, already_flagged=()):
+        """Jedno powiadomienie na klienta ze wszystkimi zmianami jego wizyt"""
+        lines_by_client = defaultdict(list)
+        clients = {}
+        for appointment, action, new_date, _ in plan:
+            original = timezone.localtime(appointment.date).strftime('%d.%m.%Y %H:%M')
+            if action == cls.ACTION_SHIFT:
+                line = f"Wizyta {original} została przesunięta na {timezone.localtime(new_date).strftime('%H:%M')}."
+            elif action == cls.ACTION_FLAG and appointment.id not in already_flagged:
+                line = f"Wizyta {original} wymaga zmiany terminu - prosimy o kontakt z warsztatem."
+            else:
+                continue
+            clients[appointment.client_id] = appointment.client
+            lines_by_client[appointment.client_id].append((appointment.id, line))
+
+        NotificationService.send_bulk_notifications([
+            {
+                'user': clients[client_id],
+                'message': "\n".join(line for _, line in lines),
+                'notification_type': 'appointment_rescheduled',
+                'priority': 'high',
+                'related_object_id': lines[0][0] if len(lines) == 1 else None,
+                'related_object_type': 'Appointment'
+            }
+            for client_id, lines in lines_by_client.items()
+        ])
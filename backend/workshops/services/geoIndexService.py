@@ -0,0 +1,234 @@
+import logging
+import math
+import threading
+import time as time_module
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import redis
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from backend.redisClient import get_async_redis, get_redis
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class WorkshopGeoIndex:
+    """
+    Indeks przestrzenny warsztatów trzymany w pamięci procesu.
+    Punkty są posortowane po komórkach siatki CELL_DEGREES x CELL_DEGREES
+    (klucz = wiersz szerokości * liczba kolumn + kolumna długości), więc
+    kandydatów z prostokąta ograniczającego wybiera się przez searchsorted,
+    a odległości liczone są jednym wektorowym przebiegiem haversine w NumPy.
+    Zapis warsztatu unieważnia indeks (workshops.signals); inne procesy
+    dowiadują się o tym z licznika wersji w Redis.
+    """
+    CELL_DEGREES = 0.5
+    INITIAL_KNN_RADIUS_KM = 10.0
+    VERSION_KEY = 'workshop_geo_index:version'
+    # Bez Redis indeks jest przebudowywany co najmniej tak często
+    MAX_AGE_SECONDS = 300
+
+    _instance: Optional['WorkshopGeoIndex'] = None
+    _instance_version = None
+    _dirty = True
+    _lock = threading.Lock()
+
+    def __init__(self, ids: Iterable[int], latitudes: Iterable[float], longitudes: Iterable[float]):
+        self.lon_cell_count = int(round(360 / self.CELL_DEGREES))
+        self.lat_cell_count = int(round(180 / self.CELL_DEGREES))
+
+        ids = np.asarray(ids, dtype=np.int64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        cells = self._lat_cell(latitudes) * self.lon_cell_count + self._lon_cell(longitudes)
+
+        order = np.lexsort((ids, cells))
+        self.ids = ids[order]
+        self.cells = cells[order]
+        self.latitudes = np.radians(latitudes[order])
+        self.longitudes = np.radians(longitudes[order])
+        self.cos_latitudes = np.cos(self.latitudes)
+        # Pozycje w kolejności id - do wyszukiwania odległości konkretnych warsztatów
+        self._id_order = np.argsort(self.ids, kind='stable')
+        self._sorted_ids = self.ids[self._id_order]
+        self.built_at = time_module.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _lat_cell(self, latitudes):
+        return np.clip(np.floor((latitudes + 90) / self.CELL_DEGREES).astype(np.int64), 0, self.lat_cell_count - 1)
+
+    def _lon_cell(self, longitudes):
+        return np.floor((longitudes + 180) / self.CELL_DEGREES).astype(np.int64) % self.lon_cell_count
+
+    @classmethod
+    def build(cls) -> 'WorkshopGeoIndex':
+        """Zbuduj indeks ze wszystkich warsztatów z geolokalizacją (jedno zapytanie)"""
+        from ..models import Workshop
+
+        rows = list(Workshop.objects.filter(
+            latitude__isnull=False,
+            longitude__isnull=False
+        ).values_list('id', 'latitude', 'longitude'))
+        return cls(
+            [row[0] for row in rows],
+            [float(row[1]) for row in rows],
+            [float(row[2]) for row in rows]
+        )
+
+    @classmethod
+    def get(cls) -> 'WorkshopGeoIndex':
+        """Aktualny indeks procesu, przebudowany jeśli warsztaty się zmieniły"""
+        version = cls._shared_version()
+        with cls._lock:
+            instance = cls._instance
+            if not cls._is_current(instance, version):
+                cls._dirty = False
+                cls._instance = instance = cls.build()
+                cls._instance_version = version
+            return instance
+
+    @classmethod
+    async def aget(cls) -> 'WorkshopGeoIndex':
+        """get() dla widoków asynchronicznych; przebudowa indeksu idzie ścieżką synchroniczną"""
+        try:
+            version = await get_async_redis().get(cls.VERSION_KEY)
+        except redis.RedisError:
+            version = None
+        instance = cls._instance
+        if cls._is_current(instance, version):
+            return instance
+        return await sync_to_async(cls.get)()
+
+    @classmethod
+    def _is_current(cls, instance, version) -> bool:
+        return not (instance is None or cls._dirty or version != cls._instance_version
+                    or time_module.monotonic() - instance.built_at > cls.MAX_AGE_SECONDS)
+
+    @classmethod
+    def _shared_version(cls):
+        try:
+            return get_redis().get(cls.VERSION_KEY)
+        except redis.RedisError:
+            return None
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Oznacz indeks do przebudowy: w tym procesie od razu, w pozostałych
+        po zatwierdzeniu transakcji (podbicie wersji w Redis)
+        """
+        cls._dirty = True
+
+        def bump_version():
+            try:
+                get_redis().incr(cls.VERSION_KEY)
+            except redis.RedisError as e:
+                logger.warning(f"Nie można podbić wersji indeksu warsztatów: {str(e)}")
+
+        transaction.on_commit(bump_version)
+
+    def _candidates(self, latitude: float, longitude: float, radius_km: Optional[float]):
+        """Pozycje punktów z komórek prostokąta ograniczającego okrąg (None = wszystkie)"""
+        if radius_km is None or radius_km >= math.pi * EARTH_RADIUS_KM:
+            return None
+
+        angular = radius_km / EARTH_RADIUS_KM
+        delta_lat = math.degrees(angular)
+        lat_min, lat_max = latitude - delta_lat, latitude + delta_lat
+        sin_ratio = math.sin(angular) / max(math.cos(math.radians(latitude)), 1e-12)
+        if lat_min <= -90 or lat_max >= 90 or sin_ratio >= 1:
+            # Okrąg obejmuje biegun - wszystkie długości
+            lon_ranges = [(0, self.lon_cell_count - 1)]
+        else:
+            delta_lon = math.degrees(math.asin(sin_ratio))
+            first = int(math.floor((longitude - delta_lon + 180) / self.CELL_DEGREES))
+            last = int(math.floor((longitude + delta_lon + 180) / self.CELL_DEGREES))
+            if last - first + 1 >= self.lon_cell_count:
+                lon_ranges = [(0, self.lon_cell_count - 1)]
+            else:
+                first %= self.lon_cell_count
+                last %= self.lon_cell_count
+                if first <= last:
+                    lon_ranges = [(first, last)]
+                else:
+                    # Prostokąt przecina południk 180°
+                    lon_ranges = [(first, self.lon_cell_count - 1), (0, last)]
+
+        rows = range(
+            int(self._lat_cell(np.array([max(lat_min, -90.0)]))[0]),
+            int(self._lat_cell(np.array([min(lat_max, 90.0)]))[0]) + 1
+        )
+        bounds = np.array([
+            (row * self.lon_cell_count + lon_first, row * self.lon_cell_count + lon_last + 1)
+            for row in rows for lon_first, lon_last in lon_ranges
+        ], dtype=np.int64)
+        starts = np.searchsorted(self.cells, bounds[:, 0], side='left')
+        ends = np.searchsorted(self.cells, bounds[:, 1], side='left')
+        slices = [np.arange(start, end) for start, end in zip(starts, ends) if end > start]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+
+    def _distances(self, positions, latitude: float, longitude: float):
+        """Haversine od punktu do wskazanych pozycji (None = wszystkie), w km"""
+        if positions is None:
+            positions = slice(None)
+        lat0, lon0 = math.radians(latitude), math.radians(longitude)
+        half_dlat = (self.latitudes[positions] - lat0) / 2
+        half_dlon = (self.longitudes[positions] - lon0) / 2
+        a = np.sin(half_dlat) ** 2 + math.cos(lat0) * self.cos_latitudes[positions] * np.sin(half_dlon) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    def _ranked(self, positions, distances, offset: int, limit: Optional[int]) -> List[Tuple[int, float]]:
+        """Posortuj po (odległość, id) i zwróć stronę [offset, offset + limit)"""
+        ids = self.ids[positions] if positions is not None else self.ids
+        end = len(distances) if limit is None else min(offset + limit, len(distances))
+        if offset >= end:
+            return []
+        if end < len(distances):
+            # Częściowe sortowanie - pełny sort tylko dla początku rankingu
+            selected = np.argpartition(distances, end - 1)[:end]
+            ids, distances = ids[selected], distances[selected]
+        order = np.lexsort((ids, distances))[offset:end]
+        return list(zip(ids[order].tolist(), distances[order].tolist()))
+
+    def within(self, latitude: float, longitude: float, radius_km: float,
+               offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Warsztaty w promieniu radius_km posortowane po odległości.
+        Zwraca stronę par (id, odległość w km) oraz liczbę wszystkich trafień.
+        """
+        positions = self._candidates(latitude, longitude, radius_km)
+        distances = self._distances(positions, latitude, longitude)
+        mask = distances <= radius_km
+        if positions is None:
+            positions = np.flatnonzero(mask)
+        else:
+            positions = positions[mask]
+        distances = distances[mask]
+        return self._ranked(positions, distances, offset, limit), len(distances)
+
+    def nearest(self, latitude: float, longitude: float, k: int) -> List[Tuple[int, float]]:
+        """k najbliższych warsztatów; promień wyszukiwania rośnie, aż zawiera k punktów"""
+        if k <= 0 or not len(self):
+            return []
+        radius_km = self.INITIAL_KNN_RADIUS_KM
+        while True:
+            results, total = self.within(latitude, longitude, radius_km, limit=k)
+            if total >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                return results
+            radius_km *= 4
+
+    def distances_for(self, latitude: float, longitude: float, ids: Iterable[int]) -> Dict[int, float]:
+        """Odległości do wskazanych warsztatów (pomija warsztaty spoza indeksu)"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        if not len(ids) or not len(self):
+            return {}
+        found = np.searchsorted(self._sorted_ids, ids)
+        found = np.minimum(found, len(self._sorted_ids) - 1)
+        present = self._sorted_ids[found] == ids
+        positions = self._id_order[found[present]]
+        distances = self._distances(positions, latitude, longitude)
+        return dict(zip(ids[present].tolist(), distances.tolist()))
@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.utils import timezone
+from appointments.models import Appointment
+from .mechanicAvailabilityService import MechanicDayIndex
+
+
+class MechanicAssignmentService:
+    """
+    Zbiorcze przypisywanie mechaników do wizyt warsztatu na dany dzień.
+    Wizyty są rozdzielane zachłannie w kolejności rozpoczęcia (interval scheduling)
+    na indeksie zajętości w pamięci; koszt wyboru mechanika opisuje
+    MechanicDayIndex.pick_mechanic (równe obciążenie + specjalizacja).
+    """
+
+    @staticmethod
+    def _unassigned_appointments(workshop_id, target_date, lock=False):
+        day_start = timezone.make_aware(datetime.combine(target_date, time.min))
+        queryset = Appointment.objects.filter(
+            workshop_id=workshop_id,
+            assigned_mechanic__isnull=True,
+            date__gte=day_start,
+            date__lt=day_start + timedelta(days=1),
+            status__in=Appointment.ACTIVE_STATUSES
+        ).select_related('vehicle').order_by('date', '-duration_estimate', 'id')
+        if lock:
+            queryset = queryset.select_for_update(of=('self',))
+        return list(queryset)
+
+    @staticmethod
+    def plan(index, appointments):
+        """
+        Rozdziel wizyty między mechaników, rezerwując ich czas w indeksie.
+        Zwraca listy (wizyta, mechanik) oraz wizyt bez wolnego mechanika.
+        """
+        assignments = []
+        unassigned = []
+        for appointment in appointments:
+            start_time = timezone.localtime(appointment.date).time()
+            duration = appointment.duration_estimate or Appointment.DEFAULT_DURATION
+            mechanic = index.pick_mechanic(start_time, duration, appointment.vehicle.brand)
+            if mechanic is None:
+                unassigned.append(appointment)
+                continue
+            index.reserve(mechanic.id, start_time, duration)
+            assignments.append((appointment, mechanic))
+        return assignments, unassigned
+
+    @classmethod
+    def assign_day(cls, workshop_id, target_date, dry_run=False):
+        """
+        Przypisz mechaników do wszystkich nieprzypisanych wizyt dnia w jednej transakcji.
+        Z dry_run=True zwraca tylko plan bez zapisu.
+        """
+        with transaction.atomic():
+            appointments = cls._unassigned_appointments(workshop_id, target_date, lock=not dry_run)
+            index = MechanicDayIndex.build(workshop_id, target_date)
+            assignments, unassigned = cls.plan(index, appointments)
+
+            if assignments and not dry_run:
+                for appointment, mechanic in assignments:
+                    appointment.assigned_mechanic = mechanic
+                Appointment.objects.bulk_update(
+                    [appointment for appointment, _ in assignments],
+                    ['assigned_mechanic'],
+                    batch_size=500
+                )
+
+        return {
+            'workshop_id': workshop_id,
+            'date': target_date.isoformat(),
+            'dry_run': dry_run,
+            'assigned': [
+                {
+                    'appointment_id': appointment.id,
+                    'time': timezone.localtime(appointment.date).strftime('%H:%M'),
+                    'mechanic_id': mechanic.id,
+                    'vehicle_brand': appointment.vehicle.brand,
+                    'specialization_match': appointment.vehicle.brand.lower() in index.specializations(mechanic)
+                }
+                for appointment, mechanic in assignments
+            ],
+            'unassigned': [
+                {
+                    'appointment_id': appointment.id,
+                    'time': timezone.localtime(appointment.date).strftime('%H:%M'),
+                    'reason': 'Brak wolnego mechanika w tym terminie'
+                }
+                for appointment in unassigned
+            ],
+            'utilisation': index.utilisation()
+        }
@@ -1,11 +1,14 @@
 from datetime import datetime, timedelta, time
+from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from workshops.models import Workshop, WorkshopMechanic, MechanicAvailability, MechanicBreak
 from appointments.models import Appointment
 from users.models import User
+from backend.singleFlight import SingleFlight
 
 class MechanicAvailabilityService:
     """Serwis do zarządzania dostępnością mechaników"""
+    flight = SingleFlight('mechanic_availability')
     
     @staticmethod
     def get_workshop_mechanics(workshop_id):
@@ -14,153 +17,345 @@ class MechanicAvailabilityService:
             workshop_id=workshop_id,
             mechanic__role='mechanic',
             mechanic__is_active=True
-        ).select_related('mechanic')
+        ).select_related('mechanic', 'mechanic__profile')
+
+    @staticmethod
+    def get_day_index(workshop_id, date):
+        """
+        Zwraca indeks zajętości mechaników warsztatu na dany dzień,
+        z czasem zablokowanym w kreatorze rezerwacji oznaczonym jako zajęty
+        """
+        from .slotHoldService import SlotHoldService
+
+        index = MechanicDayIndex.build(workshop_id, date)
+        for hold in SlotHoldService.get_active_holds(workshop_id, date):
+            if hold['mechanic_id'] is not None:
+                index.reserve(
+                    hold['mechanic_id'],
+                    time(hold['start_minute'] // 60, hold['start_minute'] % 60),
+                    hold['end_minute'] - hold['start_minute']
+                )
+        return index
     
+    @staticmethod
+    def _mechanic_data(mechanic, is_available):
+        specializations = []
+        if hasattr(mechanic, 'profile') and mechanic.profile:
+            specializations = mechanic.profile.specializations or []
+        return {
+            'id': mechanic.id,
+            'first_name': mechanic.first_name,
+            'last_name': mechanic.last_name,
+            'full_name': f"{mechanic.first_name} {mechanic.last_name}",
+            'email': mechanic.email,
+            'is_available': is_available,
+            'specializations': specializations
+        }
+
+    @classmethod
+    def get_mechanic_availability(cls, workshop_id, date, time_slot=None, duration_minutes=60):
+        """
+        Dostępność wszystkich mechaników warsztatu o danej godzinie lub (bez time_slot)
+        w danym dniu. Identyczne równoległe zapytania współdzielą jedno obliczenie.
+        """
+        time_key = time_slot.strftime('%H:%M') if time_slot else ''
+        return cls.flight.run(
+            f"{workshop_id}:{date.isoformat()}:{time_key}:{duration_minutes}",
+            lambda: cls._compute_mechanic_availability(workshop_id, date, time_slot, duration_minutes),
+            tag=f'workshop:{workshop_id}'
+        )
+
+    @classmethod
+    def _compute_mechanic_availability(cls, workshop_id, date, time_slot, duration_minutes):
+        index = cls.get_day_index(workshop_id, date)
+        all_mechanics = index.workshop_mechanics
+
+        if time_slot is None:
+            mechanic_data = [
+                cls._mechanic_data(wm.mechanic, index.works_on_day(wm.mechanic_id))
+                for wm in all_mechanics
+            ]
+            return {
+                'mechanics': mechanic_data,
+                'available_count': sum(1 for m in mechanic_data if m['is_available']),
+                'total_count': len(all_mechanics),
+                'date': date.isoformat()
+            }
+
+        available_mechanics = index.available_mechanics(time_slot, duration_minutes)
+        available_mechanic_ids = {mechanic.id for mechanic in available_mechanics}
+        # Najpierw dostępni, potem pozostali mechanicy warsztatu
+        mechanic_data = [cls._mechanic_data(mechanic, True) for mechanic in available_mechanics]
+        mechanic_data.extend(
+            cls._mechanic_data(wm.mechanic, False)
+            for wm in all_mechanics if wm.mechanic_id not in available_mechanic_ids
+        )
+        return {
+            'mechanics': mechanic_data,
+            'available_count': len(available_mechanics),
+            'total_count': len(all_mechanics),
+            'date': date.isoformat(),
+            'time': time_slot.strftime('%H:%M')
+        }
+
     @staticmethod
     def get_available_mechanics(workshop_id, date, time_slot, duration_minutes=60):
         """
         Zwraca listę dostępnych mechaników w danym czasie
         """
-        workshop_mechanics = MechanicAvailabilityService.get_workshop_mechanics(workshop_id)
-        available_mechanics = []
-        
-        appointment_time = datetime.combine(date, time_slot)
-        appointment_end = appointment_time + timedelta(minutes=duration_minutes)
-        
-        for workshop_mechanic in workshop_mechanics:
-            if MechanicAvailabilityService.is_mechanic_available(
-                workshop_mechanic, 
-                date, 
-                time_slot, 
-                duration_minutes
-            ):
-                available_mechanics.append(workshop_mechanic.mechanic)
-        
-        return available_mechanics
+        index = MechanicAvailabilityService.get_day_index(workshop_id, date)
+        return index.available_mechanics(time_slot, duration_minutes)
     
     @staticmethod
     def is_mechanic_available(workshop_mechanic, date, time_slot, duration_minutes=60):
         """
         Sprawdza czy mechanik jest dostępny w danym czasie
         """
-        appointment_time = datetime.combine(date, time_slot)
-        # Make appointment_time timezone-aware to match database timestamps
-        if timezone.is_naive(appointment_time):
-            appointment_time = timezone.make_aware(appointment_time)
-        appointment_end = appointment_time + timedelta(minutes=duration_minutes)
-        
-        # Sprawdź podstawową dostępność (harmonogram pracy)
-        weekday = date.weekday()
-        try:
-            availability = MechanicAvailability.objects.get(
-                workshop_mechanic=workshop_mechanic,
-                weekday=weekday
-            )
-            
-            if not availability.is_available:
-                return False
-                
-            # Sprawdź czy czas mieści się w godzinach pracy
-            if not (availability.start_time <= time_slot and 
-                    appointment_end.time() <= availability.end_time):
-                return False
-                
-        except MechanicAvailability.DoesNotExist:
-            # Brak harmonogramu = niedostępny
-            return False
-        
-        # Sprawdź czy mechanik nie ma przerwy w tym czasie
-        breaks = MechanicBreak.objects.filter(
-            workshop_mechanic=workshop_mechanic,
-            start_date__lte=date,
-            end_date__gte=date
+        index = MechanicDayIndex.build(
+            workshop_mechanic.workshop_id,
+            date,
+            workshop_mechanics=[workshop_mechanic]
         )
-        
-        for break_obj in breaks:
-            if break_obj.overlaps_with_slot(date, time_slot):
-                return False
-        
-        # Sprawdź czy mechanik nie ma już appointment w tym czasie
-        existing_appointments = Appointment.objects.filter(
-            assigned_mechanic=workshop_mechanic.mechanic,
-            date__date=date,
-            status__in=['scheduled', 'in_progress']
-        )
-        
-        for existing_apt in existing_appointments:
-            existing_end = existing_apt.estimated_end_time
-            if (appointment_time < existing_end and 
-                appointment_end > existing_apt.date):
-                return False
-        
-        return True
+        return index.is_available(workshop_mechanic.mechanic_id, time_slot, duration_minutes)
     
     @staticmethod
     def get_available_time_slots(workshop_id, date, duration_minutes=60):
         """
         Zwraca słownik dostępnych slotów czasowych z listą dostępnych mechaników
         """
-        workshop_mechanics = MechanicAvailabilityService.get_workshop_mechanics(workshop_id)
-        
+        index = MechanicAvailabilityService.get_day_index(workshop_id, date)
+        return index.available_time_slots(duration_minutes)
+    
+    @staticmethod
+    def auto_assign_mechanic(workshop_id, date, time_slot, duration_minutes=60, vehicle_brand=None):
+        """
+        Automatycznie przypisuje mechanika na podstawie dostępności:
+        najmniej obciążonego, z preferencją dla specjalisty od marki pojazdu
+        """
+        index = MechanicAvailabilityService.get_day_index(workshop_id, date)
+        return index.pick_mechanic(time_slot, duration_minutes, vehicle_brand)
+
+
+class MechanicDayIndex:
+    """
+    Indeks zajętości mechaników na jeden dzień.
+    Dla każdego mechanika trzymana jest maska bitowa wolnego czasu, w której
+    bit n oznacza przedział [n * SLOT_MINUTES, (n + 1) * SLOT_MINUTES) minut od północy.
+    """
+    SLOT_MINUTES = 5
+    SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+    # Premia (w punktach obciążenia 0-1) za zgodność specjalizacji z marką pojazdu
+    SPECIALIZATION_WEIGHT = 0.25
+
+    def __init__(self, target_date, workshop_mechanics, schedules, free_masks, capacity_masks=None):
+        self.date = target_date
+        self.workshop_mechanics = list(workshop_mechanics)
+        self.schedules = schedules
+        self.free_masks = free_masks
+        # Czas pracy bez przerw; zajętość = capacity & ~free
+        self.capacity_masks = capacity_masks if capacity_masks is not None else dict(free_masks)
+
+    @classmethod
+    def build(cls, workshop_id, target_date, workshop_mechanics=None):
+        """Zbuduj indeks dla warsztatu na dany dzień stałą liczbą zapytań"""
+        if workshop_mechanics is None:
+            workshop_mechanics = MechanicAvailabilityService.get_workshop_mechanics(workshop_id)
+        workshop_mechanics = list(workshop_mechanics)
+        workshop_mechanic_ids = [wm.id for wm in workshop_mechanics]
+        mechanic_ids = [wm.mechanic_id for wm in workshop_mechanics]
+
         if not workshop_mechanics:
-            return {}
-        
-        # Znajdź wszystkie możliwe sloty na podstawie harmonogramów mechaników
-        all_slots = set()
-        weekday = date.weekday()
-        
-        for workshop_mechanic in workshop_mechanics:
-            try:
-                availability = MechanicAvailability.objects.get(
-                    workshop_mechanic=workshop_mechanic,
-                    weekday=weekday
+            return cls(target_date, [], {}, {}, {})
+
+        schedules = {
+            availability.workshop_mechanic_id: availability
+            for availability in MechanicAvailability.objects.filter(
+                workshop_mechanic_id__in=workshop_mechanic_ids,
+                weekday=target_date.weekday()
+            )
+        }
+
+        break_masks = dict.fromkeys(mechanic_ids, 0)
+        booked_masks = dict.fromkeys(mechanic_ids, 0)
+        wm_to_mechanic = {wm.id: wm.mechanic_id for wm in workshop_mechanics}
+
+        for break_obj in MechanicBreak.objects.filter(
+            workshop_mechanic_id__in=workshop_mechanic_ids,
+            start_date__lte=target_date,
+            end_date__gte=target_date
+        ):
+            mechanic_id = wm_to_mechanic[break_obj.workshop_mechanic_id]
+            if break_obj.start_time and break_obj.end_time:
+                break_masks[mechanic_id] |= cls.interval_mask(
+                    cls._minutes(break_obj.start_time),
+                    cls._minutes(break_obj.end_time)
                 )
-                
-                if availability.is_available:
-                    # Generuj sloty co 30 minut
-                    current_time = availability.start_time
-                    while current_time <= availability.end_time:
-                        # Sprawdź czy cały appointment zmieści się przed końcem pracy
-                        slot_end_time = (
-                            datetime.combine(date, current_time) + 
-                            timedelta(minutes=duration_minutes)
-                        ).time()
-                        
-                        if slot_end_time <= availability.end_time:
-                            all_slots.add(current_time)
-                        
-                        # Następny slot za 30 minut
-                        current_datetime = datetime.combine(date, current_time)
-                        current_datetime += timedelta(minutes=30)
-                        current_time = current_datetime.time()
-                        
-            except MechanicAvailability.DoesNotExist:
+            else:
+                break_masks[mechanic_id] |= cls.interval_mask(0, 24 * 60)
+
+        day_start = timezone.make_aware(datetime.combine(target_date, time.min))
+        day_end = day_start + timedelta(days=1)
+        # Zakres [date, end_date) - również wizyty rozpoczęte poprzedniego dnia
+        for mechanic_id, start, end in Appointment.objects.overlapping(day_start, day_end).filter(
+            assigned_mechanic_id__in=mechanic_ids,
+            status__in=Appointment.ACTIVE_STATUSES
+        ).values_list('assigned_mechanic_id', 'date', 'end_date'):
+            booked_masks[mechanic_id] |= cls.interval_mask(
+                int((start - day_start).total_seconds() // 60),
+                int(-(-(end - day_start).total_seconds() // 60))
+            )
+
+        free_masks = {}
+        capacity_masks = {}
+        for wm in workshop_mechanics:
+            availability = schedules.get(wm.id)
+            if availability is None or not availability.is_available:
+                free_masks[wm.mechanic_id] = capacity_masks[wm.mechanic_id] = 0
                 continue
-        
-        # Dla każdego slotu sprawdź dostępnych mechaników
-        slots_with_mechanics = {}
-        for time_slot in sorted(all_slots):
-            available_mechanics = MechanicAvailabilityService.get_available_mechanics(
-                workshop_id, date, time_slot, duration_minutes
+            working_mask = cls.interval_mask(
+                cls._minutes(availability.start_time),
+                cls._minutes(availability.end_time),
+                inner=True
             )
-            
-            if available_mechanics:
-                slots_with_mechanics[time_slot] = available_mechanics
-        
-        return slots_with_mechanics
-    
+            capacity_masks[wm.mechanic_id] = working_mask & ~break_masks[wm.mechanic_id]
+            free_masks[wm.mechanic_id] = capacity_masks[wm.mechanic_id] & ~booked_masks[wm.mechanic_id]
+
+        return cls(target_date, workshop_mechanics, schedules, free_masks, capacity_masks)
+
     @staticmethod
-    def auto_assign_mechanic(workshop_id, date, time_slot, duration_minutes=60):
+    def _minutes(value):
+        return value.hour * 60 + value.minute
+
+    @classmethod
+    def interval_mask(cls, start_minute, end_minute, inner=False):
         """
-        Automatycznie przypisuje mechanika na podstawie dostępności
+        Maska bitów pokrywających przedział [start_minute, end_minute).
+        Domyślnie zaokrągla na zewnątrz (zajętość), z inner=True do wewnątrz (godziny pracy).
         """
-        available_mechanics = MechanicAvailabilityService.get_available_mechanics(
-            workshop_id, date, time_slot, duration_minutes
+        if inner:
+            first = -(-start_minute // cls.SLOT_MINUTES)
+            last = end_minute // cls.SLOT_MINUTES
+        else:
+            first = start_minute // cls.SLOT_MINUTES
+            last = -(-end_minute // cls.SLOT_MINUTES)
+        first = max(first, 0)
+        last = min(last, cls.SLOTS_PER_DAY)
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def works_on_day(self, mechanic_id):
+        """Czy mechanik ma w harmonogramie pracę tego dnia"""
+        for wm in self.workshop_mechanics:
+            if wm.mechanic_id == mechanic_id:
+                availability = self.schedules.get(wm.id)
+                return availability is not None and availability.is_available
+        return False
+
+    def is_available(self, mechanic_id, time_slot, duration_minutes=60):
+        """Czy mechanik ma wolny cały przedział od time_slot przez duration_minutes"""
+        start_minute = self._minutes(time_slot)
+        end_minute = start_minute + duration_minutes
+        if end_minute > 24 * 60:
+            return False
+        job_mask = self.interval_mask(start_minute, end_minute)
+        return self.free_masks.get(mechanic_id, 0) & job_mask == job_mask
+
+    def available_mechanics(self, time_slot, duration_minutes=60):
+        """Mechanicy wolni w danym przedziale, w kolejności z get_workshop_mechanics"""
+        return [
+            wm.mechanic for wm in self.workshop_mechanics
+            if self.is_available(wm.mechanic_id, time_slot, duration_minutes)
+        ]
+
+    def reserve(self, mechanic_id, time_slot, duration_minutes=60):
+        """Oznacz przedział jako zajęty (np. po przypisaniu wizyty w pamięci)"""
+        start_minute = self._minutes(time_slot)
+        self.free_masks[mechanic_id] = self.free_masks.get(mechanic_id, 0) & ~self.interval_mask(
+            start_minute, start_minute + duration_minutes
+        )
+
+    def release(self, mechanic_id, time_slot, duration_minutes=60):
+        """Zwolnij przedział (np. przenoszonej wizyty) w granicach czasu pracy"""
+        start_minute = self._minutes(time_slot)
+        self.free_masks[mechanic_id] = self.free_masks.get(mechanic_id, 0) | (
+            self.interval_mask(start_minute, start_minute + duration_minutes)
+            & self.capacity_masks.get(mechanic_id, 0)
         )
-        
-        if available_mechanics:
-            # Prosta strategia - wybierz pierwszego dostępnego
-            # Można rozwinąć o bardziej zaawansowane algorytmy
-            return available_mechanics[0]
-        
-        return None
\ No newline at end of file
+
+    def capacity_minutes(self, mechanic_id):
+        """Czas pracy mechanika tego dnia (bez przerw) w minutach"""
+        return self.capacity_masks.get(mechanic_id, 0).bit_count() * self.SLOT_MINUTES
+
+    def booked_minutes(self, mechanic_id):
+        """Zajęty czas pracy mechanika w minutach"""
+        booked = self.capacity_masks.get(mechanic_id, 0) & ~self.free_masks.get(mechanic_id, 0)
+        return booked.bit_count() * self.SLOT_MINUTES
+
+    def load(self, mechanic_id):
+        """Obciążenie mechanika jako ułamek czasu pracy (0-1)"""
+        capacity = self.capacity_minutes(mechanic_id)
+        return self.booked_minutes(mechanic_id) / capacity if capacity else 1.0
+
+    @staticmethod
+    def specializations(mechanic):
+        """Marki, w których specjalizuje się mechanik (z profilu)"""
+        try:
+            return [brand.lower() for brand in (mechanic.profile.specializations or [])]
+        except ObjectDoesNotExist:
+            return []
+
+    def pick_mechanic(self, time_slot, duration_minutes=60, vehicle_brand=None):
+        """
+        Wybierz wolnego mechanika o najniższym koszcie: obciążenie po przypisaniu
+        minus SPECIALIZATION_WEIGHT, gdy specjalizuje się w marce pojazdu
+        """
+        brand = vehicle_brand.lower() if vehicle_brand else None
+        best, best_cost = None, None
+        for wm in self.workshop_mechanics:
+            if not self.is_available(wm.mechanic_id, time_slot, duration_minutes):
+                continue
+            capacity = self.capacity_minutes(wm.mechanic_id)
+            cost = (self.booked_minutes(wm.mechanic_id) + duration_minutes) / capacity
+            if brand and brand in self.specializations(wm.mechanic):
+                cost -= self.SPECIALIZATION_WEIGHT
+            if best_cost is None or cost < best_cost:
+                best, best_cost = wm.mechanic, cost
+        return best
+
+    def utilisation(self):
+        """Raport obciążenia mechaników tego dnia"""
+        report = []
+        for wm in self.workshop_mechanics:
+            capacity = self.capacity_minutes(wm.mechanic_id)
+            booked = self.booked_minutes(wm.mechanic_id)
+            report.append({
+                'mechanic_id': wm.mechanic_id,
+                'full_name': f"{wm.mechanic.first_name} {wm.mechanic.last_name}",
+                'capacity_minutes': capacity,
+                'booked_minutes': booked,
+                'utilisation': round(booked / capacity, 3) if capacity else 0.0
+            })
+        return report
+
+    def candidate_slots(self, duration_minutes=60, step_minutes=30):
+        """Godziny rozpoczęcia co step_minutes od początku pracy każdego mechanika"""
+        slots = set()
+        for availability in self.schedules.values():
+            if not availability.is_available:
+                continue
+            end_minute = self._minutes(availability.end_time)
+            minute = self._minutes(availability.start_time)
+            while minute + duration_minutes <= end_minute:
+                slots.add(time(minute // 60, minute % 60))
+                minute += step_minutes
+        return sorted(slots)
+
+    def available_time_slots(self, duration_minutes=60, step_minutes=30):
+        """Słownik {godzina: [mechanicy]} dla slotów z co najmniej jednym wolnym mechanikiem"""
+        slots_with_mechanics = {}
+        for time_slot in self.candidate_slots(duration_minutes, step_minutes):
+            mechanics = self.available_mechanics(time_slot, duration_minutes)
+            if mechanics:
+                slots_with_mechanics[time_slot] = mechanics
+        return slots_with_mechanics
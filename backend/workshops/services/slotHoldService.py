@@ -0,0 +1,252 @@
+import json
+import logging
+import time as time_module
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import redis
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from backend.dbRouter import DatabaseRouting
+from backend.redisClient import get_async_redis, get_redis
+from backend.singleFlight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class SlotUnavailableError(Exception):
+    """Termin jest zajęty przez wizytę lub blokadę innego klienta"""
+
+
+# KEYS[1] indeks blokad dnia, KEYS[2] klucz blokady
+# ARGV: teraz (ms), wygaśnięcie (ms), element indeksu, początek, koniec (minuty), dane blokady, TTL (ms)
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local start_minute = tonumber(ARGV[4])
+local end_minute = tonumber(ARGV[5])
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    local _, _, hold_start, hold_end = string.find(member, '^[^|]+|(%d+)|(%d+)|')
+    if tonumber(hold_start) < end_minute and tonumber(hold_end) > start_minute then
+        return 0
+    end
+end
+redis.call('SET', KEYS[2], ARGV[6], 'PX', ARGV[7])
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[7]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[7])
+end
+return 1
+"""
+
+# KEYS[1] klucz blokady, KEYS[2] klucz potwierdzania, KEYS[3] indeks blokad dnia
+# ARGV: czas na potwierdzenie (ms), teraz (ms), element indeksu
+# Zwraca 0 - blokada wygasła, 1 - blokada jest już potwierdzana, 2 - przejęta
+CLAIM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if not redis.call('SET', KEYS[2], '1', 'NX', 'PX', ARGV[1]) then
+    return 1
+end
+if redis.call('PTTL', KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call('PEXPIRE', KEYS[1], ARGV[1])
+    redis.call('ZADD', KEYS[3], 'XX', tonumber(ARGV[2]) + tonumber(ARGV[1]), ARGV[3])
+    if redis.call('PTTL', KEYS[3]) < tonumber(ARGV[1]) then
+        redis.call('PEXPIRE', KEYS[3], ARGV[1])
+    end
+end
+return 2
+"""
+
+
+class SlotHoldService:
+    """
+    Krótkotrwałe blokady terminów dla kreatora rezerwacji, trzymane wyłącznie w Redis.
+    Blokada to klucz z TTL oraz wpis w indeksie dnia warsztatu (sorted set, score =
+    czas wygaśnięcia), więc wygasłe blokady znikają same, bez zadania sprzątającego.
+    """
+    HOLD_TTL_SECONDS = 300
+    CONFIRM_GRACE_SECONDS = 30
+    KEY_PREFIX = 'slot_hold'
+
+    @classmethod
+    def _hold_key(cls, hold_id: str) -> str:
+        return f'{cls.KEY_PREFIX}:{hold_id}'
+
+    @classmethod
+    def _claim_key(cls, hold_id: str) -> str:
+        return f'{cls.KEY_PREFIX}:{hold_id}:confirming'
+
+    @classmethod
+    def _index_key(cls, workshop_id: int, target_date: date) -> str:
+        return f'{cls.KEY_PREFIX}s:{workshop_id}:{target_date.isoformat()}'
+
+    @staticmethod
+    def _index_member(hold: Dict) -> str:
+        return f"{hold['id']}|{hold['start_minute']}|{hold['end_minute']}|{hold['mechanic_id'] or ''}"
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time_module.time() * 1000)
+
+    @classmethod
+    def get_active_holds(cls, workshop_id: int, target_date: date) -> List[Dict]:
+        """
+        Aktywne blokady warsztatu w danym dniu (minuty od północy, czas lokalny).
+        Niedostępność Redis nie blokuje odczytu dostępności - zwracana jest pusta lista.
+        """
+        try:
+            members = get_redis().zrangebyscore(cls._index_key(workshop_id, target_date), cls._now_ms(), '+inf')
+        except redis.RedisError as e:
+            logger.warning(f"Nie można pobrać blokad terminów z Redis: {str(e)}")
+            return []
+        return cls._parse_holds(members)
+
+    @classmethod
+    async def aget_active_holds(cls, workshop_id: int, target_date: date) -> List[Dict]:
+        """get_active_holds dla widoków asynchronicznych"""
+        try:
+            members = await get_async_redis().zrangebyscore(
+                cls._index_key(workshop_id, target_date), cls._now_ms(), '+inf'
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Nie można pobrać blokad terminów z Redis: {str(e)}")
+            return []
+        return cls._parse_holds(members)
+
+    @staticmethod
+    def _parse_holds(members) -> List[Dict]:
+        holds = []
+        for member in members:
+            hold_id, start_minute, end_minute, mechanic_id = member.split('|')
+            holds.append({
+                'id': hold_id,
+                'start_minute': int(start_minute),
+                'end_minute': int(end_minute),
+                'mechanic_id': int(mechanic_id) if mechanic_id else None
+            })
+        return holds
+
+    @classmethod
+    def create_hold(cls, user, workshop_id: int, start: datetime, duration_minutes: int,
+                    mechanic_id: Optional[int] = None) -> Dict:
+        """Zablokuj termin na HOLD_TTL_SECONDS, jeśli jest wolny w bazie i nie jest zablokowany"""
+        from .availabilityService import AvailabilityService
+        from .mechanicAvailabilityService import MechanicAvailabilityService
+
+        local_start = timezone.localtime(start) if timezone.is_aware(start) else start
+        start_minute = local_start.hour * 60 + local_start.minute
+        end_minute = start_minute + duration_minutes
+        if duration_minutes <= 0 or end_minute > 24 * 60:
+            raise ValueError("Blokada musi mieścić się w jednym dniu")
+
+        # Sprawdzenie przed blokadą - replika mogłaby jeszcze nie widzieć świeżej rezerwacji
+        with DatabaseRouting.primary():
+            if not AvailabilityService.check_slot_availability(workshop_id, local_start, duration_minutes):
+                raise SlotUnavailableError("Termin nie jest dostępny")
+            if mechanic_id is not None:
+                index = MechanicAvailabilityService.get_day_index(workshop_id, local_start.date())
+                if not index.is_available(mechanic_id, local_start.time(), duration_minutes):
+                    raise SlotUnavailableError("Mechanik nie jest dostępny w tym terminie")
+
+        aware_start = timezone.make_aware(local_start.replace(tzinfo=None))
+        now_ms = cls._now_ms()
+        ttl_ms = cls.HOLD_TTL_SECONDS * 1000
+        hold = {
+            'id': uuid.uuid4().hex,
+            'user_id': user.id,
+            'workshop_id': workshop_id,
+            'mechanic_id': mechanic_id,
+            'date': local_start.date().isoformat(),
+            'start': aware_start.isoformat(),
+            'end': (aware_start + timedelta(minutes=duration_minutes)).isoformat(),
+            'start_minute': start_minute,
+            'end_minute': end_minute,
+            'duration_minutes': duration_minutes,
+            'expires_at': datetime.fromtimestamp((now_ms + ttl_ms) / 1000, tz=timezone.get_current_timezone()).isoformat()
+        }
+
+        acquired = get_redis().eval(
+            ACQUIRE_SCRIPT, 2,
+            cls._index_key(workshop_id, local_start.date()), cls._hold_key(hold['id']),
+            now_ms, now_ms + ttl_ms, cls._index_member(hold),
+            start_minute, end_minute, json.dumps(hold), ttl_ms
+        )
+        if not acquired:
+            raise SlotUnavailableError("Termin jest zablokowany przez innego klienta")
+        cls._forget_mechanic_results(hold)
+        return hold
+
+    @staticmethod
+    def _forget_mechanic_results(hold: Dict):
+        """Blokada z mechanikiem zmienia wyniki dostępności mechaników współdzielone przez SingleFlight"""
+        if hold['mechanic_id'] is not None:
+            SingleFlight.forget(f"workshop:{hold['workshop_id']}")
+
+    @classmethod
+    def get_hold(cls, hold_id: str, user=None) -> Dict:
+        """Pobierz aktywną blokadę; tylko właściciel ma do niej dostęp"""
+        raw = get_redis().get(cls._hold_key(hold_id))
+        if raw is None:
+            raise Http404("Blokada nie istnieje lub wygasła")
+        hold = json.loads(raw)
+        if user is not None and hold['user_id'] != user.id:
+            raise PermissionError("Blokada należy do innego użytkownika")
+        return hold
+
+    @classmethod
+    def release_hold(cls, hold: Dict):
+        """Usuń blokadę i jej wpis w indeksie dnia"""
+        pipeline = get_redis().pipeline(transaction=True)
+        pipeline.delete(cls._hold_key(hold['id']), cls._claim_key(hold['id']))
+        pipeline.zrem(cls._index_key(hold['workshop_id'], date.fromisoformat(hold['date'])), cls._index_member(hold))
+        pipeline.execute()
+        cls._forget_mechanic_results(hold)
+
+    @classmethod
+    def confirm_hold(cls, hold_id: str, user, vehicle_id: int, appointment_type: str = 'service',
+                     service_description: Optional[str] = None):
+        """
+        Zamień blokadę w wizytę. Blokada jest przejmowana (i przedłużana o
+        CONFIRM_GRACE_SECONDS) przed zapisem, a usuwana dopiero po zatwierdzeniu transakcji.
+        """
+        from appointments.models import Appointment
+        from vehicles.models import Vehicle
+
+        hold = cls.get_hold(hold_id, user)
+        vehicle = Vehicle.objects.filter(id=vehicle_id, owner=user).first()
+        if vehicle is None:
+            raise ValueError("Pojazd nie istnieje lub nie należy do użytkownika")
+
+        client = get_redis()
+        claimed = client.eval(
+            CLAIM_SCRIPT, 3,
+            cls._hold_key(hold_id), cls._claim_key(hold_id),
+            cls._index_key(hold['workshop_id'], date.fromisoformat(hold['date'])),
+            cls.CONFIRM_GRACE_SECONDS * 1000, cls._now_ms(), cls._index_member(hold)
+        )
+        if claimed == 0:
+            raise Http404("Blokada nie istnieje lub wygasła")
+        if claimed == 1:
+            raise SlotUnavailableError("Blokada jest już potwierdzana")
+
+        try:
+            with transaction.atomic():
+                appointment = Appointment.objects.create(
+                    client=user,
+                    workshop_id=hold['workshop_id'],
+                    vehicle=vehicle,
+                    assigned_mechanic_id=hold['mechanic_id'],
+                    date=datetime.fromisoformat(hold['start']),
+                    duration_estimate=hold['duration_minutes'],
+                    appointment_type=appointment_type,
+                    service_description=service_description
+                )
+                transaction.on_commit(lambda: cls.release_hold(hold))
+        except Exception:
+            # Nieudany zapis - blokada zostaje, klient może spróbować ponownie
+            client.delete(cls._claim_key(hold_id))
+            raise
+
+        return appointment
@@ -0,0 +1,129 @@
+import math
+import re
+from typing import Optional
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import ASin, Cast, Coalesce, Cos, Least, Power, Radians, Sin, Sqrt
+from ..models import Workshop
+from .geoIndexService import EARTH_RADIUS_KM
+
+
+class WorkshopSearchService:
+    """
+    Wyszukiwanie warsztatów w całości w SQL.
+    Na PostgreSQL: tsvector z indeksem GIN (prefiksowe tsquery) oraz podobieństwo
+    trigramowe nazwy (literówki). Trafność łączy dopasowanie tekstu, ocenę
+    i odległość; na innych bazach dopasowanie tekstu zastępuje icontains.
+    """
+    SORT_OPTIONS = ('name', 'rating', 'distance', 'relevance')
+
+    RATING_WEIGHT = 0.2
+    DISTANCE_WEIGHT = 0.3
+    # Odległość (km), przy której składnik odległości spada o połowę
+    DISTANCE_HALF_KM = 10
+
+    @staticmethod
+    def _uses_postgres() -> bool:
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def _prefix_query(query: str) -> Optional[SearchQuery]:
+        """tsquery dopasowujące każde słowo zapytania jako prefiks (autouzupełnianie)"""
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return None
+        return SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=Workshop.SEARCH_CONFIG
+        )
+
+    @staticmethod
+    def distance_expression(latitude: float, longitude: float):
+        """Haversine w SQL (km) od podanego punktu do lokalizacji warsztatu"""
+        lat0, lon0 = math.radians(latitude), math.radians(longitude)
+        workshop_lat = Radians(Cast('latitude', FloatField()))
+        workshop_lon = Radians(Cast('longitude', FloatField()))
+        a = (
+            Power(Sin((workshop_lat - Value(lat0)) / Value(2.0)), 2)
+            + Value(math.cos(lat0)) * Cos(workshop_lat) * Power(Sin((workshop_lon - Value(lon0)) / Value(2.0)), 2)
+        )
+        return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(a, Value(1.0))), output_field=FloatField())
+
+    @classmethod
+    def _text_match(cls, queryset, query: str):
+        """Filtr i ocena dopasowania tekstu (0..~2) dla zapytania"""
+        if cls._uses_postgres():
+            prefix_query = cls._prefix_query(query)
+            condition = Q(name__trigram_word_similar=query)
+            text_score = TrigramWordSimilarity(query, 'name')
+            if prefix_query is not None:
+                condition |= Q(search_vector=prefix_query)
+                text_score = text_score + SearchRank(F('search_vector'), prefix_query)
+            return queryset.filter(condition).annotate(text_score=text_score)
+
+        return queryset.filter(
+            Q(name__icontains=query) |
+            Q(location__icontains=query) |
+            Q(address_full__icontains=query)
+        ).annotate(text_score=Case(
+            When(name__istartswith=query, then=Value(1.0)),
+            When(name__icontains=query, then=Value(0.6)),
+            default=Value(0.3),
+            output_field=FloatField()
+        ))
+
+    @classmethod
+    def search(cls, query=None, latitude=None, longitude=None, sort_by='name', specialization=None,
+               has_location=None):
+        """
+        Queryset wyszukiwania z adnotacjami calculated_distance (km, gdy podano lokalizację)
+        i relevance, posortowany w SQL. Stronicowanie to zwykłe cięcie querysetu.
+        """
+        if sort_by not in cls.SORT_OPTIONS:
+            raise ValueError(f"Invalid sort_by: {sort_by}")
+
+        workshops = Workshop.objects.all()
+        if specialization:
+            workshops = workshops.filter(specialization=specialization)
+        if has_location:
+            workshops = workshops.filter(latitude__isnull=False, longitude__isnull=False)
+
+        relevance = Value(0.0)
+        if query:
+            workshops = cls._text_match(workshops, query)
+            relevance = F('text_score')
+
+        relevance = relevance + Value(cls.RATING_WEIGHT / 5) * Cast('rating', FloatField())
+
+        if latitude is not None and longitude is not None:
+            workshops = workshops.annotate(calculated_distance=cls.distance_expression(latitude, longitude))
+            relevance = relevance + Coalesce(
+                Value(cls.DISTANCE_WEIGHT) / (
+                    Value(1.0) + F('calculated_distance') / Value(float(cls.DISTANCE_HALF_KM))
+                ),
+                Value(0.0)
+            )
+        elif sort_by == 'distance':
+            sort_by = 'name'
+
+        workshops = workshops.annotate(relevance=relevance)
+
+        if sort_by == 'distance':
+            return workshops.filter(calculated_distance__isnull=False).order_by('calculated_distance', 'id')
+        if sort_by == 'rating':
+            return workshops.order_by('-rating', 'name', 'id')
+        if sort_by == 'relevance':
+            return workshops.order_by('-relevance', 'id')
+        return workshops.order_by('name', 'id')
+
+    @classmethod
+    def autocomplete(cls, query: str, limit: int = 10):
+        """Podpowiedzi nazw warsztatów (id, name, location) najlepiej dopasowanych do wpisywanego tekstu"""
+        if not query or not query.strip():
+            return []
+        workshops = cls._text_match(Workshop.objects.all(), query.strip())
+        return list(
+            workshops.order_by('-text_score', 'name', 'id').values('id', 'name', 'location')[:limit]
+        )
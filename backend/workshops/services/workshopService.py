@@ -62,6 +62,19 @@ class WorkshopService(BaseService):
             traceback.print_exc()
             raise Exception(f"Error fetching user workshop customers: {str(e)}")
 
+    @staticmethod
+    async def aget_user_workshop(user):
+        """Warsztat właściciela lub mechanika (get_user_workshop dla widoków asynchronicznych)"""
+        from ..models import Workshop, WorkshopMechanic
+
+        if user.role == 'owner':
+            return await Workshop.objects.filter(owner_id=user.id).afirst()
+        if user.role == 'mechanic':
+            workshop_mechanic = await WorkshopMechanic.objects.filter(mechanic_id=user.id).select_related('workshop').afirst()
+            if workshop_mechanic:
+                return workshop_mechanic.workshop
+        return None
+
     @staticmethod
     def get_user_workshop(user_id):
         """
@@ -176,80 +189,102 @@ class WorkshopService(BaseService):
             traceback.print_exc()
             return User.objects.none()
     
+    @staticmethod
+    def _hydrate_ranked(ranked):
+        """Warsztaty w kolejności rankingu z odległością w atrybucie distance_km"""
+        from ..models import Workshop
+
+        workshops = Workshop.objects.in_bulk([workshop_id for workshop_id, _ in ranked])
+        result = []
+        for workshop_id, distance in ranked:
+            # Indeks może jeszcze zawierać usunięty warsztat
+            if workshop_id in workshops:
+                workshop = workshops[workshop_id]
+                workshop.distance_km = distance
+                result.append(workshop)
+        return result
+
+    @staticmethod
+    async def _ahydrate_ranked(ranked):
+        """_hydrate_ranked przez asynchroniczny ORM"""
+        from ..models import Workshop
+
+        workshops = await Workshop.objects.ain_bulk([workshop_id for workshop_id, _ in ranked])
+        result = []
+        for workshop_id, distance in ranked:
+            if workshop_id in workshops:
+                workshop = workshops[workshop_id]
+                workshop.distance_km = distance
+                result.append(workshop)
+        return result
+
+    @staticmethod
+    def get_nearby_workshops_page(latitude, longitude, radius_km=50, offset=0, limit=None):
+        """
+        Strona warsztatów w promieniu radius_km posortowanych po odległości
+        oraz liczba wszystkich warsztatów w promieniu
+        """
+        from .geoIndexService import WorkshopGeoIndex
+
+        ranked, total = WorkshopGeoIndex.get().within(latitude, longitude, radius_km, offset, limit)
+        return WorkshopService._hydrate_ranked(ranked), total
+
     @staticmethod
     def get_nearby_workshops(latitude, longitude, radius_km=50):
         """
-        Znajdź warsztaty w pobliżu podanej lokalizacji w określonym promieniu.
+        Znajdź warsztaty w pobliżu podanej lokalizacji w określonym promieniu,
+        posortowane według odległości (distance_km).
         """
-        from ..models import Workshop
-        
-        # Pobierz warsztaty z danymi geolokalizacyjnymi
-        workshops = Workshop.objects.filter(
-            latitude__isnull=False,
-            longitude__isnull=False
-        )
-        
-        nearby_workshops = []
-        
-        for workshop in workshops:
-            distance = workshop.distance_to(latitude, longitude)
-            if distance is not None and distance <= radius_km:
-                nearby_workshops.append(workshop)
-        
-        # Sortuj według odległości
-        nearby_workshops.sort(key=lambda w: w.distance_to(latitude, longitude))
-        
-        return nearby_workshops
+        workshops, _ = WorkshopService.get_nearby_workshops_page(latitude, longitude, radius_km)
+        return workshops
+
+    @staticmethod
+    def get_nearest_workshops(latitude, longitude, k=10):
+        """k warsztatów najbliższych podanej lokalizacji, bez limitu promienia"""
+        from .geoIndexService import WorkshopGeoIndex
+
+        return WorkshopService._hydrate_ranked(WorkshopGeoIndex.get().nearest(latitude, longitude, k))
+
+    @staticmethod
+    async def aget_nearby_workshops_page(latitude, longitude, radius_km=50, offset=0, limit=None):
+        """get_nearby_workshops_page dla widoków asynchronicznych"""
+        from .geoIndexService import WorkshopGeoIndex
+
+        ranked, total = (await WorkshopGeoIndex.aget()).within(latitude, longitude, radius_km, offset, limit)
+        return await WorkshopService._ahydrate_ranked(ranked), total
+
+    @staticmethod
+    async def aget_nearest_workshops(latitude, longitude, k=10):
+        """get_nearest_workshops dla widoków asynchronicznych"""
+        from .geoIndexService import WorkshopGeoIndex
+
+        return await WorkshopService._ahydrate_ranked((await WorkshopGeoIndex.aget()).nearest(latitude, longitude, k))
 
     @staticmethod
     def search_workshops(query=None, location_lat=None, location_lng=None, sort_by='name', specialization=None, has_location=None):
         """
-        Wyszukaj warsztaty z możliwością sortowania i filtrowania
+        Wyszukaj warsztaty z możliwością sortowania i filtrowania.
+        Zwraca queryset posortowany w SQL (patrz WorkshopSearchService).
         """
-        from ..models import Workshop
-        from django.db.models import Q
-        
-        workshops = Workshop.objects.all()
-        
-        # Filtrowanie po nazwie/lokalizacji
-        if query:
-            workshops = workshops.filter(
-                Q(name__icontains=query) | 
-                Q(location__icontains=query) |
-                Q(address_full__icontains=query)
-            )
-        
-        # Filtrowanie po specjalizacji
-        if specialization:
-            workshops = workshops.filter(specialization=specialization)
-        
-        # Filtrowanie warsztatów z danymi geolokalizacji
-        if has_location:
-            workshops = workshops.filter(
-                latitude__isnull=False,
-                longitude__isnull=False
-            )
-        
-        workshops_list = list(workshops)
-        
-        # Dodanie odległości dla warsztatów z geolokalizacją
-        if location_lat and location_lng:
-            for workshop in workshops_list:
-                if workshop.has_location_data:
-                    workshop.calculated_distance = workshop.distance_to(float(location_lat), float(location_lng))
-                else:
-                    workshop.calculated_distance = None
-        
-        # Sortowanie
-        if sort_by == 'distance' and location_lat and location_lng:
-            workshops_list = [w for w in workshops_list if hasattr(w, 'calculated_distance') and w.calculated_distance is not None]
-            workshops_list.sort(key=lambda w: w.calculated_distance)
-        elif sort_by == 'rating':
-            workshops_list.sort(key=lambda w: w.rating, reverse=True)
-        elif sort_by == 'name':
-            workshops_list.sort(key=lambda w: w.name)
-        
-        return workshops_list
+        from .workshopSearchService import WorkshopSearchService
+
+        latitude = float(location_lat) if location_lat else None
+        longitude = float(location_lng) if location_lng else None
+        return WorkshopSearchService.search(
+            query=query,
+            latitude=latitude if longitude is not None else None,
+            longitude=longitude if latitude is not None else None,
+            sort_by=sort_by,
+            specialization=specialization,
+            has_location=has_location
+        )
+
+    @staticmethod
+    def autocomplete_workshops(query, limit=10):
+        """Podpowiedzi nazw warsztatów dla wpisywanego tekstu"""
+        from .workshopSearchService import WorkshopSearchService
+
+        return WorkshopSearchService.autocomplete(query, limit)
 
     @staticmethod
     def get_workshop_specializations():
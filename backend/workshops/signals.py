@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from appointments.models import Appointment
+from .models import Workshop, WorkshopAvailability, WorkshopBreak, MechanicAvailability, MechanicBreak
+from .services.availabilityCacheService import AvailabilityCacheService
+from .services.geoIndexService import WorkshopGeoIndex
+
+
+def _local_date(value):
+    if timezone.is_naive(value):
+        return value.date()
+    return timezone.localtime(value).date()
+
+
+@receiver(post_save, sender=Workshop)
+@receiver(post_delete, sender=Workshop)
+def workshop_changed_handler(sender, instance, **kwargs):
+    """Przebuduj indeks geolokalizacji warsztatów przy kolejnym wyszukiwaniu"""
+    WorkshopGeoIndex.invalidate()
+
+
+@receiver(pre_save, sender=Appointment)
+def appointment_pre_save_handler(sender, instance, **kwargs):
+    """Zapamiętaj poprzedni termin wizyty, aby przeliczyć również zwolniony dzień"""
+    instance._availability_previous = None
+    if instance.pk:
+        instance._availability_previous = Appointment.objects.filter(pk=instance.pk).values_list(
+            'workshop_id', 'date'
+        ).first()
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_saved_handler(sender, instance, **kwargs):
+    """Przelicz dostępność dnia wizyty (i dnia poprzedniego terminu)"""
+    day = _local_date(instance.date)
+    AvailabilityCacheService.schedule_refresh(instance.workshop_id, day, day)
+
+    previous = getattr(instance, '_availability_previous', None)
+    if previous:
+        previous_workshop_id, previous_date = previous
+        previous_day = _local_date(previous_date)
+        if (previous_workshop_id, previous_day) != (instance.workshop_id, day):
+            AvailabilityCacheService.schedule_refresh(previous_workshop_id, previous_day, previous_day)
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_deleted_handler(sender, instance, **kwargs):
+    day = _local_date(instance.date)
+    AvailabilityCacheService.schedule_refresh(instance.workshop_id, day, day)
+
+
+@receiver(post_save, sender=WorkshopAvailability)
+@receiver(post_delete, sender=WorkshopAvailability)
+def workshop_availability_changed_handler(sender, instance, **kwargs):
+    """Zmiana harmonogramu dotyka całego horyzontu warsztatu"""
+    AvailabilityCacheService.schedule_refresh(instance.workshop_id)
+
+
+@receiver(pre_save, sender=WorkshopBreak)
+@receiver(pre_save, sender=MechanicBreak)
+def break_pre_save_handler(sender, instance, **kwargs):
+    """Zapamiętaj poprzedni zakres przerwy (dni i godziny)"""
+    instance._availability_previous = None
+    if instance.pk:
+        instance._availability_previous = sender.objects.filter(pk=instance.pk).values_list(
+            'start_date', 'end_date', 'start_time', 'end_time'
+        ).first()
+
+
+def _refresh_break_range(workshop_id, instance):
+    start_date, end_date = instance.start_date, instance.end_date
+    previous = getattr(instance, '_availability_previous', None)
+    if previous:
+        start_date = min(start_date, previous[0])
+        end_date = max(end_date, previous[1])
+    AvailabilityCacheService.schedule_refresh(workshop_id, start_date, end_date)
+
+
+@receiver(post_save, sender=WorkshopBreak)
+@receiver(post_delete, sender=WorkshopBreak)
+def workshop_break_changed_handler(sender, instance, **kwargs):
+    _refresh_break_range(instance.workshop_id, instance)
+
+
+@receiver(post_save, sender=MechanicBreak)
+@receiver(post_delete, sender=MechanicBreak)
+def mechanic_break_changed_handler(sender, instance, **kwargs):
+    _refresh_break_range(instance.workshop_mechanic.workshop_id, instance)
+
+
+@receiver(post_save, sender=WorkshopBreak)
+@receiver(post_save, sender=MechanicBreak)
+def break_disruption_handler(sender, instance, created=False, **kwargs):
+    """Po zatwierdzeniu nowej przerwy lub zmiany jej zakresu przeplanuj dotknięte wizyty"""
+    if not settings.BREAK_DISRUPTION_AUTO_APPLY:
+        return
+    previous = getattr(instance, '_availability_previous', None)
+    current = (instance.start_date, instance.end_date, instance.start_time, instance.end_time)
+    if not created and previous == current:
+        # Zmiana np. samego powodu nie dotyka wizyt
+        return
+    from .services.disruptionService import DisruptionService
+
+    # robust: błąd przeplanowania nie może zepsuć zapisanej już przerwy
+    transaction.on_commit(lambda: DisruptionService.apply(instance, previous=previous), robust=True)
+
+
+@receiver(post_save, sender=MechanicAvailability)
+@receiver(post_delete, sender=MechanicAvailability)
+def mechanic_availability_changed_handler(sender, instance, **kwargs):
+    AvailabilityCacheService.schedule_refresh(instance.workshop_mechanic.workshop_id)
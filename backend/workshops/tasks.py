@@ -0,0 +1,30 @@
+from celery import shared_task
+from datetime import date
+from .services.availabilityCacheService import AvailabilityCacheService
+from .services.mechanicAssignmentService import MechanicAssignmentService
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task
+def refresh_availability_cache():
+    """
+    Przesuwa horyzont zmaterializowanej dostępności warsztatów o kolejny dzień
+    """
+    _, horizon_end = AvailabilityCacheService.horizon()
+    refreshed_days = AvailabilityCacheService.rebuild(start_date=horizon_end, end_date=horizon_end)
+    logger.info(f"Przeliczono {refreshed_days} dni dostępności warsztatów")
+    return refreshed_days
+
+
+@shared_task
+def assign_mechanics_for_day(workshop_id, date_str, dry_run=False):
+    """
+    Przypisuje mechaników do nieprzypisanych wizyt warsztatu w danym dniu (YYYY-MM-DD)
+    """
+    result = MechanicAssignmentService.assign_day(workshop_id, date.fromisoformat(date_str), dry_run)
+    logger.info(
+        f"Warsztat {workshop_id}, {date_str}: przypisano {len(result['assigned'])} wizyt, "
+        f"bez mechanika {len(result['unassigned'])}"
+    )
+    return result
@@ -0,0 +1,471 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import random
+import pytest
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+from decimal import Decimal
+from unittest.mock import patch
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.core.management import call_command
+from workshops.models import Workshop, WorkshopAvailability, WorkshopBreak, WorkshopDaySlots
+from workshops.services.availabilityService import AvailabilityService
+from workshops.services.availabilityCacheService import AvailabilityCacheService
+from backend.singleFlight import SingleFlight
+from appointments.models import Appointment
+from vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Poniedziałek
+MONDAY = date(2030, 1, 7)
+
+
+def next_monday():
+    today = timezone.localdate()
+    return today + timedelta(days=7 - today.weekday())
+
+
+class AvailabilityRangeTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='availabilityowner',
+            email='availabilityowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.client_user = User.objects.create_user(
+            username='availabilityclient',
+            email='availabilityclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(
+            name='Availability Workshop',
+            owner=self.owner,
+            location='Test Location'
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='AV12345',
+            vin='1HGCM82633A654321',
+            year=2020
+        )
+        AvailabilityService.create_default_availability(self.workshop.id)
+
+    def _book(self, day, hour, status='in_progress'):
+        appointment = Appointment.objects.create(
+            client=self.client_user,
+            workshop=self.workshop,
+            vehicle=self.vehicle,
+            date=timezone.make_aware(datetime.combine(day, time(hour, 0)))
+        )
+        # Pomijamy automatyczną zmianę statusu wykonywaną w save()
+        Appointment.objects.filter(id=appointment.id).update(status=status)
+        return appointment
+
+    def test_single_day_matches_schedule(self):
+        """Test that a weekday returns every slot from the default schedule"""
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)
+
+        self.assertTrue(availability['available'])
+        self.assertEqual(availability['slots'][0], '08:00')
+        self.assertEqual(availability['slots'][-1], '16:00')
+        self.assertEqual(len(availability['slots']), 9)
+        self.assertEqual(availability['working_hours']['slot_duration'], 60)
+
+    def test_sunday_has_no_schedule(self):
+        """Test that a day without a schedule row is reported as unavailable"""
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY + timedelta(days=6))
+
+        self.assertFalse(availability['available'])
+        self.assertEqual(availability['slots'], [])
+
+    def test_booked_slot_is_removed(self):
+        """Test that a booked start time is not offered again"""
+        self._book(MONDAY, 10)
+
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)
+
+        self.assertNotIn('10:00', availability['slots'])
+        # Domyślna wizyta serwisowa trwa 120 minut
+        self.assertNotIn('11:00', availability['slots'])
+        self.assertIn('12:00', availability['slots'])
+
+    def test_long_booking_blocks_following_slots(self):
+        """Test that a booking blocks every slot until its estimated end"""
+        appointment = self._book(MONDAY, 10, status='scheduled')
+        Appointment.objects.filter(id=appointment.id).update(appointment_type='repair', duration_estimate=180)
+
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)
+
+        self.assertIn('09:00', availability['slots'])
+        self.assertNotIn('10:00', availability['slots'])
+        self.assertNotIn('11:00', availability['slots'])
+        self.assertNotIn('12:00', availability['slots'])
+        self.assertIn('13:00', availability['slots'])
+
+    def test_requested_duration_must_fit(self):
+        """Test that only start times where the whole job fits are returned"""
+        appointment = self._book(MONDAY, 10, status='scheduled')
+        Appointment.objects.filter(id=appointment.id).update(duration_estimate=180)
+
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY, 180)
+
+        self.assertEqual(availability['slots'], ['13:00', '14:00'])
+        self.assertTrue(AvailabilityService.check_slot_availability(
+            self.workshop.id, datetime.combine(MONDAY, time(13, 0)), 180
+        ))
+        self.assertFalse(AvailabilityService.check_slot_availability(
+            self.workshop.id, datetime.combine(MONDAY, time(8, 0)), 180
+        ))
+
+    def test_partial_break_window(self):
+        """Test that a partial-day break only blocks jobs overlapping its window"""
+        WorkshopBreak.objects.create(
+            workshop=self.workshop,
+            start_date=MONDAY,
+            end_date=MONDAY,
+            start_time=time(12, 0),
+            end_time=time(13, 0)
+        )
+
+        hourly = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)
+        two_hours = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY, 120)
+
+        self.assertIn('11:00', hourly['slots'])
+        self.assertNotIn('12:00', hourly['slots'])
+        self.assertIn('13:00', hourly['slots'])
+        self.assertNotIn('11:00', two_hours['slots'])
+        self.assertIn('10:00', two_hours['slots'])
+
+    def test_completed_booking_does_not_block(self):
+        """Test that completed appointments free their slot"""
+        self._book(MONDAY, 10, status='completed')
+
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)
+
+        self.assertIn('10:00', availability['slots'])
+
+    def test_break_blocks_whole_day(self):
+        """Test that a full-day break removes the day from available dates"""
+        WorkshopBreak.objects.create(
+            workshop=self.workshop,
+            start_date=MONDAY + timedelta(days=1),
+            end_date=MONDAY + timedelta(days=1),
+            reason='Inwentaryzacja'
+        )
+
+        available_dates = AvailabilityService.get_available_dates(
+            self.workshop.id, MONDAY, MONDAY + timedelta(days=6)
+        )
+
+        self.assertEqual(available_dates, [
+            MONDAY.isoformat(),
+            (MONDAY + timedelta(days=2)).isoformat(),
+            (MONDAY + timedelta(days=3)).isoformat(),
+            (MONDAY + timedelta(days=4)).isoformat(),
+            (MONDAY + timedelta(days=5)).isoformat(),
+        ])
+
+    def test_range_matches_single_day_computation(self):
+        """Test that the range engine returns the same payload as per-day calls"""
+        self._book(MONDAY + timedelta(days=2), 9)
+        WorkshopBreak.objects.create(
+            workshop=self.workshop,
+            start_date=MONDAY + timedelta(days=3),
+            end_date=MONDAY + timedelta(days=3),
+            start_time=time(12, 0),
+            end_time=time(13, 0)
+        )
+        end_date = MONDAY + timedelta(days=13)
+
+        availability_range = AvailabilityService.get_availability_range(self.workshop.id, MONDAY, end_date)
+
+        for day, availability in availability_range.items():
+            self.assertEqual(availability, AvailabilityService.get_workshop_availability(self.workshop.id, day))
+
+    def test_range_uses_constant_number_of_queries(self):
+        """Test that a 30-day range costs the same number of queries as a single day"""
+        for offset in range(0, 30, 3):
+            self._book(MONDAY + timedelta(days=offset), 8)
+        WorkshopBreak.objects.create(
+            workshop=self.workshop,
+            start_date=MONDAY + timedelta(days=10),
+            end_date=MONDAY + timedelta(days=12)
+        )
+
+        with self.assertNumQueries(4):
+            AvailabilityService.get_availability_range(self.workshop.id, MONDAY, MONDAY + timedelta(days=30))
+
+    def test_missing_workshop(self):
+        """Test that an unknown workshop is reported as unavailable"""
+        availability = AvailabilityService.get_workshop_availability(999999, MONDAY)
+
+        self.assertFalse(availability['available'])
+        self.assertEqual(availability['message'], 'Warsztat nie istnieje')
+
+
+class IntervalPackingTests(TestCase):
+    @staticmethod
+    def _brute_force(starts, intervals, duration):
+        return [
+            start for start in starts
+            if not any(start < end and start + duration > begin for begin, end in intervals)
+        ]
+
+    def test_merge_intervals(self):
+        """Test that overlapping and touching intervals are merged"""
+        self.assertEqual(
+            AvailabilityService._merge_intervals([(60, 120), (0, 30), (100, 180), (180, 200), (300, 300)]),
+            [(0, 30), (60, 200)]
+        )
+
+    @pytest.mark.slow
+    def test_sweep_matches_brute_force_on_busy_day(self):
+        """Test the sorted sweep against nested loops on days with hundreds of bookings"""
+        generator = random.Random(42)
+        starts = range(0, 24 * 60, 5)
+
+        for _ in range(20):
+            intervals = []
+            for _ in range(400):
+                begin = generator.randrange(0, 24 * 60)
+                intervals.append((begin, begin + generator.choice([30, 60, 90, 120, 180])))
+
+            for duration in (30, 60, 180):
+                started = perf_counter()
+                fitting = AvailabilityService._fit_starts(
+                    starts, AvailabilityService._merge_intervals(intervals), duration
+                )
+                elapsed = perf_counter() - started
+
+                self.assertEqual(fitting, self._brute_force(starts, intervals, duration))
+                self.assertLess(elapsed, 0.05)
+
+    @pytest.mark.slow
+    def test_busy_day_query_count(self):
+        """Test that a day with hundreds of appointments is computed with a fixed number of queries"""
+        owner = User.objects.create_user(
+            username='busyowner', email='busyowner@example.com', password='ownerpassword', role='owner'
+        )
+        client_user = User.objects.create_user(
+            username='busyclient', email='busyclient@example.com', password='clientpassword', role='client'
+        )
+        workshop = Workshop.objects.create(name='Busy Workshop', owner=owner, location='Test Location')
+        vehicle = Vehicle.objects.create(
+            owner=client_user, brand='ford', model='Focus', registration_number='BUSY123',
+            vin='1HGCM82633A333333', year=2019
+        )
+        WorkshopAvailability.objects.create(
+            workshop=workshop, weekday=MONDAY.weekday(), start_time=time(0, 0), end_time=time(23, 59), slot_duration=5
+        )
+        generator = random.Random(7)
+        Appointment.objects.bulk_create([
+            Appointment(
+                client=client_user,
+                workshop=workshop,
+                vehicle=vehicle,
+                date=timezone.make_aware(datetime.combine(MONDAY, time(0, 0))) + timedelta(
+                    minutes=generator.randrange(0, 24 * 60, 5)
+                ),
+                duration_estimate=generator.choice([30, 60, 90]),
+                status='scheduled'
+            )
+            for _ in range(300)
+        ])
+
+        started = perf_counter()
+        with self.assertNumQueries(4):
+            availability = AvailabilityService.get_availability_range(workshop.id, MONDAY, MONDAY, 60)[MONDAY]
+        self.assertLess(perf_counter() - started, 0.5)
+        self.assertIsInstance(availability['slots'], list)
+
+
+class AvailabilityCacheTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='cacheowner',
+            email='cacheowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.client_user = User.objects.create_user(
+            username='cacheclient',
+            email='cacheclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(
+            name='Cache Workshop',
+            owner=self.owner,
+            location='Test Location'
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='CA12345',
+            vin='1HGCM82633A222222',
+            year=2020
+        )
+        AvailabilityService.create_default_availability(self.workshop.id)
+        self.day = next_monday()
+
+    def test_second_read_is_single_lookup(self):
+        """Test that a cached day is served with one query"""
+        first = AvailabilityService.get_workshop_availability(self.workshop.id, self.day)
+        self.assertTrue(WorkshopDaySlots.objects.filter(workshop=self.workshop, date=self.day).exists())
+        # Pomijamy wynik współdzielony przez SingleFlight, który nie wymaga żadnego zapytania
+        SingleFlight.forget(f'workshop:{self.workshop.id}')
+
+        with self.assertNumQueries(1):
+            second = AvailabilityService.get_workshop_availability(self.workshop.id, self.day)
+
+        self.assertEqual(first, second)
+
+    def test_days_outside_horizon_are_not_stored(self):
+        """Test that days beyond the horizon are computed but not materialised"""
+        far_day = self.day + timedelta(days=AvailabilityCacheService.HORIZON_DAYS + 7)
+
+        availability = AvailabilityService.get_workshop_availability(self.workshop.id, far_day)
+
+        self.assertTrue(availability['available'])
+        self.assertFalse(WorkshopDaySlots.objects.filter(workshop=self.workshop, date=far_day).exists())
+
+    def test_booking_refreshes_only_its_day(self):
+        """Test that saving an appointment recomputes the affected day"""
+        AvailabilityService.get_available_dates(self.workshop.id, self.day, self.day + timedelta(days=6))
+        other_day = WorkshopDaySlots.objects.get(workshop=self.workshop, date=self.day + timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = Appointment.objects.create(
+                client=self.client_user,
+                workshop=self.workshop,
+                vehicle=self.vehicle,
+                date=timezone.make_aware(datetime.combine(self.day, time(10, 0)))
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.status = 'in_progress'
+            appointment.save()
+
+        cached = WorkshopDaySlots.objects.get(workshop=self.workshop, date=self.day)
+        self.assertNotIn('10:00', cached.payload['slots'])
+        self.assertEqual(
+            WorkshopDaySlots.objects.get(workshop=self.workshop, date=self.day + timedelta(days=1)).computed_at,
+            other_day.computed_at
+        )
+
+    def test_break_refreshes_cached_days(self):
+        """Test that adding a break removes the day from cached available dates"""
+        AvailabilityService.get_available_dates(self.workshop.id, self.day, self.day + timedelta(days=6))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkshopBreak.objects.create(
+                workshop=self.workshop,
+                start_date=self.day,
+                end_date=self.day
+            )
+
+        self.assertFalse(AvailabilityService.get_workshop_availability(self.workshop.id, self.day)['available'])
+        self.assertEqual(AvailabilityCacheService.verify(self.workshop.id), [])
+
+    def test_verify_detects_stale_rows(self):
+        """Test that verification reports rows that drifted from the live computation"""
+        AvailabilityCacheService.rebuild([self.workshop.id])
+        WorkshopDaySlots.objects.filter(workshop=self.workshop, date=self.day).update(
+            payload={'available': False, 'message': 'stale', 'slots': []}
+        )
+
+        self.assertEqual(AvailabilityCacheService.verify(self.workshop.id), [self.day])
+
+        call_command('rebuild_availability_cache', workshop_ids=[self.workshop.id], stdout=open(os.devnull, 'w'))
+        self.assertEqual(AvailabilityCacheService.verify(self.workshop.id), [])
+
+
+class EarliestSlotsTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='earliestowner',
+            email='earliestowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.day = next_monday()
+        # Warszawa, ~5 km od centrum, oraz Kraków (poza promieniem)
+        self.near = self._workshop('Near Workshop', '52.229700', '21.012200')
+        self.farther = self._workshop('Farther Workshop', '52.260000', '21.050000')
+        self.remote = self._workshop('Remote Workshop', '50.064700', '19.945000')
+        WorkshopBreak.objects.create(workshop=self.near, start_date=self.day, end_date=self.day)
+        self.pool = patch.object(AvailabilityService, 'SEARCH_WORKERS', 1)
+        self.pool.start()
+
+    def tearDown(self):
+        self.pool.stop()
+
+    def _workshop(self, name, latitude, longitude):
+        workshop = Workshop.objects.create(
+            name=name,
+            owner=self.owner,
+            location='Test Location',
+            latitude=Decimal(latitude),
+            longitude=Decimal(longitude)
+        )
+        AvailabilityService.create_default_availability(workshop.id)
+        return workshop
+
+    def test_slots_are_merged_by_time(self):
+        """Test that the earliest slots come from whichever workshop is free first"""
+        result = AvailabilityService.find_earliest_slots(52.2297, 21.0122, radius_km=20, limit=3, start_date=self.day)
+
+        self.assertEqual(result['searched_workshops'], 2)
+        self.assertEqual([slot['workshop_id'] for slot in result['slots']], [self.farther.id] * 3)
+        self.assertEqual([slot['time'] for slot in result['slots']], ['08:00', '09:00', '10:00'])
+        self.assertEqual(result['slots'][0]['date'], self.day.isoformat())
+
+    def test_ties_are_broken_by_distance(self):
+        """Test that workshops free at the same time are ordered by distance"""
+        result = AvailabilityService.find_earliest_slots(
+            52.2297, 21.0122, radius_km=20, limit=2, start_date=self.day + timedelta(days=1)
+        )
+
+        self.assertEqual([slot['workshop_id'] for slot in result['slots']], [self.near.id, self.farther.id])
+        self.assertEqual(result['slots'][0]['time'], result['slots'][1]['time'])
+
+    def test_duration_is_respected(self):
+        """Test that long jobs only get start times where they fit"""
+        result = AvailabilityService.find_earliest_slots(
+            52.2297, 21.0122, radius_km=20, limit=20, duration_minutes=480, start_date=self.day + timedelta(days=1)
+        )
+
+        self.assertTrue(result['slots'])
+        self.assertTrue(all(slot['time'] in ('08:00', '09:00') for slot in result['slots']))
+
+    def test_endpoint(self):
+        """Test the earliest-slots action"""
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.owner).access_token}')
+
+        response = api_client.get('/api/v1/availability/earliest-slots/', {
+            'latitude': '52.2297',
+            'longitude': '21.0122',
+            'radius': '20',
+            'limit': '4',
+            'start_date': self.day.isoformat(),
+            'appointment_type': 'inspection'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['slots']), 4)
+
+        response = api_client.get('/api/v1/availability/earliest-slots/', {'latitude': 'x', 'longitude': '21'})
+        self.assertEqual(response.status_code, 400)
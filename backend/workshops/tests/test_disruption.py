@@ -0,0 +1,269 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import time as time_module
+from datetime import date, datetime, time
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from workshops.models import Workshop, WorkshopAvailability, WorkshopBreak, WorkshopMechanic, MechanicAvailability, MechanicBreak
+from workshops.services.disruptionService import DisruptionService
+from appointments.models import Appointment
+from notifications.models import Notification
+from vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Poniedziałek
+MONDAY = date(2030, 1, 7)
+
+
+@override_settings(BREAK_DISRUPTION_AUTO_APPLY=False)
+class DisruptionServiceTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='disruptowner',
+            email='disruptowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.client_user = User.objects.create_user(
+            username='disruptclient',
+            email='disruptclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(
+            name='Disruption Workshop',
+            owner=self.owner,
+            location='Test Location'
+        )
+        WorkshopAvailability.objects.create(
+            workshop=self.workshop,
+            weekday=MONDAY.weekday(),
+            start_time=time(8, 0),
+            end_time=time(16, 0)
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='DSR1234',
+            vin='1HGCM82633A555555',
+            year=2020
+        )
+        self.mechanics = []
+        self.workshop_mechanics = []
+        for number in range(3):
+            self._add_mechanic(number)
+
+    def _add_mechanic(self, number):
+        mechanic = User.objects.create_user(
+            username=f'disruptmechanic{number}',
+            email=f'disruptmechanic{number}@example.com',
+            password='mechpass',
+            role='mechanic'
+        )
+        workshop_mechanic = WorkshopMechanic.objects.create(workshop=self.workshop, mechanic=mechanic)
+        MechanicAvailability.objects.create(
+            workshop_mechanic=workshop_mechanic,
+            weekday=MONDAY.weekday(),
+            start_time=time(8, 0),
+            end_time=time(16, 0)
+        )
+        self.mechanics.append(mechanic)
+        self.workshop_mechanics.append(workshop_mechanic)
+
+    def _book(self, mechanic, hour, minute=0, duration=60):
+        return Appointment.objects.create(
+            client=self.client_user,
+            workshop=self.workshop,
+            vehicle=self.vehicle,
+            assigned_mechanic=mechanic,
+            date=timezone.make_aware(datetime.combine(MONDAY, time(hour, minute))),
+            duration_estimate=duration
+        )
+
+    def _mechanic_break(self, mechanic_number=0, start_time=None, end_time=None):
+        return MechanicBreak.objects.create(
+            workshop_mechanic=self.workshop_mechanics[mechanic_number],
+            start_date=MONDAY,
+            end_date=MONDAY,
+            start_time=start_time,
+            end_time=end_time
+        )
+
+    def test_affected_appointments_respect_break_window(self):
+        """Test that only appointments overlapping the break hours are affected"""
+        early = self._book(self.mechanics[0], 8)
+        overlapping = self._book(self.mechanics[0], 9, 30)
+        self._book(self.mechanics[1], 10)
+        self._book(self.mechanics[0], 13)
+
+        break_obj = self._mechanic_break(start_time=time(10, 0), end_time=time(12, 0))
+
+        with self.assertNumQueries(1):
+            affected = DisruptionService.affected_appointments(break_obj)
+
+        self.assertEqual(affected, [overlapping])
+        self.assertNotIn(early, affected)
+
+    def test_reassigns_to_free_mechanic(self):
+        """Test that appointments move to another mechanic at the same time when possible"""
+        first = self._book(self.mechanics[0], 10)
+        second = self._book(self.mechanics[0], 11)
+        self._book(self.mechanics[1], 10)
+
+        result = DisruptionService.apply(self._mechanic_break(start_time=time(10, 0), end_time=time(12, 0)))
+
+        self.assertEqual(result['summary'], {'reassign': 2, 'shift': 0, 'flag': 0})
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.assigned_mechanic, self.mechanics[2])
+        self.assertIn(second.assigned_mechanic, self.mechanics[1:])
+        self.assertEqual(first.date, timezone.make_aware(datetime.combine(MONDAY, time(10, 0))))
+        # Zmiana mechanika nie wymaga powiadomienia klienta
+        self.assertFalse(Notification.objects.exists())
+
+    def test_shifts_within_day_when_everyone_is_busy(self):
+        """Test that an appointment is shifted to the nearest free time of the same day"""
+        appointment = self._book(self.mechanics[0], 10)
+        for mechanic in self.mechanics[1:]:
+            self._book(mechanic, 9, duration=180)
+
+        result = DisruptionService.apply(self._mechanic_break(start_time=time(9, 0), end_time=time(11, 0)))
+
+        self.assertEqual(result['summary']['shift'], 1)
+        appointment.refresh_from_db()
+        # Najbliższy wolny termin: mechanik wraca z przerwy o 11:00
+        self.assertEqual(timezone.localtime(appointment.date).time(), time(11, 0))
+        self.assertEqual(appointment.assigned_mechanic, self.mechanics[0])
+        self.assertEqual(Notification.objects.filter(user=self.client_user).count(), 1)
+
+    def test_workshop_closure_flags_and_batches_notifications(self):
+        """Test that a full-day closure flags appointments with one notification per client"""
+        appointments = [self._book(self.mechanics[number % 3], 8 + number) for number in range(6)]
+        break_obj = WorkshopBreak.objects.create(workshop=self.workshop, start_date=MONDAY, end_date=MONDAY)
+
+        result = DisruptionService.apply(break_obj)
+
+        self.assertEqual(result['summary'], {'reassign': 0, 'shift': 0, 'flag': 6})
+        notifications = Notification.objects.filter(user=self.client_user)
+        self.assertEqual(notifications.count(), 1)
+        self.assertEqual(notifications[0].notification_type, 'appointment_rescheduled')
+        self.assertEqual(len(notifications[0].message.splitlines()), 6)
+        # Przerwa warsztatu nie odpina mechaników
+        for appointment in appointments:
+            appointment.refresh_from_db()
+            self.assertIsNotNone(appointment.assigned_mechanic)
+
+    def test_flagged_appointment_is_unassigned_from_absent_mechanic(self):
+        """Test that an appointment without any option returns to the unassigned pool"""
+        appointment = self._book(self.mechanics[0], 8, duration=480)
+        for mechanic in self.mechanics[1:]:
+            self._book(mechanic, 8, duration=480)
+
+        result = DisruptionService.apply(self._mechanic_break())
+
+        self.assertEqual(result['summary']['flag'], 1)
+        appointment.refresh_from_db()
+        self.assertIsNone(appointment.assigned_mechanic)
+
+    def test_preview_does_not_save(self):
+        """Test that the preview only returns the plan"""
+        appointment = self._book(self.mechanics[0], 10)
+
+        result = DisruptionService.preview(self._mechanic_break())
+
+        self.assertFalse(result['applied'])
+        self.assertEqual(result['appointments'][0]['action'], 'reassign')
+        appointment.refresh_from_db()
+        self.assertEqual(appointment.assigned_mechanic, self.mechanics[0])
+
+    def test_full_day_break_on_busy_day_is_fast(self):
+        """Test a full-day break across a 40-appointment day with a constant number of queries"""
+        for number in range(3, 8):
+            self._add_mechanic(number)
+        for number in range(40):
+            self._book(self.mechanics[0], 8 + number * 12 // 60, number * 12 % 60, duration=12)
+        break_obj = self._mechanic_break()
+
+        started = time_module.perf_counter()
+        # savepoint, wizyty, mechanicy, harmonogram, przerwy warsztatu, indeks (3),
+        # bulk_update, release
+        with self.assertNumQueries(10):
+            result = DisruptionService.apply(break_obj)
+        elapsed = time_module.perf_counter() - started
+
+        self.assertEqual(result['summary']['reassign'], 40)
+        self.assertLess(elapsed, 1.0)
+        self.assertFalse(Appointment.objects.filter(assigned_mechanic=self.mechanics[0]).exists())
+
+    def test_break_save_applies_plan_after_commit(self):
+        """Test that saving a break reschedules affected appointments once committed"""
+        appointment = self._book(self.mechanics[0], 10)
+
+        with override_settings(BREAK_DISRUPTION_AUTO_APPLY=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._mechanic_break()
+
+        appointment.refresh_from_db()
+        self.assertNotEqual(appointment.assigned_mechanic, self.mechanics[0])
+        self.assertIsNotNone(appointment.assigned_mechanic)
+
+    def test_break_resave_reapplies_only_when_range_changes(self):
+        """Test that re-saving a break does not notify clients again about the same flagged appointments"""
+        self._book(self.mechanics[0], 9)
+        with override_settings(BREAK_DISRUPTION_AUTO_APPLY=True):
+            with self.captureOnCommitCallbacks(execute=True):
+                break_obj = WorkshopBreak.objects.create(workshop=self.workshop, start_date=MONDAY, end_date=MONDAY)
+            self.assertEqual(Notification.objects.filter(user=self.client_user).count(), 1)
+
+            # Zmiana samego powodu nie przeplanowuje wizyt
+            break_obj.reason = 'Inwentaryzacja'
+            with patch.object(DisruptionService, 'apply') as apply:
+                with self.captureOnCommitCallbacks(execute=True):
+                    break_obj.save()
+            apply.assert_not_called()
+
+            # Wydłużona przerwa zgłasza tylko nowo oznaczoną wizytę
+            Appointment.objects.create(
+                client=self.client_user, workshop=self.workshop, vehicle=self.vehicle,
+                date=timezone.make_aware(datetime(2030, 1, 8, 9, 0))
+            )
+            break_obj.end_date = date(2030, 1, 8)
+            with self.captureOnCommitCallbacks(execute=True):
+                break_obj.save()
+
+        notifications = Notification.objects.filter(user=self.client_user).order_by('id')
+        self.assertEqual(notifications.count(), 2)
+        self.assertEqual(notifications.last().message.splitlines(), [
+            "Wizyta 08.01.2030 09:00 wymaga zmiany terminu - prosimy o kontakt z warsztatem."
+        ])
+
+    def test_endpoint(self):
+        """Test previewing and applying the plan through the API"""
+        self._book(self.mechanics[0], 10)
+        break_obj = self._mechanic_break()
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.owner).access_token}')
+        url = f'/api/v1/availability/break-disruption/?break_type=mechanic&break_id={break_obj.id}'
+
+        response = api_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['applied'])
+
+        response = api_client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['reassign'], 1)
+
+        self.assertEqual(api_client.get('/api/v1/availability/break-disruption/?break_type=x').status_code, 400)
+        self.assertEqual(
+            api_client.get('/api/v1/availability/break-disruption/?break_type=workshop&break_id=999999').status_code,
+            404
+        )
@@ -0,0 +1,194 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import math
+import random
+import pytest
+from decimal import Decimal
+from time import perf_counter
+from django.test import TestCase, SimpleTestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from workshops.models import Workshop
+from workshops.services.geoIndexService import WorkshopGeoIndex, EARTH_RADIUS_KM
+from workshops.services.workshopService import WorkshopService
+
+User = get_user_model()
+
+benchmark = pytest.mark.skipif(
+    not os.environ.get('RUN_BENCHMARKS'),
+    reason="Pomiar czasu na 100 tys. warsztatów - uruchamiany z RUN_BENCHMARKS=1"
+)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def brute_force(points, latitude, longitude, radius_km=None):
+    ranked = sorted(
+        (haversine(latitude, longitude, lat, lon), point_id)
+        for point_id, lat, lon in points
+    )
+    return [(point_id, distance) for distance, point_id in ranked if radius_km is None or distance <= radius_km]
+
+
+class GeoIndexQueryTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.points = [(number, rng.uniform(-89.5, 89.5), rng.uniform(-180, 180)) for number in range(3000)]
+        # Skupisko wokół Warszawy, przy południku 180° i przy biegunie
+        self.points += [(3000 + number, 52.2 + rng.uniform(-0.3, 0.3), 21.0 + rng.uniform(-0.3, 0.3)) for number in range(300)]
+        self.points += [(4000 + number, rng.uniform(-10, 10), rng.choice([-1, 1]) * rng.uniform(179, 180)) for number in range(100)]
+        self.points += [(5000 + number, rng.uniform(88, 90), rng.uniform(-180, 180)) for number in range(50)]
+        self.index = WorkshopGeoIndex(*zip(*self.points))
+
+    def assertRanking(self, actual, expected):
+        self.assertEqual([point_id for point_id, _ in actual], [point_id for point_id, _ in expected])
+        for (_, actual_distance), (_, expected_distance) in zip(actual, expected):
+            self.assertAlmostEqual(actual_distance, expected_distance, places=6)
+
+    def test_radius_query_matches_brute_force(self):
+        """Test radius queries against a full scan, including the antimeridian and the pole"""
+        for latitude, longitude, radius in [(52.2, 21.0, 25), (0, 179.9, 300), (89.5, 10, 200), (-30, -60, 2000), (10, 20, 30000)]:
+            results, total = self.index.within(latitude, longitude, radius)
+            expected = brute_force(self.points, latitude, longitude, radius)
+            self.assertEqual(total, len(expected))
+            self.assertRanking(results, expected)
+
+    def test_nearest_matches_brute_force(self):
+        """Test k-nearest queries in dense and empty areas"""
+        for latitude, longitude, k in [(52.2, 21.0, 5), (0, -179.95, 3), (-60, 100, 10)]:
+            self.assertRanking(self.index.nearest(latitude, longitude, k), brute_force(self.points, latitude, longitude)[:k])
+
+    def test_pages_concatenate_to_full_ranking(self):
+        """Test that distance-sorted pages cover the ranking without gaps"""
+        full, total = self.index.within(52.2, 21.0, 100)
+        pages = []
+        for offset in range(0, total + 40, 40):
+            page, page_total = self.index.within(52.2, 21.0, 100, offset=offset, limit=40)
+            self.assertEqual(page_total, total)
+            pages.extend(page)
+        self.assertEqual(pages, full)
+
+    def test_distances_for_selected_ids(self):
+        """Test looking up distances of chosen workshops"""
+        distances = self.index.distances_for(52.2, 21.0, [3000, 7, 999999])
+        self.assertEqual(set(distances), {3000, 7})
+        point_id, lat, lon = self.points[7]
+        self.assertAlmostEqual(distances[7], haversine(52.2, 21.0, lat, lon), places=6)
+
+    def test_dense_country_matches_brute_force(self):
+        """Test radius and k-nearest queries on a dense, country-sized set of workshops"""
+        rng = random.Random(11)
+        points = [(number, rng.uniform(49.0, 54.8), rng.uniform(14.1, 24.1)) for number in range(20_000)]
+        index = WorkshopGeoIndex(*zip(*points))
+
+        for latitude, longitude in [(rng.uniform(49.5, 54.5), rng.uniform(14.5, 23.5)) for _ in range(3)]:
+            results, total = index.within(latitude, longitude, 20)
+            expected = brute_force(points, latitude, longitude, 20)
+            self.assertEqual(total, len(expected))
+            self.assertRanking(results, expected)
+            self.assertRanking(index.nearest(latitude, longitude, 10), brute_force(points, latitude, longitude)[:10])
+
+    @benchmark
+    def test_benchmark_100k_workshops(self):
+        """Benchmark radius and k-nearest queries over 100k workshops"""
+        rng = random.Random(11)
+        count = 100_000
+        # Warsztaty rozłożone na obszarze Polski
+        points = [(number, rng.uniform(49.0, 54.8), rng.uniform(14.1, 24.1)) for number in range(count)]
+
+        started = perf_counter()
+        index = WorkshopGeoIndex(*zip(*points))
+        build_time = perf_counter() - started
+
+        queries = [(rng.uniform(49.5, 54.5), rng.uniform(14.5, 23.5)) for _ in range(100)]
+        started = perf_counter()
+        for latitude, longitude in queries:
+            index.within(latitude, longitude, 20, limit=20)
+        radius_time = (perf_counter() - started) / len(queries)
+
+        started = perf_counter()
+        for latitude, longitude in queries:
+            index.nearest(latitude, longitude, 10)
+        knn_time = (perf_counter() - started) / len(queries)
+
+        # Punkt odniesienia: dotychczasowy haversine w Pythonie dla każdego warsztatu
+        latitude, longitude = queries[0]
+        started = perf_counter()
+        brute_force(points, latitude, longitude, 20)
+        scan_time = perf_counter() - started
+
+        print(
+            f"\n100k workshops: build {build_time * 1000:.1f} ms, radius {radius_time * 1000:.2f} ms, "
+            f"kNN {knn_time * 1000:.2f} ms, Python scan {scan_time * 1000:.1f} ms"
+        )
+        self.assertLess(build_time, 2.0)
+        self.assertLess(radius_time, scan_time / 10)
+        self.assertLess(knn_time, scan_time / 10)
+
+
+class NearbyWorkshopsTests(TestCase):
+    def setUp(self):
+        WorkshopGeoIndex.invalidate()
+        self.user = User.objects.create_user(username='geouser', email='geouser@example.com', password='password123')
+        self.api_client = APIClient()
+        self.api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.center = Workshop.objects.create(name='Centrum', location='Warszawa', latitude=Decimal('52.229700'), longitude=Decimal('21.012200'))
+        self.praga = Workshop.objects.create(name='Praga', location='Warszawa', latitude=Decimal('52.250000'), longitude=Decimal('21.040000'))
+        self.krakow = Workshop.objects.create(name='Kraków', location='Kraków', latitude=Decimal('50.064700'), longitude=Decimal('19.945000'))
+        Workshop.objects.create(name='Bez lokalizacji', location='Nieznana')
+
+    def test_nearby_sorted_by_distance(self):
+        """Test that nearby workshops are filtered by radius and sorted by distance"""
+        response = self.api_client.get('/api/v1/workshops/nearby/', {'latitude': 52.2297, 'longitude': 21.0122, 'radius': 10})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [self.center.id, self.praga.id])
+        self.assertEqual(response.data[0]['distance_km'], 0)
+        self.assertEqual(response.data[1]['distance_km'], round(self.praga.distance_to(52.2297, 21.0122), 2))
+
+    def test_nearby_pagination_and_knn(self):
+        """Test the paginated and k-nearest variants"""
+        response = self.api_client.get(
+            '/api/v1/workshops/nearby/', {'latitude': 52.2297, 'longitude': 21.0122, 'radius': 500, 'limit': 2, 'offset': 1}
+        )
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.praga.id, self.krakow.id])
+
+        response = self.api_client.get('/api/v1/workshops/nearby/', {'latitude': 50.0, 'longitude': 20.0, 'k': 2})
+        self.assertEqual([item['id'] for item in response.data], [self.krakow.id, self.center.id])
+
+        self.assertEqual(self.api_client.get('/api/v1/workshops/nearby/', {'latitude': 'x', 'longitude': 1}).status_code, 400)
+        self.assertEqual(
+            self.api_client.get('/api/v1/workshops/nearby/', {'latitude': 1, 'longitude': 1, 'limit': 0}).status_code,
+            400
+        )
+
+    def test_index_follows_workshop_changes(self):
+        """Test that saving or deleting a workshop is visible in the next search"""
+        self.assertEqual(len(WorkshopService.get_nearby_workshops(50.06, 19.94, 5)), 1)
+
+        self.krakow.latitude, self.krakow.longitude = Decimal('52.230000'), Decimal('21.010000')
+        self.krakow.save()
+        self.assertEqual(WorkshopService.get_nearby_workshops(50.06, 19.94, 5), [])
+
+        self.praga.delete()
+        nearby = WorkshopService.get_nearby_workshops(52.2297, 21.0122, 10)
+        self.assertEqual([workshop.id for workshop in nearby], [self.center.id, self.krakow.id])
+
+    def test_search_sorted_by_distance(self):
+        """Test that search with sort_by=distance skips workshops without location"""
+        response = self.api_client.get(
+            '/api/v1/workshops/search/', {'latitude': 50.0647, 'longitude': 19.945, 'sort_by': 'distance'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [self.krakow.id, self.center.id, self.praga.id])
+        self.assertEqual(response.data[0]['distance_km'], 0)
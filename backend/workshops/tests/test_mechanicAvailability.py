@@ -0,0 +1,325 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+from datetime import date, datetime, time
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from workshops.models import Workshop, WorkshopMechanic, MechanicAvailability, MechanicBreak
+from workshops.services.mechanicAvailabilityService import MechanicAvailabilityService, MechanicDayIndex
+from workshops.services.mechanicAssignmentService import MechanicAssignmentService
+from users.models import Profile
+from appointments.models import Appointment
+from vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Poniedziałek
+MONDAY = date(2030, 1, 7)
+
+
+class MechanicDayIndexTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='indexowner',
+            email='indexowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.client_user = User.objects.create_user(
+            username='indexclient',
+            email='indexclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(
+            name='Index Workshop',
+            owner=self.owner,
+            location='Test Location'
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='IDX1234',
+            vin='1HGCM82633A111111',
+            year=2020
+        )
+        self.mechanics = []
+        self.workshop_mechanics = []
+        for number in range(3):
+            mechanic = User.objects.create_user(
+                username=f'indexmechanic{number}',
+                email=f'indexmechanic{number}@example.com',
+                password='mechpass',
+                role='mechanic'
+            )
+            workshop_mechanic = WorkshopMechanic.objects.create(workshop=self.workshop, mechanic=mechanic)
+            MechanicAvailability.objects.create(
+                workshop_mechanic=workshop_mechanic,
+                weekday=MONDAY.weekday(),
+                start_time=time(8, 0),
+                end_time=time(16, 0)
+            )
+            self.mechanics.append(mechanic)
+            self.workshop_mechanics.append(workshop_mechanic)
+
+    def _book(self, mechanic, hour, minute=0, duration=60):
+        return Appointment.objects.create(
+            client=self.client_user,
+            workshop=self.workshop,
+            vehicle=self.vehicle,
+            assigned_mechanic=mechanic,
+            date=timezone.make_aware(datetime.combine(MONDAY, time(hour, minute))),
+            duration_estimate=duration
+        )
+
+    def test_interval_mask_rounding(self):
+        """Test that occupancy rounds outwards and working hours round inwards"""
+        self.assertEqual(MechanicDayIndex.interval_mask(0, 10), 0b11)
+        self.assertEqual(MechanicDayIndex.interval_mask(3, 7), 0b11)
+        self.assertEqual(MechanicDayIndex.interval_mask(3, 7, inner=True), 0)
+        self.assertEqual(MechanicDayIndex.interval_mask(10, 5), 0)
+
+    def test_booking_blocks_overlapping_slots(self):
+        """Test that a booking blocks every slot overlapping its duration"""
+        self._book(self.mechanics[0], 10, duration=180)
+
+        index = MechanicAvailabilityService.get_day_index(self.workshop.id, MONDAY)
+
+        self.assertTrue(index.is_available(self.mechanics[0].id, time(9, 0), 60))
+        self.assertFalse(index.is_available(self.mechanics[0].id, time(9, 30), 60))
+        self.assertFalse(index.is_available(self.mechanics[0].id, time(12, 0), 30))
+        self.assertTrue(index.is_available(self.mechanics[0].id, time(13, 0), 60))
+        self.assertTrue(index.is_available(self.mechanics[1].id, time(10, 0), 60))
+
+    def test_job_must_fit_in_working_hours(self):
+        """Test that a job running past the end of the shift is rejected"""
+        index = MechanicAvailabilityService.get_day_index(self.workshop.id, MONDAY)
+
+        self.assertTrue(index.is_available(self.mechanics[0].id, time(15, 0), 60))
+        self.assertFalse(index.is_available(self.mechanics[0].id, time(15, 30), 60))
+        self.assertFalse(index.is_available(self.mechanics[0].id, time(7, 30), 60))
+
+    def test_breaks(self):
+        """Test that partial and full-day breaks remove availability"""
+        MechanicBreak.objects.create(
+            workshop_mechanic=self.workshop_mechanics[0],
+            start_date=MONDAY,
+            end_date=MONDAY,
+            start_time=time(12, 0),
+            end_time=time(13, 0)
+        )
+        MechanicBreak.objects.create(
+            workshop_mechanic=self.workshop_mechanics[1],
+            start_date=MONDAY,
+            end_date=MONDAY
+        )
+
+        index = MechanicAvailabilityService.get_day_index(self.workshop.id, MONDAY)
+
+        self.assertFalse(index.is_available(self.mechanics[0].id, time(11, 30), 60))
+        self.assertTrue(index.is_available(self.mechanics[0].id, time(13, 0), 60))
+        self.assertFalse(index.is_available(self.mechanics[1].id, time(8, 0), 30))
+        self.assertTrue(index.works_on_day(self.mechanics[1].id))
+        self.assertEqual(
+            MechanicAvailabilityService.get_available_mechanics(self.workshop.id, MONDAY, time(12, 0), 60),
+            [self.mechanics[2]]
+        )
+
+    def test_available_time_slots(self):
+        """Test that slots list only mechanics free for the whole duration"""
+        self._book(self.mechanics[0], 8)
+        self._book(self.mechanics[1], 8)
+        self._book(self.mechanics[2], 8)
+
+        slots = MechanicAvailabilityService.get_available_time_slots(self.workshop.id, MONDAY, 60)
+
+        self.assertNotIn(time(8, 0), slots)
+        self.assertNotIn(time(8, 30), slots)
+        self.assertEqual(slots[time(9, 0)], self.mechanics)
+        self.assertEqual(max(slots), time(15, 0))
+
+    def test_query_count_does_not_grow_with_mechanics(self):
+        """Test that the index is built with a fixed number of queries"""
+        for hour in range(8, 15):
+            self._book(self.mechanics[hour % 3], hour)
+
+        with self.assertNumQueries(4):
+            MechanicAvailabilityService.get_available_time_slots(self.workshop.id, MONDAY, 60)
+
+        with self.assertNumQueries(4):
+            MechanicAvailabilityService.auto_assign_mechanic(self.workshop.id, MONDAY, time(10, 0), 60)
+
+
+class MechanicAssignmentTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username='assignowner',
+            email='assignowner@example.com',
+            password='ownerpassword',
+            role='owner'
+        )
+        self.client_user = User.objects.create_user(
+            username='assignclient',
+            email='assignclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(
+            name='Assignment Workshop',
+            owner=self.owner,
+            location='Test Location'
+        )
+        self.toyota = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='ASG1234',
+            vin='1HGCM82633A222222',
+            year=2020
+        )
+        self.bmw = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='bmw',
+            model='X5',
+            registration_number='ASG5678',
+            vin='1HGCM82633A333333',
+            year=2021
+        )
+        self.mechanics = []
+        for number, specializations in enumerate([['toyota'], ['bmw'], []]):
+            mechanic = User.objects.create_user(
+                username=f'assignmechanic{number}',
+                email=f'assignmechanic{number}@example.com',
+                password='mechpass',
+                role='mechanic'
+            )
+            Profile.objects.create(user=mechanic, specializations=specializations)
+            workshop_mechanic = WorkshopMechanic.objects.create(workshop=self.workshop, mechanic=mechanic)
+            MechanicAvailability.objects.create(
+                workshop_mechanic=workshop_mechanic,
+                weekday=MONDAY.weekday(),
+                start_time=time(8, 0),
+                end_time=time(16, 0)
+            )
+            self.mechanics.append(mechanic)
+
+    def _book(self, hour, minute=0, duration=60, vehicle=None, mechanic=None):
+        return Appointment.objects.create(
+            client=self.client_user,
+            workshop=self.workshop,
+            vehicle=vehicle or self.toyota,
+            assigned_mechanic=mechanic,
+            date=timezone.make_aware(datetime.combine(MONDAY, time(hour, minute))),
+            duration_estimate=duration
+        )
+
+    def test_auto_assign_prefers_least_loaded(self):
+        """Test that single assignment no longer always returns the first mechanic"""
+        self._book(9, duration=240, vehicle=self.bmw, mechanic=self.mechanics[0])
+
+        mechanic = MechanicAvailabilityService.auto_assign_mechanic(self.workshop.id, MONDAY, time(14, 0), 60)
+
+        self.assertNotEqual(mechanic, self.mechanics[0])
+
+    def test_auto_assign_prefers_specialist(self):
+        """Test that a specialist in the vehicle brand wins at equal load"""
+        mechanic = MechanicAvailabilityService.auto_assign_mechanic(
+            self.workshop.id, MONDAY, time(10, 0), 60, vehicle_brand='BMW'
+        )
+
+        self.assertEqual(mechanic, self.mechanics[1])
+
+    def test_assign_day_balances_load(self):
+        """Test that a day of unassigned appointments is spread evenly without overlaps"""
+        ford = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='ford',
+            model='Focus',
+            registration_number='ASG9012',
+            vin='1HGCM82633A444444',
+            year=2019
+        )
+        for hour in range(8, 16):
+            self._book(hour, vehicle=ford)
+            self._book(hour, vehicle=ford)
+
+        result = MechanicAssignmentService.assign_day(self.workshop.id, MONDAY)
+
+        self.assertEqual(len(result['assigned']), 16)
+        self.assertEqual(result['unassigned'], [])
+        booked = sorted(row['booked_minutes'] for row in result['utilisation'])
+        self.assertLessEqual(booked[-1] - booked[0], 60)
+
+        for mechanic in self.mechanics:
+            starts = sorted(Appointment.objects.filter(assigned_mechanic=mechanic).values_list('date', flat=True))
+            self.assertEqual(len(starts), len(set(starts)))
+        self.assertFalse(Appointment.objects.filter(assigned_mechanic__isnull=True).exists())
+
+    def test_assign_day_matches_specializations(self):
+        """Test that appointments go to brand specialists when load allows it"""
+        toyota_appointment = self._book(9, vehicle=self.toyota)
+        bmw_appointment = self._book(9, vehicle=self.bmw)
+
+        MechanicAssignmentService.assign_day(self.workshop.id, MONDAY)
+
+        toyota_appointment.refresh_from_db()
+        bmw_appointment.refresh_from_db()
+        self.assertEqual(toyota_appointment.assigned_mechanic, self.mechanics[0])
+        self.assertEqual(bmw_appointment.assigned_mechanic, self.mechanics[1])
+
+    def test_assign_day_reports_overbooked_and_respects_existing(self):
+        """Test that existing assignments block time and surplus appointments stay unassigned"""
+        self._book(10, mechanic=self.mechanics[0])
+        for _ in range(3):
+            self._book(10)
+
+        result = MechanicAssignmentService.assign_day(self.workshop.id, MONDAY)
+
+        self.assertEqual(len(result['assigned']), 2)
+        self.assertEqual(len(result['unassigned']), 1)
+        self.assertEqual({row['booked_minutes'] for row in result['utilisation']}, {60})
+        self.assertEqual(result['utilisation'][0]['capacity_minutes'], 480)
+        self.assertEqual(result['utilisation'][0]['utilisation'], 0.125)
+
+    def test_dry_run_does_not_save(self):
+        """Test that a dry run only returns the plan"""
+        self._book(10)
+
+        result = MechanicAssignmentService.assign_day(self.workshop.id, MONDAY, dry_run=True)
+
+        self.assertEqual(len(result['assigned']), 1)
+        self.assertFalse(Appointment.objects.filter(assigned_mechanic__isnull=False).exists())
+
+    def test_query_count_is_constant(self):
+        """Test that the solver uses a fixed number of queries regardless of appointments"""
+        for hour in range(8, 16):
+            self._book(hour)
+
+        # savepoint, wizyty, indeks (4), bulk_update, release
+        with self.assertNumQueries(8):
+            MechanicAssignmentService.assign_day(self.workshop.id, MONDAY)
+
+    def test_endpoint(self):
+        """Test the auto-assign-mechanics action and its owner check"""
+        self._book(10)
+        api_client = APIClient()
+        url = '/api/v1/availability/auto-assign-mechanics/'
+        params = f'?workshop_id={self.workshop.id}&date={MONDAY.isoformat()}'
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.client_user).access_token}')
+        self.assertEqual(api_client.post(url + params).status_code, 403)
+
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.owner).access_token}')
+        response = api_client.post(url + params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['assigned']), 1)
+        self.assertEqual(len(response.data['utilisation']), 3)
+
+        self.assertEqual(api_client.post(url + '?workshop_id=999999&date=2030-01-07').status_code, 404)
+        self.assertEqual(api_client.post(url + '?workshop_id=x').status_code, 400)
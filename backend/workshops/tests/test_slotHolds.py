@@ -0,0 +1,203 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import time as time_module
+import unittest
+from datetime import date, datetime, time
+from unittest.mock import patch
+import redis
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from backend.redisClient import get_redis
+from workshops.models import Workshop, WorkshopAvailability, WorkshopMechanic, MechanicAvailability
+from workshops.services.availabilityService import AvailabilityService
+from workshops.services.mechanicAvailabilityService import MechanicAvailabilityService
+from workshops.services.slotHoldService import SlotHoldService, SlotUnavailableError
+from appointments.models import Appointment
+from vehicles.models import Vehicle
+
+User = get_user_model()
+
+# Poniedziałek
+MONDAY = date(2030, 1, 7)
+
+
+def redis_available():
+    try:
+        return get_redis().ping()
+    except redis.RedisError:
+        return False
+
+
+@unittest.skipUnless(redis_available(), "Blokady terminów wymagają działającego Redis")
+class SlotHoldTests(TestCase):
+    def setUp(self):
+        self._clear_holds()
+        self.client_user = User.objects.create_user(
+            username='holdclient',
+            email='holdclient@example.com',
+            password='clientpassword',
+            role='client'
+        )
+        self.other_user = User.objects.create_user(
+            username='holdother',
+            email='holdother@example.com',
+            password='otherpassword',
+            role='client'
+        )
+        self.workshop = Workshop.objects.create(name='Hold Workshop', location='Test Location')
+        WorkshopAvailability.objects.create(
+            workshop=self.workshop,
+            weekday=MONDAY.weekday(),
+            start_time=time(8, 0),
+            end_time=time(16, 0),
+            slot_duration=60
+        )
+        self.mechanic = User.objects.create_user(
+            username='holdmechanic',
+            email='holdmechanic@example.com',
+            password='mechpass',
+            role='mechanic'
+        )
+        workshop_mechanic = WorkshopMechanic.objects.create(workshop=self.workshop, mechanic=self.mechanic)
+        MechanicAvailability.objects.create(
+            workshop_mechanic=workshop_mechanic,
+            weekday=MONDAY.weekday(),
+            start_time=time(8, 0),
+            end_time=time(16, 0)
+        )
+        self.vehicle = Vehicle.objects.create(
+            owner=self.client_user,
+            brand='toyota',
+            model='Corolla',
+            registration_number='HLD1234',
+            vin='1HGCM82633A777777',
+            year=2020
+        )
+
+    def tearDown(self):
+        self._clear_holds()
+
+    def _clear_holds(self):
+        client = get_redis()
+        for key in client.scan_iter(f'{SlotHoldService.KEY_PREFIX}*'):
+            client.delete(key)
+
+    def _at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(MONDAY, time(hour, minute)))
+
+    def test_overlapping_hold_is_rejected(self):
+        """Test that a held slot cannot be held by another client"""
+        SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 60)
+
+        with self.assertRaises(SlotUnavailableError):
+            SlotHoldService.create_hold(self.other_user, self.workshop.id, self._at(10, 30), 60)
+
+        # Przedziały są półotwarte - termin zaraz po blokadzie jest wolny
+        SlotHoldService.create_hold(self.other_user, self.workshop.id, self._at(11), 60)
+
+    def test_hold_hides_slots_from_availability(self):
+        """Test that availability skips slots overlapping an active hold"""
+        SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 90)
+
+        slots = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)['slots']
+        self.assertNotIn('10:00', slots)
+        self.assertNotIn('11:00', slots)
+        self.assertIn('12:00', slots)
+
+        slots = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY, duration_minutes=120)['slots']
+        self.assertNotIn('09:00', slots)
+        self.assertIn('12:00', slots)
+
+    def test_hold_expires_without_cleanup(self):
+        """Test that an expired hold frees the slot on its own"""
+        with patch.object(SlotHoldService, 'HOLD_TTL_SECONDS', 1):
+            hold = SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 60)
+        self.assertNotIn('10:00', AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)['slots'])
+
+        time_module.sleep(1.1)
+
+        self.assertIn('10:00', AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)['slots'])
+        with self.assertRaises(django.http.Http404):
+            SlotHoldService.get_hold(hold['id'])
+        SlotHoldService.create_hold(self.other_user, self.workshop.id, self._at(10), 60)
+
+    def test_held_mechanic_is_not_available(self):
+        """Test that a hold with a mechanic blocks that mechanic"""
+        self.assertEqual(
+            MechanicAvailabilityService.get_available_mechanics(self.workshop.id, MONDAY, time(10, 0)),
+            [self.mechanic]
+        )
+
+        SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 60, self.mechanic.id)
+
+        self.assertEqual(MechanicAvailabilityService.get_available_mechanics(self.workshop.id, MONDAY, time(10, 0)), [])
+        self.assertEqual(
+            MechanicAvailabilityService.get_available_mechanics(self.workshop.id, MONDAY, time(11, 0)),
+            [self.mechanic]
+        )
+
+    def test_confirm_creates_appointment_and_releases_hold(self):
+        """Test that confirming a hold books the appointment and removes the hold"""
+        hold = SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 60, self.mechanic.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment = SlotHoldService.confirm_hold(hold['id'], self.client_user, self.vehicle.id, 'inspection')
+
+        self.assertEqual(appointment.date, self._at(10))
+        self.assertEqual(appointment.duration_estimate, 60)
+        self.assertEqual(appointment.assigned_mechanic, self.mechanic)
+        self.assertEqual(SlotHoldService.get_active_holds(self.workshop.id, MONDAY), [])
+        with self.assertRaises(django.http.Http404):
+            SlotHoldService.confirm_hold(hold['id'], self.client_user, self.vehicle.id)
+        # Termin jest teraz zajęty przez wizytę
+        self.assertNotIn('10:00', AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)['slots'])
+
+    def test_confirm_requires_owner(self):
+        """Test that only the user who created the hold can confirm it"""
+        hold = SlotHoldService.create_hold(self.client_user, self.workshop.id, self._at(10), 60)
+
+        with self.assertRaises(PermissionError):
+            SlotHoldService.confirm_hold(hold['id'], self.other_user, self.vehicle.id)
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_redis_outage_does_not_break_availability(self):
+        """Test that availability is still served when Redis is unreachable"""
+        with patch('workshops.services.slotHoldService.get_redis', side_effect=redis.ConnectionError):
+            slots = AvailabilityService.get_workshop_availability(self.workshop.id, MONDAY)['slots']
+        self.assertIn('10:00', slots)
+
+    def test_endpoints(self):
+        """Test the hold lifecycle through the API"""
+        api_client = APIClient()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.client_user).access_token}')
+        other_client = APIClient()
+        other_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.other_user).access_token}')
+        payload = {'workshop_id': self.workshop.id, 'start': self._at(10).isoformat(), 'appointment_type': 'inspection'}
+
+        response = api_client.post('/api/v1/slot-holds/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        hold_id = response.data['id']
+        self.assertEqual(response.data['duration_minutes'], 60)
+
+        self.assertEqual(other_client.post('/api/v1/slot-holds/', payload, format='json').status_code, 409)
+        self.assertEqual(other_client.get(f'/api/v1/slot-holds/{hold_id}/').status_code, 403)
+        self.assertEqual(api_client.post('/api/v1/slot-holds/', {'start': 'x'}, format='json').status_code, 400)
+
+        response = api_client.post(
+            f'/api/v1/slot-holds/{hold_id}/confirm/',
+            {'vehicle_id': self.vehicle.id, 'appointment_type': 'inspection'},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Appointment.objects.get().id, response.data['id'])
+
+        response = api_client.post('/api/v1/slot-holds/', {**payload, 'start': self._at(13).isoformat()}, format='json')
+        hold_id = response.data['id']
+        self.assertEqual(api_client.delete(f'/api/v1/slot-holds/{hold_id}/').status_code, 204)
+        self.assertEqual(api_client.get(f'/api/v1/slot-holds/{hold_id}/').status_code, 404)
@@ -0,0 +1,152 @@
+import os
+os.environ['DJANGO_SETTINGS_MODULE'] = 'backend.settings'
+import django
+django.setup()
+
+import unittest
+from decimal import Decimal
+from time import perf_counter
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from workshops.models import Workshop
+from workshops.services.workshopSearchService import WorkshopSearchService
+
+User = get_user_model()
+
+postgres_only = unittest.skipUnless(
+    connection.vendor == 'postgresql',
+    "tsvector, trigramy i indeksy GIN istnieją tylko na PostgreSQL"
+)
+
+benchmark = unittest.skipUnless(
+    os.environ.get('RUN_BENCHMARKS'),
+    "Pomiar czasu na 100 tys. warsztatów - uruchamiany z RUN_BENCHMARKS=1"
+)
+
+
+class WorkshopSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='searchuser', email='searchuser@example.com', password='password123')
+        self.api_client = APIClient()
+        self.api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.kowalski = Workshop.objects.create(
+            name='Serwis Kowalski', location='Warszawa', rating=Decimal('4.50'),
+            latitude=Decimal('52.229700'), longitude=Decimal('21.012200')
+        )
+        self.opony = Workshop.objects.create(
+            name='Opony Nowak', location='Warszawa', address_full='ul. Serwisowa 1', rating=Decimal('3.00'),
+            latitude=Decimal('52.250000'), longitude=Decimal('21.040000')
+        )
+        self.diesel = Workshop.objects.create(
+            name='Diesel Serwis', location='Kraków', rating=Decimal('5.00'),
+            latitude=Decimal('50.064700'), longitude=Decimal('19.945000'), specialization='diesel'
+        )
+        self.no_location = Workshop.objects.create(name='Blacharnia', location='Gdańsk', rating=Decimal('4.00'))
+
+    def _ids(self, workshops):
+        return [workshop.id for workshop in workshops]
+
+    def test_filters_and_sorts_in_sql(self):
+        """Test that filtering and each sort order produce a single query"""
+        with self.assertNumQueries(1):
+            by_name = self._ids(WorkshopSearchService.search(query='serwis'))
+        self.assertEqual(by_name, [self.diesel.id, self.opony.id, self.kowalski.id])
+
+        by_rating = self._ids(WorkshopSearchService.search(sort_by='rating'))
+        self.assertEqual(by_rating, [self.diesel.id, self.kowalski.id, self.no_location.id, self.opony.id])
+
+        by_distance = WorkshopSearchService.search(latitude=50.0647, longitude=19.945, sort_by='distance')
+        self.assertEqual(self._ids(by_distance), [self.diesel.id, self.kowalski.id, self.opony.id])
+        self.assertAlmostEqual(by_distance[1].calculated_distance, self.kowalski.distance_to(50.0647, 19.945), places=6)
+
+        self.assertEqual(self._ids(WorkshopSearchService.search(specialization='diesel')), [self.diesel.id])
+        with self.assertRaises(ValueError):
+            WorkshopSearchService.search(sort_by='popularity')
+
+    def test_relevance_combines_text_rating_and_distance(self):
+        """Test that relevance prefers name matches, then rating and proximity"""
+        ranked = self._ids(WorkshopSearchService.search(query='serwis', sort_by='relevance'))
+        # Dopasowanie w adresie jest najsłabsze
+        self.assertEqual(ranked[-1], self.opony.id)
+
+        # Blisko Warszawy odległość przeważa nad wyższą oceną warsztatu z Krakowa
+        ranked = self._ids(WorkshopSearchService.search(
+            query='serwis', latitude=52.2297, longitude=21.0122, sort_by='relevance'
+        ))
+        self.assertEqual(ranked[0], self.kowalski.id)
+
+    def test_search_endpoint_pagination(self):
+        """Test limit/offset pages and parameter validation"""
+        response = self.api_client.get('/api/v1/workshops/search/', {'sort_by': 'rating', 'limit': 2, 'offset': 1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual([item['id'] for item in response.data['results']], [self.kowalski.id, self.no_location.id])
+
+        response = self.api_client.get('/api/v1/workshops/search/', {'query': 'serwis', 'latitude': 52.2297, 'longitude': 21.0122, 'sort_by': 'distance'})
+        self.assertEqual(response.data[0]['id'], self.kowalski.id)
+        self.assertEqual(response.data[0]['distance_km'], 0)
+
+        self.assertEqual(self.api_client.get('/api/v1/workshops/search/', {'sort_by': 'x'}).status_code, 400)
+        self.assertEqual(self.api_client.get('/api/v1/workshops/search/', {'limit': 0}).status_code, 400)
+
+    def test_autocomplete(self):
+        """Test that suggestions start with names beginning with the typed text"""
+        response = self.api_client.get('/api/v1/workshops/autocomplete/', {'q': 'Ser', 'limit': 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({item['id'] for item in response.data[:2]}, {self.kowalski.id, self.diesel.id})
+        self.assertEqual(set(response.data[0]), {'id', 'name', 'location'})
+        self.assertEqual(self.api_client.get('/api/v1/workshops/autocomplete/', {'q': ''}).data, [])
+
+
+@postgres_only
+class PostgresWorkshopSearchTests(TestCase):
+    def test_search_vector_is_maintained(self):
+        """Test that the trigger keeps the tsvector in sync with the text columns"""
+        workshop = Workshop.objects.create(name='Auto Mechanika', location='Poznań')
+        workshop.refresh_from_db()
+        self.assertIn('mechanika', str(workshop.search_vector))
+
+        Workshop.objects.filter(id=workshop.id).update(location='Gniezno')
+        workshop.refresh_from_db()
+        self.assertIn('gniezno', str(workshop.search_vector))
+
+    def test_typo_tolerance(self):
+        """Test that trigram similarity finds names with typos"""
+        workshop = Workshop.objects.create(name='Warsztat Samochodowy Kowalczyk', location='Łódź')
+
+        self.assertIn(workshop.id, [w.id for w in WorkshopSearchService.search(query='Kowalczk')])
+        self.assertEqual(WorkshopSearchService.autocomplete('warszt samoch')[0]['id'], workshop.id)
+
+    @benchmark
+    def test_autocomplete_on_100k_workshops(self):
+        """Benchmark autocomplete on a 100k-workshop table"""
+        words = ['Auto', 'Serwis', 'Mechanika', 'Opony', 'Diesel', 'Blacharstwo', 'Elektryka', 'Moto']
+        cities = ['Warszawa', 'Kraków', 'Gdańsk', 'Wrocław', 'Poznań', 'Łódź']
+        Workshop.objects.bulk_create(
+            [
+                Workshop(
+                    name=f'{words[number % 8]} {words[(number // 8) % 8]} {number}',
+                    location=cities[number % 6]
+                )
+                for number in range(100_000)
+            ],
+            batch_size=5000
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE workshops_workshop')
+
+        WorkshopSearchService.autocomplete('Mecha')
+        timings = []
+        for text in ['Mecha', 'Serwis Op', 'Elektyka', 'Diesel 99']:
+            started = perf_counter()
+            suggestions = WorkshopSearchService.autocomplete(text)
+            timings.append(perf_counter() - started)
+            self.assertTrue(suggestions)
+
+        print(f"\nAutocomplete on 100k workshops: {', '.join(f'{t * 1000:.1f} ms' for t in timings)}")
+        self.assertLess(max(timings), 0.05)
@@ -1,6 +1,29 @@
+from django.conf import settings
 from django.urls import path, include
 from .routers import router
+from .views_collection.AsyncWorkshopView import CheckAvailabilityAsyncView, NearbyWorkshopsAsyncView, SearchWorkshopsAsyncView
+from .views_collection.AvailabilityView import WorkshopAvailabilityViewSet
+from .views_collection.WorkshopView import WorkshopViewSet
 
-urlpatterns = [
+# Widoki asynchroniczne przed trasami routera, z tymi samymi nazwami tras co akcje DRF
+async_read_urlpatterns = [
+    path(
+        'availability/check_availability/',
+        CheckAvailabilityAsyncView.as_view(sync_view=WorkshopAvailabilityViewSet.as_view({'get': 'check_availability'})),
+        name='workshop-availability-check-availability'
+    ),
+    path(
+        'workshops/nearby/',
+        NearbyWorkshopsAsyncView.as_view(sync_view=WorkshopViewSet.as_view({'get': 'nearby_workshops'})),
+        name='workshop-nearby-workshops'
+    ),
+    path(
+        'workshops/search/',
+        SearchWorkshopsAsyncView.as_view(sync_view=WorkshopViewSet.as_view({'get': 'search_workshops'})),
+        name='workshop-search-workshops'
+    ),
+] if settings.ASYNC_READ_VIEWS else []
+
+urlpatterns = async_read_urlpatterns + [
     path('', include(router.urls)),
 ]
@@ -0,0 +1,86 @@
+from datetime import datetime
+from rest_framework import status
+from backend.views_collection.AsyncView import AsyncAPIView
+from ..services.availabilityService import AvailabilityService
+from ..services.workshopService import WorkshopService
+from ..serializers import WorkshopSerializer
+from .AvailabilityView import WorkshopAvailabilityViewSet
+from .WorkshopView import WorkshopViewSet
+
+
+class CheckAvailabilityAsyncView(AsyncAPIView):
+    """Async GET /availability/check_availability/ (WorkshopAvailabilityViewSet.check_availability)."""
+
+    async def get(self, request):
+        workshop_id = request.query_params.get('workshop_id')
+        date_str = request.query_params.get('date')
+
+        if not workshop_id or not date_str:
+            return self.render(
+                {"error": "Both 'workshop_id' and 'date' parameters are required"},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            workshop_id = int(workshop_id)
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            duration = WorkshopAvailabilityViewSet.requested_duration(request)
+        except (ValueError, TypeError):
+            return self.render(
+                {"error": "Invalid workshop_id, date format (expected YYYY-MM-DD) or duration"},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            availability = await AvailabilityService.aget_workshop_availability(workshop_id, target_date, duration)
+            return self.render(availability)
+        except Exception as e:
+            return self.render(
+                {"error": f"Error checking availability: {str(e)}"},
+                status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class NearbyWorkshopsAsyncView(AsyncAPIView):
+    """Async GET /workshops/nearby/ (WorkshopViewSet.nearby_workshops)."""
+    serializer_class = WorkshopSerializer
+
+    async def get(self, request):
+        try:
+            latitude, longitude, radius, k, limit, offset = WorkshopViewSet.nearby_params(request.query_params)
+        except (ValueError, TypeError):
+            return self.render({"error": "Invalid latitude, longitude, radius, k, limit or offset parameters"}, 400)
+
+        try:
+            if k is not None:
+                workshops, total = await WorkshopService.aget_nearest_workshops(latitude, longitude, k), None
+            else:
+                workshops, total = await WorkshopService.aget_nearby_workshops_page(
+                    latitude, longitude, radius, offset, limit
+                )
+        except Exception as e:
+            return self.render({"error": str(e)}, 500)
+
+        return self.render(WorkshopViewSet.nearby_data(workshops, total, k, limit, offset))
+
+
+class SearchWorkshopsAsyncView(AsyncAPIView):
+    """Async GET /workshops/search/ (WorkshopViewSet.search_workshops)."""
+    serializer_class = WorkshopSerializer
+
+    async def get(self, request):
+        try:
+            workshops, limit, offset = WorkshopViewSet.search_queryset(request.query_params)
+        except ValueError:
+            return self.render(
+                {"error": "Invalid latitude, longitude, sort_by, limit or offset parameters"},
+                400
+            )
+
+        try:
+            page = workshops[offset:offset + limit] if limit is not None else workshops[offset:]
+            page = [workshop async for workshop in page]
+            count = await workshops.acount() if limit is not None else None
+            return self.render(WorkshopViewSet.search_data(page, count, limit, offset))
+        except Exception as e:
+            return self.render({"error": str(e)}, 500)
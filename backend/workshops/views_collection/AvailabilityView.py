@@ -6,9 +6,12 @@ from django.http import Http404
 from datetime import datetime, date, timedelta
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 from backend.views_collection.BaseView import BaseViewSet
+from backend.singleFlight import SingleFlight
 from ..services.availabilityService import AvailabilityService
 from ..services.mechanicAvailabilityService import MechanicAvailabilityService
-from ..models import WorkshopAvailability, WorkshopBreak, MechanicAvailability
+from ..services.mechanicAssignmentService import MechanicAssignmentService
+from ..services.disruptionService import DisruptionService
+from ..models import Workshop, WorkshopAvailability, WorkshopBreak, MechanicBreak
 from ..serializers import WorkshopAvailabilitySerializer, WorkshopBreakSerializer
 
 
@@ -19,12 +22,16 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
     def list(self, request):
         """Override list - redirect to specific actions"""
         return Response({
-            "message": "Use specific endpoints: check_availability, available_dates, get-workshop-mechanics, get-mechanic-availability",
+            "message": "Use specific endpoints: check_availability, available_dates, earliest-slots, get-workshop-mechanics, get-mechanic-availability, auto-assign-mechanics, break-disruption, coalescing-stats",
             "available_actions": [
                 "/api/v1/availability/check_availability/",
                 "/api/v1/availability/available_dates/",
+                "/api/v1/availability/earliest-slots/",
                 "/api/v1/availability/get-workshop-mechanics/",
-                "/api/v1/availability/get-mechanic-availability/"
+                "/api/v1/availability/get-mechanic-availability/",
+                "/api/v1/availability/auto-assign-mechanics/",
+                "/api/v1/availability/break-disruption/",
+                "/api/v1/availability/coalescing-stats/"
             ]
         })
 
@@ -38,12 +45,45 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
             ]
         })
 
+    def _check_workshop_owner(self, request, workshop_id):
+        """Return an error response unless the user owns the workshop or is an admin"""
+        owner_ids = list(Workshop.objects.filter(id=workshop_id).values_list('owner_id', flat=True))
+        if not owner_ids:
+            return Response({"error": "Workshop not found"}, status=status.HTTP_404_NOT_FOUND)
+        if owner_ids[0] != request.user.id and request.user.role not in ('admin', 'root'):
+            return Response(
+                {"error": "Only the workshop owner can manage its schedule"},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return None
+
+    @staticmethod
+    def requested_duration(request):
+        """Czas trwania z parametru 'duration' lub domyślny dla 'appointment_type' (None = slot_duration)"""
+        from appointments.models import Appointment
+
+        duration = request.query_params.get('duration')
+        appointment_type = request.query_params.get('appointment_type')
+
+        if duration:
+            duration = int(duration)
+            if duration <= 0:
+                raise ValueError("Duration must be positive")
+            return duration
+        if appointment_type:
+            if appointment_type not in Appointment.APPOINTMENT_DURATIONS:
+                raise ValueError(f"Unknown appointment type: {appointment_type}")
+            return Appointment.APPOINTMENT_DURATIONS[appointment_type]
+        return None
+
     @extend_schema(
         summary="Check workshop availability for a specific date",
         description="Returns available time slots for a workshop on a given date",
         parameters=[
             OpenApiParameter(name="workshop_id", description="ID of the workshop", required=True, type=int),
-            OpenApiParameter(name="date", description="Date in YYYY-MM-DD format", required=True, type=str)
+            OpenApiParameter(name="date", description="Date in YYYY-MM-DD format", required=True, type=str),
+            OpenApiParameter(name="duration", description="Required duration in minutes (defaults to the slot duration)", required=False, type=int),
+            OpenApiParameter(name="appointment_type", description="Appointment type used to derive the duration", required=False, type=str),
         ],
         responses={
             200: OpenApiResponse(description="Availability information"),
@@ -66,14 +106,15 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
         try:
             workshop_id = int(workshop_id)
             target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            duration = self.requested_duration(request)
         except (ValueError, TypeError):
             return Response(
-                {"error": "Invalid workshop_id or date format (expected YYYY-MM-DD)"},
+                {"error": "Invalid workshop_id, date format (expected YYYY-MM-DD) or duration"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         try:
-            availability = self.service.get_workshop_availability(workshop_id, target_date)
+            availability = self.service.get_workshop_availability(workshop_id, target_date, duration)
             return Response(availability)
         except Exception as e:
             return Response(
@@ -87,7 +128,9 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
         parameters=[
             OpenApiParameter(name="workshop_id", description="ID of the workshop", required=True, type=int),
             OpenApiParameter(name="start_date", description="Start date in YYYY-MM-DD format", required=True, type=str),
-            OpenApiParameter(name="end_date", description="End date in YYYY-MM-DD format", required=True, type=str)
+            OpenApiParameter(name="end_date", description="End date in YYYY-MM-DD format", required=True, type=str),
+            OpenApiParameter(name="duration", description="Required duration in minutes (defaults to the slot duration)", required=False, type=int),
+            OpenApiParameter(name="appointment_type", description="Appointment type used to derive the duration", required=False, type=str),
         ],
         responses={
             200: OpenApiResponse(description="List of available dates"),
@@ -112,6 +155,7 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
             workshop_id = int(workshop_id)
             start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
             end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+            duration = self.requested_duration(request)
             
             if start_date > end_date:
                 return Response(
@@ -133,7 +177,7 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
             )
         
         try:
-            available_dates = self.service.get_available_dates(workshop_id, start_date, end_date)
+            available_dates = self.service.get_available_dates(workshop_id, start_date, end_date, duration)
             return Response({"available_dates": available_dates})
         except Exception as e:
             return Response(
@@ -146,7 +190,9 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
         description="Verify if a specific date and time slot is available for booking",
         parameters=[
             OpenApiParameter(name="workshop_id", description="ID of the workshop", required=True, type=int),
-            OpenApiParameter(name="datetime", description="DateTime in ISO format", required=True, type=str)
+            OpenApiParameter(name="datetime", description="DateTime in ISO format", required=True, type=str),
+            OpenApiParameter(name="duration", description="Required duration in minutes (defaults to the slot duration)", required=False, type=int),
+            OpenApiParameter(name="appointment_type", description="Appointment type used to derive the duration", required=False, type=str),
         ],
         responses={
             200: OpenApiResponse(description="Slot availability status"),
@@ -169,14 +215,15 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
         try:
             workshop_id = int(workshop_id)
             datetime_slot = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
+            duration = self.requested_duration(request)
         except (ValueError, TypeError):
             return Response(
-                {"error": "Invalid workshop_id or datetime format"},
+                {"error": "Invalid workshop_id, datetime format or duration"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         try:
-            is_available = self.service.check_slot_availability(workshop_id, datetime_slot)
+            is_available = self.service.check_slot_availability(workshop_id, datetime_slot, duration)
             return Response({
                 "available": is_available,
                 "workshop_id": workshop_id,
@@ -188,6 +235,59 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @extend_schema(
+        summary="Find the earliest free slots near a location",
+        description="Returns the earliest free slots across all workshops within the given radius, sorted by time",
+        parameters=[
+            OpenApiParameter(name="latitude", description="User latitude", required=True, type=float),
+            OpenApiParameter(name="longitude", description="User longitude", required=True, type=float),
+            OpenApiParameter(name="radius", description="Search radius in kilometers (default 20)", required=False, type=float),
+            OpenApiParameter(name="limit", description="Number of slots to return (default 5, max 50)", required=False, type=int),
+            OpenApiParameter(name="days", description="Number of days to search (default 14, max 60)", required=False, type=int),
+            OpenApiParameter(name="start_date", description="First date to search in YYYY-MM-DD format", required=False, type=str),
+            OpenApiParameter(name="duration", description="Required duration in minutes (defaults to the slot duration)", required=False, type=int),
+            OpenApiParameter(name="appointment_type", description="Appointment type used to derive the duration", required=False, type=str),
+        ],
+        responses={
+            200: OpenApiResponse(description="Earliest free slots"),
+            400: OpenApiResponse(description="Invalid parameters")
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='earliest-slots')
+    def earliest_slots(self, request):
+        """Find the earliest free slots across nearby workshops"""
+        try:
+            latitude = float(request.query_params.get('latitude'))
+            longitude = float(request.query_params.get('longitude'))
+            radius = float(request.query_params.get('radius', 20))
+            limit = int(request.query_params.get('limit', 5))
+            days = int(request.query_params.get('days', 14))
+            start_date_str = request.query_params.get('start_date')
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
+            duration = self.requested_duration(request)
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "Invalid latitude, longitude, radius, limit, days, start_date or duration"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not (1 <= limit <= 50) or not (1 <= days <= 60) or radius <= 0:
+            return Response(
+                {"error": "Parameters out of range (limit 1-50, days 1-60, radius > 0)"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = self.service.find_earliest_slots(
+                latitude, longitude, radius, limit, duration, start_date, days
+            )
+            return Response(result)
+        except Exception as e:
+            return Response(
+                {"error": f"Error searching for slots: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @extend_schema(
         summary="Create default availability schedule for workshop",
         description="Creates a default Monday-Friday 8:00-17:00, Saturday 8:00-15:00 schedule",
@@ -328,110 +428,11 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
             target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
             print(f"DEBUG: Parsed workshop_id={workshop_id}, target_date={target_date}")
             
-            if time_str:
-                print(f"DEBUG: Checking specific time {time_str}")
-                # Sprawdź konkretny czas
-                time_slot = datetime.strptime(time_str, '%H:%M').time()
-                print(f"DEBUG: Parsed time_slot={time_slot}")
-                
-                available_mechanics = MechanicAvailabilityService.get_available_mechanics(
-                    workshop_id, target_date, time_slot, duration
-                )
-                print(f"DEBUG: Available mechanics count: {len(available_mechanics)}")
-                
-                mechanic_data = []
-                for mechanic in available_mechanics:
-                    # Get specializations from profile
-                    specializations = []
-                    if hasattr(mechanic, 'profile') and mechanic.profile:
-                        specializations = mechanic.profile.specializations or []
-                    
-                    mechanic_data.append({
-                        'id': mechanic.id,
-                        'first_name': mechanic.first_name,
-                        'last_name': mechanic.last_name,
-                        'full_name': f"{mechanic.first_name} {mechanic.last_name}",
-                        'email': mechanic.email,
-                        'is_available': True,
-                        'specializations': specializations
-                    })
-                
-                # Pobierz wszystkich mechaników warsztatu dla porównania
-                print("DEBUG: Getting all workshop mechanics for comparison")
-                all_mechanics = MechanicAvailabilityService.get_workshop_mechanics(workshop_id)
-                
-                # Utwórz set ID dostępnych mechaników dla szybkiego wyszukiwania
-                available_mechanic_ids = {mechanic.id for mechanic in available_mechanics}
-                
-                # Dodaj niedostępnych mechaników
-                for workshop_mechanic in all_mechanics:
-                    if workshop_mechanic.mechanic.id not in available_mechanic_ids:
-                        # Get specializations from profile
-                        specializations = []
-                        if hasattr(workshop_mechanic.mechanic, 'profile') and workshop_mechanic.mechanic.profile:
-                            specializations = workshop_mechanic.mechanic.profile.specializations or []
-                        
-                        mechanic_data.append({
-                            'id': workshop_mechanic.mechanic.id,
-                            'first_name': workshop_mechanic.mechanic.first_name,
-                            'last_name': workshop_mechanic.mechanic.last_name,
-                            'full_name': f"{workshop_mechanic.mechanic.first_name} {workshop_mechanic.mechanic.last_name}",
-                            'email': workshop_mechanic.mechanic.email,
-                            'is_available': False,
-                            'specializations': specializations
-                        })
-                
-                print(f"DEBUG: Unavailable mechanics count: {len(all_mechanics) - len(available_mechanics)}")
-                print(f"DEBUG: Returning {len(mechanic_data)} total mechanics")
-                return Response({
-                    'mechanics': mechanic_data,
-                    'available_count': len(available_mechanics),
-                    'total_count': len(all_mechanics),
-                    'date': date_str,
-                    'time': time_str
-                })
-            else:
-                # Sprawdź ogólną dostępność na cały dzień
-                print("DEBUG: Checking general availability for the day")
-                all_mechanics = MechanicAvailabilityService.get_workshop_mechanics(workshop_id)
-                mechanic_data = []
-                
-                for mechanic in all_mechanics:
-                    # Sprawdź czy mechanik ma dostępność w tym dniu
-                    weekday = target_date.weekday()
-                    try:
-                        availability = MechanicAvailability.objects.get(
-                            workshop_mechanic=mechanic,
-                            weekday=weekday
-                        )
-                        is_available = availability.is_available
-                    except MechanicAvailability.DoesNotExist:
-                        is_available = False
-                    
-                    # Get specializations from profile
-                    specializations = []
-                    if hasattr(mechanic.mechanic, 'profile') and mechanic.mechanic.profile:
-                        specializations = mechanic.mechanic.profile.specializations or []
-                    
-                    mechanic_data.append({
-                        'id': mechanic.mechanic.id,
-                        'first_name': mechanic.mechanic.first_name,
-                        'last_name': mechanic.mechanic.last_name,
-                        'full_name': f"{mechanic.mechanic.first_name} {mechanic.mechanic.last_name}",
-                        'email': mechanic.mechanic.email,
-                        'is_available': is_available,
-                        'specializations': specializations
-                    })
-                
-                available_count = sum(1 for m in mechanic_data if m['is_available'])
-                
-                return Response({
-                    'mechanics': mechanic_data,
-                    'available_count': available_count,
-                    'total_count': len(all_mechanics),
-                    'date': date_str
-                })
-                
+            time_slot = datetime.strptime(time_str, '%H:%M').time() if time_str else None
+            return Response(MechanicAvailabilityService.get_mechanic_availability(
+                workshop_id, target_date, time_slot, duration
+            ))
+
         except ValueError as e:
             print(f"DEBUG: ValueError in check_mechanic_availability: {e}")
             return Response(
@@ -447,6 +448,125 @@ class WorkshopAvailabilityViewSet(BaseViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @extend_schema(
+        summary="Assign mechanics to all unassigned appointments of a day",
+        description="Balances load across the workshop's mechanics and prefers specialists in the vehicle brand. "
+                    "Returns the assignments and per-mechanic utilisation.",
+        parameters=[
+            OpenApiParameter(name="workshop_id", description="ID of the workshop", required=True, type=int),
+            OpenApiParameter(name="date", description="Date (YYYY-MM-DD)", required=True, type=str),
+            OpenApiParameter(name="dry_run", description="Only return the plan without saving", required=False, type=bool),
+            OpenApiParameter(name="async", description="Run as a background Celery task", required=False, type=bool),
+        ],
+        responses={
+            200: OpenApiResponse(description="Assignment result with utilisation report"),
+            202: OpenApiResponse(description="Assignment task queued"),
+            400: OpenApiResponse(description="Invalid parameters"),
+            403: OpenApiResponse(description="Not the workshop owner"),
+            404: OpenApiResponse(description="Workshop not found")
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='auto-assign-mechanics')
+    def auto_assign_mechanics(self, request):
+        """Assign mechanics to the unassigned appointments of a workshop day"""
+        try:
+            workshop_id = int(request.query_params.get('workshop_id'))
+            target_date = datetime.strptime(request.query_params.get('date'), '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "Parameters 'workshop_id' and 'date' (YYYY-MM-DD) are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        dry_run = request.query_params.get('dry_run', 'false').lower() == 'true'
+        run_async = request.query_params.get('async', 'false').lower() == 'true'
+
+        error_response = self._check_workshop_owner(request, workshop_id)
+        if error_response:
+            return error_response
+
+        try:
+            if run_async:
+                from ..tasks import assign_mechanics_for_day
+                task = assign_mechanics_for_day.delay(workshop_id, target_date.isoformat(), dry_run)
+                return Response({"task_id": task.id}, status=status.HTTP_202_ACCEPTED)
+
+            result = MechanicAssignmentService.assign_day(workshop_id, target_date, dry_run)
+            return Response(result)
+        except Exception as e:
+            return Response(
+                {"error": f"Error assigning mechanics: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @extend_schema(
+        summary="Preview or apply rescheduling of appointments affected by a break",
+        description="GET returns the plan (reassign to another mechanic, shift within the day or flag for rescheduling); "
+                    "POST applies it in bulk and notifies the affected clients.",
+        parameters=[
+            OpenApiParameter(name="break_type", description="'workshop' or 'mechanic'", required=True, type=str),
+            OpenApiParameter(name="break_id", description="ID of the break", required=True, type=int),
+            OpenApiParameter(name="notify", description="Notify clients when applying (default true)", required=False, type=bool),
+        ],
+        responses={
+            200: OpenApiResponse(description="Rescheduling plan"),
+            400: OpenApiResponse(description="Invalid parameters"),
+            403: OpenApiResponse(description="Not the workshop owner"),
+            404: OpenApiResponse(description="Break not found")
+        }
+    )
+    @action(detail=False, methods=['get', 'post'], url_path='break-disruption')
+    def break_disruption(self, request):
+        """Preview (GET) or apply (POST) the rescheduling plan for a break"""
+        break_type = request.query_params.get('break_type')
+        try:
+            break_id = int(request.query_params.get('break_id'))
+        except (ValueError, TypeError):
+            break_id = None
+        if break_type not in ('workshop', 'mechanic') or break_id is None:
+            return Response(
+                {"error": "Parameters 'break_type' (workshop|mechanic) and 'break_id' are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if break_type == 'mechanic':
+            break_obj = MechanicBreak.objects.select_related('workshop_mechanic').filter(id=break_id).first()
+        else:
+            break_obj = WorkshopBreak.objects.filter(id=break_id).first()
+        if break_obj is None:
+            return Response({"error": "Break not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        workshop_id = break_obj.workshop_mechanic.workshop_id if break_type == 'mechanic' else break_obj.workshop_id
+        error_response = self._check_workshop_owner(request, workshop_id)
+        if error_response:
+            return error_response
+
+        try:
+            if request.method == 'GET':
+                return Response(DisruptionService.preview(break_obj))
+            notify = request.query_params.get('notify', 'true').lower() == 'true'
+            return Response(DisruptionService.apply(break_obj, notify=notify))
+        except Exception as e:
+            return Response(
+                {"error": f"Error rescheduling appointments: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @extend_schema(
+        summary="Request coalescing statistics",
+        description="Hit, miss and coalesced counts of the shared availability computations, "
+                    "for this worker process and across all workers.",
+        responses={
+            200: OpenApiResponse(description="Counts per computation"),
+            403: OpenApiResponse(description="Admin only")
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='coalescing-stats')
+    def coalescing_stats(self, request):
+        """Return single-flight metrics of the availability services"""
+        if request.user.role not in ('admin', 'root'):
+            return Response({"error": "Only administrators can view metrics"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(SingleFlight.all_stats())
+
 
 class WorkshopBreakViewSet(BaseViewSet):
     queryset = WorkshopBreak.objects.all()
@@ -480,4 +600,4 @@ class WorkshopBreakViewSet(BaseViewSet):
             return Response(
                 {"error": "Invalid workshop_id"},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,163 @@
+import redis
+from datetime import datetime
+from django.db import IntegrityError
+from django.http import Http404
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.viewsets import ViewSet
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from appointments.models import Appointment
+from appointments.serializers import AppointmentSerializer
+from ..services.slotHoldService import SlotHoldService, SlotUnavailableError
+
+
+class SlotHoldViewSet(ViewSet):
+    """Short-lived slot holds used by the booking wizard before the appointment is confirmed"""
+    permission_classes = [IsAuthenticated]
+
+    def _error(self, exception):
+        """Map hold errors to the API error envelope"""
+        if isinstance(exception, Http404):
+            return Response({"error": "Hold not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        if isinstance(exception, PermissionError):
+            return Response({"error": str(exception)}, status=status.HTTP_403_FORBIDDEN)
+        if isinstance(exception, SlotUnavailableError):
+            return Response({"error": str(exception)}, status=status.HTTP_409_CONFLICT)
+        if isinstance(exception, IntegrityError):
+            return Response(
+                {"error": "The assigned mechanic already has an appointment at this time"},
+                status=status.HTTP_409_CONFLICT
+            )
+        if isinstance(exception, ValueError):
+            return Response({"error": str(exception)}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(exception, redis.RedisError):
+            return Response({"error": "Slot holds are temporarily unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        raise exception
+
+    @extend_schema(
+        summary="Hold a slot",
+        description=f"Reserves the slot for {SlotHoldService.HOLD_TTL_SECONDS} seconds. Held slots are hidden "
+                    "from availability and mechanic searches until the hold expires or is confirmed.",
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {
+                    'workshop_id': {'type': 'integer'},
+                    'start': {'type': 'string', 'format': 'date-time'},
+                    'duration': {'type': 'integer'},
+                    'appointment_type': {'type': 'string'},
+                    'mechanic_id': {'type': 'integer'}
+                },
+                'required': ['workshop_id', 'start']
+            }
+        },
+        responses={
+            201: OpenApiResponse(description="Hold created"),
+            400: OpenApiResponse(description="Invalid parameters"),
+            409: OpenApiResponse(description="Slot is booked or held by another client"),
+            503: OpenApiResponse(description="Redis unavailable")
+        }
+    )
+    def create(self, request):
+        """Hold a slot for the current user"""
+        try:
+            workshop_id = int(request.data.get('workshop_id'))
+            start = datetime.fromisoformat(request.data.get('start'))
+            mechanic_id = request.data.get('mechanic_id')
+            mechanic_id = int(mechanic_id) if mechanic_id not in (None, '') else None
+            duration = request.data.get('duration')
+            appointment_type = request.data.get('appointment_type')
+            if duration:
+                duration = int(duration)
+            elif appointment_type in Appointment.APPOINTMENT_DURATIONS:
+                duration = Appointment.APPOINTMENT_DURATIONS[appointment_type]
+            else:
+                duration = Appointment.DEFAULT_DURATION
+        except (ValueError, TypeError):
+            return Response(
+                {"error": "Fields 'workshop_id' and 'start' (ISO datetime) are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            hold = SlotHoldService.create_hold(request.user, workshop_id, start, duration, mechanic_id)
+        except Exception as e:
+            return self._error(e)
+        return Response(hold, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        summary="Get a slot hold",
+        parameters=[OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Hold ID", required=True, type=str)],
+        responses={
+            200: OpenApiResponse(description="Hold details"),
+            403: OpenApiResponse(description="Hold belongs to another user"),
+            404: OpenApiResponse(description="Hold not found or expired")
+        }
+    )
+    def retrieve(self, request, pk=None):
+        """Return an active hold of the current user"""
+        try:
+            return Response(SlotHoldService.get_hold(pk, request.user))
+        except Exception as e:
+            return self._error(e)
+
+    @extend_schema(
+        summary="Release a slot hold",
+        parameters=[OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Hold ID", required=True, type=str)],
+        responses={
+            204: OpenApiResponse(description="Hold released"),
+            403: OpenApiResponse(description="Hold belongs to another user"),
+            404: OpenApiResponse(description="Hold not found or expired")
+        }
+    )
+    def destroy(self, request, pk=None):
+        """Release the hold before it expires"""
+        try:
+            SlotHoldService.release_hold(SlotHoldService.get_hold(pk, request.user))
+        except Exception as e:
+            return self._error(e)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @extend_schema(
+        summary="Confirm a slot hold",
+        description="Creates the appointment for the held slot and releases the hold.",
+        parameters=[OpenApiParameter(name="id", location=OpenApiParameter.PATH, description="Hold ID", required=True, type=str)],
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {
+                    'vehicle_id': {'type': 'integer'},
+                    'appointment_type': {'type': 'string'},
+                    'service_description': {'type': 'string'}
+                },
+                'required': ['vehicle_id']
+            }
+        },
+        responses={
+            201: AppointmentSerializer,
+            400: OpenApiResponse(description="Invalid parameters"),
+            403: OpenApiResponse(description="Hold belongs to another user"),
+            404: OpenApiResponse(description="Hold not found or expired"),
+            409: OpenApiResponse(description="Hold is already being confirmed or the slot is taken")
+        }
+    )
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        """Turn the hold into an appointment"""
+        try:
+            vehicle_id = int(request.data.get('vehicle_id'))
+        except (ValueError, TypeError):
+            return Response({"error": "Field 'vehicle_id' is required"}, status=status.HTTP_400_BAD_REQUEST)
+        appointment_type = request.data.get('appointment_type', 'service')
+        if appointment_type not in Appointment.APPOINTMENT_DURATIONS:
+            return Response({"error": f"Invalid appointment type: {appointment_type}"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            appointment = SlotHoldService.confirm_hold(
+                pk, request.user, vehicle_id, appointment_type, request.data.get('service_description')
+            )
+        except Exception as e:
+            return self._error(e)
+        return Response(AppointmentSerializer(appointment).data, status=status.HTTP_201_CREATED)
@@ -93,8 +93,8 @@ class WorkshopViewSet(BaseViewSet):
 
     @extend_schema(
         summary="Get current user's workshop",
-        description="Retrieve the workshop assigned to the current user.",
-        responses={200: WorkshopSerializer}
+        description="Retrieve the workshop assigned to the current user. Supports If-None-Match.",
+        responses={200: WorkshopSerializer, 304: OpenApiResponse(description="Not modified")}
     )
     @action(detail=False, methods=['get'], url_path='my-workshop')
     def my_workshop(self, request):
@@ -106,8 +106,11 @@ class WorkshopViewSet(BaseViewSet):
             workshop = self.service.get_user_workshop(user.id)
             if not workshop:
                 return Response({"error": "No workshop assigned to user"}, status=404)
-            serializer = self.serializer_class(workshop)
-            return Response(serializer.data)
+            return self.conditional_response(
+                request,
+                self.record_etag(request, workshop),
+                lambda: Response(self.serializer_class(workshop).data)
+            )
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
@@ -160,12 +163,16 @@ class WorkshopViewSet(BaseViewSet):
             return Response({"error": str(e)}, status=500)
 
     @extend_schema(
-        summary="Get nearby workshops",
-        description="Find workshops near a specific location within a given radius.",
+        summary="Find nearby workshops",
+        description="Find workshops near a given location sorted by distance. With 'k' returns the k nearest "
+                    "workshops regardless of radius; with 'limit' returns a page of the radius results.",
         parameters=[
             OpenApiParameter(name="latitude", location=OpenApiParameter.QUERY, description="User latitude", required=True, type=float),
             OpenApiParameter(name="longitude", location=OpenApiParameter.QUERY, description="User longitude", required=True, type=float),
-            OpenApiParameter(name="radius", location=OpenApiParameter.QUERY, description="Search radius in kilometers", required=False, type=int)
+            OpenApiParameter(name="radius", location=OpenApiParameter.QUERY, description="Search radius in kilometers", required=False, type=float),
+            OpenApiParameter(name="k", location=OpenApiParameter.QUERY, description="Return the k nearest workshops", required=False, type=int),
+            OpenApiParameter(name="limit", location=OpenApiParameter.QUERY, description="Page size", required=False, type=int),
+            OpenApiParameter(name="offset", location=OpenApiParameter.QUERY, description="Page offset", required=False, type=int)
         ],
         responses={200: WorkshopSerializer(many=True)}
     )
@@ -175,115 +182,145 @@ class WorkshopViewSet(BaseViewSet):
         Znajdź warsztaty w pobliżu podanej lokalizacji.
         """
         try:
-            latitude = float(request.GET.get('latitude'))
-            longitude = float(request.GET.get('longitude'))
-            radius = int(request.GET.get('radius', 50))  # Default 50km
-            
-            nearby_workshops = self.service.get_nearby_workshops(latitude, longitude, radius)
-            
-            # Add distance information to each workshop
-            for workshop in nearby_workshops:
-                if workshop.latitude and workshop.longitude:
-                    distance = workshop.distance_to(latitude, longitude)
-                    workshop.distance = distance
-            
-            serializer = self.serializer_class(nearby_workshops, many=True)
-            
-            # Add distance to serialized data
-            data = serializer.data
-            for i, workshop in enumerate(nearby_workshops):
-                if hasattr(workshop, 'distance'):
-                    data[i]['distance'] = workshop.distance
-            
-            return Response(data)
+            latitude, longitude, radius, k, limit, offset = self.nearby_params(request.query_params)
         except (ValueError, TypeError):
-            return Response({"error": "Invalid latitude, longitude or radius parameters"}, status=400)
-        except Exception as e:
-            return Response({"error": str(e)}, status=500)
+            return Response({"error": "Invalid latitude, longitude, radius, k, limit or offset parameters"}, status=400)
 
-    @extend_schema(
-        summary="Find nearby workshops",
-        description="Find workshops near a given location sorted by distance.",
-        parameters=[
-            OpenApiParameter(name="latitude", location=OpenApiParameter.QUERY, description="User latitude", required=True, type=float),
-            OpenApiParameter(name="longitude", location=OpenApiParameter.QUERY, description="User longitude", required=True, type=float),
-            OpenApiParameter(name="radius", location=OpenApiParameter.QUERY, description="Search radius in kilometers", required=False, type=int)
-        ],
-        responses={200: WorkshopSerializer(many=True)}
-    )
-    @action(detail=False, methods=['get'], url_path='nearby')
-    def nearby_workshops(self, request):
-        """
-        Znajdź warsztaty w pobliżu podanej lokalizacji.
-        """
         try:
-            latitude = float(request.GET.get('latitude'))
-            longitude = float(request.GET.get('longitude'))
-            radius = int(request.GET.get('radius', 50))  # domyślnie 50km
-            
-            workshops = self.service.get_nearby_workshops(latitude, longitude, radius)
-            serializer = self.serializer_class(workshops, many=True)
-            
-            # Dodaj dystans do każdego warsztatu
-            for workshop_data, workshop in zip(serializer.data, workshops):
-                distance = workshop.distance_to(latitude, longitude)
-                workshop_data['distance_km'] = round(distance, 2) if distance else None
-            
-            return Response(serializer.data)
-            
-        except (ValueError, TypeError):
-            return Response({"error": "Invalid latitude or longitude"}, status=400)
+            if k is not None:
+                workshops, total = self.service.get_nearest_workshops(latitude, longitude, k), None
+            else:
+                workshops, total = self.service.get_nearby_workshops_page(latitude, longitude, radius, offset, limit)
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
+        return Response(self.nearby_data(workshops, total, k, limit, offset))
+
+    @staticmethod
+    def nearby_params(query_params):
+        """(latitude, longitude, radius, k, limit, offset) akcji nearby; ValueError/TypeError dla błędnych"""
+        latitude = float(query_params.get('latitude'))
+        longitude = float(query_params.get('longitude'))
+        radius = float(query_params.get('radius', 50))  # domyślnie 50km
+        k = int(query_params['k']) if 'k' in query_params else None
+        limit = int(query_params['limit']) if 'limit' in query_params else None
+        offset = int(query_params.get('offset', 0))
+        if (not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or radius <= 0 or offset < 0
+                or (k is not None and k <= 0) or (limit is not None and limit <= 0)):
+            raise ValueError
+        return latitude, longitude, radius, k, limit, offset
+
+    @classmethod
+    def nearby_data(cls, workshops, total, k, limit, offset):
+        """Odpowiedź akcji nearby: lista z distance_km albo strona z liczbą wyników"""
+        data = cls.serializer_class(workshops, many=True).data
+        for workshop_data, workshop in zip(data, workshops):
+            workshop_data['distance_km'] = round(workshop.distance_km, 2)
+
+        if limit is not None and k is None:
+            return {
+                "count": total,
+                "offset": offset,
+                "limit": limit,
+                "results": data
+            }
+        return data
+
     @extend_schema(
         summary="Search workshops with filters and sorting",
-        description="Search workshops with optional filters and sorting options",
+        description="Search workshops with optional filters and sorting options. Filtering, ranking and sorting "
+                    "run in the database; with 'limit' the response is a page with the total count.",
         parameters=[
             OpenApiParameter(name="query", description="Search query for name/location", required=False, type=str),
             OpenApiParameter(name="latitude", description="User latitude for distance calculation", required=False, type=float),
             OpenApiParameter(name="longitude", description="User longitude for distance calculation", required=False, type=float),
-            OpenApiParameter(name="sort_by", description="Sort by: name, rating, distance", required=False, type=str),
+            OpenApiParameter(name="sort_by", description="Sort by: name, rating, distance, relevance", required=False, type=str),
             OpenApiParameter(name="specialization", description="Workshop specialization", required=False, type=str),
-            OpenApiParameter(name="has_location", description="Filter by geolocation data availability", required=False, type=bool)
+            OpenApiParameter(name="has_location", description="Filter by geolocation data availability", required=False, type=bool),
+            OpenApiParameter(name="limit", description="Page size", required=False, type=int),
+            OpenApiParameter(name="offset", description="Page offset", required=False, type=int)
         ],
-        responses={200: WorkshopSerializer(many=True)}
+        responses={200: WorkshopSerializer(many=True), 400: OpenApiResponse(description="Invalid parameters")}
     )
     @action(detail=False, methods=['get'], url_path='search')
     def search_workshops(self, request):
         """Wyszukaj warsztaty z filtrami i sortowaniem"""
-        query = request.query_params.get('query')
-        latitude = request.query_params.get('latitude')
-        longitude = request.query_params.get('longitude')
-        sort_by = request.query_params.get('sort_by', 'name')
-        specialization = request.query_params.get('specialization')
-        has_location = request.query_params.get('has_location')
-        
-        if has_location is not None:
-            has_location = has_location.lower() in ['true', '1', 'yes']
-        
         try:
-            workshops = self.service.search_workshops(
-                query=query,
-                location_lat=latitude,
-                location_lng=longitude,
-                sort_by=sort_by,
-                specialization=specialization,
-                has_location=has_location
+            workshops, limit, offset = self.search_queryset(request.query_params)
+        except ValueError:
+            return Response(
+                {"error": "Invalid latitude, longitude, sort_by, limit or offset parameters"},
+                status=400
             )
-            
-            serializer = self.serializer_class(workshops, many=True)
-            
-            # Dodaj obliczoną odległość do odpowiedzi
-            for workshop_data, workshop in zip(serializer.data, workshops):
-                if hasattr(workshop, 'calculated_distance') and workshop.calculated_distance is not None:
-                    workshop_data['distance_km'] = round(workshop.calculated_distance, 2)
-            
-            return Response(serializer.data)
-            
+
+        try:
+            page = workshops[offset:offset + limit] if limit is not None else workshops[offset:]
+            page = list(page)
+            count = workshops.count() if limit is not None else None
+            return Response(self.search_data(page, count, limit, offset))
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
+    @classmethod
+    def search_queryset(cls, query_params):
+        """(queryset wyników, limit, offset) akcji search; ValueError dla błędnych parametrów"""
+        has_location = query_params.get('has_location')
+        if has_location is not None:
+            has_location = has_location.lower() in ['true', '1', 'yes']
+
+        limit = int(query_params['limit']) if 'limit' in query_params else None
+        offset = int(query_params.get('offset', 0))
+        if offset < 0 or (limit is not None and limit <= 0):
+            raise ValueError
+        workshops = cls.service.search_workshops(
+            query=query_params.get('query'),
+            location_lat=query_params.get('latitude'),
+            location_lng=query_params.get('longitude'),
+            sort_by=query_params.get('sort_by', 'name'),
+            specialization=query_params.get('specialization'),
+            has_location=has_location
+        )
+        return workshops, limit, offset
+
+    @classmethod
+    def search_data(cls, page, count, limit, offset):
+        """Odpowiedź akcji search: lista z distance_km albo strona z liczbą wyników"""
+        data = cls.serializer_class(page, many=True).data
+
+        # Dodaj obliczoną odległość do odpowiedzi
+        for workshop_data, workshop in zip(data, page):
+            if getattr(workshop, 'calculated_distance', None) is not None:
+                workshop_data['distance_km'] = round(workshop.calculated_distance, 2)
+
+        if limit is not None:
+            return {
+                "count": count,
+                "offset": offset,
+                "limit": limit,
+                "results": data
+            }
+        return data
+
+    @extend_schema(
+        summary="Autocomplete workshop names",
+        description="Returns the best matching workshops for the typed text (prefix and typo tolerant on PostgreSQL).",
+        parameters=[
+            OpenApiParameter(name="q", description="Typed text", required=True, type=str),
+            OpenApiParameter(name="limit", description="Maximum number of suggestions (default 10, max 50)", required=False, type=int)
+        ],
+        responses={200: OpenApiResponse(description="List of {id, name, location}"), 400: OpenApiResponse(description="Invalid parameters")}
+    )
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        """Podpowiedzi nazw warsztatów"""
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+            if limit <= 0:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "Invalid limit"}, status=400)
+        return Response(self.service.autocomplete_workshops(request.query_params.get('q', ''), limit))
+
     @extend_schema(
         summary="Get workshop specializations",
         description="Get list of available workshop specializations",